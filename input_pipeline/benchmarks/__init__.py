@@ -0,0 +1,6 @@
+"""
+Benchmarks Module - Performance Regression Suite
+
+Synthetic corpus generation and per-stage benchmarks for the
+normalization, validation and snapshot layers.
+"""
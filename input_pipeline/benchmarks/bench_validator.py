@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Schema Validator Benchmark
+
+Compares the generic Draft7Validator against the compiled validators
+generated by schema_compiler on a synthetic canonical corpus: times
+schema validation per entity type (documents per second) and checks both
+report the same number of errors. The fuzzed equivalence check (identical
+errors on mutated documents) is in tests/test_schema_compiler.py.
+
+Usage:
+    python3 bench_validator.py                 # 1x corpus
+    python3 bench_validator.py --scale 10      # 10x corpus
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Dict, List, Any
+
+# Add parent directory to path for imports
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PIPELINE_DIR)
+
+from benchmarks.synthetic_data import ensure_corpus
+from benchmarks.run_benchmarks import DEFAULT_WORK_DIR, prepare_canonical, _load_canonical
+from normalize_schema.validator import SchemaValidator
+
+
+def time_validator(validator: SchemaValidator, entities: List[Dict], entity_type: str, repeat: int) -> Dict[str, Any]:
+    """Best-of-repeat schema validation time for one entity type."""
+    best = None
+    error_count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        error_count = len(validator.validate_batch(entities, entity_type))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        'seconds': round(best, 4),
+        'docs_per_second': round(len(entities) / best, 1) if best > 0 else None,
+        'errors': error_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generic vs compiled schema validator benchmark")
+    parser.add_argument('--scale', type=int, default=1, help="Corpus scale (default: 1)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs; the best is reported (default: 3)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the corpus (default: 42)")
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help="Directory for generated corpora")
+    parser.add_argument('--output', help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("SCHEMA VALIDATOR BENCHMARK")
+    print("=" * 60)
+
+    corpus_dir = os.path.join(args.work_dir, f"corpus_{args.scale}x")
+    canonical_dir = os.path.join(args.work_dir, f"canonical_{args.scale}x")
+    corpus = ensure_corpus(corpus_dir, scale=args.scale, seed=args.seed)
+    if not os.path.exists(os.path.join(canonical_dir, 'problems.json')):
+        prepare_canonical(corpus, canonical_dir)
+    problems, contests, topics = _load_canonical(canonical_dir)
+    entities = {'problem': problems, 'contest': contests, 'topic': topics}
+
+    generic = SchemaValidator(compiled=False)
+    compiled = SchemaValidator(compiled=True)
+    print(f"Compiled schemas: {sorted(compiled.compiled)}")
+
+    report: Dict[str, Any] = {'scale': args.scale, 'timings': {}}
+    mismatched = []
+    for entity_type, docs in entities.items():
+        g = time_validator(generic, docs, entity_type, args.repeat)
+        c = time_validator(compiled, docs, entity_type, args.repeat)
+        speedup = round(g['seconds'] / c['seconds'], 2) if c['seconds'] > 0 else None
+        report['timings'][entity_type] = {'documents': len(docs), 'generic': g, 'compiled': c, 'speedup': speedup}
+        print(f"\n  {entity_type} ({len(docs)} docs)")
+        print(f"    generic:  {g['seconds']:.3f}s  ({g['docs_per_second']} docs/s, {g['errors']} errors)")
+        print(f"    compiled: {c['seconds']:.3f}s  ({c['docs_per_second']} docs/s, {c['errors']} errors)")
+        print(f"    speedup:  {speedup}x")
+        if g['errors'] != c['errors']:
+            mismatched.append(entity_type)
+            print(f"    ✗ error counts differ")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n  ✓ Results saved to: {args.output}")
+
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
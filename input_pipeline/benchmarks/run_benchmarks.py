@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Suite
+
+Runs each pipeline stage in isolation against synthetic corpora scaled
+to 1x, 10x and 100x the current corpus size, and records wall time,
+records per second, peak RSS and tracemalloc peak per stage.
+
+Each stage runs in a fresh process so peak RSS is attributable to that
+stage alone. Results are written as JSON so runs from different commits
+can be compared with --compare.
+
+Usage:
+    python3 run_benchmarks.py                          # All stages, 1x/10x/100x
+    python3 run_benchmarks.py --scales 1 10            # Skip the 100x corpus
+    python3 run_benchmarks.py --stages validate_all    # One stage only
+    python3 run_benchmarks.py --compare results/old.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import resource
+import subprocess
+import tracemalloc
+import multiprocessing
+from queue import Empty
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Tuple
+
+# Add parent directory to path for imports
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PIPELINE_DIR)
+
+from benchmarks.synthetic_data import ensure_corpus
+
+
+# Paths
+DEFAULT_WORK_DIR = os.path.join(SCRIPT_DIR, "work")
+RESULTS_DIR = os.path.join(SCRIPT_DIR, "results")
+
+# Seconds between liveness checks while waiting for a child's result
+CHILD_POLL_SECONDS = 1.0
+
+STAGES = [
+    'codeforces_transform',
+    'leetcode_transform',
+    'validate_all',
+    'near_duplicates',
+    'create_snapshot',
+    'verify_snapshot',
+]
+
+DEFAULT_SCALES = [1, 10, 100]
+
+
+def _max_rss_mb() -> float:
+    """Peak resident set size of the current process in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if sys.platform == 'darwin':
+        return rss / (1024 * 1024)
+    return rss / 1024
+
+
+def _load_canonical(canonical_dir: str) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Load canonical problems, contests and topics from a directory."""
+    collections = []
+    for name in ('problems.json', 'contests.json', 'topics.json'):
+        with open(os.path.join(canonical_dir, name), 'r', encoding='utf-8') as f:
+            collections.append(json.load(f))
+    return tuple(collections)
+
+
+def prepare_canonical(corpus: Dict[str, Any], canonical_dir: str) -> Dict[str, int]:
+    """
+    Normalize a raw corpus into canonical files for the downstream stages.
+
+    Args:
+        corpus: Corpus info from ensure_corpus
+        canonical_dir: Directory to write problems/contests/topics JSON into
+
+    Returns:
+        Canonical record counts
+    """
+    from modify_data.transformers import LeetCodeTransformer, CodeforcesTransformer
+    from modify_data.utils.topic_normalizer import build_topic_document
+
+    lc_result = LeetCodeTransformer().transform_from_file(corpus['leetcode_file'])
+    cf_result = CodeforcesTransformer().transform_all(corpus['codeforces_dir'])
+
+    problems = lc_result['problems'] + cf_result['problems']
+    contests = cf_result['contests']
+    topic_names = sorted({t for p in problems for t in p.get('topics', [])})
+    topics = [build_topic_document(name) for name in topic_names]
+
+    os.makedirs(canonical_dir, exist_ok=True)
+    for name, data in (('problems.json', problems), ('contests.json', contests), ('topics.json', topics)):
+        with open(os.path.join(canonical_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    return {'problems': len(problems), 'contests': len(contests), 'topics': len(topics)}
+
+
+def _stage_runner(
+    stage: str,
+    corpus: Dict[str, Any],
+    canonical_dir: str,
+    scratch_dir: str
+) -> Callable[[int], int]:
+    """
+    Set up inputs for a stage and return a callable that runs it once.
+
+    Setup (loading inputs, creating the snapshot to verify) happens here
+    so it is excluded from the measurements.
+
+    Args:
+        stage: Stage name from STAGES
+        corpus: Corpus info
+        canonical_dir: Directory with canonical JSON files
+        scratch_dir: Empty directory the stage may write into
+
+    Returns:
+        Callable taking the iteration number and returning records processed
+    """
+    if stage == 'codeforces_transform':
+        from modify_data.transformers import CodeforcesTransformer
+
+        def run(iteration: int) -> int:
+            result = CodeforcesTransformer().transform_all(corpus['codeforces_dir'])
+            return result['stats']['problems']['total']
+        return run
+
+    if stage == 'leetcode_transform':
+        from modify_data.transformers import LeetCodeTransformer
+
+        def run(iteration: int) -> int:
+            result = LeetCodeTransformer().transform_from_file(corpus['leetcode_file'])
+            return result['stats']['total']
+        return run
+
+    if stage == 'validate_all':
+        from normalize_schema.validator import SchemaValidator
+        problems, contests, topics = _load_canonical(canonical_dir)
+        validator = SchemaValidator()
+
+        # Near-duplicate detection is opt-in and benchmarked as its own stage
+        def run(iteration: int) -> int:
+            validator.validate_all(problems, contests, topics)
+            return len(problems) + len(contests) + len(topics)
+        return run
+
+    if stage == 'near_duplicates':
+        from normalize_schema.rules.near_duplicate_detector import detect_near_duplicates
+        from validate_schema.search_index import load_leetcode_descriptions
+        problems, _, _ = _load_canonical(canonical_dir)
+        descriptions = load_leetcode_descriptions(corpus['leetcode_file'])
+
+        def run(iteration: int) -> int:
+            detect_near_duplicates(problems, descriptions)
+            return len(problems)
+        return run
+
+    from validate_schema import snapshot_manager
+    snapshot_manager.VALIDATED_DIR = scratch_dir
+    problems, contests, topics = _load_canonical(canonical_dir)
+    record_count = len(problems) + len(contests) + len(topics)
+    del problems, contests, topics
+
+    if stage == 'create_snapshot':
+        def run(iteration: int) -> int:
+            result = snapshot_manager.create_snapshot(
+                version=f"v0.0.{iteration}",
+                source_dir=canonical_dir,
+                leetcode_file=corpus['leetcode_file']
+            )
+            if not result['success']:
+                raise RuntimeError(result['error'])
+            return record_count
+        return run
+
+    if stage == 'verify_snapshot':
+        created = snapshot_manager.create_snapshot(
+            version="v0.0.0",
+            source_dir=canonical_dir,
+            leetcode_file=corpus['leetcode_file']
+        )
+        if not created['success']:
+            raise RuntimeError(created['error'])
+
+        def run(iteration: int) -> int:
+            result = snapshot_manager.verify_snapshot("v0.0.0")
+            if not result['valid']:
+                raise RuntimeError(result['errors'])
+            return record_count
+        return run
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def _measure_stage(
+    stage: str,
+    corpus: Dict[str, Any],
+    canonical_dir: str,
+    scratch_dir: str,
+    repeat: int,
+    queue
+):
+    """
+    Child-process entry point: run one stage and report measurements.
+
+    Timing runs happen without tracemalloc (it slows allocation-heavy code
+    several times over); one extra traced run then measures the peak.
+    """
+    try:
+        rss_start = _max_rss_mb()
+        run = _stage_runner(stage, corpus, canonical_dir, scratch_dir)
+        rss_after_setup = _max_rss_mb()
+
+        timings = []
+        records = 0
+        for i in range(repeat):
+            start = time.perf_counter()
+            records = run(i + 1)
+            timings.append(time.perf_counter() - start)
+        rss_peak = _max_rss_mb()
+
+        tracemalloc.start()
+        run(repeat + 1)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        queue.put({
+            'records': records,
+            'timings': timings,
+            'rss_start_mb': rss_start,
+            'rss_after_setup_mb': rss_after_setup,
+            'rss_peak_mb': rss_peak,
+            'tracemalloc_peak_mb': traced_peak / (1024 * 1024),
+        })
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _prepare_in_child(corpus: Dict[str, Any], canonical_dir: str, queue):
+    """Child-process entry point for prepare_canonical."""
+    try:
+        queue.put(prepare_canonical(corpus, canonical_dir))
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _run_in_child(target: Callable, *args) -> Dict[str, Any]:
+    """
+    Run target in a fresh spawned process and return what it reports.
+
+    A child that dies without reporting (OOM kill, segfault) yields an
+    error result instead of blocking the run.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=target, args=(*args, queue))
+    process.start()
+    while True:
+        try:
+            result = queue.get(timeout=CHILD_POLL_SECONDS)
+            break
+        except Empty:
+            if process.is_alive():
+                continue
+            # The result may have been flushed just before the child exited
+            try:
+                result = queue.get(timeout=CHILD_POLL_SECONDS)
+                break
+            except Empty:
+                process.join()
+                return {'error': f"child exited with {process.exitcode}"}
+    process.join()
+    return result
+
+
+def run_stage(
+    stage: str,
+    corpus: Dict[str, Any],
+    canonical_dir: str,
+    work_dir: str,
+    repeat: int = 3
+) -> Dict[str, Any]:
+    """
+    Benchmark one stage at one scale in an isolated process.
+
+    Args:
+        stage: Stage name from STAGES
+        corpus: Corpus info
+        canonical_dir: Directory with canonical JSON files
+        work_dir: Directory for stage scratch output
+        repeat: Number of timed runs
+
+    Returns:
+        Result dict for the results file
+    """
+    scratch_dir = os.path.join(work_dir, f"scratch_{stage}")
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    os.makedirs(scratch_dir)
+
+    measured = _run_in_child(_measure_stage, stage, corpus, canonical_dir, scratch_dir, repeat)
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    result = {'stage': stage, 'scale': corpus['scale']}
+    if 'error' in measured:
+        result['error'] = measured['error']
+        return result
+
+    timings = sorted(measured['timings'])
+    wall = timings[len(timings) // 2]
+    result.update({
+        'records': measured['records'],
+        'wall_seconds': round(wall, 4),
+        'wall_seconds_min': round(timings[0], 4),
+        'runs': len(timings),
+        'records_per_second': round(measured['records'] / wall, 1) if wall > 0 else None,
+        'rss_peak_mb': round(measured['rss_peak_mb'], 1),
+        'rss_setup_mb': round(measured['rss_after_setup_mb'], 1),
+        'rss_stage_delta_mb': round(measured['rss_peak_mb'] - measured['rss_after_setup_mb'], 1),
+        'tracemalloc_peak_mb': round(measured['tracemalloc_peak_mb'], 1),
+    })
+    return result
+
+
+def _git_commit() -> str:
+    """Current git commit hash, or None outside a git checkout."""
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=PIPELINE_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(
+    stages: List[str],
+    scales: List[int],
+    work_dir: str,
+    repeat: int = 3,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Run the benchmark matrix (stages x scales).
+
+    Args:
+        stages: Stage names to run
+        scales: Corpus scales to run at
+        work_dir: Directory for generated corpora and scratch output
+        repeat: Timed runs per stage
+        seed: Corpus generation seed
+
+    Returns:
+        Results document
+    """
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'corpora': {},
+        'results': [],
+    }
+
+    for scale in scales:
+        print("\n" + "=" * 60)
+        print(f"SCALE {scale}x")
+        print("=" * 60)
+
+        corpus_dir = os.path.join(work_dir, f"corpus_{scale}x")
+        print(f"  Generating corpus in {corpus_dir}...")
+        corpus = ensure_corpus(corpus_dir, scale=scale, seed=seed)
+
+        canonical_dir = os.path.join(corpus_dir, 'canonical')
+        if any(s in stages for s in ('validate_all', 'near_duplicates', 'create_snapshot', 'verify_snapshot')):
+            print("  Preparing canonical data...")
+            counts = _run_in_child(_prepare_in_child, corpus, canonical_dir)
+            if 'error' in counts:
+                print(f"  ✗ Failed to prepare canonical data: {counts['error']}")
+                continue
+            corpus['canonical_counts'] = counts
+
+        report['corpora'][f"{scale}x"] = corpus['counts']
+
+        for stage in stages:
+            result = run_stage(stage, corpus, canonical_dir, work_dir, repeat=repeat)
+            report['results'].append(result)
+
+            if 'error' in result:
+                print(f"  ✗ {stage}: {result['error']}")
+            else:
+                print(
+                    f"  ✓ {stage}: {result['wall_seconds']:.3f}s, "
+                    f"{result['records_per_second']:.0f} rec/s, "
+                    f"RSS {result['rss_peak_mb']:.0f}MB, "
+                    f"traced {result['tracemalloc_peak_mb']:.0f}MB"
+                )
+
+    return report
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare two results documents stage by stage.
+
+    Args:
+        current: Results from this run
+        baseline: Results from an earlier run
+
+    Returns:
+        List of comparison rows with relative changes (positive = slower/larger)
+    """
+    base_index = {
+        (r['stage'], r['scale']): r
+        for r in baseline.get('results', []) if 'error' not in r
+    }
+
+    rows = []
+    for r in current.get('results', []):
+        base = base_index.get((r['stage'], r['scale']))
+        if base is None or 'error' in r:
+            continue
+        row = {'stage': r['stage'], 'scale': r['scale']}
+        for metric in ('wall_seconds', 'rss_peak_mb', 'tracemalloc_peak_mb'):
+            old, new = base.get(metric), r.get(metric)
+            if old:
+                row[metric] = round((new - old) / old * 100, 1)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmarks")
+    parser.add_argument(
+        '--stages',
+        nargs='+',
+        choices=STAGES,
+        default=STAGES,
+        help="Stages to benchmark (default: all)"
+    )
+    parser.add_argument(
+        '--scales',
+        nargs='+',
+        type=int,
+        default=DEFAULT_SCALES,
+        help="Corpus scales relative to the current corpus (default: 1 10 100)"
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help="Timed runs per stage; the median is reported (default: 3)"
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help="Seed for synthetic corpus generation (default: 42)"
+    )
+    parser.add_argument(
+        '--work-dir',
+        default=DEFAULT_WORK_DIR,
+        help="Directory for generated corpora, reused across runs"
+    )
+    parser.add_argument(
+        '--output',
+        help="Results file (default: results/bench_<timestamp>.json)"
+    )
+    parser.add_argument(
+        '--compare',
+        help="Earlier results file to compare against"
+    )
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("PIPELINE BENCHMARKS")
+    print("=" * 60)
+    print(f"Stages: {args.stages}")
+    print(f"Scales: {args.scales}")
+    print(f"Repeat: {args.repeat}")
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    report = run_benchmarks(
+        stages=args.stages,
+        scales=args.scales,
+        work_dir=args.work_dir,
+        repeat=args.repeat,
+        seed=args.seed
+    )
+
+    output = args.output
+    if output is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"bench_{timestamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n  ✓ Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\n" + "=" * 60)
+        print(f"COMPARISON vs {args.compare}")
+        print("=" * 60)
+        for row in compare_results(report, baseline):
+            changes = ', '.join(
+                f"{k} {v:+.1f}%" for k, v in row.items() if k not in ('stage', 'scale')
+            )
+            print(f"  {row['stage']} @ {row['scale']}x: {changes}")
+
+
+if __name__ == "__main__":
+    main()
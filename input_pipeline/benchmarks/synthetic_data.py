@@ -0,0 +1,253 @@
+"""
+Synthetic Corpus Generator
+
+Generates raw Codeforces contest files and LeetCode records shaped like
+the real fetch_data inputs, scaled relative to the current corpus size.
+Output is deterministic for a given scale and seed.
+"""
+
+import os
+import json
+import random
+from typing import Dict, Any
+
+
+# Current corpus size (see modify_data/output/normalization_report.json)
+BASE_CODEFORCES_CONTESTS = 1940
+BASE_LEETCODE_PROBLEMS = 2913
+
+CODEFORCES_TAGS = [
+    'implementation', 'math', 'greedy', 'dp', 'data structures',
+    'brute force', 'constructive algorithms', 'graphs', 'sortings',
+    'binary search', 'dfs and similar', 'trees', 'strings', 'number theory',
+    'combinatorics', 'two pointers', 'bitmasks', 'geometry', 'dsu',
+    'shortest paths', 'probabilities', 'divide and conquer', 'hashing',
+    'games', 'interactive', 'flows', 'matrices', 'fft', '2-sat',
+]
+
+LEETCODE_TAGS = [
+    'Array', 'String', 'Hash Table', 'Dynamic Programming', 'Math',
+    'Sorting', 'Greedy', 'Depth-First Search', 'Binary Search', 'Database',
+    'Breadth-First Search', 'Tree', 'Matrix', 'Two Pointers', 'Bit Manipulation',
+    'Stack', 'Heap (Priority Queue)', 'Graph', 'Prefix Sum', 'Simulation',
+    'Design', 'Counting', 'Backtracking', 'Sliding Window', 'Union Find',
+    'Linked List', 'Ordered Set', 'Monotonic Stack', 'Trie', 'Recursion',
+]
+
+CONTEST_TYPES = ['CF', 'CF', 'CF', 'ICPC', 'IOI']
+
+SNIPPET_LANGUAGES = [
+    'cpp', 'java', 'python', 'python3', 'c', 'csharp', 'javascript',
+    'typescript', 'php', 'swift', 'kotlin', 'dart', 'golang', 'ruby',
+    'scala', 'rust', 'racket', 'erlang', 'elixir',
+]
+
+WORDS = [
+    'array', 'string', 'tree', 'graph', 'sum', 'path', 'maximum', 'minimum',
+    'subarray', 'queries', 'number', 'pairs', 'game', 'robot', 'grid',
+    'matrix', 'binary', 'sequence', 'permutation', 'interval', 'cost',
+    'distance', 'balanced', 'palindrome', 'operations', 'divisible', 'coins',
+    'segments', 'colors', 'cities', 'roads', 'candies', 'team', 'letters',
+]
+
+
+def _title(rng: random.Random) -> str:
+    """Build a random problem title."""
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title()
+
+
+def _description_html(rng: random.Random, title: str) -> str:
+    """Build an HTML description comparable in size to real LeetCode content."""
+    paragraphs = []
+    for _ in range(rng.randint(2, 5)):
+        sentence = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 40)))
+        paragraphs.append(f"<p>Given a <code>{rng.choice(WORDS)}</code>, {sentence}.</p>")
+
+    examples = []
+    for i in range(1, rng.randint(2, 4)):
+        examples.append(
+            f"<p><strong>Example {i}:</strong></p>"
+            f"<pre><strong>Input:</strong> nums = [{rng.randint(1, 9)},{rng.randint(1, 9)}]\n"
+            f"<strong>Output:</strong> {rng.randint(0, 99)}\n"
+            f"<strong>Explanation:</strong> {' '.join(rng.choice(WORDS) for _ in range(12))}</pre>"
+        )
+
+    constraints = ''.join(
+        f"<li><code>1 &lt;= n &lt;= 10<sup>{rng.randint(3, 9)}</sup></code></li>"
+        for _ in range(rng.randint(2, 4))
+    )
+
+    return (
+        f"<p><strong>{title}</strong></p>"
+        + ''.join(paragraphs)
+        + ''.join(examples)
+        + f"<p><strong>Constraints:</strong></p><ul>{constraints}</ul>"
+    )
+
+
+def generate_codeforces_contest(rng: random.Random, contest_id: int) -> Dict[str, Any]:
+    """
+    Generate one raw Codeforces contest file payload.
+
+    Args:
+        rng: Random generator
+        contest_id: Contest ID to assign
+
+    Returns:
+        Dict with 'contest' and 'problems' keys (codeforces_sync.py format)
+    """
+    contest = {
+        'id': contest_id,
+        'name': f"Codeforces Round {contest_id} (Div. {rng.randint(1, 4)})",
+        'type': rng.choice(CONTEST_TYPES),
+        'phase': 'FINISHED',
+        'frozen': False,
+        'durationSeconds': rng.choice([7200, 8100, 9000, 10800]),
+        'startTimeSeconds': 1266580800 + contest_id * 86400,
+        'relativeTimeSeconds': 500000000 - contest_id * 86400,
+    }
+
+    problems = []
+    for offset in range(rng.randint(3, 8)):
+        problem = {
+            'contestId': contest_id,
+            'index': chr(ord('A') + offset),
+            'name': _title(rng),
+            'type': 'PROGRAMMING',
+            'tags': rng.sample(CODEFORCES_TAGS, rng.randint(0, 5)),
+        }
+        if rng.random() < 0.9:
+            problem['rating'] = rng.randrange(800, 3600, 100)
+        if rng.random() < 0.6:
+            problem['points'] = float(500 * (offset + 1))
+        problems.append(problem)
+
+    return {'contest': contest, 'problems': problems}
+
+
+def generate_leetcode_problem(rng: random.Random, problem_id: int) -> Dict[str, Any]:
+    """
+    Generate one raw LeetCode record in merged_problems.json format.
+
+    Args:
+        rng: Random generator
+        problem_id: Problem ID to assign
+
+    Returns:
+        Raw LeetCode problem dict
+    """
+    title = f"{_title(rng)} {problem_id}"
+    slug = title.lower().replace(' ', '-')
+
+    return {
+        'title': title,
+        'problem_id': str(problem_id),
+        'frontend_id': str(problem_id),
+        'difficulty': rng.choice(['Easy', 'Medium', 'Medium', 'Hard']),
+        'problem_slug': slug,
+        'topics': rng.sample(LEETCODE_TAGS, rng.randint(1, 4)),
+        'description': _description_html(rng, title),
+        'hints': [' '.join(rng.choice(WORDS) for _ in range(10)) for _ in range(rng.randint(0, 3))],
+        'code_snippets': {
+            lang: f"class Solution {{\n    // {lang} stub for {slug}\n}}"
+            for lang in SNIPPET_LANGUAGES
+        },
+    }
+
+
+def generate_corpus(
+    output_dir: str,
+    scale: int = 1,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Generate a scaled raw corpus on disk.
+
+    Layout mirrors fetch_data/:
+        {output_dir}/codeforces/{contestId}.json
+        {output_dir}/leetcode/merged_problems.json
+
+    Args:
+        output_dir: Directory to write the corpus into
+        scale: Multiple of the current corpus size
+        seed: Random seed for reproducible output
+
+    Returns:
+        Dict with corpus paths and record counts
+    """
+    rng = random.Random(f"{seed}:{scale}")
+
+    cf_dir = os.path.join(output_dir, 'codeforces')
+    lc_dir = os.path.join(output_dir, 'leetcode')
+    os.makedirs(cf_dir, exist_ok=True)
+    os.makedirs(lc_dir, exist_ok=True)
+
+    cf_problems = 0
+    contest_count = BASE_CODEFORCES_CONTESTS * scale
+    for contest_id in range(1, contest_count + 1):
+        payload = generate_codeforces_contest(rng, contest_id)
+        cf_problems += len(payload['problems'])
+        with open(os.path.join(cf_dir, f"{contest_id}.json"), 'w') as f:
+            json.dump(payload, f, indent=2)
+
+    # Stream questions out one at a time so 100x corpora don't need to fit in memory
+    lc_path = os.path.join(lc_dir, 'merged_problems.json')
+    lc_count = BASE_LEETCODE_PROBLEMS * scale
+    with open(lc_path, 'w', encoding='utf-8') as f:
+        f.write('{"questions": [\n')
+        for problem_id in range(1, lc_count + 1):
+            if problem_id > 1:
+                f.write(',\n')
+            json.dump(generate_leetcode_problem(rng, problem_id), f, ensure_ascii=False)
+        f.write('\n]}\n')
+
+    return {
+        'scale': scale,
+        'seed': seed,
+        'codeforces_dir': cf_dir,
+        'leetcode_file': lc_path,
+        'counts': {
+            'codeforces_contests': contest_count,
+            'codeforces_problems': cf_problems,
+            'leetcode_problems': lc_count,
+        },
+    }
+
+
+def load_corpus_info(output_dir: str) -> Dict[str, Any]:
+    """
+    Load corpus info written by a previous generation run.
+
+    Args:
+        output_dir: Corpus directory
+
+    Returns:
+        Corpus info dict, or None if not generated yet
+    """
+    info_path = os.path.join(output_dir, 'corpus.json')
+    if not os.path.exists(info_path):
+        return None
+    with open(info_path, 'r') as f:
+        return json.load(f)
+
+
+def ensure_corpus(output_dir: str, scale: int = 1, seed: int = 42) -> Dict[str, Any]:
+    """
+    Generate a corpus unless a matching one already exists in output_dir.
+
+    Args:
+        output_dir: Corpus directory
+        scale: Multiple of the current corpus size
+        seed: Random seed
+
+    Returns:
+        Corpus info dict
+    """
+    info = load_corpus_info(output_dir)
+    if info and info.get('scale') == scale and info.get('seed') == seed:
+        return info
+
+    info = generate_corpus(output_dir, scale=scale, seed=seed)
+    with open(os.path.join(output_dir, 'corpus.json'), 'w') as f:
+        json.dump(info, f, indent=2)
+    return info
@@ -1,7 +1,28 @@
 import requests
 import json
 import os
+import sys
 import time
+import argparse
+
+# Add pipeline root to path for the shared metrics registry
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from metrics import add_metrics_arguments, MetricsRun
+from metrics.pipeline_metrics import observe_http_request
+
+
+def timed_get(url, endpoint):
+    """GET a Codeforces API endpoint, recording latency and status."""
+    start = time.perf_counter()
+    try:
+        response = requests.get(url)
+    except Exception as e:
+        observe_http_request("codeforces", endpoint, time.perf_counter() - start, type(e).__name__)
+        raise
+    observe_http_request("codeforces", endpoint, time.perf_counter() - start, response.status_code)
+    return response
+
 
 def fetch_data():
     base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,12 +35,12 @@ def fetch_data():
     # Step 1: Get Contest Index
     print("Step 1: Fetching Contest Index...")
     try:
-        contest_response = requests.get("https://codeforces.com/api/contest.list")
+        contest_response = timed_get("https://codeforces.com/api/contest.list", "contest.list")
         contest_response.raise_for_status()
         contests_data = contest_response.json()
         if contests_data["status"] != "OK":
             print(f"Error fetching contests: {contests_data.get('comment')}")
-            return
+            return False
         
         all_contests = contests_data["result"]
         # Filter: FINISHED and non-gym
@@ -31,17 +52,17 @@ def fetch_data():
 
     except Exception as e:
         print(f"Exception during contest fetch: {e}")
-        return
+        return False
 
     # Step 2: Get Master Problem List
     print("Step 2: Fetching Master Problem List...")
     try:
-        problems_response = requests.get("https://codeforces.com/api/problemset.problems")
+        problems_response = timed_get("https://codeforces.com/api/problemset.problems", "problemset.problems")
         problems_response.raise_for_status()
         problems_data = problems_response.json()
         if problems_data["status"] != "OK":
             print(f"Error fetching problems: {problems_data.get('comment')}")
-            return
+            return False
         
         all_problems = problems_data["result"]["problems"]
         problem_stats = problems_data["result"]["problemStatistics"]
@@ -50,7 +71,7 @@ def fetch_data():
         
     except Exception as e:
         print(f"Exception during problem fetch: {e}")
-        return
+        return False
 
     # Step 3: Local Processing (The "Join")
     print("Step 3: Processing data locally...")
@@ -101,8 +122,14 @@ def fetch_data():
             count += 1
             
     print(f"Successfully saved data for {count} contests to {data_dir}/")
+    return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync Codeforces contests and problems")
+    add_metrics_arguments(parser, "codeforces_sync")
+    args = parser.parse_args()
+
     start_time = time.time()
-    fetch_data()
+    with MetricsRun("codeforces_sync", args.metrics_file, args.metrics_port) as metrics_run:
+        metrics_run.success = fetch_data()
     print(f"Total time: {time.time() - start_time:.2f} seconds")
@@ -21,10 +21,17 @@ import argparse
 import urllib.request
 import urllib.error
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Set
 
 # Configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+sys.path.insert(0, PIPELINE_DIR)
+
+from metrics import add_metrics_arguments, MetricsRun
+from metrics.pipeline_metrics import observe_http_request
+from modify_data.utils.json_array_reader import iter_json_array
+
 DATA_DIR = os.path.join(SCRIPT_DIR, "data")
 STATE_FILE = os.path.join(SCRIPT_DIR, "fetch_state.json")
 MERGED_FILE = os.path.join(DATA_DIR, "merged_problems.json")
@@ -68,59 +75,63 @@ def save_state(state: Dict):
         json.dump(state, f, indent=2)
 
 
-def api_request(url: str) -> Optional[Dict]:
-    """Make a GET request to an API endpoint."""
+def api_request(url: str, endpoint: str = "unknown") -> Optional[Dict]:
+    """Make a GET request to an API endpoint, recording its latency."""
+    start = time.perf_counter()
+    status = "error"
     try:
         req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
         with urllib.request.urlopen(req, timeout=DEFAULT_TIMEOUT) as response:
+            status = response.status
             return json.loads(response.read().decode("utf-8"))
     except urllib.error.HTTPError as e:
+        status = e.code
         print(f"  HTTP Error {e.code}: {url}")
         return None
     except urllib.error.URLError as e:
+        status = "URLError"
         print(f"  URL Error: {e.reason}")
         return None
     except Exception as e:
         print(f"  Error: {e}")
         return None
+    finally:
+        observe_http_request("leetcode", endpoint, time.perf_counter() - start, status)
 
 
 def fetch_problem_list_alfa(limit: int = 50, skip: int = 0) -> Optional[Dict]:
     """Fetch problem list from Alfa API with pagination."""
     url = f"{ALFA_API_BASE}/problems?limit={limit}&skip={skip}"
     print(f"  Fetching: {url}")
-    return api_request(url)
+    return api_request(url, "alfa.problems")
 
 
 def fetch_problem_detail_alfa(title_slug: str) -> Optional[Dict]:
     """Fetch specific problem details from Alfa API."""
     url = f"{ALFA_API_BASE}/select?titleSlug={title_slug}"
-    return api_request(url)
+    return api_request(url, "alfa.select")
 
 
 def fetch_daily_problem() -> Optional[Dict]:
     """Fetch today's daily problem from Alfa API."""
     url = f"{ALFA_API_BASE}/daily"
-    return api_request(url)
+    return api_request(url, "alfa.daily")
 
 
 def fetch_official_problem_list() -> Optional[Dict]:
     """Fetch all problems from LeetCode's official API (basic info only)."""
     print(f"  Fetching from official API: {LEETCODE_OFFICIAL_API}")
-    return api_request(LEETCODE_OFFICIAL_API)
+    return api_request(LEETCODE_OFFICIAL_API, "official.problems_all")
 
 
-def load_existing_problems() -> Dict[str, Dict]:
-    """Load existing problems from merged_problems.json."""
-    existing = {}
+def load_existing_slugs() -> Set[str]:
+    """Load the slugs of existing problems from merged_problems.json (read one question at a time)."""
+    existing = set()
     if os.path.exists(MERGED_FILE):
-        with open(MERGED_FILE, "r") as f:
-            data = json.load(f)
-            questions = data.get("questions", data) if isinstance(data, dict) else data
-            for q in questions:
-                slug = q.get("problem_slug") or q.get("titleSlug", "")
-                if slug:
-                    existing[slug] = q
+        for q in iter_json_array(MERGED_FILE, keys=("questions",)):
+            slug = q.get("problem_slug") or q.get("titleSlug", "")
+            if slug:
+                existing.add(slug)
     return existing
 
 
@@ -148,7 +159,7 @@ def mode_list(args):
         print(f"  -> Alfa reports: {alfa_total} problems")
     
     # Compare with existing
-    existing = load_existing_problems()
+    existing = load_existing_slugs()
     print(f"\n[Summary]")
     print(f"  Total on LeetCode: {total if official_data else 'Unknown'}")
     print(f"  Currently have: {len(existing)} problems")
@@ -167,7 +178,7 @@ def mode_details(args):
     fetched_slugs = set(state.get("fetched_slugs", []))
     
     # Get existing problems
-    existing = load_existing_problems()
+    existing = load_existing_slugs()
     print(f"Existing problems: {len(existing)}")
     print(f"Already fetched via API: {len(fetched_slugs)}")
     
@@ -254,7 +265,7 @@ def mode_sync(args):
     print("MODE: SYNC")
     print("=" * 60)
     
-    existing = load_existing_problems()
+    existing = load_existing_slugs()
     print(f"Existing: {len(existing)} problems")
     
     # Fetch full list from official API
@@ -339,6 +350,7 @@ def main():
                         help="Show list of new problems (for sync mode)")
     parser.add_argument("--save", action="store_true",
                         help="Save fetched data to file (for daily mode)")
+    add_metrics_arguments(parser, "leetcode_fetch_api")
     args = parser.parse_args()
     
     modes = {
@@ -348,7 +360,8 @@ def main():
         "daily": mode_daily,
     }
     
-    modes[args.mode](args)
+    with MetricsRun("leetcode_fetch_api", args.metrics_file, args.metrics_port):
+        modes[args.mode](args)
 
 
 if __name__ == "__main__":
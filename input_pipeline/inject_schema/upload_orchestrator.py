@@ -13,6 +13,7 @@ Upload only proceeds if all validation gates pass.
 import os
 import sys
 import json
+import time
 import argparse
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -28,6 +29,12 @@ from validate_schema.snapshot_manager import (
     list_snapshots,
     VALIDATED_DIR
 )
+from validate_schema.aggregates import load_aggregates, topic_totals, difficulty_totals
+from validate_schema.shards import SHARD_WORKERS, map_shards, shard_entries
+from validate_schema.compression import find_data_file
+from normalize_schema.entity_graph import load_snapshot_graph
+from metrics import add_metrics_arguments, MetricsRun
+from metrics.pipeline_metrics import record_upload
 
 
 class UploadGate:
@@ -53,6 +60,9 @@ class UploadGate:
         self.snapshot_dir = os.path.join(VALIDATED_DIR, version)
         self.checks_passed = False
         self.check_results = {}
+        # Entity graph and aggregate tables of the snapshot (loaded by run_checks)
+        self.graph = None
+        self.aggregates = None
     
     def run_checks(self) -> Dict[str, Any]:
         """
@@ -75,11 +85,10 @@ class UploadGate:
         manifest_path = os.path.join(self.snapshot_dir, 'manifest.json')
         results['checks']['manifest_exists'] = os.path.exists(manifest_path)
         
-        # Check 3: Data files exist
+        # Check 3: Data files exist (plain or compressed)
         required_files = ['problems.json', 'topics.json']
         for f in required_files:
-            filepath = os.path.join(self.snapshot_dir, f)
-            results['checks'][f'file_exists_{f}'] = os.path.exists(filepath)
+            results['checks'][f'file_exists_{f}'] = find_data_file(self.snapshot_dir, f) is not None
         
         # Check 4: Snapshot integrity (checksums)
         if results['checks']['manifest_exists']:
@@ -90,13 +99,13 @@ class UploadGate:
         else:
             results['checks']['checksum_valid'] = False
         
-        # Check 5: Data is non-empty
+        # Check 5: Data is non-empty (counted from the entity graph)
         try:
-            with open(os.path.join(self.snapshot_dir, 'problems.json'), 'r') as f:
-                problems = json.load(f)
-            results['checks']['has_problems'] = len(problems) > 0
-            results['problem_count'] = len(problems)
+            self.graph = load_snapshot_graph(self.snapshot_dir)
+            results['checks']['has_problems'] = self.graph.problem_count > 0
+            results['problem_count'] = self.graph.problem_count
         except Exception:
+            self.graph = None
             results['checks']['has_problems'] = False
         
         # Check 6: Load manifest for counts
@@ -107,6 +116,22 @@ class UploadGate:
         except Exception:
             results['manifest'] = None
         
+        # Check 7: Every contest/topic reference resolves
+        if self.graph is not None:
+            stats = self.graph.stats()
+            results['graph'] = stats
+            results['checks']['references_resolved'] = (
+                stats['missing_problems'] == 0 and stats['missing_topics'] == 0
+            )
+        else:
+            results['checks']['references_resolved'] = False
+        
+        # Aggregate tables (upload and warmup read these instead of the data)
+        try:
+            self.aggregates = load_aggregates(self.snapshot_dir)
+        except Exception:
+            self.aggregates = None
+        
         # Aggregate
         results['all_passed'] = all(
             v for k, v in results['checks'].items()
@@ -141,6 +166,12 @@ class UploadOrchestrator:
         self.version = self.gate.version
         self.snapshot_dir = self.gate.snapshot_dir
         self.upload_log = []
+        # Payload of each upload step (what it uploads, or in a dry run would):
+        # target -> {'records': {entity: n}, 'bytes': n}
+        self.payloads: Dict[str, Dict[str, Any]] = {}
+        # How each step that ran handled its payload (see UPLOAD_MODES):
+        # target -> 'uploaded', 'dry_run' or 'not_implemented'
+        self.step_modes: Dict[str, str] = {}
     
     def log(self, message: str, level: str = "INFO"):
         """Add message to upload log."""
@@ -152,6 +183,43 @@ class UploadOrchestrator:
         self.upload_log.append(entry)
         print(f"  [{level}] {message}")
     
+    def _file_bytes(self, filenames) -> int:
+        """Total stored size of snapshot files (plain or compressed; missing ones count 0)."""
+        total = 0
+        for filename in filenames:
+            path = find_data_file(self.snapshot_dir, filename)
+            if path is not None:
+                total += os.path.getsize(path)
+        return total
+    
+    def _timed_step(self, target: str, step, dry_run: bool) -> bool:
+        """
+        Run one upload step and record its duration and payload.
+        
+        Successful steps are recorded with the mode they ran in, so dry
+        runs and not-implemented targets are never counted as uploads.
+        
+        Args:
+            target: Upload target name (r2, supabase, redis)
+            step: Bound upload method
+            dry_run: Passed through to the step
+            
+        Returns:
+            Step result
+        """
+        start = time.perf_counter()
+        succeeded = step(dry_run)
+        if succeeded and target in self.step_modes:
+            payload = self.payloads.get(target, {'records': {}, 'bytes': 0})
+            record_upload(
+                target,
+                time.perf_counter() - start,
+                records=payload['records'],
+                size_bytes=payload['bytes'],
+                mode=self.step_modes[target]
+            )
+        return succeeded
+    
     def upload_to_r2(self, dry_run: bool = False) -> bool:
         """
         Upload content files to Cloudflare R2.
@@ -167,8 +235,17 @@ class UploadOrchestrator:
         # This is a placeholder for actual R2 upload logic
         # In production, this would use boto3 with R2 endpoint
         
+        counts = (self.gate.check_results.get('manifest') or {}).get('counts', {})
+        collections = [collection for collection in ('problems', 'topics', 'contests') if collection in counts]
+        self.payloads['r2'] = {
+            'records': {collection: counts[collection] for collection in collections},
+            'bytes': self._file_bytes([f"{collection}.json" for collection in collections]),
+        }
+        self.log(f"  Content: {len(collections)} files, {self.payloads['r2']['bytes']} bytes")
+        
         if dry_run:
             self.log("[DRY RUN] R2 upload skipped")
+            self.step_modes['r2'] = 'dry_run'
             return True
         
         # TODO: Implement actual R2 upload
@@ -177,6 +254,7 @@ class UploadOrchestrator:
         # - Verify upload success
         
         self.log("R2 upload: Not implemented (content storage)", "WARN")
+        self.step_modes['r2'] = 'not_implemented'
         return True
     
     def upload_to_supabase(self, dry_run: bool = False) -> bool:
@@ -191,16 +269,59 @@ class UploadOrchestrator:
         """
         self.log("Starting Supabase upload...")
         
+        rows = {}
+        graph = self.gate.graph
+        if graph is not None:
+            stats = graph.stats()
+            rows = {
+                'problems': stats['problems'],
+                'contests': stats['contests'],
+                'topics': stats['topics'],
+                'contest_problems': stats['contest_problem_links'],
+                'problem_topics': stats['problem_topic_links'],
+            }
+            self.log(
+                f"  Rows: {stats['problems']} problems, {stats['contests']} contests, "
+                f"{stats['topics']} topics, {stats['contest_problem_links']} contest_problems, "
+                f"{stats['problem_topic_links']} problem_topics"
+            )
+        
+        aggregates = self.gate.aggregates
+        if aggregates is not None:
+            per_source = ', '.join(f"{source}: {count}" for source, count in aggregates['problems_per_source'].items())
+            self.log(f"  Problems per source: {per_source or 'none'}")
+        
+        # Each shard is an independent batch; batches are loaded in parallel
+        manifest = self.gate.check_results.get('manifest') or {}
+        entries = shard_entries(manifest, 'problems') + shard_entries(manifest, 'contests')
+        if entries:
+            loaded = map_shards(self.snapshot_dir, entries, lambda entry, records: len(records), SHARD_WORKERS)
+            self.log(f"  Batches: {len(entries)} shards, {sum(loaded)} rows ({SHARD_WORKERS} workers)")
+            short = [entry['file'] for entry, count in zip(entries, loaded) if count != entry['count']]
+            if short:
+                self.log(f"Shard row counts differ from the manifest: {', '.join(short)}", "ERROR")
+                return False
+        
+        # Batches are the shards (plus topics), or the whole files when unsharded
+        if entries:
+            size = sum(os.path.getsize(os.path.join(self.snapshot_dir, entry['file'])) for entry in entries)
+            size += self._file_bytes(['topics.json'])
+        else:
+            size = self._file_bytes(['problems.json', 'contests.json', 'topics.json'])
+        self.payloads['supabase'] = {'records': rows, 'bytes': size}
+        
         if dry_run:
             self.log("[DRY RUN] Supabase upload skipped")
+            self.step_modes['supabase'] = 'dry_run'
             return True
         
         # TODO: Implement actual Supabase upload
-        # - Read problems, topics, contests from snapshot
-        # - Batch insert to Supabase tables
+        # - Read problems, contests per shard (map_shards), topics from snapshot
+        # - Batch insert to Supabase tables (join rows from self.gate.graph)
         # - Handle conflicts (upsert)
         
         self.log("Supabase upload: Not implemented (requires credentials)", "WARN")
+        self.step_modes['supabase'] = 'not_implemented'
         return True
     
     def warmup_redis(self, dry_run: bool = False) -> bool:
@@ -215,15 +336,41 @@ class UploadOrchestrator:
         """
         self.log("Starting Redis warmup...")
         
+        aggregates = self.gate.aggregates
+        if aggregates is not None:
+            # Cached tables come straight from the snapshot's aggregates
+            sizes = sorted(((size, name) for name, size in topic_totals(aggregates).items()), reverse=True)
+            largest = ', '.join(f"{name} ({size})" for size, name in sizes[:3])
+            self.log(f"  Topic lists: {len(sizes)} (largest: {largest or 'none'})")
+            levels = difficulty_totals(aggregates)
+            distribution = ', '.join(f"{level}: {count}" for level, count in levels.items())
+            self.log(f"  Difficulty distribution: {distribution or 'none'}")
+            histograms = aggregates['rating_histogram']['counts']
+            self.log(f"  Rating histograms: {sum(len(buckets) for buckets in histograms.values())} buckets "
+                     f"over {len(histograms)} sources, {len(aggregates['contest_problems'])} contest sizes")
+            
+            # Cache entries per table, written from aggregates.json
+            self.payloads['redis'] = {
+                'records': {
+                    'topic_lists': len(sizes),
+                    'difficulty_levels': len(levels),
+                    'rating_buckets': sum(len(buckets) for buckets in histograms.values()),
+                    'contest_sizes': len(aggregates['contest_problems']),
+                },
+                'bytes': self._file_bytes(['aggregates.json']),
+            }
+        
         if dry_run:
             self.log("[DRY RUN] Redis warmup skipped")
+            self.step_modes['redis'] = 'dry_run'
             return True
         
         # TODO: Implement Redis warmup
         # - Connect to Redis
-        # - Cache topic lists, difficulty distributions, etc.
+        # - Cache topic lists, difficulty distributions, etc. (from self.gate.aggregates)
         
         self.log("Redis warmup: Not implemented (optional)", "WARN")
+        self.step_modes['redis'] = 'not_implemented'
         return True
     
     def rollback(self):
@@ -289,7 +436,7 @@ class UploadOrchestrator:
 
         print("\n[2/4] Uploading to R2...")
         try:
-            result['steps']['r2'] = self.upload_to_r2(dry_run)
+            result['steps']['r2'] = self._timed_step('r2', self.upload_to_r2, dry_run)
         except Exception as e:
             self.log(f"R2 upload failed: {e}", "ERROR")
             result['steps']['r2'] = False
@@ -300,7 +447,7 @@ class UploadOrchestrator:
         # Step 3: Upload to Supabase
         print("\n[3/4] Uploading to Supabase...")
         try:
-            result['steps']['supabase'] = self.upload_to_supabase(dry_run)
+            result['steps']['supabase'] = self._timed_step('supabase', self.upload_to_supabase, dry_run)
         except Exception as e:
             self.log(f"Supabase upload failed: {e}", "ERROR")
             result['steps']['supabase'] = False
@@ -311,7 +458,7 @@ class UploadOrchestrator:
         # Step 4: Warm Redis cache
         print("\n[4/4] Warming Redis cache...")
         try:
-            result['steps']['redis'] = self.warmup_redis(dry_run)
+            result['steps']['redis'] = self._timed_step('redis', self.warmup_redis, dry_run)
         except Exception as e:
             self.log(f"Redis warmup failed: {e}", "WARN")
             result['steps']['redis'] = False
@@ -375,42 +522,43 @@ def main():
         action='store_true',
         help="List available snapshots"
     )
+    add_metrics_arguments(parser, 'upload_orchestrator')
     args = parser.parse_args()
     
     if args.list:
         print("\nAvailable Snapshots:")
         print("-" * 40)
         for snap in list_snapshots():
-            manifest = snap.get('manifest', {})
-            counts = manifest.get('counts', {})
+            counts = snap.get('counts', {})
             print(f"  {snap['version']}")
             print(f"    Problems: {counts.get('problems', '?')}")
             print(f"    Topics: {counts.get('topics', '?')}")
             print()
         return
     
-    try:
-        orchestrator = UploadOrchestrator(version=args.version)
-    except ValueError as e:
-        print(f"Error: {e}")
-        sys.exit(1)
-    
-    if args.check_only:
-        print("\nRunning pre-upload checks only...")
-        checks = orchestrator.gate.run_checks()
+    with MetricsRun('upload_orchestrator', args.metrics_file, args.metrics_port):
+        try:
+            orchestrator = UploadOrchestrator(version=args.version)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        
+        if args.check_only:
+            print("\nRunning pre-upload checks only...")
+            checks = orchestrator.gate.run_checks()
+            
+            print("\nCheck Results:")
+            for check, passed in checks['checks'].items():
+                status = "✓" if passed else "✗"
+                print(f"  {status} {check}")
+            
+            print(f"\nAll Passed: {'✓ YES' if checks['all_passed'] else '✗ NO'}")
+            sys.exit(0 if checks['all_passed'] else 1)
         
-        print("\nCheck Results:")
-        for check, passed in checks['checks'].items():
-            status = "✓" if passed else "✗"
-            print(f"  {status} {check}")
+        result = orchestrator.run(dry_run=args.dry_run)
+        orchestrator.save_log()
         
-        print(f"\nAll Passed: {'✓ YES' if checks['all_passed'] else '✗ NO'}")
-        sys.exit(0 if checks['all_passed'] else 1)
-    
-    result = orchestrator.run(dry_run=args.dry_run)
-    orchestrator.save_log()
-    
-    sys.exit(0 if result['success'] else 1)
+        sys.exit(0 if result['success'] else 1)
 
 
 if __name__ == "__main__":
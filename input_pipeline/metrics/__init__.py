@@ -0,0 +1,16 @@
+"""
+Metrics Module - Batch Job Observability
+
+Shared metrics registry for all pipeline entry points, exported as an
+OpenMetrics textfile at the end of each run and optionally served on a
+local port.
+"""
+
+from .registry import MetricsRegistry, Counter, Gauge, Histogram, REGISTRY
+from .exposition import (
+    write_textfile,
+    read_textfile_value,
+    start_http_server,
+    add_metrics_arguments,
+    MetricsRun,
+)
@@ -0,0 +1,194 @@
+"""
+Metrics Exposition
+
+Writes the registry as an OpenMetrics textfile (for node_exporter's
+textfile collector or a scheduler sidecar) and optionally serves it
+over HTTP on a local port while a long run is in progress.
+"""
+
+import os
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .registry import MetricsRegistry, REGISTRY, _format_labels
+
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Default textfile location: {METRICS_DIR}/{job}.prom
+METRICS_DIR = os.environ.get(
+    'ASCEND_METRICS_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "validate_schema", "metrics")
+)
+
+
+def write_textfile(path: str, registry: MetricsRegistry = REGISTRY):
+    """
+    Write the registry to a textfile atomically.
+
+    Collectors may read the file at any moment, so it is written to a
+    temporary file and renamed into place.
+
+    Args:
+        path: Output path (conventionally *.prom)
+        registry: Registry to render
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def read_textfile_value(path: str, name: str, **labels) -> Optional[float]:
+    """
+    Read one sample back from a previously written textfile.
+
+    Args:
+        path: Textfile path
+        name: Metric name
+        **labels: Label set of the sample (in the family's label order)
+
+    Returns:
+        Sample value, or None if the file or sample does not exist
+    """
+    prefix = f"{name}{_format_labels(list(labels), list(labels.values()))} "
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith(prefix):
+                    return float(line[len(prefix):].split()[0])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def start_http_server(
+    port: int,
+    registry: MetricsRegistry = REGISTRY,
+    addr: str = '127.0.0.1'
+) -> ThreadingHTTPServer:
+    """
+    Serve the registry at /metrics from a daemon thread.
+
+    Args:
+        port: Port to listen on (0 picks a free port)
+        registry: Registry to serve
+        addr: Bind address (local only by default)
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser, job: str):
+    """
+    Add the shared --metrics-file / --metrics-port options to a CLI.
+
+    Args:
+        parser: Argument parser of the entry point
+        job: Job name used for the default textfile name
+    """
+    parser.add_argument(
+        '--metrics-file',
+        default=os.path.join(METRICS_DIR, f"{job}.prom"),
+        help=f"OpenMetrics textfile written at the end of the run (default: {METRICS_DIR}/{job}.prom)"
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help="Also serve metrics on this local port while running"
+    )
+
+
+class MetricsRun:
+    """
+    Context manager wrapping one batch job run.
+
+    Starts the optional HTTP endpoint, records job duration, outcome and
+    last-success timestamp, and writes the textfile on exit (including
+    when the job raises or calls sys.exit). A failed run keeps the
+    last-success timestamp of the textfile it replaces.
+    """
+
+    def __init__(
+        self,
+        job: str,
+        metrics_file: Optional[str] = None,
+        port: Optional[int] = None,
+        registry: MetricsRegistry = REGISTRY
+    ):
+        self.job = job
+        self.metrics_file = metrics_file
+        self.port = port
+        self.registry = registry
+        self.success = True
+        self._server = None
+        self._start = None
+
+    def __enter__(self) -> 'MetricsRun':
+        self._start = time.time()
+        if self.port is not None:
+            self._server = start_http_server(self.port, self.registry)
+            print(f"  Metrics: http://127.0.0.1:{self._server.server_address[1]}/metrics")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and not (exc_type is SystemExit and exc.code in (0, None)):
+            self.success = False
+
+        end = time.time()
+        self.registry.gauge(
+            'ascend_job_duration_seconds', "Wall time of the last job run", ['job']
+        ).set(end - self._start, job=self.job)
+        self.registry.gauge(
+            'ascend_job_success', "1 if the last job run succeeded, else 0", ['job']
+        ).set(1 if self.success else 0, job=self.job)
+        self.registry.gauge(
+            'ascend_job_last_run_timestamp_seconds', "Unix time the last job run finished", ['job']
+        ).set(end, job=self.job)
+        last_success = self.registry.gauge(
+            'ascend_job_last_success_timestamp_seconds', "Unix time of the last successful run", ['job']
+        )
+        if self.success:
+            last_success.set(end, job=self.job)
+        elif self.metrics_file:
+            previous = read_textfile_value(
+                self.metrics_file, 'ascend_job_last_success_timestamp_seconds', job=self.job
+            )
+            if previous is not None:
+                last_success.set(previous, job=self.job)
+
+        if self.metrics_file:
+            try:
+                write_textfile(self.metrics_file, self.registry)
+            except OSError as e:
+                print(f"  ⚠ Failed to write metrics textfile {self.metrics_file}: {e}")
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        return False
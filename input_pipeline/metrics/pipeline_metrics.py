@@ -0,0 +1,183 @@
+"""
+Pipeline Metrics
+
+Metric families shared by the pipeline entry points (run_pipeline.py,
+the fetch/sync scripts and upload_orchestrator.py), plus helpers that
+translate pipeline result objects into metric updates.
+"""
+
+from typing import Dict, Any
+
+from .registry import REGISTRY
+
+
+STAGE_DURATION = REGISTRY.gauge(
+    'ascend_pipeline_stage_duration_seconds',
+    "Wall time of each pipeline stage and sub-step in the last run",
+    ['job', 'stage']
+)
+
+RECORDS_PROCESSED = REGISTRY.counter(
+    'ascend_records_processed',
+    "Records processed by the normalization transformers",
+    ['source', 'entity', 'outcome']
+)
+
+NORMALIZATION_WARNINGS = REGISTRY.counter(
+    'ascend_normalization_warnings',
+    "Warnings raised while transforming raw records",
+    ['source', 'entity']
+)
+
+VALIDATION_ERRORS = REGISTRY.counter(
+    'ascend_validation_errors',
+    "Validation errors by category and rule",
+    ['category', 'rule']
+)
+
+VALIDATION_WARNINGS = REGISTRY.counter(
+    'ascend_validation_warnings',
+    "Validation warnings by rule",
+    ['rule']
+)
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'ascend_http_request_duration_seconds',
+    "Latency of HTTP requests made by the fetchers",
+    ['fetcher', 'endpoint', 'status']
+)
+
+# Upload step modes: 'uploaded' (data left the machine), 'dry_run' and
+# 'not_implemented' (payload prepared, nothing sent)
+UPLOAD_MODES = ('uploaded', 'dry_run', 'not_implemented')
+
+UPLOAD_RECORDS = REGISTRY.counter(
+    'ascend_upload_records',
+    "Records in the payload of each upload step",
+    ['target', 'entity', 'mode']
+)
+
+UPLOAD_BYTES = REGISTRY.counter(
+    'ascend_upload_bytes',
+    "Bytes in the payload of each upload step",
+    ['target', 'mode']
+)
+
+UPLOAD_DURATION = REGISTRY.gauge(
+    'ascend_upload_duration_seconds',
+    "Wall time of each upload step in the last run",
+    ['target', 'mode']
+)
+
+UPLOAD_THROUGHPUT = REGISTRY.gauge(
+    'ascend_upload_throughput_records_per_second',
+    "Payload records per second of each upload step in the last run",
+    ['target', 'mode']
+)
+
+
+def record_stage_timings(job: str, timings: Dict[str, float]):
+    """
+    Publish stage timings (as recorded by StageProfiler).
+
+    Args:
+        job: Job name
+        timings: Dict of dotted stage name to seconds
+    """
+    for stage, seconds in timings.items():
+        STAGE_DURATION.set(seconds, job=job, stage=stage)
+
+
+def _record_transform_stats(source: str, entity: str, stats: Dict[str, int]):
+    RECORDS_PROCESSED.inc(stats.get('success', 0), source=source, entity=entity, outcome='success')
+    RECORDS_PROCESSED.inc(stats.get('failed', 0), source=source, entity=entity, outcome='failed')
+    NORMALIZATION_WARNINGS.inc(stats.get('warnings', 0), source=source, entity=entity)
+
+
+def record_normalization_stats(stats: Dict[str, Any]):
+    """
+    Publish per-source record counts from normalization stats.
+
+    Args:
+        stats: Stats dict as built by merge_normalized / run_all_normalization
+    """
+    if stats.get('leetcode'):
+        _record_transform_stats('leetcode', 'problem', stats['leetcode'])
+
+    codeforces = stats.get('codeforces') or {}
+    for entity_key, entity in (('problems', 'problem'), ('contests', 'contest')):
+        if codeforces.get(entity_key):
+            _record_transform_stats('codeforces', entity, codeforces[entity_key])
+
+
+def record_validation_result(result: Any):
+    """
+    Publish error and warning counts from a ValidationResult.
+
+    Schema errors are keyed by the failing JSON Schema keyword; rule
+    errors by their error/orphan/entity type.
+
+    Args:
+        result: ValidationResult
+    """
+    for err in result.schema_errors:
+        rule = (err.get('schema_path') or 'unknown').rsplit('.', 1)[-1]
+        VALIDATION_ERRORS.inc(category='schema', rule=rule)
+    for err in result.duplicate_errors:
+        VALIDATION_ERRORS.inc(category='duplicate', rule=err.entity_type)
+    for err in result.orphan_errors:
+        VALIDATION_ERRORS.inc(category='orphan', rule=err.orphan_type)
+    for err in result.reference_errors:
+        VALIDATION_ERRORS.inc(category='reference', rule=err.error_type)
+    # Errors streamed to an ErrorSink are only kept as counts
+    for category, rules in result.omitted.items():
+        for rule, count in rules.items():
+            VALIDATION_ERRORS.inc(count, category=category, rule=rule)
+
+    for _ in result.warnings:
+        VALIDATION_WARNINGS.inc(rule='general')
+    for _ in result.near_duplicates:
+        VALIDATION_WARNINGS.inc(rule='near_duplicate')
+
+
+def observe_http_request(fetcher: str, endpoint: str, seconds: float, status: Any):
+    """
+    Record one HTTP request made by a fetcher.
+
+    Args:
+        fetcher: Fetcher name (e.g., "codeforces")
+        endpoint: Logical endpoint name (not the full URL, to bound cardinality)
+        seconds: Request latency
+        status: HTTP status code, or an error class name if no response
+    """
+    HTTP_REQUEST_DURATION.observe(seconds, fetcher=fetcher, endpoint=endpoint, status=str(status))
+
+
+def record_upload(
+    target: str,
+    seconds: float,
+    records: Dict[str, int] = None,
+    size_bytes: int = 0,
+    mode: str = 'uploaded'
+):
+    """
+    Record one upload step.
+
+    Args:
+        target: Upload target (r2, supabase, redis)
+        seconds: Step wall time
+        records: Payload records per entity type
+        size_bytes: Payload bytes
+        mode: One of UPLOAD_MODES (whether the payload was actually sent)
+    """
+    if mode not in UPLOAD_MODES:
+        raise ValueError(f"Unknown upload mode: {mode}")
+    records = records or {}
+    for entity, count in records.items():
+        UPLOAD_RECORDS.inc(count, target=target, entity=entity, mode=mode)
+    if size_bytes:
+        UPLOAD_BYTES.inc(size_bytes, target=target, mode=mode)
+
+    UPLOAD_DURATION.set(seconds, target=target, mode=mode)
+    total = sum(records.values())
+    UPLOAD_THROUGHPUT.set(total / seconds if seconds > 0 else 0.0, target=target, mode=mode)
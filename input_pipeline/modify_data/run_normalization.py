@@ -15,15 +15,18 @@ Usage:
 import os
 import sys
 import json
+import time
 import argparse
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, List, Any
 
 # Add parent directory to path for imports
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
 
 from modify_data.transformers import LeetCodeTransformer, CodeforcesTransformer
+from metrics import add_metrics_arguments, MetricsRun
+from metrics.pipeline_metrics import record_normalization_stats, record_stage_timings
 
 
 # Paths
@@ -40,10 +43,17 @@ def ensure_output_dir():
 
 
 def save_json(data: Any, filename: str):
-    """Save data to JSON file in output directory."""
+    """
+    Save data to JSON file in output directory.
+    
+    The file is replaced rather than rewritten in place: snapshots may
+    hard-link the previous output, and must not change with it.
+    """
     filepath = os.path.join(OUTPUT_DIR, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, filepath)
     print(f"  ✓ Saved: {filename} ({len(json.dumps(data))} bytes)")
 
 
@@ -168,6 +178,39 @@ def merge_topics(leetcode_topics: list, codeforces_topics: list) -> list:
     return sorted(seen.values(), key=lambda t: t['name'])
 
 
+def build_normalization_report(
+    stats: Dict[str, Any],
+    timings: Dict[str, float],
+    errors: Dict[str, List[str]],
+    warnings: Dict[str, List[str]]
+) -> Dict[str, Any]:
+    """
+    Build normalization_report.json (shared with run_pipeline).
+    
+    Args:
+        stats: Per-source stats plus totals
+        timings: Step durations in seconds
+        errors: Transformer errors per source
+        warnings: Transformer warnings per source
+        
+    Returns:
+        Report dict
+    """
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'stats': stats,
+        'timings': {name: round(seconds, 4) for name, seconds in timings.items()},
+        'errors': {
+            'leetcode': errors.get('leetcode', []),
+            'codeforces': errors.get('codeforces', []),
+        },
+        'warnings': {
+            'leetcode': warnings.get('leetcode', []),
+            'codeforces': warnings.get('codeforces', []),
+        }
+    }
+
+
 def run_all_normalization(dry_run: bool = False) -> Dict[str, Any]:
     """
     Run normalization for all platforms and merge results.
@@ -178,14 +221,23 @@ def run_all_normalization(dry_run: bool = False) -> Dict[str, Any]:
     Returns:
         Merged transformation result
     """
+    timings = {}
+    
+    start = time.perf_counter()
     lc_result = run_leetcode_normalization(dry_run=True)  # Always dry-run individual
+    timings['leetcode'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
     cf_result = run_codeforces_normalization(dry_run=True)
+    timings['codeforces'] = time.perf_counter() - start
     
     # Merge all problems
     all_problems = lc_result['problems'] + cf_result['problems']
     
     # Merge and deduplicate topics
+    start = time.perf_counter()
     all_topics = merge_topics(lc_result['topics'], cf_result['topics'])
+    timings['topics'] = time.perf_counter() - start
     
     # Aggregate stats
     combined_stats = {
@@ -195,6 +247,7 @@ def run_all_normalization(dry_run: bool = False) -> Dict[str, Any]:
         'total_topics': len(all_topics),
         'total_contests': len(cf_result.get('contests', [])),
     }
+    timings = {name: round(seconds, 4) for name, seconds in timings.items()}
     
     print("\n" + "=" * 60)
     print("COMBINED RESULTS")
@@ -210,18 +263,12 @@ def run_all_normalization(dry_run: bool = False) -> Dict[str, Any]:
         save_json(cf_result.get('contests', []), 'contests.json')
         
         # Save normalization report
-        report = {
-            'timestamp': datetime.now().isoformat(),
-            'stats': combined_stats,
-            'errors': {
-                'leetcode': lc_result['errors'],
-                'codeforces': cf_result['errors'],
-            },
-            'warnings': {
-                'leetcode': lc_result.get('warnings', []),
-                'codeforces': cf_result.get('warnings', []),
-            }
-        }
+        report = build_normalization_report(
+            combined_stats,
+            timings,
+            errors={'leetcode': lc_result['errors'], 'codeforces': cf_result['errors']},
+            warnings={'leetcode': lc_result.get('warnings', []), 'codeforces': cf_result.get('warnings', [])}
+        )
         save_json(report, 'normalization_report.json')
     
     return {
@@ -229,6 +276,7 @@ def run_all_normalization(dry_run: bool = False) -> Dict[str, Any]:
         'topics': all_topics,
         'contests': cf_result.get('contests', []),
         'stats': combined_stats,
+        'timings': timings,
         'errors': lc_result['errors'] + cf_result['errors'],
     }
 
@@ -248,6 +296,7 @@ def main():
         action='store_true',
         help="Don't save output files, just show what would be done"
     )
+    add_metrics_arguments(parser, 'run_normalization')
     args = parser.parse_args()
     
     print("\n" + "=" * 60)
@@ -257,12 +306,17 @@ def main():
     print(f"Dry Run: {args.dry_run}")
     print(f"Timestamp: {datetime.now().isoformat()}")
     
-    if args.source == 'leetcode':
-        run_leetcode_normalization(args.dry_run)
-    elif args.source == 'codeforces':
-        run_codeforces_normalization(args.dry_run)
-    else:
-        run_all_normalization(args.dry_run)
+    with MetricsRun('run_normalization', args.metrics_file, args.metrics_port):
+        if args.source == 'leetcode':
+            result = run_leetcode_normalization(args.dry_run)
+            record_normalization_stats({'leetcode': result['stats']})
+        elif args.source == 'codeforces':
+            result = run_codeforces_normalization(args.dry_run)
+            record_normalization_stats({'codeforces': result['stats']})
+        else:
+            result = run_all_normalization(args.dry_run)
+            record_normalization_stats(result['stats'])
+            record_stage_timings('run_normalization', result['timings'])
     
     print("\n" + "=" * 60)
     print("NORMALIZATION COMPLETE")
@@ -7,7 +7,7 @@ into canonical problem and contest formats.
 
 import os
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from dataclasses import dataclass
 
 from ..utils.uuid_generator import generate_problem_uuid, generate_contest_uuid
@@ -52,11 +52,17 @@ class CodeforcesTransformer:
             content_base_path: Base path for R2 content references
         """
         self.content_base_path = content_base_path
+        self.reset()
+    
+    def reset(self):
+        """Clear topics, stats, errors and warnings before a new run."""
         self.all_topics = set()
         self.stats = {
             'problems': {'total': 0, 'success': 0, 'failed': 0, 'warnings': 0},
             'contests': {'total': 0, 'success': 0, 'failed': 0, 'warnings': 0},
         }
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
     
     def rating_to_difficulty(self, rating: Optional[int]) -> str:
         """
@@ -319,17 +325,43 @@ class CodeforcesTransformer:
         Returns:
             Dict with 'problems', 'contests', 'topics', 'stats', 'errors', 'warnings'
         """
-        self.all_topics = set()
-        self.stats = {
-            'problems': {'total': 0, 'success': 0, 'failed': 0, 'warnings': 0},
-            'contests': {'total': 0, 'success': 0, 'failed': 0, 'warnings': 0},
-        }
+        self.reset()
         
         all_problems = []
         all_contests = []
-        all_errors = []
-        all_warnings = []
+        for entity_type, doc in self.iter_documents(data_dir):
+            if entity_type == 'contest':
+                all_contests.append(doc)
+            else:
+                all_problems.append(doc)
         
+        # Build topic documents
+        from ..utils.topic_normalizer import build_topic_document
+        topic_docs = [build_topic_document(name) for name in sorted(self.all_topics)]
+        
+        return {
+            'problems': all_problems,
+            'contests': all_contests,
+            'topics': topic_docs,
+            'stats': self.stats,
+            'errors': self.errors,
+            'warnings': self.warnings,
+        }
+    
+    def iter_documents(self, data_dir: str) -> Iterator[Tuple[str, Dict]]:
+        """
+        Transform contest files one at a time.
+        
+        Each file yields its problems followed by its contest. Failures
+        are counted in self.stats and recorded in self.errors instead of
+        being yielded. Call reset() first to start a fresh run.
+        
+        Args:
+            data_dir: Directory containing {contestId}.json files
+            
+        Yields:
+            ('problem' | 'contest', canonical document) pairs
+        """
         # Find all JSON files
         json_files = sorted([
             f for f in os.listdir(data_dir) 
@@ -340,26 +372,14 @@ class CodeforcesTransformer:
             filepath = os.path.join(data_dir, filename)
             try:
                 result = self.transform_contest_file(filepath)
-                
-                if result['contest']:
-                    all_contests.append(result['contest'])
-                all_problems.extend(result['problems'])
-                all_errors.extend(result['errors'])
-                all_warnings.extend(result['warnings'])
-                
             except Exception as e:
-                all_errors.append(f"[{filename}] Failed to process: {str(e)}")
+                self.errors.append(f"[{filename}] Failed to process: {str(e)}")
                 self.stats['contests']['failed'] += 1
-        
-        # Build topic documents
-        from ..utils.topic_normalizer import build_topic_document
-        topic_docs = [build_topic_document(name) for name in sorted(self.all_topics)]
-        
-        return {
-            'problems': all_problems,
-            'contests': all_contests,
-            'topics': topic_docs,
-            'stats': self.stats,
-            'errors': all_errors,
-            'warnings': all_warnings,
-        }
+                continue
+            
+            self.errors.extend(result['errors'])
+            self.warnings.extend(result['warnings'])
+            for problem in result['problems']:
+                yield 'problem', problem
+            if result['contest']:
+                yield 'contest', result['contest']
@@ -6,13 +6,13 @@ into canonical problem format.
 """
 
 import os
-import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
 from dataclasses import dataclass
 
 from ..utils.html_stripper import html_to_markdown, extract_examples, extract_constraints
 from ..utils.uuid_generator import generate_problem_uuid
 from ..utils.topic_normalizer import normalize_topics
+from ..utils.json_array_reader import JsonArrayReader
 
 
 @dataclass
@@ -46,6 +46,10 @@ class LeetCodeTransformer:
             content_base_path: Base path for R2 content references
         """
         self.content_base_path = content_base_path
+        self.reset()
+    
+    def reset(self):
+        """Clear topics, stats, errors and warnings before a new run."""
         self.all_topics = set()
         self.stats = {
             'total': 0,
@@ -53,6 +57,8 @@ class LeetCodeTransformer:
             'failed': 0,
             'warnings': 0,
         }
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
     
     def transform_problem(self, raw: Dict) -> TransformResult:
         """
@@ -175,79 +181,114 @@ class LeetCodeTransformer:
             warnings=warnings
         )
     
-    def transform_all(self, raw_problems: List[Dict]) -> Dict[str, Any]:
+    def transform_all(self, raw_problems: Iterable[Dict]) -> Dict[str, Any]:
         """
         Transform all raw problems to canonical format.
         
         Args:
-            raw_problems: List of raw LeetCode problems
+            raw_problems: Raw LeetCode problems (list or stream)
             
         Returns:
             Dict with 'problems', 'topics', 'stats', 'errors', 'warnings'
         """
-        self.all_topics = set()
-        self.stats = {'total': len(raw_problems), 'success': 0, 'failed': 0, 'warnings': 0}
+        self.reset()
+        canonical_problems = [doc for _, doc in self.iter_documents(raw_problems)]
         
-        canonical_problems = []
-        all_errors = []
-        all_warnings = []
+        # Build topic documents
+        from ..utils.topic_normalizer import build_topic_document
+        topic_docs = [build_topic_document(name) for name in sorted(self.all_topics)]
         
+        return {
+            'problems': canonical_problems,
+            'topics': topic_docs,
+            'stats': self.stats,
+            'errors': self.errors,
+            'warnings': self.warnings,
+        }
+    
+    def iter_documents(self, raw_problems: Iterable[Dict]) -> Iterator[Tuple[str, Dict]]:
+        """
+        Transform raw problems one at a time.
+        
+        Failed problems are counted in self.stats and recorded in
+        self.errors instead of being yielded. Call reset() first to
+        start a fresh run.
+        
+        Args:
+            raw_problems: Iterable of raw LeetCode problems
+            
+        Yields:
+            ('problem', canonical document) pairs
+        """
         for raw in raw_problems:
+            self.stats['total'] += 1
             result = self.transform_problem(raw)
             
             if result.success:
-                canonical_problems.append(result.data)
                 self.stats['success'] += 1
                 if result.warnings:
                     self.stats['warnings'] += len(result.warnings)
-                    all_warnings.extend(result.warnings)
+                    self.warnings.extend(result.warnings)
+                yield 'problem', result.data
             else:
                 self.stats['failed'] += 1
                 # Include identifier in error context
                 slug = raw.get('titleSlug') or raw.get('problem_slug') or 'unknown'
                 for err in result.errors:
-                    all_errors.append(f"[{slug}] {err}")
-        
-        # Build topic documents
-        from ..utils.topic_normalizer import build_topic_document
-        topic_docs = [build_topic_document(name) for name in sorted(self.all_topics)]
-        
-        return {
-            'problems': canonical_problems,
-            'topics': topic_docs,
-            'stats': self.stats,
-            'errors': all_errors,
-            'warnings': all_warnings,
-        }
+                    self.errors.append(f"[{slug}] {err}")
     
     def transform_from_file(self, filepath: str) -> Dict[str, Any]:
         """
         Load and transform problems from a JSON file.
         
+        Raw problems are read one at a time (see JsonArrayReader), so only
+        the canonical documents are held in memory.
+        
         Args:
             filepath: Path to merged_problems.json or similar
             
         Returns:
             Transformation result dict
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with self._open_raw(filepath) as problems:
+            if problems.kind is None:
+                return {
+                    'problems': [],
+                    'topics': [],
+                    'stats': {'total': 0, 'success': 0, 'failed': 1, 'warnings': 0},
+                    'errors': ['Invalid JSON format - expected list or dict'],
+                    'warnings': [],
+                }
+            
+            return self.transform_all(problems)
+    
+    def iter_from_file(self, filepath: str) -> Iterator[Tuple[str, Dict]]:
+        """
+        Read a JSON file and transform its problems one at a time.
         
-        # Handle different file formats
-        if isinstance(data, list):
-            problems = data
-        elif isinstance(data, dict):
-            problems = data.get('questions') or data.get('problems') or []
-        else:
-            return {
-                'problems': [],
-                'topics': [],
-                'stats': {'total': 0, 'success': 0, 'failed': 1, 'warnings': 0},
-                'errors': ['Invalid JSON format - expected list or dict'],
-                'warnings': [],
-            }
+        Args:
+            filepath: Path to merged_problems.json or similar
+            
+        Yields:
+            ('problem', canonical document) pairs (see iter_documents)
+        """
+        with self._open_raw(filepath) as problems:
+            if problems.kind is None:
+                self.stats['failed'] += 1
+                self.errors.append('Invalid JSON format - expected list or dict')
+                return
+            
+            yield from self.iter_documents(problems)
+    
+    def _open_raw(self, filepath: str) -> JsonArrayReader:
+        """
+        Open the raw problems of a list or {questions|problems: [...]} file.
         
-        return self.transform_all(problems)
+        An empty questions list falls back to problems, as it did when the
+        file was loaded whole; kind is None if the file is neither a list
+        nor an object.
+        """
+        return JsonArrayReader(filepath, keys=('questions', 'problems'))
     
     def extract_content(self, raw: Dict) -> Dict[str, Any]:
         """
@@ -0,0 +1,240 @@
+"""
+JSON Array Reader
+
+Reads the elements of a JSON array one at a time, so a large data file
+(e.g. merged_problems.json with full descriptions and code snippets) never
+has to be held in memory as a whole; only one element is decoded at once.
+
+The array may be the top-level value or the value of one of the given
+keys of a top-level object ({"questions": [...]}). Keys are tried in
+order and an empty array falls through to the next key, like
+data.get('questions') or data.get('problems'). Counterpart of
+JsonArrayWriter.
+"""
+
+import json
+from typing import Any, Iterator, Optional, Tuple
+
+
+# Characters read per refill (doubled while an element does not fit)
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789+-.eE'
+
+
+class JsonArrayReader:
+    """
+    Incremental reader for a JSON array file.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        keys: Tuple[str, ...] = ('questions', 'problems'),
+        chunk_size: int = CHUNK_SIZE
+    ):
+        """
+        Open the file and position it at the first array element.
+
+        Args:
+            filepath: Path of the JSON file
+            keys: Keys of a top-level object whose array is read, in
+                order of preference (the first with a non-empty array;
+                other values are skipped)
+            chunk_size: Characters read per refill
+
+        Raises:
+            json.JSONDecodeError: If the file is not valid JSON up to the array
+        """
+        self.filepath = filepath
+        self.keys = keys
+        self.chunk_size = chunk_size
+        self.count = 0
+        # 'list', 'dict', or None if the top-level value is neither
+        self.kind: Optional[str] = None
+        self._file = open(filepath, 'r', encoding='utf-8')
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        try:
+            self._in_array = self._find_array()
+        except BaseException:
+            self._file.close()
+            raise
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Yield the array elements in file order.
+
+        Yields nothing for an object without any of the keys.
+        """
+        if not self._in_array:
+            return
+        if self._peek() == ']':
+            self._pos += 1
+            self._in_array = False
+            return
+        while True:
+            item = self._decode()
+            self.count += 1
+            yield item
+            if self._peek() == ']':
+                self._pos += 1
+                self._in_array = False
+                return
+            self._expect(',')
+
+    def close(self):
+        """Close the file."""
+        self._file.close()
+
+    def __enter__(self) -> 'JsonArrayReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _find_array(self) -> bool:
+        """Skip to the first element; False if there is no array to read."""
+        char = self._peek()
+        if char == '[':
+            self.kind = 'list'
+            self._pos += 1
+            return True
+        if char != '{':
+            return False
+
+        self.kind = 'dict'
+        self._pos += 1
+        if self._peek() == '}':
+            return False
+        seen = set()
+        # (preference, member number) of a non-empty array passed over
+        # because a preferred key may still follow
+        fallback = None
+        member = 0
+        while True:
+            key = self._decode()
+            if not isinstance(key, str):
+                self._error('object key')
+            self._expect(':')
+            if key in self.keys and self._peek() == '[':
+                self._pos += 1
+                preference = self.keys.index(key)
+                if self._peek() == ']':
+                    self._pos += 1
+                elif all(k in seen for k in self.keys[:preference]):
+                    return True
+                else:
+                    if fallback is None or preference < fallback[0]:
+                        fallback = (preference, member)
+                    self._skip_elements()
+            else:
+                # Not the array we want: decode it to skip it
+                self._decode()
+            if key in self.keys:
+                seen.add(key)
+            member += 1
+            if self._peek() == '}':
+                break
+            self._expect(',')
+
+        if fallback is None:
+            return False
+        return self._reopen_at(fallback[1])
+
+    def _skip_elements(self):
+        """Skip the rest of a non-empty array, one element at a time."""
+        while True:
+            self._decode()
+            if self._peek() == ']':
+                self._pos += 1
+                return
+            self._expect(',')
+
+    def _reopen_at(self, member: int) -> bool:
+        """Read the object again from the start, up to the array of a member."""
+        self._file.seek(0)
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._expect('{')
+        for _ in range(member):
+            self._decode()
+            self._expect(':')
+            self._decode()
+            self._expect(',')
+        self._decode()
+        self._expect(':')
+        self._expect('[')
+        return True
+
+    def _fill(self, size: int) -> bool:
+        """Append up to size characters to the buffer (False at end of file)."""
+        chunk = self._file.read(size)
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        if not chunk:
+            self._eof = True
+        return bool(chunk)
+
+    def _peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill(self.chunk_size):
+                return ''
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            self._error(repr(char))
+        self._pos += 1
+
+    def _decode(self) -> Any:
+        """Decode the value at the current position, reading more as needed."""
+        self._peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill(size)
+                size *= 2
+                continue
+            # A number running up to the end of the buffer may continue in
+            # the next chunk ("-4" of "-4.5e3")
+            if isinstance(value, (int, float)) and not self._eof:
+                tail = end
+                while tail < len(self._buffer) and self._buffer[tail] in _NUMBER_CHARS:
+                    tail += 1
+                if tail == len(self._buffer):
+                    self._fill(size)
+                    continue
+            self._pos = end
+            return value
+
+    def _error(self, expected: str):
+        found = self._peek() or 'end of file'
+        raise json.JSONDecodeError(f"Expecting {expected}, found {found!r}", self._buffer, self._pos)
+
+
+def iter_json_array(filepath: str, keys: Tuple[str, ...] = ('questions', 'problems')) -> Iterator[Any]:
+    """
+    Yield the elements of a JSON array file one at a time.
+
+    Args:
+        filepath: A list or {<key>: [...]} JSON file
+        keys: Keys of a top-level object whose array is read
+
+    Yields:
+        Array elements in file order
+    """
+    with JsonArrayReader(filepath, keys) as reader:
+        yield from reader
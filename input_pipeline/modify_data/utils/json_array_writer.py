@@ -0,0 +1,67 @@
+"""
+JSON Array Writer
+
+Writes a JSON array one element at a time, producing exactly the bytes
+json.dump(items, f, indent=2, ensure_ascii=False) would, so streamed
+output files keep the same checksums as batch output.
+
+The file is written under a temporary name and only renamed into place
+by commit(); abort() leaves any previous file untouched.
+"""
+
+import os
+import json
+from typing import Any
+
+
+class JsonArrayWriter:
+    """
+    Incremental writer for an indented JSON array file.
+    """
+
+    def __init__(self, filepath: str, indent: int = 2):
+        """
+        Open the temporary output file.
+
+        Args:
+            filepath: Final path of the JSON file
+            indent: Indentation width (matches json.dump's indent)
+        """
+        self.filepath = filepath
+        self.indent = indent
+        self.count = 0
+        self._tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._pad = ' ' * indent
+
+    def write(self, item: Any):
+        """
+        Append one element.
+
+        Args:
+            item: JSON-serializable element
+        """
+        # Strings are escaped, so the only newlines are structural ones
+        encoded = json.dumps(item, indent=self.indent, ensure_ascii=False)
+        prefix = '[\n' if self.count == 0 else ',\n'
+        self._file.write(prefix + self._pad + encoded.replace('\n', '\n' + self._pad))
+        self.count += 1
+
+    def commit(self) -> str:
+        """
+        Close the array and move the file into place.
+
+        Returns:
+            Final file path
+        """
+        self._file.write('\n]' if self.count else '[]')
+        self._file.close()
+        os.replace(self._tmp_path, self.filepath)
+        return self.filepath
+
+    def abort(self):
+        """Discard the partial file."""
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
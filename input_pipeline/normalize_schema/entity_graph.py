@@ -0,0 +1,405 @@
+"""
+Entity Graph
+
+Relationships between problems, contests and topics, built once per
+snapshot and shared by validation, snapshotting, upload and queries:
+- contest → problems, problem → topics, topic → parent (forward)
+- problem → contests, topic → problems, topic → children (reverse)
+
+Entities get dense integer ids (their position in the collection) and
+every relation is stored as CSR adjacency arrays: offsets[i]..offsets[i+1]
+index the targets of node i. References to entities that do not exist
+become "phantom" nodes appended after the defined ones, so an orphan is
+any link whose target id is past the defined range.
+"""
+
+import os
+import json
+from array import array
+from functools import cached_property
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from validate_schema.compression import find_data_file, load_json_data
+
+
+# Bump when the persisted layout changes
+GRAPH_FORMAT = 1
+
+GRAPH_FILE = "entity_graph.json"
+
+
+class Adjacency:
+    """
+    Compressed sparse row adjacency: node i links to
+    targets[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, offsets: array, targets: array):
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_lists(cls, lists: Iterable[Iterable[int]]) -> 'Adjacency':
+        """Build from one target list per node."""
+        offsets = array('i', [0])
+        targets = array('i')
+        for items in lists:
+            targets.extend(items)
+            offsets.append(len(targets))
+        return cls(offsets, targets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def neighbors(self, node: int) -> array:
+        """Targets of one node, in insertion order."""
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def degree(self, node: int) -> int:
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def reverse(self, target_count: int) -> 'Adjacency':
+        """
+        Reverse index (target → sources) by counting sort.
+
+        Sources appear in node order, once per edge, so a node linking
+        the same target twice is listed twice.
+        """
+        counts = [0] * (target_count + 1)
+        for target in self.targets:
+            counts[target + 1] += 1
+        for i in range(target_count):
+            counts[i + 1] += counts[i]
+        offsets = array('i', counts)
+
+        cursor = list(counts[:target_count])
+        targets = array('i', [0]) * len(self.targets)
+        for node in range(len(self)):
+            for target in self.neighbors(node):
+                targets[cursor[target]] = node
+                cursor[target] += 1
+        return Adjacency(offsets, targets)
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return {'offsets': self.offsets.tolist(), 'targets': self.targets.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[int]]) -> 'Adjacency':
+        return cls(array('i', data['offsets']), array('i', data['targets']))
+
+
+class _NodeTable:
+    """Name → dense id table; unknown names are added as phantom nodes."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        for name in names:
+            # Duplicates keep their own node; lookups resolve to the first
+            self.index.setdefault(name, len(self.names))
+            self.names.append(name)
+        self.defined = len(self.names)
+
+    def resolve(self, name: str) -> int:
+        node = self.index.get(name)
+        if node is None:
+            node = len(self.names)
+            self.index[name] = node
+            self.names.append(name)
+        return node
+
+
+def _first_index(names: List[str]) -> Dict[str, int]:
+    """Name → id of its first node."""
+    index: Dict[str, int] = {}
+    for i, name in enumerate(names):
+        index.setdefault(name, i)
+    return index
+
+
+def problem_key(source: Any, external_id: Any) -> str:
+    """Key problems are referenced by ("source:external_id")."""
+    return f"{source}:{external_id}"
+
+
+class EntityGraph:
+    """
+    Integer-id graph of problems, contests and topics.
+    """
+
+    def __init__(
+        self,
+        problem_keys: List[str],
+        problem_ids: List[str],
+        problem_count: int,
+        contest_ids: List[str],
+        topic_names: List[str],
+        topic_count: int,
+        problem_topics: Adjacency,
+        contest_problems: Adjacency,
+        topic_parent: array
+    ):
+        """
+        Initialize from node tables and forward relations (see build()).
+
+        Nodes [0, problem_count) and [0, topic_count) are defined entities;
+        higher ids are phantom nodes for references to missing ones.
+        """
+        self.problem_keys = problem_keys
+        self.problem_ids = problem_ids
+        self.problem_count = problem_count
+        self.contest_ids = contest_ids
+        self.topic_names = topic_names
+        self.topic_count = topic_count
+
+        self.problem_topics = problem_topics
+        self.contest_problems = contest_problems
+        self.topic_parent = topic_parent
+
+    # Reverse indexes and lookups are built on first use
+    @cached_property
+    def topic_problems(self) -> Adjacency:
+        """Topic → problems using it."""
+        return self.problem_topics.reverse(len(self.topic_names))
+
+    @cached_property
+    def problem_contests(self) -> Adjacency:
+        """Problem → contests referencing it."""
+        return self.contest_problems.reverse(len(self.problem_keys))
+
+    @cached_property
+    def topic_children(self) -> Adjacency:
+        """Topic → child topics."""
+        children: List[List[int]] = [[] for _ in self.topic_names]
+        for topic, parent in enumerate(self.topic_parent):
+            if parent >= 0:
+                children[parent].append(topic)
+        return Adjacency.from_lists(children)
+
+    @cached_property
+    def _problem_index(self) -> Dict[str, int]:
+        return _first_index(self.problem_keys)
+
+    @cached_property
+    def _topic_index(self) -> Dict[str, int]:
+        return _first_index(self.topic_names)
+
+    @cached_property
+    def _contest_index(self) -> Dict[str, int]:
+        return _first_index(self.contest_ids)
+
+    @classmethod
+    def build(
+        cls,
+        problems: List[Dict],
+        contests: List[Dict],
+        topics: List[Dict]
+    ) -> 'EntityGraph':
+        """
+        Build the graph from canonical collections.
+
+        Args:
+            problems: Canonical problem documents
+            contests: Canonical contest documents
+            topics: Canonical topic documents
+
+        Returns:
+            EntityGraph
+        """
+        topic_table = _NodeTable(t.get('name', '') for t in topics)
+        topic_parent = array('i', [-1] * len(topics))
+        for i, topic in enumerate(topics):
+            parent = topic.get('parent')
+            if parent:
+                topic_parent[i] = topic_table.resolve(parent)
+
+        problem_table = _NodeTable(
+            problem_key(p.get('source', ''), p.get('external_id', '')) for p in problems
+        )
+        topic_index, resolve_topic = topic_table.index, topic_table.resolve
+        problem_topics = Adjacency.from_lists(
+            [
+                topic_index[name] if name in topic_index else resolve_topic(name)
+                for name in p.get('topics', [])
+            ]
+            for p in problems
+        )
+        problem_index, resolve_problem = problem_table.index, problem_table.resolve
+        contest_problems = Adjacency.from_lists(
+            [
+                problem_index[key] if key in problem_index else resolve_problem(key)
+                for key in (
+                    f"{c.get('source', '')}:{ref.get('problem_external_id', '')}"
+                    for ref in c.get('problems', [])
+                )
+            ]
+            for c in contests
+        )
+
+        # Phantom nodes have no outgoing links of their own
+        topic_parent.extend([-1] * (len(topic_table.names) - len(topics)))
+        problem_topics.offsets.extend(
+            [len(problem_topics.targets)] * (len(problem_table.names) - len(problems))
+        )
+
+        problem_ids = [p.get('problem_id', 'unknown') for p in problems]
+        problem_ids.extend([''] * (len(problem_table.names) - len(problems)))
+
+        return cls(
+            problem_keys=problem_table.names,
+            problem_ids=problem_ids,
+            problem_count=problem_table.defined,
+            contest_ids=[c.get('contest_id', 'unknown') for c in contests],
+            topic_names=topic_table.names,
+            topic_count=topic_table.defined,
+            problem_topics=problem_topics,
+            contest_problems=contest_problems,
+            topic_parent=topic_parent
+        )
+
+    # Lookups ---------------------------------------------------------------
+
+    def problem_node(self, key: str) -> Optional[int]:
+        """Node id of a problem by "source:external_id" (None if unknown)."""
+        return self._problem_index.get(key)
+
+    def topic_node(self, name: str) -> Optional[int]:
+        """Node id of a topic by name (None if unknown)."""
+        return self._topic_index.get(name)
+
+    def contest_node(self, contest_id: str) -> Optional[int]:
+        """Node id of a contest by contest_id (None if unknown)."""
+        return self._contest_index.get(contest_id)
+
+    def is_phantom_problem(self, node: int) -> bool:
+        return node >= self.problem_count
+
+    def is_phantom_topic(self, node: int) -> bool:
+        return node >= self.topic_count
+
+    def stats(self) -> Dict[str, int]:
+        """Node and edge counts."""
+        return {
+            'problems': self.problem_count,
+            'contests': len(self.contest_ids),
+            'topics': self.topic_count,
+            'missing_problems': len(self.problem_keys) - self.problem_count,
+            'missing_topics': len(self.topic_names) - self.topic_count,
+            'contest_problem_links': self.contest_problems.edge_count(),
+            'problem_topic_links': self.problem_topics.edge_count(),
+            'topic_parent_links': sum(1 for parent in self.topic_parent if parent >= 0),
+        }
+
+    # Orphans ---------------------------------------------------------------
+
+    def _orphans(self, first: int, count: int, forward: Adjacency) -> Dict[int, List[int]]:
+        """
+        Phantom nodes in [first, count) → referrers (once per reference),
+        in order of first reference.
+        """
+        usage: Dict[int, List[int]] = {}
+        if first == count:
+            return usage
+        for node in range(len(forward)):
+            for target in forward.neighbors(node):
+                if target >= first:
+                    usage.setdefault(target, []).append(node)
+        return usage
+
+    def orphan_topics(self) -> List[Tuple[str, List[str]]]:
+        """Topics used by problems but not defined: (name, problem ids)."""
+        usage = self._orphans(self.topic_count, len(self.topic_names), self.problem_topics)
+        return [
+            (self.topic_names[node], [self.problem_ids[p] for p in referrers])
+            for node, referrers in usage.items()
+        ]
+
+    def orphan_problems(self) -> List[Tuple[str, List[str]]]:
+        """Problems referenced by contests but not defined: (key, contest ids)."""
+        usage = self._orphans(self.problem_count, len(self.problem_keys), self.contest_problems)
+        return [
+            (self.problem_keys[node], [self.contest_ids[c] for c in referrers])
+            for node, referrers in usage.items()
+        ]
+
+    def orphan_parents(self) -> List[Tuple[str, List[str]]]:
+        """Parent topics that are not defined: (name, child topic names)."""
+        usage: Dict[int, List[int]] = {}
+        if self.topic_count < len(self.topic_names):
+            for topic, parent in enumerate(self.topic_parent):
+                if parent >= self.topic_count:
+                    usage.setdefault(parent, []).append(topic)
+        return [
+            (self.topic_names[node], [self.topic_names[child] for child in children])
+            for node, children in usage.items()
+        ]
+
+    # Persistence -----------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization (forward relations only)."""
+        return {
+            'format': GRAPH_FORMAT,
+            'stats': self.stats(),
+            'problems': {'keys': self.problem_keys, 'ids': self.problem_ids, 'defined': self.problem_count},
+            'contests': {'ids': self.contest_ids},
+            'topics': {'names': self.topic_names, 'defined': self.topic_count},
+            'problem_topics': self.problem_topics.to_dict(),
+            'contest_problems': self.contest_problems.to_dict(),
+            'topic_parent': self.topic_parent.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EntityGraph':
+        """Rebuild a graph from to_dict() output (reverse indexes are recomputed)."""
+        if data.get('format') != GRAPH_FORMAT:
+            raise ValueError(f"Unsupported entity graph format: {data.get('format')}")
+        return cls(
+            problem_keys=data['problems']['keys'],
+            problem_ids=data['problems']['ids'],
+            problem_count=data['problems']['defined'],
+            contest_ids=data['contests']['ids'],
+            topic_names=data['topics']['names'],
+            topic_count=data['topics']['defined'],
+            problem_topics=Adjacency.from_dict(data['problem_topics']),
+            contest_problems=Adjacency.from_dict(data['contest_problems']),
+            topic_parent=array('i', data['topic_parent'])
+        )
+
+    def save(self, filepath: str):
+        """Write the graph as compact JSON."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':')))
+
+    @classmethod
+    def load(cls, filepath: str) -> 'EntityGraph':
+        """Load a graph written by save()."""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_snapshot_graph(snapshot_dir: str) -> EntityGraph:
+    """
+    Entity graph of a snapshot directory.
+
+    Snapshots created before the graph was persisted are indexed from
+    their data files.
+
+    Args:
+        snapshot_dir: Snapshot directory
+
+    Returns:
+        EntityGraph
+    """
+    graph_path = os.path.join(snapshot_dir, GRAPH_FILE)
+    if os.path.exists(graph_path):
+        return EntityGraph.load(graph_path)
+
+    collections = {}
+    for name in ('problems', 'contests', 'topics'):
+        path = find_data_file(snapshot_dir, f"{name}.json")
+        collections[name] = load_json_data(path) if path else []
+    return EntityGraph.build(collections['problems'], collections['contests'], collections['topics'])
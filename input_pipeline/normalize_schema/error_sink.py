@@ -0,0 +1,251 @@
+"""
+Error Sink
+
+Streams validation errors to an NDJSON file as they are found and keeps
+only a bounded summary in memory:
+- Counts grouped by category, rule and path (schema path or field)
+- The first K examples of each group
+
+Rejection reports (errors.json, errors.log) are produced from the sink,
+so a badly broken input costs disk space rather than memory.
+"""
+
+import os
+import json
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+
+# Report categories, in report order
+CATEGORIES = ['schema', 'duplicate', 'orphan', 'reference']
+
+# errors.log line prefix per category
+LOG_PREFIXES = {
+    'schema': 'SCHEMA',
+    'duplicate': 'DUPLICATE',
+    'orphan': 'ORPHAN',
+    'reference': 'REFERENCE',
+}
+
+ERRORS_FILE = "errors.ndjson"
+
+
+def error_rule(category: str, error: Any) -> str:
+    """
+    Rule an error belongs to.
+
+    Schema errors are keyed by the failing JSON Schema keyword; rule
+    errors by their entity/orphan/error type.
+
+    Args:
+        category: Error category (schema, duplicate, orphan, reference)
+        error: Schema error dict or rule error object
+
+    Returns:
+        Rule name
+    """
+    if category == 'schema':
+        return (error.get('schema_path') or 'unknown').rsplit('.', 1)[-1]
+    if category == 'duplicate':
+        return error.entity_type
+    if category == 'orphan':
+        return error.orphan_type
+    return error.error_type
+
+
+def error_record(category: str, error: Any) -> Dict[str, Any]:
+    """
+    JSON record for one error.
+
+    Duplicate occurrences are reduced to a count; the full records are
+    what makes large error sets expensive.
+
+    Args:
+        category: Error category
+        error: Schema error dict or rule error object
+
+    Returns:
+        Dict with category, rule, path and the error's fields
+    """
+    record = {'category': category, 'rule': error_rule(category, error)}
+    if category == 'schema':
+        record['path'] = error.get('schema_path', '')
+        record['error'] = error
+    elif category == 'duplicate':
+        record['path'] = ''
+        record.update({'key': error.key, 'count': len(error.occurrences), 'message': error.message})
+    elif category == 'orphan':
+        record['path'] = ''
+        record.update({'value': error.value, 'referenced_by': error.referenced_by, 'message': error.message})
+    else:
+        record['path'] = error.field
+        record.update({
+            'field': error.field,
+            'value': error.value,
+            'record_id': error.record_id,
+            'message': error.message,
+        })
+    return record
+
+
+def keep_or_emit(errors: List[Any], sink: Optional['ErrorSink'], category: str, error: Any):
+    """
+    Hand one error found by a check to the sink, or keep it when there is none.
+
+    Args:
+        errors: List the check returns (only appended to without a sink)
+        sink: Error stream, or None to keep errors in memory
+        category: Error category
+        error: Schema error dict or rule error object
+    """
+    if sink is None:
+        errors.append(error)
+    else:
+        sink.emit(category, error)
+
+
+class ErrorSink:
+    """
+    Append-only NDJSON error stream with a bounded in-memory summary.
+    """
+
+    def __init__(self, directory: str, examples_per_group: int = 5):
+        """
+        Open the error stream.
+
+        Args:
+            directory: Report directory (created); errors go to errors.ndjson in it
+            examples_per_group: Examples kept in memory per (category, rule, path)
+        """
+        self.directory = directory
+        self.examples_per_group = examples_per_group
+        self.path = os.path.join(directory, ERRORS_FILE)
+        self.total = 0
+        self.counts: Dict[str, int] = {category: 0 for category in CATEGORIES}
+        # category -> rule -> count (what a ValidationResult keeps as 'omitted')
+        self.rule_counts: Dict[str, Dict[str, int]] = {}
+        self.groups: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def emit(self, category: str, error: Any):
+        """
+        Record one error.
+
+        Args:
+            category: Error category (schema, duplicate, orphan, reference)
+            error: Schema error dict or rule error object
+        """
+        record = error_record(category, error)
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.total += 1
+        self.counts[category] = self.counts.get(category, 0) + 1
+        rules = self.rule_counts.setdefault(category, {})
+        rules[record['rule']] = rules.get(record['rule'], 0) + 1
+
+        group = self.groups.get((category, record['rule'], record['path']))
+        if group is None:
+            group = {'count': 0, 'examples': []}
+            self.groups[(category, record['rule'], record['path'])] = group
+        group['count'] += 1
+        if len(group['examples']) < self.examples_per_group:
+            group['examples'].append(record)
+
+    def emit_all(self, category: str, errors: List[Any]):
+        """Record a list of errors of one category."""
+        for error in errors:
+            self.emit(category, error)
+
+    def rule_counts_snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Copy of the per-rule counts (pass to ValidationResult.count_streamed later)."""
+        return {category: dict(rules) for category, rules in self.rule_counts.items()}
+
+    def close(self):
+        """Flush and close the error stream."""
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        """Close and delete the error stream (and the directory if left empty)."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            pass
+
+    def records(self, category: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Read errors back from the stream, one at a time.
+
+        Args:
+            category: Only yield this category (None for all)
+        """
+        if not self._file.closed:
+            self._file.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if category is None or record['category'] == category:
+                    yield record
+
+    def summary(self) -> Dict[str, Any]:
+        """Bounded summary: totals, per-category counts and per-group examples."""
+        groups = []
+        for (category, rule, path), group in sorted(
+            self.groups.items(),
+            key=lambda item: (CATEGORIES.index(item[0][0]), -item[1]['count'], item[0][1], item[0][2])
+        ):
+            groups.append({
+                'category': category,
+                'rule': rule,
+                'path': path,
+                'count': group['count'],
+                'omitted_examples': group['count'] - len(group['examples']),
+                'examples': group['examples'],
+            })
+
+        return {
+            'total_errors': self.total,
+            'counts': dict(self.counts),
+            'errors_file': ERRORS_FILE,
+            'examples_per_group': self.examples_per_group,
+            'groups': groups,
+        }
+
+    def _log_line(self, record: Dict[str, Any]) -> str:
+        prefix = LOG_PREFIXES.get(record['category'], record['category'].upper())
+        if record['category'] == 'schema':
+            return f"[{prefix}] {record['error']}"
+        return f"[{prefix}] {record['message']}"
+
+    def write_report(self, extra: Dict[str, Any] = None, log_header: List[str] = None) -> str:
+        """
+        Write errors.json (summary) and errors.log (every error) next to the stream.
+
+        errors.log is written by re-reading the stream once per category,
+        so neither file needs the full error set in memory.
+
+        Args:
+            extra: Additional top-level fields for errors.json (e.g., stats)
+            log_header: Lines written at the top of errors.log
+
+        Returns:
+            Report directory
+        """
+        self.close()
+
+        report = dict(extra or {})
+        report.update(self.summary())
+        with open(os.path.join(self.directory, "errors.json"), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        with open(os.path.join(self.directory, "errors.log"), 'w', encoding='utf-8') as f:
+            lines = list(log_header or []) + ["", "=== ERRORS ==="]
+            f.write('\n'.join(lines))
+            for category in CATEGORIES:
+                for record in self.records(category):
+                    f.write('\n' + self._log_line(record))
+
+        return self.directory
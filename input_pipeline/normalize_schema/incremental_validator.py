@@ -0,0 +1,508 @@
+"""
+Incremental Validator
+
+Revalidates only what changed since the previous run:
+1. Per-document schema and reference results are cached by content hash
+   (the cache is tied to the schema version and schema file contents)
+2. Duplicate and orphan checks run against persisted key and reference
+   indexes, updated with only the added and removed documents
+3. Topics (a few dozen documents) are always validated in full
+4. Near-duplicate pairs are cached by a checksum of all problem hashes
+   and descriptions, and only recomputed when either changed
+
+A changed document is a removal of its old content plus an addition of
+the new one. The result matches SchemaValidator.validate_all(), error
+order included.
+"""
+
+import os
+import json
+import hashlib
+import time
+from collections import Counter
+from typing import Dict, List, Any, Optional
+
+from .validator import SchemaValidator, ValidationResult, SCHEMAS_DIR
+from .error_sink import ErrorSink
+from .rules.duplicate_checker import record_key, DuplicateError
+from .rules.orphan_detector import OrphanError
+from .rules.near_duplicate_detector import detect_near_duplicates, NearDuplicate
+from .rules.reference_validator import (
+    validate_uuids,
+    validate_r2_references,
+    validate_source_urls,
+    validate_slug_format,
+    ReferenceError
+)
+
+
+# Bump when the state layout or cached results change
+STATE_FORMAT = 2
+
+# State file: cache/{schema_version}/validation_state.json
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+# Identifier field per cached entity type
+ID_FIELDS = {
+    'problem': 'problem_id',
+    'contest': 'contest_id',
+}
+
+# Reference checks per entity type, in validate_all() order
+REFERENCE_CHECKS = {
+    'problem': [
+        lambda doc: validate_uuids([doc], 'problem_id'),
+        lambda doc: validate_r2_references([doc]),
+        lambda doc: validate_source_urls([doc]),
+        lambda doc: validate_slug_format([doc]),
+    ],
+    'contest': [
+        lambda doc: validate_uuids([doc], 'contest_id'),
+    ],
+}
+
+
+def document_hash(doc: Dict) -> str:
+    """
+    Content hash of a canonical document.
+
+    Args:
+        doc: Document to hash
+
+    Keys are not sorted: canonical documents are built with a fixed key
+    order, and a reordered document merely counts as changed.
+
+    Returns:
+        Hex BLAKE2b-128 digest of the document's compact JSON encoding
+    """
+    encoded = json.dumps(doc, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def schema_fingerprint(schema_version: str) -> str:
+    """Hash of the schema files of a version (invalidates the cache on change)."""
+    digest = hashlib.sha256(str(STATE_FORMAT).encode('utf-8'))
+    schema_dir = os.path.join(SCHEMAS_DIR, schema_version)
+    if os.path.isdir(schema_dir):
+        for filename in sorted(os.listdir(schema_dir)):
+            with open(os.path.join(schema_dir, filename), 'rb') as f:
+                digest.update(filename.encode('utf-8'))
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _empty_state(fingerprint: str, schema_version: str) -> Dict[str, Any]:
+    return {
+        'format': STATE_FORMAT,
+        'schema_version': schema_version,
+        'fingerprint': fingerprint,
+        # Content hash -> cached per-document results (one per current document)
+        'documents': {'problem': {}, 'contest': {}},
+        # Content hash -> number of documents with that content, when above 1
+        'repeats': {'problem': {}, 'contest': {}},
+        # Duplicate indexes: composite key -> record ids, UUID -> count
+        'keys': {'problem': {}, 'contest': {}},
+        'uuids': {'problem': {}, 'contest': {}},
+        # Reference indexes: topic -> problem ids, "source:external_id" -> contest ids
+        'topic_refs': {},
+        'problem_refs': {},
+        # Near-duplicate pairs of the corpus with the given checksum
+        'near_duplicates': {'checksum': None, 'pairs': []},
+    }
+
+
+def corpus_checksum(problem_hashes: List[str], descriptions: Optional[Dict[str, str]] = None) -> str:
+    """
+    Checksum of everything near-duplicate detection looks at.
+
+    Args:
+        problem_hashes: document_hash() of each problem, in document order
+        descriptions: LeetCode description HTML per slug
+
+    Returns:
+        Hex BLAKE2b-128 digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for problem_hash in problem_hashes:
+        digest.update(problem_hash.encode('ascii'))
+    digest.update(b'\0')
+    for slug in sorted(descriptions or {}):
+        digest.update(json.dumps([slug, descriptions[slug]], ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class IncrementalValidator:
+    """
+    validate_all() with per-document result caching and maintained
+    cross-entity indexes.
+
+    Documents still have to be hashed on every run; schema and reference
+    validation only run for new content, and the duplicate/orphan
+    indexes only see the delta.
+    """
+
+    def __init__(
+        self,
+        schema_version: str = "v1.0.0",
+        state_path: Optional[str] = None,
+        validator: SchemaValidator = None
+    ):
+        """
+        Initialize incremental validator and load the previous state.
+
+        Args:
+            schema_version: Version of schemas to use
+            state_path: State file (default: cache/{schema_version}/validation_state.json)
+            validator: Validator to reuse (created for schema_version if None)
+        """
+        self.schema_version = schema_version
+        self.validator = validator or SchemaValidator(schema_version)
+        self.state_path = state_path or os.path.join(CACHE_DIR, schema_version, "validation_state.json")
+        self.fingerprint = schema_fingerprint(schema_version)
+        self.state = self._load_state()
+        # Per entity type: added / removed / reused documents in the last run
+        self.delta: Dict[str, Dict[str, int]] = {}
+        # Content hashes of the documents of the last _sync(), per entity type
+        self._hashes: Dict[str, List[str]] = {}
+        self._dirty = False
+
+    def _load_state(self) -> Dict[str, Any]:
+        """Load the persisted state, discarding it if stale or unreadable."""
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if (state.get('format') == STATE_FORMAT and
+                        state.get('fingerprint') == self.fingerprint):
+                    return state
+            except (OSError, ValueError):
+                pass
+        return _empty_state(self.fingerprint, self.schema_version)
+
+    def save(self):
+        """Persist the state (atomically replaces the previous file)."""
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        # json.dumps encodes in one C call; json.dump streams chunks from Python
+        encoded = json.dumps(self.state, ensure_ascii=False, separators=(',', ':'))
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(encoded)
+        os.replace(tmp_path, self.state_path)
+        self._dirty = False
+
+    def _evaluate(self, entity_type: str, doc: Dict) -> Dict[str, Any]:
+        """
+        Run the per-document checks and extract index contributions.
+
+        Error lists are only stored when non-empty, and 'uuid' only when it
+        differs from 'id', to keep the state file small.
+        """
+        id_field = ID_FIELDS[entity_type]
+        entry = {
+            'id': doc.get(id_field, 'unknown'),
+            'key': record_key(doc),
+        }
+        uuid = doc.get(id_field, '')
+        if uuid != entry['id']:
+            entry['uuid'] = uuid
+
+        schema_errors = self.validator.validate_entity(doc, entity_type)
+        if schema_errors:
+            entry['schema'] = schema_errors
+        references = [
+            [index, e.error_type, e.field, e.value, e.record_id, e.message]
+            for index, check in enumerate(REFERENCE_CHECKS[entity_type])
+            for e in check(doc)
+        ]
+        if references:
+            entry['references'] = references
+        if entity_type == 'problem':
+            entry['topics'] = list(doc.get('topics', []))
+        else:
+            source = doc.get('source', '')
+            entry['refs'] = [
+                f"{source}:{ref.get('problem_external_id', '')}"
+                for ref in doc.get('problems', [])
+            ]
+        return entry
+
+    def _apply(self, entity_type: str, entry: Dict[str, Any], sign: int):
+        """Add (sign=1) or remove (sign=-1) one document's index contributions."""
+        state = self.state
+
+        def update(index: Dict[str, List[str]], key: str, record_id: str):
+            if sign > 0:
+                index.setdefault(key, []).append(record_id)
+                return
+            ids = index.get(key)
+            if ids is not None and record_id in ids:
+                ids.remove(record_id)
+                if not ids:
+                    del index[key]
+
+        update(state['keys'][entity_type], entry['key'], entry['id'])
+        uuid = entry.get('uuid', entry['id'])
+        if uuid:
+            uuids = state['uuids'][entity_type]
+            uuids[uuid] = uuids.get(uuid, 0) + sign
+            if uuids[uuid] <= 0:
+                del uuids[uuid]
+        if entity_type == 'problem':
+            for topic in entry['topics']:
+                update(state['topic_refs'], topic, entry['id'])
+        else:
+            for ref in entry['refs']:
+                update(state['problem_refs'], ref, entry['id'])
+
+    def _sync(self, entity_type: str, docs: List[Dict]) -> List[Dict[str, Any]]:
+        """
+        Bring cache and indexes up to date with the current documents.
+
+        Returns:
+            Cached entry per document, in document order
+        """
+        cache = self.state['documents'][entity_type]
+        hashes = [document_hash(doc) for doc in docs]
+        current = Counter(hashes)
+        previous = Counter(cache.keys())
+        previous.update({digest: count - 1 for digest, count in self.state['repeats'][entity_type].items()})
+
+        removed = previous - current
+        added = current - previous
+
+        for digest, count in removed.items():
+            for _ in range(count):
+                self._apply(entity_type, cache[digest], -1)
+
+        evaluated = 0
+        for doc, digest in zip(docs, hashes):
+            if digest not in cache:
+                cache[digest] = self._evaluate(entity_type, doc)
+                evaluated += 1
+        for digest, count in added.items():
+            for _ in range(count):
+                self._apply(entity_type, cache[digest], 1)
+
+        for digest in removed:
+            if digest not in current:
+                del cache[digest]
+
+        self.state['repeats'][entity_type] = {
+            digest: count for digest, count in current.items() if count > 1
+        }
+        if added or removed:
+            self._dirty = True
+        self.delta[entity_type] = {
+            'added': sum(added.values()),
+            'removed': sum(removed.values()),
+            'evaluated': evaluated,
+            'reused': len(docs) - evaluated,
+        }
+        self._hashes[entity_type] = hashes
+        return [cache[digest] for digest in hashes]
+
+    def _near_duplicates(
+        self,
+        problems: List[Dict],
+        descriptions: Optional[Dict[str, str]]
+    ) -> List[NearDuplicate]:
+        """Near-duplicate pairs, recomputed only when the corpus checksum changed."""
+        checksum = corpus_checksum(self._hashes['problem'], descriptions)
+        cached = self.state['near_duplicates']
+        if cached['checksum'] == checksum:
+            return [
+                NearDuplicate(tuple(ids), tuple(keys), similarity, message)
+                for ids, keys, similarity, message in cached['pairs']
+            ]
+
+        near_duplicates = detect_near_duplicates(problems, descriptions)
+        self.state['near_duplicates'] = {
+            'checksum': checksum,
+            'pairs': [
+                [list(d.problem_ids), list(d.keys), d.similarity, d.message]
+                for d in near_duplicates
+            ],
+        }
+        self._dirty = True
+        return near_duplicates
+
+    def _collect(
+        self,
+        entity_type: str,
+        entries: List[Dict[str, Any]],
+        result: ValidationResult
+    ):
+        """Gather cached schema and reference errors in validate_all() order."""
+        buckets: List[List[ReferenceError]] = [[] for _ in REFERENCE_CHECKS[entity_type]]
+        for entry in entries:
+            if 'schema' in entry:
+                result.schema_errors.extend(entry['schema'])
+            for index, *fields in entry.get('references', ()):
+                buckets[index].append(ReferenceError(*fields))
+        for bucket in buckets:
+            result.reference_errors.extend(bucket)
+
+    def _duplicate_errors(self, entity_type: str, position: Dict[str, int]) -> List[DuplicateError]:
+        """Duplicate errors from the key indexes, ordered as check_duplicates() orders them."""
+        id_field = ID_FIELDS[entity_type]
+        errors = []
+
+        def order(ids: List[str]) -> List[str]:
+            return sorted(ids, key=lambda i: position.get(i, len(position)))
+
+        dup_keys = [(key, order(ids)) for key, ids in self.state['keys'][entity_type].items() if len(ids) > 1]
+        dup_keys.sort(key=lambda item: position.get(item[1][0], len(position)))
+        for key, ids in dup_keys:
+            errors.append(DuplicateError(
+                entity_type=entity_type,
+                key=key,
+                occurrences=[{id_field: i} for i in ids],
+                message=f"Duplicate {entity_type} found: key={key}, count={len(ids)}, ids={ids}"
+            ))
+
+        # Records sharing a UUID share the id, so the UUID's position orders them
+        dup_uuids = [uuid for uuid, count in self.state['uuids'][entity_type].items() if count > 1]
+        dup_uuids.sort(key=lambda uuid: position.get(uuid, len(position)))
+        for uuid in dup_uuids:
+            count = self.state['uuids'][entity_type][uuid]
+            errors.append(DuplicateError(
+                entity_type="uuid",
+                key=uuid,
+                occurrences=[{id_field: uuid}] * count,
+                message=f"Duplicate UUID found: {uuid}, count={count}"
+            ))
+
+        return errors
+
+    def _orphans(
+        self,
+        index: Dict[str, List[str]],
+        defined,
+        entries: List[Dict[str, Any]],
+        position: Dict[str, int],
+        field: str
+    ) -> List[tuple]:
+        """
+        Index entries whose target is not defined, in first-reference order.
+
+        Args:
+            index: Reference index (target -> referencing record ids)
+            defined: Targets that exist
+            entries: Cached entries of the referencing documents, in order
+            position: Record id -> first position in entries
+            field: Entry field listing the references ('topics' or 'refs')
+        """
+        end = len(position)
+        orphans = []
+        for value, ids in index.items():
+            if value not in defined:
+                ids = sorted(ids, key=lambda i: position.get(i, end))
+                first = position.get(ids[0], end)
+                # Ties (several orphans in one document) keep the document's order
+                offset = entries[first][field].index(value) if first < end else 0
+                orphans.append(((first, offset), value, ids))
+        orphans.sort(key=lambda item: item[0])
+        return [(value, ids) for _, value, ids in orphans]
+
+    def validate_all(
+        self,
+        problems: List[Dict],
+        contests: List[Dict],
+        topics: List[Dict],
+        save: bool = True,
+        sink: Optional[ErrorSink] = None,
+        descriptions: Optional[Dict[str, str]] = None,
+        near_duplicates: bool = False
+    ) -> ValidationResult:
+        """
+        Validate all entity types, reusing cached results for unchanged documents.
+
+        Args:
+            problems: List of canonical problem documents
+            contests: List of canonical contest documents
+            topics: List of canonical topic documents
+            save: Persist the updated state (skipped when nothing changed)
+            sink: Stream the errors here instead of keeping them in the result
+            descriptions: LeetCode description HTML per slug (near-duplicate detection)
+            near_duplicates: Also report near-duplicate pairs (cached per corpus checksum)
+
+        Returns:
+            Combined ValidationResult (same content as SchemaValidator.validate_all)
+        """
+        result = ValidationResult(is_valid=True)
+
+        start = time.perf_counter()
+        problem_entries = self._sync('problem', problems)
+        self._collect('problem', problem_entries, result)
+        result.timings['problems'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        contest_entries = self._sync('contest', contests)
+        self._collect('contest', contest_entries, result)
+        result.timings['contests'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        topic_result = self.validator.validate_topics(topics)
+        result.timings['topics'] = time.perf_counter() - start
+
+        result.schema_errors.extend(topic_result.schema_errors)
+
+        start = time.perf_counter()
+        problem_position = {entry['id']: i for i, entry in reversed(list(enumerate(problem_entries)))}
+        contest_position = {entry['id']: i for i, entry in reversed(list(enumerate(contest_entries)))}
+
+        result.duplicate_errors.extend(self._duplicate_errors('problem', problem_position))
+        result.duplicate_errors.extend(self._duplicate_errors('contest', contest_position))
+        result.duplicate_errors.extend(topic_result.duplicate_errors)
+
+        result.orphan_errors.extend(topic_result.orphan_errors)
+
+        defined_topics = {t.get('name', '') for t in topics}
+        for topic, problem_ids in self._orphans(
+                self.state['topic_refs'], defined_topics, problem_entries, problem_position, 'topics'):
+            result.orphan_errors.append(OrphanError(
+                orphan_type="topic",
+                value=topic,
+                referenced_by=problem_ids,
+                message=f"Orphan topic '{topic}' used in {len(problem_ids)} problems but not defined"
+            ))
+
+        defined_problems = self.state['keys']['problem']
+        for problem_key, contest_ids in self._orphans(
+                self.state['problem_refs'], defined_problems, contest_entries, contest_position, 'refs'):
+            result.orphan_errors.append(OrphanError(
+                orphan_type="problem",
+                value=problem_key,
+                referenced_by=contest_ids,
+                message=f"Orphan problem '{problem_key}' referenced in {len(contest_ids)} contests but not defined"
+            ))
+        result.timings['cross_entity'] = time.perf_counter() - start
+
+        # Near duplicates compare problems with each other, so the whole
+        # result is cached for the corpus instead of per document
+        if near_duplicates:
+            start = time.perf_counter()
+            result.near_duplicates = self._near_duplicates(problems, descriptions)
+            result.timings['near_duplicates'] = time.perf_counter() - start
+
+        if sink is not None:
+            result.spill(sink)
+
+        result.stats = {
+            'total_problems': len(problems),
+            'total_contests': len(contests),
+            'total_topics': len(topics),
+            'schema_errors': result.count('schema'),
+            'duplicate_errors': result.count('duplicate'),
+            'orphan_errors': result.count('orphan'),
+            'reference_errors': result.count('reference'),
+            'near_duplicates': len(result.near_duplicates),
+        }
+        result.is_valid = result.total_errors() == 0
+
+        if save and self._dirty:
+            start = time.perf_counter()
+            self.save()
+            result.timings['save_state'] = time.perf_counter() - start
+
+        return result
@@ -0,0 +1,121 @@
+"""
+Schema Migrations
+
+Record transforms that carry canonical documents from one schema version
+to the next, so existing snapshots can be moved to a new schema without
+re-running the pipeline from raw data.
+
+Each module in this package describes one step and exposes it as
+MIGRATION:
+
+    # normalize_schema/migrations/v1_0_0_to_v1_1_0.py
+    from . import Migration
+
+    def migrate_problem(problem):
+        problem.setdefault('tags', [])
+        return problem
+
+    MIGRATION = Migration('v1.0.0', 'v1.1.0', problem=migrate_problem)
+
+Transforms take one document and return the migrated document, or None
+to drop it. Entity types without a transform pass through unchanged.
+Steps are chained (v1.0.0 → v1.1.0 → v1.2.0) to reach the target version.
+"""
+
+import pkgutil
+import importlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+# Transform of one document (None drops it)
+Transform = Callable[[Dict], Optional[Dict]]
+
+
+class MigrationError(Exception):
+    """Raised when no chain of migrations connects two schema versions."""
+    pass
+
+
+@dataclass
+class Migration:
+    """One migration step between consecutive schema versions."""
+    from_version: str
+    to_version: str
+    problem: Optional[Transform] = None
+    contest: Optional[Transform] = None
+    topic: Optional[Transform] = None
+    description: str = ''
+
+    def transform(self, entity_type: str) -> Optional[Transform]:
+        """Transform for an entity type ('problem', 'contest', 'topic'), if any."""
+        return getattr(self, entity_type)
+
+
+def load_migrations() -> Dict[str, Migration]:
+    """
+    Collect the MIGRATION of every module in this package.
+
+    Returns:
+        from_version → Migration
+
+    Raises:
+        MigrationError: If two modules migrate from the same version
+    """
+    migrations: Dict[str, Migration] = {}
+    for module_info in pkgutil.iter_modules(__path__):
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migration = getattr(module, 'MIGRATION', None)
+        if migration is None:
+            continue
+        if migration.from_version in migrations:
+            raise MigrationError(f"Two migrations start at {migration.from_version}")
+        migrations[migration.from_version] = migration
+    return migrations
+
+
+def migration_path(from_version: str, to_version: str) -> List[Migration]:
+    """
+    Migration steps from one schema version to another.
+
+    Args:
+        from_version: Schema version of the existing data
+        to_version: Target schema version
+
+    Returns:
+        Steps in application order (empty if the versions are equal)
+
+    Raises:
+        MigrationError: If no chain of migrations reaches to_version
+    """
+    migrations = load_migrations()
+    steps = []
+    version = from_version
+    while version != to_version:
+        migration = migrations.get(version)
+        if migration is None or len(steps) > len(migrations):
+            raise MigrationError(f"No migration path from {from_version} to {to_version} (stuck at {version})")
+        steps.append(migration)
+        version = migration.to_version
+    return steps
+
+
+def migrate_record(entity_type: str, record: Dict, steps: List[Migration]) -> Optional[Dict]:
+    """
+    Apply migration steps to one document.
+
+    Args:
+        entity_type: 'problem', 'contest' or 'topic'
+        record: Document in the source schema version
+        steps: Steps from migration_path()
+
+    Returns:
+        Document in the target schema version, or None if a step dropped it
+    """
+    for step in steps:
+        transform = step.transform(entity_type)
+        if transform is not None:
+            record = transform(record)
+            if record is None:
+                return None
+    return record
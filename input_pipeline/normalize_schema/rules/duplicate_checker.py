@@ -4,9 +4,11 @@ Duplicate Checker
 Detects duplicate records based on external_id + source combination.
 """
 
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Tuple, Set, Optional
 from dataclasses import dataclass
 
+from ..error_sink import ErrorSink, keep_or_emit
+
 
 @dataclass
 class DuplicateError:
@@ -17,10 +19,32 @@ class DuplicateError:
     message: str
 
 
+def record_key(record: Dict, key_fields: Tuple[str, ...] = ("source", "external_id")) -> str:
+    """
+    Build the composite key used for duplicate detection.
+    
+    Args:
+        record: Record to build the key for
+        key_fields: Tuple of field names that form the unique key
+        
+    Returns:
+        Key string (field values joined with ":")
+    """
+    key_parts = []
+    for field in key_fields:
+        value = record.get(field, '')
+        if isinstance(value, (list, dict)):
+            value = str(value)
+        key_parts.append(str(value))
+    
+    return ":".join(key_parts)
+
+
 def check_duplicates(
     records: List[Dict],
     entity_type: str = "problem",
-    key_fields: Tuple[str, ...] = ("source", "external_id")
+    key_fields: Tuple[str, ...] = ("source", "external_id"),
+    sink: Optional[ErrorSink] = None
 ) -> List[DuplicateError]:
     """
     Check for duplicate records based on composite key.
@@ -29,6 +53,7 @@ def check_duplicates(
         records: List of records to check
         entity_type: Type of entity (problem, contest, topic)
         key_fields: Tuple of field names that form the unique key
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of DuplicateError objects for each set of duplicates found
@@ -37,15 +62,7 @@ def check_duplicates(
     seen: Dict[str, List[Dict]] = {}
     
     for record in records:
-        # Build composite key
-        key_parts = []
-        for field in key_fields:
-            value = record.get(field, '')
-            if isinstance(value, (list, dict)):
-                value = str(value)
-            key_parts.append(str(value))
-        
-        key = ":".join(key_parts)
+        key = record_key(record, key_fields)
         
         if key not in seen:
             seen[key] = []
@@ -66,7 +83,7 @@ def check_duplicates(
                 else:
                     ids.append('unknown')
             
-            errors.append(DuplicateError(
+            keep_or_emit(errors, sink, 'duplicate', DuplicateError(
                 entity_type=entity_type,
                 key=key,
                 occurrences=occurrences,
@@ -76,12 +93,13 @@ def check_duplicates(
     return errors
 
 
-def check_problem_duplicates(problems: List[Dict]) -> List[DuplicateError]:
+def check_problem_duplicates(problems: List[Dict], sink: Optional[ErrorSink] = None) -> List[DuplicateError]:
     """
     Check for duplicate problems.
     
     Args:
         problems: List of canonical problem documents
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of duplicate errors
@@ -89,16 +107,18 @@ def check_problem_duplicates(problems: List[Dict]) -> List[DuplicateError]:
     return check_duplicates(
         problems,
         entity_type="problem",
-        key_fields=("source", "external_id")
+        key_fields=("source", "external_id"),
+        sink=sink
     )
 
 
-def check_contest_duplicates(contests: List[Dict]) -> List[DuplicateError]:
+def check_contest_duplicates(contests: List[Dict], sink: Optional[ErrorSink] = None) -> List[DuplicateError]:
     """
     Check for duplicate contests.
     
     Args:
         contests: List of canonical contest documents
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of duplicate errors
@@ -106,11 +126,12 @@ def check_contest_duplicates(contests: List[Dict]) -> List[DuplicateError]:
     return check_duplicates(
         contests,
         entity_type="contest",
-        key_fields=("source", "external_id")
+        key_fields=("source", "external_id"),
+        sink=sink
     )
 
 
-def check_topic_duplicates(topics: List[Dict]) -> List[DuplicateError]:
+def check_topic_duplicates(topics: List[Dict], sink: Optional[ErrorSink] = None) -> List[DuplicateError]:
     """
     Check for duplicate topics.
     
@@ -118,6 +139,7 @@ def check_topic_duplicates(topics: List[Dict]) -> List[DuplicateError]:
     
     Args:
         topics: List of canonical topic documents
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of duplicate errors
@@ -125,11 +147,16 @@ def check_topic_duplicates(topics: List[Dict]) -> List[DuplicateError]:
     return check_duplicates(
         topics,
         entity_type="topic",
-        key_fields=("name",)
+        key_fields=("name",),
+        sink=sink
     )
 
 
-def check_uuid_duplicates(records: List[Dict], id_field: str = "problem_id") -> List[DuplicateError]:
+def check_uuid_duplicates(
+    records: List[Dict],
+    id_field: str = "problem_id",
+    sink: Optional[ErrorSink] = None
+) -> List[DuplicateError]:
     """
     Check for duplicate UUIDs.
     
@@ -139,6 +166,7 @@ def check_uuid_duplicates(records: List[Dict], id_field: str = "problem_id") ->
     Args:
         records: List of records to check
         id_field: Name of the UUID field
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of duplicate errors
@@ -155,7 +183,7 @@ def check_uuid_duplicates(records: List[Dict], id_field: str = "problem_id") ->
     
     for uuid, occurrences in seen.items():
         if len(occurrences) > 1:
-            errors.append(DuplicateError(
+            keep_or_emit(errors, sink, 'duplicate', DuplicateError(
                 entity_type="uuid",
                 key=uuid,
                 occurrences=occurrences,
@@ -0,0 +1,307 @@
+"""
+Near-Duplicate Detector
+
+Finds the same problem published twice under different keys (across
+sources, or re-uploaded under a new ID) without pairwise comparison:
+1. Each problem gets a title shingle set (title character 4-grams) and,
+   when a description is available, a full set (title 4-grams plus
+   description word 3-grams)
+2. A MinHash signature estimates Jaccard similarity between sets
+   (one-permutation hashing: each shingle is hashed once into one of
+   NUM_PERM bins, empty bins are filled from the next non-empty one)
+3. LSH banding buckets signatures so only colliding pairs are compared;
+   buckets larger than MAX_BUCKET_SIZE are skipped, keeping the pass
+   roughly linear (true duplicates still meet in their other bands)
+4. Candidates are confirmed by exact Jaccard similarity
+
+Which sets a pair is compared on depends on the pair:
+- different sources: titles (only LeetCode has descriptions, so full sets
+  from two sources never match)
+- same source, both described: full sets
+- same source otherwise: identical titles, only on platforms whose titles
+  are unique (UNIQUE_TITLE_SOURCES), where a repeated title means a
+  re-upload; elsewhere different problems share titles ("Permutation
+  Game", "Sum of Digits" on Codeforces), so such pairs are not compared
+"""
+
+import re
+import json
+import zlib
+from html import unescape
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+
+
+# Signature size and LSH banding (BANDS * ROWS == NUM_PERM); with 16 bands
+# of 4 rows, pairs above ~0.5 similarity are likely to share a bucket
+NUM_PERM = 64
+BANDS = 16
+ROWS = 4
+
+# Minimum Jaccard similarity reported
+DEFAULT_THRESHOLD = 0.8
+
+# Sources whose titles are unique per platform; only their same-source
+# pairs without descriptions are compared, and only on identical titles
+UNIQUE_TITLE_SOURCES = {'leetcode'}
+SAME_SOURCE_TITLE_THRESHOLD = 1.0
+
+# Buckets with more items than this are skipped (they come from shingles
+# shared by many unrelated problems and would make the pass quadratic)
+MAX_BUCKET_SIZE = 40
+
+# Cross-reference table persisted with each snapshot
+NEAR_DUPLICATES_FILE = "near_duplicates.json"
+
+_BIN_BITS = 6  # log2(NUM_PERM)
+_EMPTY = 1 << 32
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_TAG = re.compile(r"<[^>]+>")
+
+
+@dataclass
+class NearDuplicate:
+    """Represents a pair of problems that look like the same problem."""
+    problem_ids: Tuple[str, str]
+    keys: Tuple[str, str]
+    similarity: float
+    message: str
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase title with punctuation collapsed to single spaces."""
+    return ' '.join(_TOKEN.findall((title or '').lower()))
+
+
+def problem_shingles(title: str, description: str = '') -> Set[str]:
+    """
+    Shingle set of a problem.
+
+    Args:
+        title: Problem title
+        description: Description text (HTML tags are ignored)
+
+    Returns:
+        Title character 4-grams and description word 3-grams
+    """
+    text = normalize_title(title)
+    shingles = {text[i:i + 4] for i in range(max(len(text) - 3, 1))} if text else set()
+
+    if description:
+        words = _TOKEN.findall(unescape(_TAG.sub(' ', description)).lower())
+        shingles.update(' '.join(words[i:i + 3]) for i in range(len(words) - 2))
+    return shingles
+
+
+def minhash_signature(shingles: Set[str]) -> Tuple[int, ...]:
+    """
+    One-permutation MinHash signature of a shingle set.
+
+    Each shingle is hashed once; the low bits pick a bin and the minimum
+    of the remaining bits is kept per bin. Empty bins take the value of
+    the next non-empty bin (rotating), offset by the distance, so that
+    equal sets still produce equal signatures.
+
+    Args:
+        shingles: Non-empty shingle set
+
+    Returns:
+        NUM_PERM values
+    """
+    bins = [_EMPTY] * NUM_PERM
+    mask = NUM_PERM - 1
+    # Multiplicative mixing spreads CRC32's linear structure over the bins
+    crcs = map(zlib.crc32, [shingle.encode('utf-8') for shingle in shingles])
+    for h in [(crc * 0x9E3779B1) & 0xFFFFFFFF for crc in crcs]:
+        value = h >> _BIN_BITS
+        if value < bins[h & mask]:
+            bins[h & mask] = value
+
+    if _EMPTY in bins and len(set(bins)) > 1:
+        # Walk the ring backwards twice, carrying the nearest filled bin
+        densified = list(bins)
+        carried = None
+        distance = 0
+        for i in range(2 * NUM_PERM - 1, -1, -1):
+            value = bins[i & mask]
+            if value != _EMPTY:
+                carried, distance = value, 0
+            else:
+                distance += 1
+                if carried is not None and i < NUM_PERM:
+                    densified[i] = carried + distance * _EMPTY
+        bins = densified
+    return tuple(bins)
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity of two sets."""
+    if not a and not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hash index over MinHash signatures.
+    """
+
+    def __init__(self, bands: int = BANDS, rows: int = ROWS, max_bucket: int = MAX_BUCKET_SIZE):
+        """
+        Initialize an empty index.
+
+        Args:
+            bands: Number of bands
+            rows: Signature values per band
+            max_bucket: Buckets with more items are skipped by candidate_pairs()
+        """
+        self.bands = bands
+        self.rows = rows
+        self.max_bucket = max_bucket
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self.skipped_buckets = 0
+
+    def add(self, item: int, signature: Tuple[int, ...]):
+        """Insert an item under each of its band keys."""
+        for band in range(self.bands):
+            key = (band, signature[band * self.rows:(band + 1) * self.rows])
+            self.buckets.setdefault(key, []).append(item)
+
+    def candidate_pairs(self, accept: Optional[Callable[[int, int], bool]] = None) -> Set[Tuple[int, int]]:
+        """
+        Item pairs sharing at least one bucket (smaller item first).
+
+        Buckets larger than max_bucket are skipped and counted in
+        skipped_buckets.
+
+        Args:
+            accept: Predicate on (smaller item, larger item); pairs it
+                rejects are not returned (default: all pairs)
+
+        Returns:
+            Set of (item, item) pairs
+        """
+        pairs = set()
+        self.skipped_buckets = 0
+        for items in self.buckets.values():
+            if len(items) < 2:
+                continue
+            if len(items) > self.max_bucket:
+                self.skipped_buckets += 1
+                continue
+            for i, first in enumerate(items):
+                for second in items[i + 1:]:
+                    pair = (first, second) if first < second else (second, first)
+                    if pair not in pairs and (accept is None or accept(*pair)):
+                        pairs.add(pair)
+        return pairs
+
+
+def detect_near_duplicates(
+    problems: List[Dict],
+    descriptions: Optional[Dict[str, str]] = None,
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[NearDuplicate]:
+    """
+    Detect problems that are near-duplicates of each other.
+
+    Args:
+        problems: List of canonical problem documents
+        descriptions: Description text/HTML per LeetCode slug (optional)
+        threshold: Minimum Jaccard similarity to report
+
+    Returns:
+        List of near-duplicate pairs, in problem order
+    """
+    descriptions = descriptions or {}
+    sources = [str(problem.get('source', '')) for problem in problems]
+    described: List[str] = [
+        descriptions.get(problem.get('slug'), '') if problem.get('source') == 'leetcode' else ''
+        for problem in problems
+    ]
+    unique_title = [source in UNIQUE_TITLE_SOURCES for source in sources]
+    multi_source = len(set(sources)) > 1
+
+    def title_pair(first: int, second: int) -> bool:
+        # Described same-source pairs are compared on their full sets
+        if sources[first] != sources[second]:
+            return True
+        return unique_title[first] and not (described[first] and described[second])
+
+    def described_pair(first: int, second: int) -> bool:
+        return sources[first] == sources[second]
+
+    # A problem only goes into an index if something could be paired with
+    # it there: another source, or a same-source problem under the rules above
+    title_index = LSHIndex()
+    full_index = LSHIndex()
+    title_sets: List[Set[str]] = []
+    full_sets: Dict[int, Set[str]] = {}
+    for position, problem in enumerate(problems):
+        title = problem.get('title') or ''
+        title_shingles = problem_shingles(title)
+        title_sets.append(title_shingles)
+        if title_shingles and (multi_source or unique_title[position]):
+            title_index.add(position, minhash_signature(title_shingles))
+        if described[position]:
+            full_sets[position] = problem_shingles(title, described[position])
+            full_index.add(position, minhash_signature(full_sets[position]))
+
+    compared = {pair: 'title' for pair in title_index.candidate_pairs(title_pair)}
+    if len(full_sets) > 1:
+        compared.update((pair, 'full') for pair in full_index.candidate_pairs(described_pair))
+
+    same_required = max(threshold, SAME_SOURCE_TITLE_THRESHOLD)
+    confirmed = []
+    for (first, second), kind in compared.items():
+        if kind == 'full':
+            set_a, set_b = full_sets[first], full_sets[second]
+            required = threshold
+        else:
+            set_a, set_b = title_sets[first], title_sets[second]
+            required = threshold if sources[first] != sources[second] else same_required
+        # Sets of very different sizes cannot reach the threshold
+        if min(len(set_a), len(set_b)) < required * max(len(set_a), len(set_b)):
+            continue
+        similarity = jaccard(set_a, set_b)
+        if similarity >= required:
+            confirmed.append((first, second, similarity))
+
+    results = []
+    for first, second, similarity in sorted(confirmed):
+        a, b = problems[first], problems[second]
+        key_a = f"{a.get('source', '')}:{a.get('external_id', '')}"
+        key_b = f"{b.get('source', '')}:{b.get('external_id', '')}"
+        if key_a == key_b:
+            # Exact key collisions are reported by the duplicate checker
+            continue
+        results.append(NearDuplicate(
+            problem_ids=(a.get('problem_id', 'unknown'), b.get('problem_id', 'unknown')),
+            keys=(key_a, key_b),
+            similarity=round(similarity, 4),
+            message=f"Near-duplicate problems '{key_a}' and '{key_b}' (similarity {similarity:.2f})"
+        ))
+
+    return results
+
+
+def save_near_duplicates(duplicates: List[NearDuplicate], filepath: str, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Write near-duplicate pairs as a cross-reference table.
+
+    Args:
+        duplicates: Pairs from detect_near_duplicates()
+        filepath: Output file path
+        threshold: Similarity threshold the pairs were detected with
+    """
+    table = {
+        'threshold': threshold,
+        'pairs': [
+            {'problem_ids': list(d.problem_ids), 'keys': list(d.keys), 'similarity': d.similarity}
+            for d in duplicates
+        ],
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(table, f, indent=2, ensure_ascii=False)
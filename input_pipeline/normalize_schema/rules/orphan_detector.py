@@ -4,11 +4,19 @@ Orphan Detector
 Detects orphan references:
 - Topics used in problems but not defined in topics list
 - Problems referenced in contests but not defined in problems list
+- Topics whose parent chain loops back on itself (hierarchy cycles)
+
+Each check can read the orphans off a prebuilt EntityGraph instead of
+rebuilding its own lookup sets.
 """
 
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Optional
 from dataclasses import dataclass
 
+from ..entity_graph import EntityGraph
+from ..error_sink import ErrorSink, keep_or_emit
+from ..topic_hierarchy import find_cycles
+
 
 @dataclass
 class OrphanError:
@@ -21,7 +29,9 @@ class OrphanError:
 
 def detect_orphan_topics(
     problems: List[Dict],
-    topics: List[Dict]
+    topics: List[Dict],
+    graph: Optional[EntityGraph] = None,
+    sink: Optional[ErrorSink] = None
 ) -> List[OrphanError]:
     """
     Detect topics used in problems but not defined in topics list.
@@ -29,31 +39,36 @@ def detect_orphan_topics(
     Args:
         problems: List of canonical problem documents
         topics: List of canonical topic documents
+        graph: Entity graph of the same collections (skips the scan)
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of orphan errors for undefined topics
     """
     errors = []
     
-    # Build set of defined topic names
-    defined_topics = {t.get('name', '') for t in topics}
-    
-    # Track which problems use each undefined topic
-    undefined_usage: Dict[str, List[str]] = {}
-    
-    for problem in problems:
-        problem_id = problem.get('problem_id', 'unknown')
-        problem_topics = problem.get('topics', [])
+    if graph is not None:
+        undefined_usage = dict(graph.orphan_topics())
+    else:
+        # Build set of defined topic names
+        defined_topics = {t.get('name', '') for t in topics}
         
-        for topic in problem_topics:
-            if topic not in defined_topics:
-                if topic not in undefined_usage:
-                    undefined_usage[topic] = []
-                undefined_usage[topic].append(problem_id)
+        # Track which problems use each undefined topic
+        undefined_usage: Dict[str, List[str]] = {}
+        
+        for problem in problems:
+            problem_id = problem.get('problem_id', 'unknown')
+            problem_topics = problem.get('topics', [])
+            
+            for topic in problem_topics:
+                if topic not in defined_topics:
+                    if topic not in undefined_usage:
+                        undefined_usage[topic] = []
+                    undefined_usage[topic].append(problem_id)
     
     # Create errors for each undefined topic
     for topic, problem_ids in undefined_usage.items():
-        errors.append(OrphanError(
+        keep_or_emit(errors, sink, 'orphan', OrphanError(
             orphan_type="topic",
             value=topic,
             referenced_by=problem_ids,
@@ -65,7 +80,9 @@ def detect_orphan_topics(
 
 def detect_orphan_problems(
     contests: List[Dict],
-    problems: List[Dict]
+    problems: List[Dict],
+    graph: Optional[EntityGraph] = None,
+    sink: Optional[ErrorSink] = None
 ) -> List[OrphanError]:
     """
     Detect problems referenced in contests but not defined in problems list.
@@ -73,38 +90,43 @@ def detect_orphan_problems(
     Args:
         contests: List of canonical contest documents
         problems: List of canonical problem documents
+        graph: Entity graph of the same collections (skips the scan)
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of orphan errors for undefined problem references
     """
     errors = []
     
-    # Build set of defined problem external_ids (with source prefix)
-    defined_problems = {
-        f"{p.get('source', '')}:{p.get('external_id', '')}"
-        for p in problems
-    }
-    
-    # Track which contests reference each undefined problem
-    undefined_usage: Dict[str, List[str]] = {}
-    
-    for contest in contests:
-        contest_id = contest.get('contest_id', 'unknown')
-        source = contest.get('source', '')
-        problem_refs = contest.get('problems', [])
+    if graph is not None:
+        undefined_usage = dict(graph.orphan_problems())
+    else:
+        # Build set of defined problem external_ids (with source prefix)
+        defined_problems = {
+            f"{p.get('source', '')}:{p.get('external_id', '')}"
+            for p in problems
+        }
+        
+        # Track which contests reference each undefined problem
+        undefined_usage: Dict[str, List[str]] = {}
         
-        for ref in problem_refs:
-            external_id = ref.get('problem_external_id', '')
-            key = f"{source}:{external_id}"
+        for contest in contests:
+            contest_id = contest.get('contest_id', 'unknown')
+            source = contest.get('source', '')
+            problem_refs = contest.get('problems', [])
             
-            if key not in defined_problems:
-                if key not in undefined_usage:
-                    undefined_usage[key] = []
-                undefined_usage[key].append(contest_id)
+            for ref in problem_refs:
+                external_id = ref.get('problem_external_id', '')
+                key = f"{source}:{external_id}"
+                
+                if key not in defined_problems:
+                    if key not in undefined_usage:
+                        undefined_usage[key] = []
+                    undefined_usage[key].append(contest_id)
     
     # Create errors for each undefined problem
     for problem_key, contest_ids in undefined_usage.items():
-        errors.append(OrphanError(
+        keep_or_emit(errors, sink, 'orphan', OrphanError(
             orphan_type="problem",
             value=problem_key,
             referenced_by=contest_ids,
@@ -114,34 +136,43 @@ def detect_orphan_problems(
     return errors
 
 
-def detect_orphan_parents(topics: List[Dict]) -> List[OrphanError]:
+def detect_orphan_parents(
+    topics: List[Dict],
+    graph: Optional[EntityGraph] = None,
+    sink: Optional[ErrorSink] = None
+) -> List[OrphanError]:
     """
     Detect parent topics that don't exist.
     
     Args:
         topics: List of canonical topic documents
+        graph: Entity graph of the same collections (skips the scan)
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of orphan errors for undefined parent topics
     """
     errors = []
     
-    # Build set of defined topic names
-    defined_topics = {t.get('name', '') for t in topics}
-    
-    # Track which topics reference undefined parents
-    undefined_usage: Dict[str, List[str]] = {}
-    
-    for topic in topics:
-        parent = topic.get('parent')
-        if parent and parent not in defined_topics:
-            if parent not in undefined_usage:
-                undefined_usage[parent] = []
-            undefined_usage[parent].append(topic.get('name', 'unknown'))
+    if graph is not None:
+        undefined_usage = dict(graph.orphan_parents())
+    else:
+        # Build set of defined topic names
+        defined_topics = {t.get('name', '') for t in topics}
+        
+        # Track which topics reference undefined parents
+        undefined_usage: Dict[str, List[str]] = {}
+        
+        for topic in topics:
+            parent = topic.get('parent')
+            if parent and parent not in defined_topics:
+                if parent not in undefined_usage:
+                    undefined_usage[parent] = []
+                undefined_usage[parent].append(topic.get('name', 'unknown'))
     
     # Create errors for each undefined parent
     for parent, child_names in undefined_usage.items():
-        errors.append(OrphanError(
+        keep_or_emit(errors, sink, 'orphan', OrphanError(
             orphan_type="parent_topic",
             value=parent,
             referenced_by=child_names,
@@ -149,3 +180,41 @@ def detect_orphan_parents(topics: List[Dict]) -> List[OrphanError]:
         ))
     
     return errors
+
+
+def detect_topic_cycles(
+    topics: List[Dict],
+    graph: Optional[EntityGraph] = None,
+    sink: Optional[ErrorSink] = None
+) -> List[OrphanError]:
+    """
+    Detect cycles in the topic hierarchy (a topic that is its own ancestor).
+    
+    Args:
+        topics: List of canonical topic documents
+        graph: Entity graph of the same collections (skips the scan)
+        sink: Stream errors here as they are found instead of returning them
+        
+    Returns:
+        One orphan error per cycle, valued by its first topic
+    """
+    if graph is not None:
+        names, parent = graph.topic_names, graph.topic_parent
+    else:
+        names = [t.get('name', '') for t in topics]
+        index: Dict[str, int] = {}
+        for i, name in enumerate(names):
+            index.setdefault(name, i)
+        parent = [index.get(t.get('parent'), -1) if t.get('parent') else -1 for t in topics]
+    
+    errors = []
+    for cycle in find_cycles(parent):
+        members = [names[node] for node in cycle]
+        keep_or_emit(errors, sink, 'orphan', OrphanError(
+            orphan_type="topic_cycle",
+            value=members[0],
+            referenced_by=members,
+            message=f"Topic hierarchy cycle: {' → '.join(members + members[:1])}"
+        ))
+    
+    return errors
@@ -12,6 +12,8 @@ import uuid
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+from ..error_sink import ErrorSink, keep_or_emit
+
 
 @dataclass
 class ReferenceError:
@@ -77,13 +79,18 @@ def validate_url(url: Optional[str]) -> bool:
     return bool(URL_PATTERN.match(url))
 
 
-def validate_uuids(records: List[Dict], id_field: str = "problem_id") -> List[ReferenceError]:
+def validate_uuids(
+    records: List[Dict],
+    id_field: str = "problem_id",
+    sink: Optional[ErrorSink] = None
+) -> List[ReferenceError]:
     """
     Validate UUID format for all records.
     
     Args:
         records: List of records to validate
         id_field: Name of the UUID field
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of validation errors
@@ -95,7 +102,7 @@ def validate_uuids(records: List[Dict], id_field: str = "problem_id") -> List[Re
         uuid_value = record.get(id_field)
         
         if not uuid_value:
-            errors.append(ReferenceError(
+            keep_or_emit(errors, sink, 'reference', ReferenceError(
                 error_type="missing_uuid",
                 field=id_field,
                 value="",
@@ -103,7 +110,7 @@ def validate_uuids(records: List[Dict], id_field: str = "problem_id") -> List[Re
                 message=f"Missing {id_field}"
             ))
         elif not validate_uuid(uuid_value):
-            errors.append(ReferenceError(
+            keep_or_emit(errors, sink, 'reference', ReferenceError(
                 error_type="invalid_uuid",
                 field=id_field,
                 value=uuid_value,
@@ -114,12 +121,13 @@ def validate_uuids(records: List[Dict], id_field: str = "problem_id") -> List[Re
     return errors
 
 
-def validate_r2_references(problems: List[Dict]) -> List[ReferenceError]:
+def validate_r2_references(problems: List[Dict], sink: Optional[ErrorSink] = None) -> List[ReferenceError]:
     """
     Validate R2 path references in problem content_refs.
     
     Args:
         problems: List of canonical problem documents
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of validation errors
@@ -132,7 +140,7 @@ def validate_r2_references(problems: List[Dict]) -> List[ReferenceError]:
         
         for field, path in content_refs.items():
             if path is not None and not validate_r2_path(path):
-                errors.append(ReferenceError(
+                keep_or_emit(errors, sink, 'reference', ReferenceError(
                     error_type="invalid_r2_path",
                     field=f"content_refs.{field}",
                     value=path,
@@ -143,12 +151,13 @@ def validate_r2_references(problems: List[Dict]) -> List[ReferenceError]:
     return errors
 
 
-def validate_source_urls(problems: List[Dict]) -> List[ReferenceError]:
+def validate_source_urls(problems: List[Dict], sink: Optional[ErrorSink] = None) -> List[ReferenceError]:
     """
     Validate source URL references in problem metadata.
     
     Args:
         problems: List of canonical problem documents
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of validation errors
@@ -161,7 +170,7 @@ def validate_source_urls(problems: List[Dict]) -> List[ReferenceError]:
         source_url = metadata.get('source_url')
         
         if source_url and not validate_url(source_url):
-            errors.append(ReferenceError(
+            keep_or_emit(errors, sink, 'reference', ReferenceError(
                 error_type="invalid_url",
                 field="metadata.source_url",
                 value=source_url,
@@ -172,12 +181,13 @@ def validate_source_urls(problems: List[Dict]) -> List[ReferenceError]:
     return errors
 
 
-def validate_slug_format(problems: List[Dict]) -> List[ReferenceError]:
+def validate_slug_format(problems: List[Dict], sink: Optional[ErrorSink] = None) -> List[ReferenceError]:
     """
     Validate slug format (lowercase, hyphens, alphanumeric only).
     
     Args:
         problems: List of canonical problem documents
+        sink: Stream errors here as they are found instead of returning them
         
     Returns:
         List of validation errors
@@ -190,7 +200,7 @@ def validate_slug_format(problems: List[Dict]) -> List[ReferenceError]:
         slug = problem.get('slug', '')
         
         if not slug:
-            errors.append(ReferenceError(
+            keep_or_emit(errors, sink, 'reference', ReferenceError(
                 error_type="missing_slug",
                 field="slug",
                 value="",
@@ -198,7 +208,7 @@ def validate_slug_format(problems: List[Dict]) -> List[ReferenceError]:
                 message="Missing slug"
             ))
         elif not slug_pattern.match(slug):
-            errors.append(ReferenceError(
+            keep_or_emit(errors, sink, 'reference', ReferenceError(
                 error_type="invalid_slug",
                 field="slug",
                 value=slug,
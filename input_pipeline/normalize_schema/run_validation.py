@@ -7,25 +7,36 @@ Orchestrates validation of normalized canonical data.
 Usage:
     python3 run_validation.py --input ../modify_data/output/
     python3 run_validation.py --input ../modify_data/output/ --strict
+    python3 run_validation.py --input ../modify_data/output/ --incremental
 """
 
 import os
 import sys
 import json
 import argparse
+from itertools import islice
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, List, Any, Iterable
 
 # Add parent directory to path for imports
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
 
 from normalize_schema.validator import SchemaValidator, ValidationResult
+from normalize_schema.incremental_validator import IncrementalValidator
+from normalize_schema.error_sink import ErrorSink
+from validate_schema.search_index import load_leetcode_descriptions
+from metrics import add_metrics_arguments, MetricsRun
+from metrics.pipeline_metrics import record_validation_result, record_stage_timings
 
 
 # Default paths
 DEFAULT_INPUT_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "modify_data", "output")
 REJECTED_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "validate_schema", "rejected")
+# Raw LeetCode data (descriptions for near-duplicate detection)
+DEFAULT_LEETCODE_DATA = os.path.join(
+    os.path.dirname(SCRIPT_DIR), "fetch_data", "leetcode", "data", "merged_problems.json"
+)
 
 
 def load_json(filepath: str) -> Any:
@@ -46,7 +57,11 @@ def save_json(data: Any, filepath: str):
 def run_validation(
     input_dir: str,
     schema_version: str = "v1.0.0",
-    strict: bool = False
+    strict: bool = False,
+    incremental: bool = False,
+    sink: ErrorSink = None,
+    leetcode_file: str = DEFAULT_LEETCODE_DATA,
+    near_duplicates: bool = False
 ) -> ValidationResult:
     """
     Run validation on normalized data.
@@ -55,6 +70,11 @@ def run_validation(
         input_dir: Directory containing normalized JSON files
         schema_version: Schema version to use
         strict: If True, treat warnings as errors
+        incremental: Reuse cached results for documents unchanged since the last incremental run
+        sink: Stream errors to this sink instead of keeping them in the result
+        leetcode_file: Raw LeetCode data whose descriptions are compared by
+            near-duplicate detection (titles only if missing)
+        near_duplicates: Also report near-duplicate problems (warnings)
         
     Returns:
         ValidationResult
@@ -78,6 +98,10 @@ def run_validation(
     print(f"  Contests: {len(contests)}")
     print(f"  Topics: {len(topics)}")
     
+    descriptions = load_leetcode_descriptions(leetcode_file) if near_duplicates else None
+    if descriptions:
+        print(f"  LeetCode descriptions: {len(descriptions)}")
+    
     if not problems and not contests and not topics:
         print("\n  ✗ Error: No data found to validate")
         return ValidationResult(
@@ -96,85 +120,128 @@ def run_validation(
     
     # Run validation
     print("\n[3/4] Running validation rules...")
-    result = validator.validate_all(problems, contests, topics)
+    if incremental:
+        incremental_validator = IncrementalValidator(schema_version, validator=validator)
+        result = incremental_validator.validate_all(
+            problems, contests, topics, sink=sink, descriptions=descriptions, near_duplicates=near_duplicates
+        )
+        for entity_type, delta in incremental_validator.delta.items():
+            print(f"  {entity_type}: {delta['evaluated']} evaluated, {delta['reused']} reused from cache")
+    else:
+        result = validator.validate_all(
+            problems, contests, topics, sink=sink, descriptions=descriptions, near_duplicates=near_duplicates
+        )
     
     # Print results
     print("\n[4/4] Validation Results:")
     print("-" * 40)
-    print(f"  Schema Errors: {len(result.schema_errors)}")
-    print(f"  Duplicate Errors: {len(result.duplicate_errors)}")
-    print(f"  Orphan Errors: {len(result.orphan_errors)}")
-    print(f"  Reference Errors: {len(result.reference_errors)}")
+    print(f"  Schema Errors: {result.count('schema')}")
+    print(f"  Duplicate Errors: {result.count('duplicate')}")
+    print(f"  Orphan Errors: {result.count('orphan')}")
+    print(f"  Reference Errors: {result.count('reference')}")
     print(f"  Warnings: {len(result.warnings)}")
+    if near_duplicates:
+        print(f"  Near-duplicate Warnings: {len(result.near_duplicates)}")
     print("-" * 40)
     print(f"  TOTAL ERRORS: {result.total_errors()}")
     print(f"  VALID: {'✓ YES' if result.is_valid else '✗ NO'}")
     
     # Show error details
-    if result.schema_errors:
+    schema_errors = _first_errors(result, sink, 'schema')
+    if schema_errors:
         print("\n  Schema Errors (first 10):")
-        for err in result.schema_errors[:10]:
+        for err in schema_errors:
             print(f"    - [{err.get('entity_id', '?')}] {err.get('path', '?')}: {err.get('message', '')}")
     
-    if result.duplicate_errors:
+    duplicate_errors = _first_errors(result, sink, 'duplicate')
+    if duplicate_errors:
         print("\n  Duplicate Errors:")
-        for err in result.duplicate_errors[:10]:
-            print(f"    - {err.message}")
+        for err in duplicate_errors:
+            print(f"    - {err['message']}")
     
-    if result.orphan_errors:
+    orphan_errors = _first_errors(result, sink, 'orphan')
+    if orphan_errors:
         print("\n  Orphan Errors:")
-        for err in result.orphan_errors[:10]:
-            print(f"    - {err.message}")
+        for err in orphan_errors:
+            print(f"    - {err['message']}")
     
-    if result.reference_errors:
+    reference_errors = _first_errors(result, sink, 'reference')
+    if reference_errors:
         print("\n  Reference Errors (first 10):")
-        for err in result.reference_errors[:10]:
-            print(f"    - [{err.record_id}] {err.message}")
+        for err in reference_errors:
+            print(f"    - [{err['record_id']}] {err['message']}")
+    
+    if result.near_duplicates:
+        print("\n  Near-duplicate Warnings (first 10):")
+        for duplicate in result.near_duplicates[:10]:
+            print(f"    ⚠ {duplicate.message}")
     
     return result
 
 
-def save_rejection_report(result: ValidationResult, version: str):
+def _first_errors(result: ValidationResult, sink: ErrorSink, category: str, limit: int = 10) -> List[Dict]:
+    """First errors of a category, from the sink if they were streamed there."""
+    if sink is not None and result.omitted.get(category):
+        records: Iterable[Dict] = sink.records(category)
+        return [
+            record['error'] if category == 'schema' else record
+            for record in islice(records, limit)
+        ]
+    
+    errors = getattr(result, f"{category}_errors")[:limit]
+    if category == 'schema':
+        return errors
+    return [vars(err) for err in errors]
+
+
+def rejection_report_dir(version: str) -> str:
+    """New timestamped rejection report directory path for a version."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(REJECTED_DIR, f"{version}_{timestamp}")
+
+
+def save_rejection_report(result: ValidationResult, version: str, sink: ErrorSink = None) -> str:
     """
     Save rejection report for failed validation.
     
+    The report is built from an ErrorSink: errors.ndjson holds every
+    error, errors.json a bounded summary (counts per rule and path plus
+    the first examples of each), and errors.log one line per error.
+    
     Args:
         result: Validation result
         version: Version string for the report
+        sink: Sink the errors were streamed to during validation (errors
+            still held by the result are streamed into a new one if None)
+        
+    Returns:
+        Report directory
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_dir = os.path.join(REJECTED_DIR, f"{version}_{timestamp}")
-    
-    os.makedirs(report_dir, exist_ok=True)
+    if sink is None:
+        sink = ErrorSink(rejection_report_dir(version))
+    # Errors still held by the result (validated without a sink) join the stream
+    result.spill(sink)
     
-    # Save detailed errors
-    save_json(result.to_dict(), os.path.join(report_dir, "errors.json"))
-    
-    # Save summary log
-    summary = [
+    header = [
         f"Validation Failed: {datetime.now().isoformat()}",
         f"Total Errors: {result.total_errors()}",
-        f"Schema Errors: {len(result.schema_errors)}",
-        f"Duplicate Errors: {len(result.duplicate_errors)}",
-        f"Orphan Errors: {len(result.orphan_errors)}",
-        f"Reference Errors: {len(result.reference_errors)}",
-        "",
-        "=== ERRORS ===",
+        f"Schema Errors: {result.count('schema')}",
+        f"Duplicate Errors: {result.count('duplicate')}",
+        f"Orphan Errors: {result.count('orphan')}",
+        f"Reference Errors: {result.count('reference')}",
     ]
-    
-    for err in result.schema_errors:
-        summary.append(f"[SCHEMA] {err}")
-    for err in result.duplicate_errors:
-        summary.append(f"[DUPLICATE] {err.message}")
-    for err in result.orphan_errors:
-        summary.append(f"[ORPHAN] {err.message}")
-    for err in result.reference_errors:
-        summary.append(f"[REFERENCE] {err.message}")
-    
-    with open(os.path.join(report_dir, "errors.log"), 'w') as f:
-        f.write('\n'.join(summary))
+    report_dir = sink.write_report(
+        extra={
+            'is_valid': result.is_valid,
+            'warnings': result.warnings,
+            'near_duplicates': result.to_dict()['near_duplicates'],
+            'stats': result.stats,
+        },
+        log_header=header
+    )
     
     print(f"\n  Rejection report saved to: {report_dir}")
+    return report_dir
 
 
 def main():
@@ -196,31 +263,72 @@ def main():
         action='store_true',
         help="Treat warnings as errors"
     )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="Reuse cached results for documents unchanged since the last incremental run"
+    )
+    parser.add_argument(
+        '--near-duplicates',
+        action='store_true',
+        help="Also detect near-duplicate problems across sources (warnings; slower)"
+    )
+    parser.add_argument(
+        '--leetcode-data',
+        default=DEFAULT_LEETCODE_DATA,
+        help="Raw LeetCode data for description-based near-duplicate detection "
+             f"(default: {DEFAULT_LEETCODE_DATA})"
+    )
     parser.add_argument(
         '--save-report',
         action='store_true',
         help="Save rejection report if validation fails"
     )
-    args = parser.parse_args()
-    
-    result = run_validation(
-        input_dir=args.input,
-        schema_version=args.schema_version,
-        strict=args.strict
+    parser.add_argument(
+        '--examples-per-group',
+        type=int,
+        default=5,
+        help="Examples kept per rule/path group in errors.json (default: 5)"
     )
+    add_metrics_arguments(parser, 'run_validation')
+    args = parser.parse_args()
     
-    if not result.is_valid and args.save_report:
-        save_rejection_report(result, args.schema_version)
-    
-    print("\n" + "=" * 60)
-    if result.is_valid:
-        print("VALIDATION PASSED ✓")
-    else:
-        print("VALIDATION FAILED ✗")
-    print("=" * 60)
+    # Errors are streamed to disk while validating when a report may be needed
+    sink = None
+    if args.save_report:
+        sink = ErrorSink(
+            rejection_report_dir(args.schema_version),
+            examples_per_group=args.examples_per_group
+        )
     
-    # Exit with appropriate code
-    sys.exit(0 if result.is_valid else 1)
+    with MetricsRun('run_validation', args.metrics_file, args.metrics_port):
+        result = run_validation(
+            input_dir=args.input,
+            schema_version=args.schema_version,
+            strict=args.strict,
+            incremental=args.incremental,
+            sink=sink,
+            leetcode_file=args.leetcode_data,
+            near_duplicates=args.near_duplicates
+        )
+        record_validation_result(result)
+        record_stage_timings('run_validation', result.timings)
+        
+        if sink is not None:
+            if result.is_valid:
+                sink.discard()
+            else:
+                save_rejection_report(result, args.schema_version, sink)
+        
+        print("\n" + "=" * 60)
+        if result.is_valid:
+            print("VALIDATION PASSED ✓")
+        else:
+            print("VALIDATION FAILED ✗")
+        print("=" * 60)
+        
+        # Exit with appropriate code
+        sys.exit(0 if result.is_valid else 1)
 
 
 if __name__ == "__main__":
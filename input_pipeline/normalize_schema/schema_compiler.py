@@ -0,0 +1,390 @@
+"""
+Schema Compiler
+
+Turns a Draft 7 JSON schema into a specialized Python validation
+function, so documents are checked with straight-line code instead of
+interpreting the schema keyword by keyword:
+1. Generates Python source for one schema (type, required, properties,
+   additionalProperties, enum, format, pattern, min/max, items, ...)
+2. Caches the generated module on disk per schema version
+3. Loads it and binds the format checks to a jsonschema FormatChecker
+
+Compiled validators report the same error paths, messages, schema paths
+and order as Draft7Validator.iter_errors (messages follow jsonschema
+>= 4.21; cached modules are keyed by the installed jsonschema version). Schemas using keywords the
+compiler does not know raise SchemaCompileError; callers then fall back
+to the generic validator.
+"""
+
+import os
+import json
+import hashlib
+import importlib.util
+import importlib.metadata
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+try:
+    JSONSCHEMA_VERSION = importlib.metadata.version('jsonschema')
+except importlib.metadata.PackageNotFoundError:
+    JSONSCHEMA_VERSION = None
+
+
+# Bump when the generated code changes, to invalidate cached modules
+COMPILER_VERSION = 2
+
+# Cache directory: compiled/{schema_version}/{name}_validator.py
+COMPILED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "compiled")
+
+# Keywords without validation semantics
+ANNOTATION_KEYWORDS = {'$schema', '$id', '$comment', 'title', 'description', 'default', 'examples'}
+
+# Error tuple: (instance path, message, schema path)
+CompiledError = Tuple[Tuple[Any, ...], str, Tuple[Any, ...]]
+
+
+class SchemaCompileError(Exception):
+    """Raised when a schema uses features the compiler does not support."""
+    pass
+
+
+def _type_check(json_type: str, var: str) -> str:
+    """Python expression testing a value against a JSON type (Draft 7 semantics)."""
+    checks = {
+        'object': f"isinstance({var}, dict)",
+        'array': f"isinstance({var}, list)",
+        'string': f"isinstance({var}, str)",
+        'null': f"{var} is None",
+        'boolean': f"isinstance({var}, bool)",
+        # bool is an int subclass but not a JSON integer/number; Draft 6+
+        # accepts floats with an integral value as integers
+        'integer': (
+            f"(isinstance({var}, int) and not isinstance({var}, bool) "
+            f"or isinstance({var}, float) and {var}.is_integer())"
+        ),
+        'number': f"(isinstance({var}, Number) and not isinstance({var}, bool))",
+    }
+    if json_type not in checks:
+        raise SchemaCompileError(f"Unsupported type: {json_type!r}")
+    return checks[json_type]
+
+
+class _CodeGenerator:
+    """Emits the body of a compiled validator."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.constants: List[str] = []
+        self.formats: Dict[str, str] = {}
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def constant(self, prefix: str, expression: str) -> str:
+        """Define a module-level constant and return its name."""
+        name = self._name(prefix)
+        self.constants.append(f"{name} = {expression}")
+        return name
+
+    def format_entry(self, fmt: str) -> str:
+        """Name of the bound (checker, raises) entry for a format."""
+        if fmt not in self.formats:
+            self.formats[fmt] = f"_FORMAT{len(self.formats)}"
+        return self.formats[fmt]
+
+    def emit(self, indent: int, line: str):
+        self.lines.append('    ' * indent + line)
+
+    def error(self, indent: int, path: str, message: str, schema_path: Tuple):
+        """Emit an errors.append(...) with a precomputed schema path."""
+        sp = self.constant('_SP', repr(schema_path))
+        self.emit(indent, f"errors.append(({path}, {message}, {sp}))")
+
+    def node(self, schema: Any, var: str, path: List[str], schema_path: Tuple, indent: int):
+        """
+        Emit checks for one (sub)schema.
+
+        Args:
+            schema: Schema node
+            var: Name of the variable holding the instance
+            path: Instance path parts as Python expressions
+            schema_path: Schema path of this node
+            indent: Current indentation level
+        """
+        if not isinstance(schema, dict):
+            raise SchemaCompileError(f"Boolean schemas are not supported (at {schema_path})")
+        if '$ref' in schema:
+            raise SchemaCompileError(f"$ref is not supported (at {schema_path})")
+
+        path_expr = f"({', '.join(path)},)" if path else "()"
+        emitted = False
+
+        # Keywords are checked in schema order, as iter_errors does
+        for keyword, value in schema.items():
+            if keyword in ANNOTATION_KEYWORDS:
+                continue
+            sp = schema_path + (keyword,)
+            handler = getattr(self, f"_kw_{keyword}", None)
+            if handler is None:
+                raise SchemaCompileError(f"Unsupported keyword {keyword!r} (at {schema_path})")
+            handler(schema, value, var, path, path_expr, sp, indent)
+            emitted = True
+
+        if not emitted:
+            self.emit(indent, "pass")
+
+    # Keyword handlers -------------------------------------------------------
+
+    def _kw_type(self, schema, value, var, path, path_expr, sp, indent):
+        types = [value] if isinstance(value, str) else list(value)
+        test = ' or '.join(_type_check(t, var) for t in types)
+        reprs = ', '.join(repr(t) for t in types)
+        self.emit(indent, f"if not ({test}):")
+        self.error(indent + 1, path_expr, f"repr({var}) + {' is not of type ' + reprs!r}", sp)
+
+    def _kw_required(self, schema, value, var, path, path_expr, sp, indent):
+        self.emit(indent, f"if isinstance({var}, dict):")
+        for prop in value:
+            self.emit(indent + 1, f"if {prop!r} not in {var}:")
+            self.error(indent + 2, path_expr, repr(f"{prop!r} is a required property"), sp)
+
+    def _kw_properties(self, schema, value, var, path, path_expr, sp, indent):
+        self.emit(indent, f"if isinstance({var}, dict):")
+        for prop, subschema in value.items():
+            child = self._name('v')
+            self.emit(indent + 1, f"if {prop!r} in {var}:")
+            self.emit(indent + 2, f"{child} = {var}[{prop!r}]")
+            self.node(subschema, child, path + [repr(prop)], sp + (prop,), indent + 2)
+
+    def _kw_additionalProperties(self, schema, value, var, path, path_expr, sp, indent):
+        if 'patternProperties' in schema:
+            raise SchemaCompileError("patternProperties is not supported")
+        if value is True:
+            return
+        known = self.constant('_PROPS', repr(frozenset(schema.get('properties', {}))))
+        extras = self._name('extras')
+        self.emit(indent, f"if isinstance({var}, dict):")
+        self.emit(indent + 1, f"{extras} = {{k for k in {var} if k not in {known}}}")
+        if value is False:
+            self.emit(indent + 1, f"if {extras}:")
+            self.emit(indent + 2, f"{extras} = sorted({extras}, key=str)")
+            message = (
+                f"'Additional properties are not allowed (%s %s unexpected)' % "
+                f"(', '.join(repr(k) for k in {extras}), 'was' if len({extras}) == 1 else 'were')"
+            )
+            self.error(indent + 2, path_expr, message, sp)
+        elif isinstance(value, dict):
+            key = self._name('k')
+            child = self._name('v')
+            self.emit(indent + 1, f"for {key} in {extras}:")
+            self.emit(indent + 2, f"{child} = {var}[{key}]")
+            # Subschema errors are not prefixed with the property name in the schema path
+            self.node(value, child, path + [key], sp, indent + 2)
+        else:
+            raise SchemaCompileError(f"Unsupported additionalProperties: {value!r}")
+
+    def _kw_enum(self, schema, value, var, path, path_expr, sp, indent):
+        # With only string members, JSON equality is plain string equality
+        if not all(isinstance(v, str) for v in value):
+            raise SchemaCompileError("Only string enums are supported")
+        members = self.constant('_ENUM', repr(frozenset(value)))
+        self.emit(indent, f"if not (isinstance({var}, str) and {var} in {members}):")
+        self.error(indent + 1, path_expr, f"repr({var}) + {' is not one of ' + repr(value)!r}", sp)
+
+    def _kw_format(self, schema, value, var, path, path_expr, sp, indent):
+        entry = self.format_entry(value)
+        ok = self._name('ok')
+        self.emit(indent, f"if {entry} is not None:")
+        self.emit(indent + 1, "try:")
+        self.emit(indent + 2, f"{ok} = {entry}[0]({var})")
+        self.emit(indent + 1, f"except {entry}[1]:")
+        self.emit(indent + 2, f"{ok} = False")
+        self.emit(indent + 1, f"if not {ok}:")
+        self.error(indent + 2, path_expr, f"repr({var}) + {' is not a ' + repr(value)!r}", sp)
+
+    def _kw_pattern(self, schema, value, var, path, path_expr, sp, indent):
+        regex = self.constant('_RE', f"re.compile({value!r})")
+        self.emit(indent, f"if isinstance({var}, str) and not {regex}.search({var}):")
+        self.error(indent + 1, path_expr, f"repr({var}) + {' does not match ' + repr(value)!r}", sp)
+
+    def _kw_minLength(self, schema, value, var, path, path_expr, sp, indent):
+        message = "should be non-empty" if value == 1 else "is too short"
+        self.emit(indent, f"if isinstance({var}, str) and len({var}) < {value!r}:")
+        self.error(indent + 1, path_expr, f"repr({var}) + {' ' + message!r}", sp)
+
+    def _kw_maxLength(self, schema, value, var, path, path_expr, sp, indent):
+        message = "is expected to be empty" if value == 0 else "is too long"
+        self.emit(indent, f"if isinstance({var}, str) and len({var}) > {value!r}:")
+        self.error(indent + 1, path_expr, f"repr({var}) + {' ' + message!r}", sp)
+
+    def _kw_minimum(self, schema, value, var, path, path_expr, sp, indent):
+        self.emit(indent, f"if {_type_check('number', var)} and {var} < {value!r}:")
+        self.error(indent + 1, path_expr, f"repr({var}) + {' is less than the minimum of ' + repr(value)!r}", sp)
+
+    def _kw_maximum(self, schema, value, var, path, path_expr, sp, indent):
+        self.emit(indent, f"if {_type_check('number', var)} and {var} > {value!r}:")
+        self.error(indent + 1, path_expr, f"repr({var}) + {' is greater than the maximum of ' + repr(value)!r}", sp)
+
+    def _kw_items(self, schema, value, var, path, path_expr, sp, indent):
+        if not isinstance(value, dict):
+            raise SchemaCompileError("Only single-schema items are supported")
+        index = self._name('i')
+        child = self._name('v')
+        self.emit(indent, f"if isinstance({var}, list):")
+        self.emit(indent + 1, f"for {index}, {child} in enumerate({var}):")
+        self.node(value, child, path + [index], sp, indent + 2)
+
+    def _kw_uniqueItems(self, schema, value, var, path, path_expr, sp, indent):
+        if not value:
+            return
+        self.emit(indent, f"if isinstance({var}, list) and not _unique({var}):")
+        self.error(indent + 1, path_expr, f"repr({var}) + ' has non-unique elements'", sp)
+
+
+def _schema_hash(schema: Dict) -> str:
+    """Hash of the schema content plus compiler and jsonschema versions."""
+    payload = json.dumps(schema, sort_keys=True, separators=(',', ':'))
+    key = f"{COMPILER_VERSION}:{JSONSCHEMA_VERSION}:{payload}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def generate_source(schema: Dict, name: str) -> str:
+    """
+    Generate the Python module source for a schema.
+
+    The module exposes build(format_checker) returning
+    validate(instance) -> List[(path, message, schema_path)].
+
+    Args:
+        schema: Draft 7 schema
+        name: Schema name (used in the header)
+
+    Returns:
+        Python source code
+
+    Raises:
+        SchemaCompileError: If the schema uses unsupported features
+    """
+    gen = _CodeGenerator()
+    gen.node(schema, 'instance', [], (), 2)
+
+    lines = [
+        f'"""Compiled validator for the {name} schema. Generated by schema_compiler.py; do not edit."""',
+        "",
+        f"SCHEMA_HASH = {_schema_hash(schema)!r}",
+        "",
+        "import re",
+        "from numbers import Number",
+        "",
+        "",
+        "def _json_key(value):",
+        "    # Hashable form with JSON equality: True != 1, but 1 == 1.0",
+        "    if isinstance(value, bool):",
+        "        return ('bool', value)",
+        "    if isinstance(value, list):",
+        "        return ('array', tuple(_json_key(item) for item in value))",
+        "    if isinstance(value, dict):",
+        "        return ('object', frozenset((k, _json_key(v)) for k, v in value.items()))",
+        "    return ('value', value)",
+        "",
+        "",
+        "def _unique(items):",
+        "    if all(isinstance(item, str) for item in items):",
+        "        return len(set(items)) == len(items)",
+        "    return len({_json_key(item) for item in items}) == len(items)",
+        "",
+        "",
+    ]
+    lines.extend(gen.constants)
+    lines.extend([
+        "",
+        "",
+        "def build(format_checker):",
+    ])
+    for fmt, entry in gen.formats.items():
+        lines.append(
+            f"    {entry} = format_checker.checkers.get({fmt!r}) if format_checker is not None else None"
+        )
+    lines.extend([
+        "",
+        "    def validate(instance):",
+        "        errors = []",
+    ])
+    lines.extend(gen.lines)
+    lines.extend([
+        "        return errors",
+        "",
+        "    return validate",
+        "",
+    ])
+    return '\n'.join(lines)
+
+
+def _load_module(path: str, module_name: str):
+    """Import a generated module from a file."""
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _cached_hash(path: str) -> Optional[str]:
+    """SCHEMA_HASH recorded in a cached module (None if missing/unreadable)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('SCHEMA_HASH = '):
+                    return line.split('=', 1)[1].strip().strip("'\"")
+    except OSError:
+        pass
+    return None
+
+
+def load_compiled_validator(
+    schema: Dict,
+    name: str,
+    schema_version: str,
+    format_checker=None,
+    cache_dir: str = COMPILED_DIR
+) -> Callable[[Any], List[CompiledError]]:
+    """
+    Get a compiled validator for a schema, generating it if needed.
+
+    The generated module is cached at {cache_dir}/{schema_version}/{name}_validator.py
+    and regenerated when the schema or compiler version changes. If the
+    cache cannot be written the source is compiled in memory.
+
+    Args:
+        schema: Draft 7 schema
+        name: Schema name (problem, contest, ...)
+        schema_version: Schema version the cache is keyed by
+        format_checker: jsonschema FormatChecker for "format" keywords (None skips them)
+        cache_dir: Root of the on-disk cache
+
+    Returns:
+        validate(instance) -> list of (path, message, schema_path) tuples
+
+    Raises:
+        SchemaCompileError: If the schema uses unsupported features
+    """
+    expected = _schema_hash(schema)
+    version_dir = os.path.join(cache_dir, schema_version)
+    path = os.path.join(version_dir, f"{name}_validator.py")
+    module_name = f"_compiled_{schema_version.replace('.', '_')}_{name}"
+
+    if _cached_hash(path) != expected:
+        source = generate_source(schema, name)
+        try:
+            os.makedirs(version_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Read-only checkout: compile without caching
+            namespace = {'__name__': module_name}
+            exec(compile(source, f"<compiled {name} schema>", 'exec'), namespace)
+            return namespace['build'](format_checker)
+
+    return _load_module(path, module_name).build(format_checker)
@@ -0,0 +1,281 @@
+"""
+Streaming Validator
+
+Validates canonical documents one at a time as they are produced:
+1. Per-record schema and reference checks run immediately
+2. Duplicate keys and cross-entity references are tracked in compact
+   key indexes instead of keeping the documents
+3. Cross-entity checks (orphans, topic rules) run once at the end
+4. An optional error budget aborts the run as soon as it is exceeded
+
+Without an ErrorSink every schema and reference error is kept in the
+result, so memory grows with the number of errors (bounded only by the
+error budget). With a sink, errors go to its NDJSON stream as they are
+found and the result keeps per-rule counts.
+"""
+
+from typing import Dict, List, Optional
+
+from .error_sink import ErrorSink
+from .validator import SchemaValidator, ValidationResult
+from .rules.duplicate_checker import record_key, DuplicateError
+from .rules.orphan_detector import OrphanError
+from .rules.reference_validator import (
+    validate_uuids,
+    validate_r2_references,
+    validate_source_urls,
+    validate_slug_format
+)
+
+
+# Identifier field per streamed entity type
+ID_FIELDS = {
+    'problem': 'problem_id',
+    'contest': 'contest_id',
+}
+
+
+class ErrorBudgetExceeded(Exception):
+    """Raised when a streaming run produces more errors than allowed."""
+
+    def __init__(self, max_errors: int, error_count: int, last_error: str):
+        self.max_errors = max_errors
+        self.error_count = error_count
+        self.last_error = last_error
+        super().__init__(
+            f"Error budget exceeded: {error_count} errors (max {max_errors}); last: {last_error}"
+        )
+
+
+class StreamingValidator:
+    """
+    Incremental counterpart of SchemaValidator.validate_all().
+
+    Produces the same errors and stats as batch validation. Schema and
+    reference errors appear in stream order rather than grouped by
+    entity type.
+    """
+
+    def __init__(
+        self,
+        schema_version: str = "v1.0.0",
+        max_errors: Optional[int] = None,
+        validator: SchemaValidator = None,
+        cache_dir: Optional[str] = None,
+        sink: Optional[ErrorSink] = None
+    ):
+        """
+        Initialize streaming validator.
+
+        Args:
+            schema_version: Version of schemas to use
+            max_errors: Abort once more than this many errors are seen (None = unlimited)
+            validator: Validator to reuse (created for schema_version if None)
+            cache_dir: Compiled validator cache of a created validator
+            sink: Stream errors here instead of keeping them (the result
+                then only holds counts in 'omitted')
+        """
+        self.validator = validator or SchemaValidator(schema_version, cache_dir=cache_dir)
+        self.max_errors = max_errors
+        self.result = ValidationResult(is_valid=True)
+        self.counts = {'problem': 0, 'contest': 0}
+        self.sink = sink
+        self._before = sink.rule_counts_snapshot() if sink is not None else None
+
+        # Errors seen so far, including upstream (transform) errors
+        self.error_count = 0
+        self.external_errors = 0
+
+        # Key indexes: composite key / UUID -> ids of the records using it
+        self._keys: Dict[str, Dict[str, List[str]]] = {'problem': {}, 'contest': {}}
+        self._uuids: Dict[str, Dict[str, List[str]]] = {'problem': {}, 'contest': {}}
+        # Topic name -> ids of problems using it
+        self._topic_usage: Dict[str, List[str]] = {}
+        # Contest problem refs not (yet) matched by a problem: key -> contest ids
+        self._pending_refs: Dict[str, List[str]] = {}
+
+    def _spend(self, count: int, last_error: str):
+        """Add errors to the running count and enforce the budget."""
+        if count <= 0:
+            return
+        self.error_count += count
+        if self.max_errors is not None and self.error_count > self.max_errors:
+            # The aborted result must still count what was streamed
+            self._flush()
+            raise ErrorBudgetExceeded(self.max_errors, self.error_count, last_error)
+
+    def _flush(self):
+        """Count the errors streamed since the last flush and stream the ones still kept."""
+        if self.sink is None:
+            return
+        self.result.count_streamed(self.sink, self._before)
+        self.result.spill(self.sink)
+        self._before = self.sink.rule_counts_snapshot()
+
+    def set_external_errors(self, count: int, last_error: str = 'transform error'):
+        """
+        Charge errors reported outside validation (e.g., failed transforms).
+
+        Args:
+            count: Total external errors so far (not a delta)
+            last_error: Message of the most recent one
+        """
+        delta = count - self.external_errors
+        self.external_errors = count
+        self._spend(delta, last_error)
+
+    def _index(self, index: Dict[str, List[str]], key: str, record_id: str) -> bool:
+        """Add a record to a key index; True when the key just became a duplicate."""
+        ids = index.get(key)
+        if ids is None:
+            index[key] = [record_id]
+            return False
+        ids.append(record_id)
+        return len(ids) == 2
+
+    def add(self, entity_type: str, doc: Dict):
+        """
+        Validate one problem or contest document.
+
+        Args:
+            entity_type: 'problem' or 'contest'
+            doc: Canonical document
+
+        Raises:
+            ErrorBudgetExceeded: If the error budget is exceeded
+        """
+        id_field = ID_FIELDS[entity_type]
+        record_id = doc.get(id_field, 'unknown')
+        self.counts[entity_type] += 1
+
+        # Per-record checks
+        schema_errors = self.validator.validate_entity(doc, entity_type)
+        reference_errors = validate_uuids([doc], id_field)
+        if entity_type == 'problem':
+            reference_errors.extend(validate_r2_references([doc]))
+            reference_errors.extend(validate_source_urls([doc]))
+            reference_errors.extend(validate_slug_format([doc]))
+        if self.sink is None:
+            self.result.schema_errors.extend(schema_errors)
+            self.result.reference_errors.extend(reference_errors)
+        else:
+            self.sink.emit_all('schema', schema_errors)
+            self.sink.emit_all('reference', reference_errors)
+
+        new_errors = len(schema_errors) + len(reference_errors)
+        last_error = (
+            schema_errors[-1]['message'] if schema_errors else
+            reference_errors[-1].message if reference_errors else ''
+        )
+
+        # Duplicate indexes (an error is counted when a key first repeats)
+        key = record_key(doc)
+        if self._index(self._keys[entity_type], key, record_id):
+            new_errors += 1
+            last_error = f"Duplicate {entity_type} found: key={key}"
+        uuid = doc.get(id_field, '')
+        if uuid and self._index(self._uuids[entity_type], uuid, record_id):
+            new_errors += 1
+            last_error = f"Duplicate UUID found: {uuid}"
+
+        # Cross-entity indexes
+        if entity_type == 'problem':
+            self._pending_refs.pop(key, None)
+            for topic in doc.get('topics', []):
+                self._topic_usage.setdefault(topic, []).append(record_id)
+        else:
+            source = doc.get('source', '')
+            for ref in doc.get('problems', []):
+                ref_key = f"{source}:{ref.get('problem_external_id', '')}"
+                if ref_key not in self._keys['problem']:
+                    self._pending_refs.setdefault(ref_key, []).append(record_id)
+
+        self._spend(new_errors, last_error)
+
+    def _duplicate_errors(self, entity_type: str) -> List[DuplicateError]:
+        """Build duplicate errors from the key indexes (same order as batch checks)."""
+        id_field = ID_FIELDS[entity_type]
+        errors = []
+
+        for key, ids in self._keys[entity_type].items():
+            if len(ids) > 1:
+                errors.append(DuplicateError(
+                    entity_type=entity_type,
+                    key=key,
+                    occurrences=[{id_field: i} for i in ids],
+                    message=f"Duplicate {entity_type} found: key={key}, count={len(ids)}, ids={ids}"
+                ))
+
+        for uuid, ids in self._uuids[entity_type].items():
+            if len(ids) > 1:
+                errors.append(DuplicateError(
+                    entity_type="uuid",
+                    key=uuid,
+                    occurrences=[{id_field: i} for i in ids],
+                    message=f"Duplicate UUID found: {uuid}, count={len(ids)}"
+                ))
+
+        return errors
+
+    def finish(self, topics: List[Dict]) -> ValidationResult:
+        """
+        Run topic and cross-entity checks and return the final result.
+
+        Args:
+            topics: Canonical topic documents (built once the stream ends)
+
+        Returns:
+            Combined ValidationResult
+
+        Raises:
+            ErrorBudgetExceeded: If the final checks exceed the error budget
+        """
+        result = self.result
+
+        # Topics are small and only known at the end
+        topic_result = self.validator.validate_topics(topics)
+        result.schema_errors.extend(topic_result.schema_errors)
+
+        result.duplicate_errors.extend(self._duplicate_errors('problem'))
+        result.duplicate_errors.extend(self._duplicate_errors('contest'))
+        result.duplicate_errors.extend(topic_result.duplicate_errors)
+
+        result.orphan_errors.extend(topic_result.orphan_errors)
+
+        # Cross-entity: topics used but not defined
+        defined_topics = {t.get('name', '') for t in topics}
+        for topic, problem_ids in self._topic_usage.items():
+            if topic not in defined_topics:
+                result.orphan_errors.append(OrphanError(
+                    orphan_type="topic",
+                    value=topic,
+                    referenced_by=problem_ids,
+                    message=f"Orphan topic '{topic}' used in {len(problem_ids)} problems but not defined"
+                ))
+
+        # Cross-entity: contest refs never matched by a problem
+        for problem_key, contest_ids in self._pending_refs.items():
+            result.orphan_errors.append(OrphanError(
+                orphan_type="problem",
+                value=problem_key,
+                referenced_by=contest_ids,
+                message=f"Orphan problem '{problem_key}' referenced in {len(contest_ids)} contests but not defined"
+            ))
+
+        self._flush()
+        result.stats = {
+            'total_problems': self.counts['problem'],
+            'total_contests': self.counts['contest'],
+            'total_topics': len(topics),
+            'schema_errors': result.count('schema'),
+            'duplicate_errors': result.count('duplicate'),
+            'orphan_errors': result.count('orphan'),
+            'reference_errors': result.count('reference'),
+        }
+        result.is_valid = result.total_errors() == 0
+
+        final_errors = result.total_errors() + self.external_errors
+        if final_errors > self.error_count:
+            self._spend(final_errors - self.error_count, 'cross-entity checks')
+
+        return result
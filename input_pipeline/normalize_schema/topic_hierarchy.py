@@ -0,0 +1,232 @@
+"""
+Topic Hierarchy
+
+Transitive closure of the topic parent relation:
+- ancestors (nearest first), descendants and depth of every topic
+- expand() adds the ancestors of a problem's topics, so "all problems
+  under graph" is a lookup of 'graph' in the expanded tags instead of a
+  tree walk per problem
+- find_cycles() reports parent chains that loop back on themselves
+  (validation rejects them; the closure stops walking at the repeat)
+
+Topic ids are entity graph topic node ids: defined topics first, then
+phantom nodes for parents that are referenced but not defined.
+"""
+
+import os
+import json
+from typing import Dict, List, Any, Iterable, Sequence
+
+from .entity_graph import EntityGraph, load_snapshot_graph
+
+
+# Bump when the persisted layout changes
+CLOSURE_FORMAT = 1
+
+CLOSURE_FILE = "topic_closure.json"
+
+# Per-problem topics expanded with their ancestors (denormalized tags)
+EXPANDED_TOPICS_FILE = "expanded_topics.json"
+
+
+def find_cycles(parent: Sequence[int]) -> List[List[int]]:
+    """
+    Cycles of a parent array (parent[i] == -1 for roots).
+
+    Every node has at most one parent, so each walk either reaches a root
+    or runs into a cycle; nodes are colored as they are walked so the
+    whole array is covered in linear time.
+
+    Args:
+        parent: Parent node per node
+
+    Returns:
+        Each cycle once, as nodes in parent order starting from its
+        lowest node
+    """
+    state = [0] * len(parent)  # 0 = unseen, 1 = on current walk, 2 = done
+    cycles = []
+    for start in range(len(parent)):
+        path = []
+        node = start
+        while node >= 0 and state[node] == 0:
+            state[node] = 1
+            path.append(node)
+            node = parent[node]
+        if node >= 0 and state[node] == 1:
+            cycle = path[path.index(node):]
+            lowest = cycle.index(min(cycle))
+            cycles.append(cycle[lowest:] + cycle[:lowest])
+        for walked in path:
+            state[walked] = 2
+    return cycles
+
+
+class TopicClosure:
+    """
+    Ancestors, descendants and depth of every topic.
+    """
+
+    def __init__(self, names: List[str], ancestors: List[List[int]]):
+        """
+        Initialize from topic names and each topic's ancestor ids (nearest first).
+
+        Args:
+            names: Topic name per id
+            ancestors: Ancestor ids per topic
+        """
+        self.names = names
+        self.ancestor_ids = ancestors
+        self.index = {name: i for i, name in reversed(list(enumerate(names)))}
+
+        descendants: List[List[int]] = [[] for _ in names]
+        for topic, chain in enumerate(ancestors):
+            for ancestor in chain:
+                descendants[ancestor].append(topic)
+        self.descendant_ids = descendants
+
+    @classmethod
+    def build(cls, names: List[str], parent: Sequence[int]) -> 'TopicClosure':
+        """
+        Build the closure of a parent array.
+
+        Args:
+            names: Topic name per id
+            parent: Parent id per topic (-1 for roots)
+
+        Returns:
+            TopicClosure
+        """
+        ancestors: List[List[int]] = []
+        for topic in range(len(names)):
+            chain = []
+            seen = {topic}
+            node = parent[topic]
+            # A cycle ends the walk at the first repeated topic
+            while node >= 0 and node not in seen:
+                chain.append(node)
+                seen.add(node)
+                node = parent[node]
+            ancestors.append(chain)
+        return cls(list(names), ancestors)
+
+    @classmethod
+    def from_graph(cls, graph: EntityGraph) -> 'TopicClosure':
+        """Closure of an entity graph's topic → parent relation."""
+        return cls.build(graph.topic_names, graph.topic_parent)
+
+    def depth(self, name: str) -> int:
+        """Number of ancestors (0 for a root)."""
+        return len(self.ancestor_ids[self.index[name]])
+
+    def ancestors(self, name: str) -> List[str]:
+        """Ancestor names, nearest first."""
+        return [self.names[a] for a in self.ancestor_ids[self.index[name]]]
+
+    def descendants(self, name: str) -> List[str]:
+        """Descendant names, in topic order."""
+        return [self.names[d] for d in self.descendant_ids[self.index[name]]]
+
+    def expand(self, topics: Iterable[str]) -> List[str]:
+        """
+        Topics plus all their ancestors, without repeats.
+
+        Args:
+            topics: Topic names (unknown names are kept as-is)
+
+        Returns:
+            The topics in order, followed by the ancestors they add
+        """
+        expanded = dict.fromkeys(topics)
+        for topic in list(expanded):
+            node = self.index.get(topic)
+            if node is not None:
+                for ancestor in self.ancestor_ids[node]:
+                    expanded.setdefault(self.names[ancestor])
+        return list(expanded)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Closure table: topic → depth, ancestors and descendants."""
+        return {
+            'format': CLOSURE_FORMAT,
+            'topics': {
+                name: {
+                    'depth': len(self.ancestor_ids[i]),
+                    'ancestors': [self.names[a] for a in self.ancestor_ids[i]],
+                    'descendants': [self.names[d] for d in self.descendant_ids[i]],
+                }
+                for i, name in enumerate(self.names)
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TopicClosure':
+        """Rebuild a closure from to_dict() output."""
+        if data.get('format') != CLOSURE_FORMAT:
+            raise ValueError(f"Unsupported topic closure format: {data.get('format')}")
+        names = list(data['topics'])
+        index = {name: i for i, name in enumerate(names)}
+        return cls(names, [[index[a] for a in entry['ancestors']] for entry in data['topics'].values()])
+
+    def save(self, filepath: str):
+        """Write the closure table as JSON."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'TopicClosure':
+        """Load a closure table written by save()."""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def save_expanded_topics(problems: List[Dict], closure: TopicClosure, filepath: str) -> int:
+    """
+    Write each problem's ancestor-expanded topic set.
+
+    Problems whose topics have no ancestors are left out: their expanded
+    set is their own topics.
+
+    Args:
+        problems: Snapshot problems
+        closure: Topic closure of the snapshot
+        filepath: Output file path
+
+    Returns:
+        Number of problems written
+    """
+    expanded = {}
+    for problem in problems:
+        tags = problem.get('topics') or []
+        tags_expanded = closure.expand(tags)
+        if len(tags_expanded) > len(set(tags)):
+            expanded[problem.get('problem_id', 'unknown')] = tags_expanded
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(
+            {'format': CLOSURE_FORMAT, 'problems': expanded},
+            ensure_ascii=False, separators=(',', ':')
+        ))
+    return len(expanded)
+
+
+def load_snapshot_closure(snapshot_dir: str, graph: EntityGraph = None) -> TopicClosure:
+    """
+    Topic closure of a snapshot directory.
+
+    Snapshots created before the closure was persisted get it from their
+    entity graph.
+
+    Args:
+        snapshot_dir: Snapshot directory
+        graph: Entity graph of the snapshot (loaded if needed and not given)
+
+    Returns:
+        TopicClosure
+    """
+    filepath = os.path.join(snapshot_dir, CLOSURE_FILE)
+    if os.path.exists(filepath):
+        return TopicClosure.load(filepath)
+    if graph is None:
+        graph = load_snapshot_graph(snapshot_dir)
+    return TopicClosure.from_graph(graph)
@@ -10,6 +10,7 @@ Main validation engine that:
 
 import os
 import json
+import time
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 
@@ -21,6 +22,9 @@ except ImportError:
     HAS_JSONSCHEMA = False
     print("Warning: jsonschema not installed. Install with: pip install jsonschema")
 
+from .schema_compiler import COMPILED_DIR, load_compiled_validator, SchemaCompileError
+from .error_sink import ErrorSink, error_rule
+from .entity_graph import EntityGraph
 from .rules.duplicate_checker import (
     check_problem_duplicates,
     check_contest_duplicates,
@@ -32,6 +36,7 @@ from .rules.orphan_detector import (
     detect_orphan_topics,
     detect_orphan_problems,
     detect_orphan_parents,
+    detect_topic_cycles,
     OrphanError
 )
 from .rules.reference_validator import (
@@ -41,6 +46,10 @@ from .rules.reference_validator import (
     validate_slug_format,
     ReferenceError
 )
+from .rules.near_duplicate_detector import (
+    detect_near_duplicates,
+    NearDuplicate
+)
 
 
 # Schema directory relative to this file
@@ -56,17 +65,75 @@ class ValidationResult:
     orphan_errors: List[OrphanError] = field(default_factory=list)
     reference_errors: List[ReferenceError] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
+    # Near-duplicate problem pairs (warnings, never fail validation)
+    near_duplicates: List[NearDuplicate] = field(default_factory=list)
     stats: Dict[str, int] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Errors streamed to an ErrorSink and not kept: category -> rule -> count
+    omitted: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # Relationship index built by validate_all (reused by snapshot creation)
+    graph: Optional[EntityGraph] = None
+    
+    def _lists(self) -> Dict[str, List]:
+        return {
+            'schema': self.schema_errors,
+            'duplicate': self.duplicate_errors,
+            'orphan': self.orphan_errors,
+            'reference': self.reference_errors,
+        }
+    
+    def count(self, category: str) -> int:
+        """Error count of one category (schema, duplicate, orphan, reference), omitted included."""
+        return len(self._lists()[category]) + sum(self.omitted.get(category, {}).values())
     
     def total_errors(self) -> int:
         """Get total error count."""
         return (
-            len(self.schema_errors) +
-            len(self.duplicate_errors) +
-            len(self.orphan_errors) +
-            len(self.reference_errors)
+            self.count('schema') +
+            self.count('duplicate') +
+            self.count('orphan') +
+            self.count('reference')
         )
     
+    def merge(self, other: 'ValidationResult'):
+        """Append another result's errors and omitted counts (category by category)."""
+        for category, errors in self._lists().items():
+            errors.extend(other._lists()[category])
+        for category, rules in other.omitted.items():
+            counts = self.omitted.setdefault(category, {})
+            for rule, count in rules.items():
+                counts[rule] = counts.get(rule, 0) + count
+    
+    def count_streamed(self, sink: ErrorSink, before: Dict[str, Dict[str, int]]):
+        """
+        Count the errors checks streamed to a sink as omitted.
+        
+        Args:
+            sink: Sink the checks emitted to
+            before: sink.rule_counts_snapshot() taken before the checks ran
+        """
+        for category, rules in sink.rule_counts.items():
+            counts = self.omitted.setdefault(category, {})
+            for rule, count in rules.items():
+                streamed = count - before.get(category, {}).get(rule, 0)
+                if streamed:
+                    counts[rule] = counts.get(rule, 0) + streamed
+    
+    def spill(self, sink: ErrorSink):
+        """
+        Stream the kept errors to a sink and drop them, keeping only counts.
+        
+        Args:
+            sink: Destination for the errors
+        """
+        for category, errors in self._lists().items():
+            counts = self.omitted.setdefault(category, {})
+            for error in errors:
+                sink.emit(category, error)
+                rule = error_rule(category, error)
+                counts[rule] = counts.get(rule, 0) + 1
+            errors.clear()
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
@@ -86,7 +153,14 @@ class ValidationResult:
                 for e in self.reference_errors
             ],
             'warnings': self.warnings,
+            'near_duplicates': [
+                {'keys': list(d.keys), 'problem_ids': list(d.problem_ids),
+                 'similarity': d.similarity, 'message': d.message}
+                for d in self.near_duplicates
+            ],
             'stats': self.stats,
+            'timings': {k: round(v, 4) for k, v in self.timings.items()},
+            'omitted': self.omitted,
         }
 
 
@@ -95,16 +169,26 @@ class SchemaValidator:
     Main validation engine for canonical data.
     """
     
-    def __init__(self, schema_version: str = "v1.0.0"):
+    def __init__(
+        self,
+        schema_version: str = "v1.0.0",
+        compiled: bool = True,
+        cache_dir: Optional[str] = None
+    ):
         """
         Initialize validator with specified schema version.
         
         Args:
             schema_version: Version of schemas to use (e.g., "v1.0.0")
+            compiled: Use code-generated validators where the schema allows
+            cache_dir: Cache of the compiled validators (default: COMPILED_DIR)
         """
         self.schema_version = schema_version
         self.schemas: Dict[str, Dict] = {}
         self.validators: Dict[str, Any] = {}
+        self.compiled: Dict[str, Any] = {}
+        self.use_compiled = compiled
+        self.cache_dir = cache_dir or COMPILED_DIR
         self._load_schemas()
     
     def _load_schemas(self):
@@ -133,6 +217,21 @@ class SchemaValidator:
                         self.schemas[name],
                         format_checker=FormatChecker()
                     )
+                    if self.use_compiled:
+                        self._load_compiled(name)
+    
+    def _load_compiled(self, name: str):
+        """Load the compiled validator for a schema (generic validator stays as fallback)."""
+        try:
+            self.compiled[name] = load_compiled_validator(
+                self.schemas[name],
+                name,
+                self.schema_version,
+                format_checker=self.validators[name].format_checker,
+                cache_dir=self.cache_dir
+            )
+        except SchemaCompileError as e:
+            print(f"Warning: Using generic validator for {name} schema: {e}")
     
     def validate_entity(
         self,
@@ -155,25 +254,36 @@ class SchemaValidator:
             # Fallback: basic required field checks
             return self._basic_validation(entity, entity_type)
         
-        validator = self.validators.get(entity_type)
-        if not validator:
-            return [{'message': f'No validator for type: {entity_type}'}]
-        
-        for error in validator.iter_errors(entity):
-            # Get a meaningful identifier for the entity
-            entity_id = (
-                entity.get('problem_id') or
-                entity.get('contest_id') or
-                entity.get('topic_id') or
-                entity.get('name') or
-                'unknown'
-            )
-            
+        compiled = self.compiled.get(entity_type)
+        if compiled is not None:
+            found = compiled(entity)
+        else:
+            validator = self.validators.get(entity_type)
+            if not validator:
+                return [{'message': f'No validator for type: {entity_type}'}]
+            found = [
+                (error.absolute_path, error.message, error.schema_path)
+                for error in validator.iter_errors(entity)
+            ]
+        
+        if not found:
+            return errors
+        
+        # Get a meaningful identifier for the entity
+        entity_id = (
+            entity.get('problem_id') or
+            entity.get('contest_id') or
+            entity.get('topic_id') or
+            entity.get('name') or
+            'unknown'
+        ) if isinstance(entity, dict) else 'unknown'
+        
+        for path, message, schema_path in found:
             errors.append({
                 'entity_id': entity_id,
-                'path': '.'.join(str(p) for p in error.absolute_path),
-                'message': error.message,
-                'schema_path': '.'.join(str(p) for p in error.schema_path),
+                'path': '.'.join(str(p) for p in path),
+                'message': message,
+                'schema_path': '.'.join(str(p) for p in schema_path),
             })
         
         return errors
@@ -207,90 +317,161 @@ class SchemaValidator:
         
         return errors
     
-    def validate_problems(self, problems: List[Dict]) -> ValidationResult:
+    def validate_batch(
+        self,
+        entities: List[Dict],
+        entity_type: str,
+        sink: Optional[ErrorSink] = None
+    ) -> List[Dict]:
+        """
+        Schema-validate a batch of entities of one type.
+        
+        Batches are independent, so callers may validate them concurrently
+        and pass the errors to validate_all() in entity order.
+        
+        Args:
+            entities: Entity documents to validate
+            entity_type: Type of entity (problem, contest, topic)
+            sink: Stream errors here entity by entity instead of returning them
+            
+        Returns:
+            List of validation error dicts, in entity order
+        """
+        errors = []
+        for entity in entities:
+            found = self.validate_entity(entity, entity_type)
+            if sink is None:
+                errors.extend(found)
+            else:
+                sink.emit_all('schema', found)
+        return errors
+    
+    def _schema_errors(
+        self,
+        entities: List[Dict],
+        entity_type: str,
+        schema_errors: Optional[List[Dict]],
+        sink: Optional[ErrorSink]
+    ) -> List[Dict]:
+        """Schema errors to keep: precomputed ones are streamed like fresh ones."""
+        if schema_errors is None:
+            return self.validate_batch(entities, entity_type, sink)
+        if sink is None:
+            return schema_errors
+        sink.emit_all('schema', schema_errors)
+        return []
+    
+    def validate_problems(
+        self,
+        problems: List[Dict],
+        schema_errors: Optional[List[Dict]] = None,
+        sink: Optional[ErrorSink] = None
+    ) -> ValidationResult:
         """
         Validate a list of problems.
         
         Args:
             problems: List of canonical problem documents
+            schema_errors: Precomputed schema errors (skips schema validation)
+            sink: Stream errors here as they are found (the result keeps counts)
             
         Returns:
             ValidationResult with all errors and stats
         """
         result = ValidationResult(is_valid=True)
         result.stats['total_problems'] = len(problems)
+        before = sink.rule_counts_snapshot() if sink is not None else None
         
         # Schema validation
-        for problem in problems:
-            schema_errors = self.validate_entity(problem, 'problem')
-            result.schema_errors.extend(schema_errors)
+        result.schema_errors.extend(self._schema_errors(problems, 'problem', schema_errors, sink))
         
         # Duplicate checks
-        result.duplicate_errors.extend(check_problem_duplicates(problems))
-        result.duplicate_errors.extend(check_uuid_duplicates(problems, 'problem_id'))
+        result.duplicate_errors.extend(check_problem_duplicates(problems, sink))
+        result.duplicate_errors.extend(check_uuid_duplicates(problems, 'problem_id', sink))
         
         # Reference validation
-        result.reference_errors.extend(validate_uuids(problems, 'problem_id'))
-        result.reference_errors.extend(validate_r2_references(problems))
-        result.reference_errors.extend(validate_source_urls(problems))
-        result.reference_errors.extend(validate_slug_format(problems))
+        result.reference_errors.extend(validate_uuids(problems, 'problem_id', sink))
+        result.reference_errors.extend(validate_r2_references(problems, sink))
+        result.reference_errors.extend(validate_source_urls(problems, sink))
+        result.reference_errors.extend(validate_slug_format(problems, sink))
         
+        if sink is not None:
+            result.count_streamed(sink, before)
         result.is_valid = result.total_errors() == 0
         return result
     
-    def validate_contests(self, contests: List[Dict]) -> ValidationResult:
+    def validate_contests(
+        self,
+        contests: List[Dict],
+        schema_errors: Optional[List[Dict]] = None,
+        sink: Optional[ErrorSink] = None
+    ) -> ValidationResult:
         """
         Validate a list of contests.
         
         Args:
             contests: List of canonical contest documents
+            schema_errors: Precomputed schema errors (skips schema validation)
+            sink: Stream errors here as they are found (the result keeps counts)
             
         Returns:
             ValidationResult with all errors and stats
         """
         result = ValidationResult(is_valid=True)
         result.stats['total_contests'] = len(contests)
+        before = sink.rule_counts_snapshot() if sink is not None else None
         
         # Schema validation
-        for contest in contests:
-            schema_errors = self.validate_entity(contest, 'contest')
-            result.schema_errors.extend(schema_errors)
+        result.schema_errors.extend(self._schema_errors(contests, 'contest', schema_errors, sink))
         
         # Duplicate checks
-        result.duplicate_errors.extend(check_contest_duplicates(contests))
-        result.duplicate_errors.extend(check_uuid_duplicates(contests, 'contest_id'))
+        result.duplicate_errors.extend(check_contest_duplicates(contests, sink))
+        result.duplicate_errors.extend(check_uuid_duplicates(contests, 'contest_id', sink))
         
         # UUID validation
-        result.reference_errors.extend(validate_uuids(contests, 'contest_id'))
+        result.reference_errors.extend(validate_uuids(contests, 'contest_id', sink))
         
+        if sink is not None:
+            result.count_streamed(sink, before)
         result.is_valid = result.total_errors() == 0
         return result
     
-    def validate_topics(self, topics: List[Dict]) -> ValidationResult:
+    def validate_topics(
+        self,
+        topics: List[Dict],
+        schema_errors: Optional[List[Dict]] = None,
+        graph: Optional[EntityGraph] = None,
+        sink: Optional[ErrorSink] = None
+    ) -> ValidationResult:
         """
         Validate a list of topics.
         
         Args:
             topics: List of canonical topic documents
+            schema_errors: Precomputed schema errors (skips schema validation)
+            graph: Entity graph including these topics (for the parent and cycle checks)
+            sink: Stream errors here as they are found (the result keeps counts)
             
         Returns:
             ValidationResult with all errors and stats
         """
         result = ValidationResult(is_valid=True)
         result.stats['total_topics'] = len(topics)
+        before = sink.rule_counts_snapshot() if sink is not None else None
         
         # Schema validation
-        for topic in topics:
-            schema_errors = self.validate_entity(topic, 'topic')
-            result.schema_errors.extend(schema_errors)
+        result.schema_errors.extend(self._schema_errors(topics, 'topic', schema_errors, sink))
         
         # Duplicate checks
-        result.duplicate_errors.extend(check_topic_duplicates(topics))
-        result.duplicate_errors.extend(check_uuid_duplicates(topics, 'topic_id'))
+        result.duplicate_errors.extend(check_topic_duplicates(topics, sink))
+        result.duplicate_errors.extend(check_uuid_duplicates(topics, 'topic_id', sink))
         
-        # Orphan parent checks
-        result.orphan_errors.extend(detect_orphan_parents(topics))
+        # Orphan parent and hierarchy cycle checks
+        result.orphan_errors.extend(detect_orphan_parents(topics, graph, sink))
+        result.orphan_errors.extend(detect_topic_cycles(topics, graph, sink))
         
+        if sink is not None:
+            result.count_streamed(sink, before)
         result.is_valid = result.total_errors() == 0
         return result
     
@@ -298,7 +479,11 @@ class SchemaValidator:
         self,
         problems: List[Dict],
         contests: List[Dict],
-        topics: List[Dict]
+        topics: List[Dict],
+        schema_errors: Optional[Dict[str, List[Dict]]] = None,
+        sink: Optional[ErrorSink] = None,
+        descriptions: Optional[Dict[str, str]] = None,
+        near_duplicates: bool = False
     ) -> ValidationResult:
         """
         Validate all entity types with cross-entity checks.
@@ -307,44 +492,70 @@ class SchemaValidator:
             problems: List of canonical problem documents
             contests: List of canonical contest documents
             topics: List of canonical topic documents
+            schema_errors: Precomputed schema errors per entity type
+                ('problem', 'contest', 'topic'); missing types are validated here
+            sink: Stream errors here as they are found instead of keeping
+                them (the result then only holds counts in 'omitted')
+            descriptions: LeetCode description HTML per slug, used by
+                near-duplicate detection (titles only if not given)
+            near_duplicates: Also run near-duplicate detection (warnings only,
+                and the slowest check; create_snapshot() computes the table
+                itself when it is skipped)
             
         Returns:
             Combined ValidationResult
         """
         result = ValidationResult(is_valid=True)
+        if schema_errors is None:
+            schema_errors = {}
         
-        # Individual validations
-        prob_result = self.validate_problems(problems)
-        contest_result = self.validate_contests(contests)
-        topic_result = self.validate_topics(topics)
+        # Relationships are indexed once and shared by every orphan check
+        start = time.perf_counter()
+        result.graph = EntityGraph.build(problems, contests, topics)
+        result.timings['graph'] = time.perf_counter() - start
         
-        # Aggregate errors
-        result.schema_errors.extend(prob_result.schema_errors)
-        result.schema_errors.extend(contest_result.schema_errors)
-        result.schema_errors.extend(topic_result.schema_errors)
+        # Individual validations
+        start = time.perf_counter()
+        prob_result = self.validate_problems(problems, schema_errors.get('problem'), sink)
+        result.timings['problems'] = time.perf_counter() - start
         
-        result.duplicate_errors.extend(prob_result.duplicate_errors)
-        result.duplicate_errors.extend(contest_result.duplicate_errors)
-        result.duplicate_errors.extend(topic_result.duplicate_errors)
+        start = time.perf_counter()
+        contest_result = self.validate_contests(contests, schema_errors.get('contest'), sink)
+        result.timings['contests'] = time.perf_counter() - start
         
-        result.orphan_errors.extend(topic_result.orphan_errors)
+        start = time.perf_counter()
+        topic_result = self.validate_topics(topics, schema_errors.get('topic'), result.graph, sink)
+        result.timings['topics'] = time.perf_counter() - start
         
-        result.reference_errors.extend(prob_result.reference_errors)
-        result.reference_errors.extend(contest_result.reference_errors)
+        # Aggregate errors (each category in problem, contest, topic order)
+        result.merge(prob_result)
+        result.merge(contest_result)
+        result.merge(topic_result)
         
         # Cross-entity validation
-        result.orphan_errors.extend(detect_orphan_topics(problems, topics))
-        result.orphan_errors.extend(detect_orphan_problems(contests, problems))
+        start = time.perf_counter()
+        before = sink.rule_counts_snapshot() if sink is not None else None
+        result.orphan_errors.extend(detect_orphan_topics(problems, topics, result.graph, sink))
+        result.orphan_errors.extend(detect_orphan_problems(contests, problems, result.graph, sink))
+        if sink is not None:
+            result.count_streamed(sink, before)
+        result.timings['cross_entity'] = time.perf_counter() - start
+        
+        if near_duplicates:
+            start = time.perf_counter()
+            result.near_duplicates = detect_near_duplicates(problems, descriptions)
+            result.timings['near_duplicates'] = time.perf_counter() - start
         
         # Aggregate stats
         result.stats = {
             'total_problems': len(problems),
             'total_contests': len(contests),
             'total_topics': len(topics),
-            'schema_errors': len(result.schema_errors),
-            'duplicate_errors': len(result.duplicate_errors),
-            'orphan_errors': len(result.orphan_errors),
-            'reference_errors': len(result.reference_errors),
+            'schema_errors': result.count('schema'),
+            'duplicate_errors': result.count('duplicate'),
+            'orphan_errors': result.count('orphan'),
+            'reference_errors': result.count('reference'),
+            'near_duplicates': len(result.near_duplicates),
         }
         
         result.is_valid = result.total_errors() == 0
@@ -0,0 +1,85 @@
+"""
+Shared test data: canonical documents as produced by normalization.
+
+Test modules import the factories directly (``from conftest import ...``).
+"""
+
+import uuid
+
+
+# LeetCode description HTML per slug
+DESCRIPTIONS = {
+    'two-sum-queries': '<p>Given an integer array <code>nums</code> and a list of queries, '
+                       'return for each query the number of pairs whose sum equals the target.</p>',
+    'tree-paths': '<p>Count the root-to-leaf paths of a binary tree whose node values '
+                  'are strictly increasing along the path.</p>',
+}
+
+
+def make_problem(
+    source: str,
+    external_id: str,
+    title: str = None,
+    slug: str = None,
+    topics=('math',),
+    **fields
+) -> dict:
+    """
+    Canonical problem document.
+
+    The title defaults to "Problem <external_id>" and the slug to the
+    lower-cased, hyphenated title; other fields can be overridden.
+    """
+    title = title or f"Problem {external_id}"
+    problem = {
+        'problem_id': str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}:{external_id}")),
+        'source': source,
+        'external_id': external_id,
+        'slug': slug or title.lower().replace(' ', '-'),
+        'title': title,
+        'difficulty': 'easy',
+        'rating': None,
+        'metadata': {
+            'frontend_id': None,
+            'contest_index': None,
+            'source_url': None,
+        },
+        'topics': list(topics),
+        'content_refs': {
+            'description_path': None,
+            'examples_path': None,
+            'constraints_path': None,
+        },
+    }
+    problem.update(fields)
+    return problem
+
+
+def make_topic(name: str, parent: str = None) -> dict:
+    """Canonical topic document."""
+    return {
+        'topic_id': str(uuid.uuid5(uuid.NAMESPACE_URL, f"topic:{name}")),
+        'name': name,
+        'parent': parent,
+        'category': 'dsa',
+    }
+
+
+def make_contest(source: str, external_id: str, problem_ids=(), **fields) -> dict:
+    """Canonical contest document listing problems by external id."""
+    contest = {
+        'contest_id': str(uuid.uuid5(uuid.NAMESPACE_URL, f"contest:{source}:{external_id}")),
+        'source': source,
+        'external_id': external_id,
+        'name': f"Round {external_id}",
+        'type': 'CF',
+        'duration_seconds': 7200,
+        'start_time': 1266580800,
+        'phase': 'FINISHED',
+        'problems': [
+            {'problem_external_id': problem_id, 'index': problem_id.rsplit('-', 1)[-1]}
+            for problem_id in problem_ids
+        ],
+    }
+    contest.update(fields)
+    return contest
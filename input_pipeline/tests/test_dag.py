@@ -0,0 +1,192 @@
+"""
+Stage DAG executor tests with synthetic stages.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from validate_schema.dag import (
+    DAGExecutor,
+    DAGError,
+    DAGResult,
+    Stage,
+    StageRun,
+    StageFailed,
+    SUCCEEDED,
+    FAILED,
+    CANCELLED,
+)
+
+
+def _stage(name, inputs=(), outputs=(), func=None):
+    if func is None:
+        def func(**kwargs):
+            return {output: f"{name}:{output}" for output in outputs}
+    return Stage(name, func, list(inputs), list(outputs))
+
+
+def test_cycle_is_rejected():
+    stages = [
+        _stage('load', outputs=['raw']),
+        _stage('a', inputs=['raw', 'y'], outputs=['x']),
+        _stage('b', inputs=['x'], outputs=['y']),
+    ]
+    with pytest.raises(DAGError, match=r"cycle between stages: \['a', 'b'\]"):
+        DAGExecutor(stages)
+
+
+def test_duplicate_output_and_name_are_rejected():
+    with pytest.raises(DAGError, match="Output 'x' produced by both a and b"):
+        DAGExecutor([_stage('a', outputs=['x']), _stage('b', outputs=['x'])])
+    with pytest.raises(DAGError, match="Duplicate stage name: a"):
+        DAGExecutor([_stage('a', outputs=['x']), _stage('a', outputs=['y'])])
+
+
+def test_unresolved_input_is_rejected():
+    executor = DAGExecutor([_stage('a', inputs=['config'], outputs=['x'])])
+    with pytest.raises(DAGError, match=r"unresolved inputs: \['config'\]"):
+        executor.run()
+    assert executor.run({'config': 1}).outputs == {'config': 1, 'x': 'a:x'}
+
+
+def test_outputs_are_passed_downstream():
+    stages = [
+        _stage('sum', inputs=['a', 'b'], outputs=['total'], func=lambda a, b: {'total': a + b}),
+        _stage('double', inputs=['total'], outputs=['doubled'], func=lambda total: {'doubled': 2 * total}),
+    ]
+    result = DAGExecutor(list(reversed(stages))).run({'a': 2, 'b': 3})
+    assert result.success
+    assert result.outputs['doubled'] == 10
+    assert [stage.name for stage in DAGExecutor(list(reversed(stages))).stages] == ['sum', 'double']
+
+
+def test_failure_cancels_downstream_while_independent_branch_runs():
+    failed = threading.Event()
+
+    def validate(canonical):
+        raise StageFailed("validation did not pass")
+
+    def slow_branch(raw):
+        # Still running when validate fails; must not be cancelled
+        assert failed.wait(5)
+        return {'search': 'index'}
+
+    def snapshot(validation):
+        raise AssertionError("cancelled stage must not run")
+
+    stages = [
+        _stage('load', outputs=['raw']),
+        _stage('normalize', inputs=['raw'], outputs=['canonical']),
+        _stage('validate', inputs=['canonical'], outputs=['validation'], func=validate),
+        _stage('snapshot', inputs=['validation'], outputs=['snapshot'], func=snapshot),
+        _stage('publish', inputs=['snapshot', 'search'], outputs=['published']),
+        _stage('search', inputs=['raw'], outputs=['search'], func=slow_branch),
+        _stage('broken', inputs=['raw'], outputs=['bad'], func=lambda raw: {}),
+        _stage('crash', inputs=['raw'], outputs=['boom'], func=lambda raw: 1 / 0),
+    ]
+    executor = DAGExecutor(stages, max_workers=4)
+    # Signal the slow branch once validate's failure has been handled
+    original = executor._cancel_downstream
+
+    def cancel_downstream(name, runs):
+        original(name, runs)
+        if name == 'validate':
+            failed.set()
+
+    executor._cancel_downstream = cancel_downstream
+    result = executor.run()
+
+    assert result.with_status(SUCCEEDED) == ['load', 'normalize', 'search']
+    assert sorted(result.with_status(FAILED)) == ['broken', 'crash', 'validate']
+    assert result.with_status(CANCELLED) == ['snapshot', 'publish']
+    assert not result.success
+    assert result.outputs['search'] == 'index'
+    assert 'snapshot' not in result.outputs
+
+    assert result.runs['validate'].error == "validation did not pass"
+    assert result.runs['validate'].error_type == 'StageFailed'
+    assert result.runs['crash'].error_type == 'ZeroDivisionError'
+    assert result.runs['broken'].error == "DAGError: Stage broken did not produce outputs: ['bad']"
+    assert result.runs['publish'].error == "Cancelled: upstream stage validate failed"
+    assert result.runs['publish'].start is None
+    # Cancelled stages are left out of the critical path
+    assert set(result.critical_path()['slack']) == {'load', 'normalize', 'validate', 'search', 'broken', 'crash'}
+
+
+def _result(schedule, wall):
+    """DAGResult from (name, depends_on, start, end) tuples (None start: never ran)."""
+    runs = {}
+    for name, depends_on, start, end in schedule:
+        runs[name] = StageRun(name, list(depends_on), SUCCEEDED if start is not None else CANCELLED, start, end)
+    return DAGResult(runs=runs, outputs={}, wall_seconds=wall)
+
+
+def test_critical_path_and_slack():
+    result = _result([
+        ('load', [], 0.0, 1.0),
+        ('idle', [], 0.0, 2.0),
+        ('normalize', ['load'], 1.0, 4.0),
+        ('profile', ['load'], 1.0, 2.0),
+        ('validate', ['normalize', 'profile'], 4.0, 5.0),
+        ('upload', ['validate'], None, None),
+    ], wall=5.0)
+    critical = result.critical_path()
+
+    assert critical['stages'] == ['load', 'normalize', 'validate']
+    assert critical['length_seconds'] == 5.0
+    assert critical['wall_seconds'] == 5.0
+    # (1 + 2 + 3 + 1 + 1) seconds of stage time over 5 seconds of wall time
+    assert critical['parallelism'] == 1.6
+    assert critical['slack'] == {
+        'load': 0.0,
+        'idle': 3.0,
+        'normalize': 0.0,
+        'profile': 2.0,
+        'validate': 0.0,
+    }
+
+    report = result.format_report()
+    assert report[-1].startswith("Critical path: load → normalize → validate (5.000s of 5.000s wall")
+    assert report[1].startswith("  idle ")
+    assert report[0].startswith("* load ")
+    assert report[5].split() == ['upload', 'cancelled']
+
+
+def test_critical_path_of_empty_run():
+    critical = _result([('a', [], None, None)], wall=0.0).critical_path()
+    assert critical == {'stages': [], 'length_seconds': 0.0, 'wall_seconds': 0.0, 'parallelism': 0.0, 'slack': {}}
+
+
+def test_measured_critical_path_follows_the_slow_branch():
+    def sleeper(seconds, output):
+        def func(**kwargs):
+            time.sleep(seconds)
+            return {output: seconds}
+        return func
+
+    stages = [
+        _stage('load', outputs=['raw'], func=sleeper(0.01, 'raw')),
+        _stage('fast', inputs=['raw'], outputs=['f'], func=sleeper(0.01, 'f')),
+        _stage('slow', inputs=['raw'], outputs=['s'], func=sleeper(0.2, 's')),
+        _stage('join', inputs=['f', 's'], outputs=['done'], func=sleeper(0.01, 'done')),
+    ]
+    result = DAGExecutor(stages, max_workers=2).run()
+    critical = result.critical_path()
+
+    assert result.success
+    assert critical['stages'] == ['load', 'slow', 'join']
+    assert critical['slack']['fast'] > 0.1
+    assert critical['slack']['slow'] == 0.0
+    # The two branches overlapped
+    assert result.runs['fast'].start < result.runs['slow'].end
+    assert critical['length_seconds'] <= critical['wall_seconds'] + 0.01
@@ -0,0 +1,118 @@
+"""
+Error sink tests: validation with a sink must write each error to the
+stream as it is found and keep only counts in the result.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import json
+import uuid
+
+import pytest
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from normalize_schema.error_sink import ErrorSink, error_record
+from normalize_schema.rules.duplicate_checker import check_problem_duplicates
+from normalize_schema.streaming_validator import ErrorBudgetExceeded, StreamingValidator
+from normalize_schema.validator import SchemaValidator
+
+from conftest import make_problem, make_topic
+
+
+def _broken_corpus():
+    problems = [
+        make_problem('codeforces', '1-A'),
+        make_problem('codeforces', '1-A'),                 # duplicate key and UUID
+        make_problem('codeforces', '1-B', topics=('missing',)),  # orphan topic
+        make_problem('codeforces', '1-C', slug='Bad Slug'),      # schema + reference errors
+        dict(make_problem('codeforces', '1-D'), difficulty='trivial'),
+    ]
+    contests = [{
+        'contest_id': str(uuid.uuid5(uuid.NAMESPACE_URL, 'codeforces:contest:1')),
+        'source': 'codeforces',
+        'external_id': '1',
+        'name': 'Round 1',
+        'type': 'CF',
+        'duration_seconds': 7200,
+        'start_time': 0,
+        'phase': 'FINISHED',
+        'problems': [{'problem_external_id': '1-Z', 'index': 'Z'}],
+    }]
+    topics = [make_topic('math', parent='nowhere')]
+    return problems, contests, topics
+
+
+def test_check_emits_instead_of_returning(tmp_path):
+    sink = ErrorSink(str(tmp_path / 'report'))
+    problems = [make_problem('codeforces', '1-A'), make_problem('codeforces', '1-A')]
+    assert check_problem_duplicates(problems, sink) == []
+    assert sink.counts['duplicate'] == 1
+    assert sink.rule_counts == {'duplicate': {'problem': 1}}
+
+
+def test_streamed_validation_matches_in_memory(tmp_path):
+    problems, contests, topics = _broken_corpus()
+    validator = SchemaValidator('v1.0.0')
+    kept = validator.validate_all(problems, contests, topics)
+
+    sink = ErrorSink(str(tmp_path / 'report'))
+    streamed = validator.validate_all(problems, contests, topics, sink=sink)
+
+    assert streamed.schema_errors == streamed.duplicate_errors == []
+    assert streamed.orphan_errors == streamed.reference_errors == []
+    for category in ('schema', 'duplicate', 'orphan', 'reference'):
+        assert kept.count(category) > 0
+        assert streamed.count(category) == kept.count(category)
+    assert streamed.stats == kept.stats
+
+    # Same records as spilling the in-memory result afterwards (stream
+    # order follows the checks, spill order the categories)
+    spilled = ErrorSink(str(tmp_path / 'spilled'))
+    kept.spill(spilled)
+    assert sorted(map(json.dumps, sink.records())) == sorted(map(json.dumps, spilled.records()))
+    assert list(sink.records('schema')) == list(spilled.records('schema'))
+    assert streamed.omitted == kept.omitted
+    assert list(sink.records('duplicate'))[0] == error_record('duplicate', check_problem_duplicates(problems)[0])
+
+
+def _stream(problems, contests, topics, **kwargs):
+    streaming = StreamingValidator('v1.0.0', **kwargs)
+    for problem in problems:
+        streaming.add('problem', problem)
+    for contest in contests:
+        streaming.add('contest', contest)
+    return streaming.finish(topics)
+
+
+def test_streaming_validator_with_sink_keeps_only_counts(tmp_path):
+    problems, contests, topics = _broken_corpus()
+    kept = _stream(problems, contests, topics)
+
+    sink = ErrorSink(str(tmp_path / 'report'))
+    streamed = _stream(problems, contests, topics, sink=sink)
+
+    for category in ('schema', 'duplicate', 'orphan', 'reference'):
+        assert kept.count(category) > 0
+        assert streamed.count(category) == kept.count(category)
+    assert streamed.schema_errors == streamed.reference_errors == []
+    assert streamed.duplicate_errors == streamed.orphan_errors == []
+    assert streamed.stats == kept.stats and not streamed.is_valid
+
+    spilled = ErrorSink(str(tmp_path / 'spilled'))
+    kept.spill(spilled)
+    assert sorted(map(json.dumps, sink.records())) == sorted(map(json.dumps, spilled.records()))
+
+
+def test_aborted_streaming_run_counts_streamed_errors(tmp_path):
+    problems, contests, topics = _broken_corpus()
+    sink = ErrorSink(str(tmp_path / 'report'))
+    streaming = StreamingValidator('v1.0.0', max_errors=2, sink=sink)
+    with pytest.raises(ErrorBudgetExceeded):
+        for problem in problems:
+            streaming.add('problem', problem)
+    assert streaming.result.total_errors() == sink.total > 0
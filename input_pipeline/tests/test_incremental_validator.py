@@ -0,0 +1,183 @@
+"""
+Incremental validator tests: cached runs must match a cold run.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import json
+import uuid
+import shutil
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from normalize_schema import incremental_validator as incremental_module
+from normalize_schema import validator as validator_module
+from normalize_schema.incremental_validator import IncrementalValidator
+from normalize_schema.validator import SchemaValidator, SCHEMAS_DIR
+
+from conftest import DESCRIPTIONS, make_problem, make_topic
+
+
+def test_near_duplicates_cached_until_corpus_changes(tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    problems = [
+        make_problem('leetcode', '1', 'Two Sum Queries'),
+        make_problem('codeforces', '100-A', 'Two Sum Queries'),
+        make_problem('codeforces', '100-B', 'Tree Paths'),
+    ]
+    topics = [make_topic('math')]
+
+    cold = IncrementalValidator('v1.0.0', state_path=state_path).validate_all(
+        problems, [], topics, descriptions=DESCRIPTIONS, near_duplicates=True)
+    assert [d.keys for d in cold.near_duplicates] == [('leetcode:1', 'codeforces:100-A')]
+
+    validator = IncrementalValidator('v1.0.0', state_path=state_path)
+    validator.validate_all(problems, [], topics, descriptions=DESCRIPTIONS, near_duplicates=True)
+    assert validator.state['near_duplicates']['checksum'] is not None
+    validator.state['near_duplicates']['pairs'] = []
+    # Same corpus: served from the cache (emptied above)
+    assert validator.validate_all(
+        problems, [], topics, descriptions=DESCRIPTIONS, near_duplicates=True).near_duplicates == []
+    # Changed descriptions or problems: recomputed
+    assert validator.validate_all(problems, [], topics, near_duplicates=True).near_duplicates == cold.near_duplicates
+    renamed = problems[:1] + [make_problem('codeforces', '100-A', 'Other Title')] + problems[2:]
+    assert validator.validate_all(renamed, [], topics, near_duplicates=True).near_duplicates == []
+
+    # Off by default
+    skipped = IncrementalValidator('v1.0.0', state_path=state_path).validate_all(problems, [], topics)
+    assert skipped.near_duplicates == []
+    assert 'near_duplicates' not in skipped.timings
+
+
+def _contest(external_id: str, problem_ids, source: str = 'codeforces') -> dict:
+    return {
+        'contest_id': str(uuid.uuid5(uuid.NAMESPACE_URL, f"contest:{source}:{external_id}")),
+        'source': source,
+        'external_id': external_id,
+        'name': f"Round {external_id}",
+        'type': 'CF',
+        'duration_seconds': 7200,
+        'start_time': 1266580800,
+        'phase': 'FINISHED',
+        'problems': [{'problem_external_id': p, 'index': p[-1]} for p in problem_ids],
+    }
+
+
+def _corpus():
+    problems = [
+        make_problem('codeforces', '1-A', 'Theatre Square', topics=['math']),
+        make_problem('codeforces', '1-B', 'Spreadsheet', topics=['implementation', 'math']),
+        make_problem('codeforces', '2-A', 'Winner', topics=['undefined-topic']),
+        make_problem('leetcode', '1', 'Two Sum Queries', topics=['arrays']),
+        make_problem('codeforces', '100-A', 'Two Sum Queries', topics=['math']),
+    ]
+    # Schema and reference errors
+    problems[2]['difficulty'] = 'impossible'
+    problems[1]['slug'] = 'Not A Slug'
+    contests = [
+        _contest('1', ['1-A', '1-B']),
+        _contest('2', ['2-A', '2-B']),
+    ]
+    topics = [make_topic('math'), make_topic('implementation'), make_topic('arrays'), make_topic('unused')]
+    return problems, contests, topics
+
+
+def _outcome(result) -> dict:
+    """Everything validate_all reports, except timings."""
+    outcome = result.to_dict()
+    del outcome['timings']
+    outcome['orphans'] = [(e.orphan_type, e.value, e.referenced_by) for e in result.orphan_errors]
+    outcome['references'] = [(e.error_type, e.field, e.value, e.record_id) for e in result.reference_errors]
+    return outcome
+
+
+def _assert_matches_cold(validator, problems, contests, topics, tmp_path, schema_version='v1.0.0'):
+    cached = validator.validate_all(problems, contests, topics, descriptions=DESCRIPTIONS, near_duplicates=True)
+    cold_incremental = IncrementalValidator(
+        schema_version, state_path=str(tmp_path / f"cold-{uuid.uuid4().hex}.json"),
+        validator=SchemaValidator(schema_version, compiled=False)
+    ).validate_all(problems, contests, topics, descriptions=DESCRIPTIONS, near_duplicates=True)
+    cold = SchemaValidator(schema_version, compiled=False).validate_all(
+        problems, contests, topics, descriptions=DESCRIPTIONS, near_duplicates=True)
+    assert _outcome(cached) == _outcome(cold)
+    assert _outcome(cold_incremental) == _outcome(cold)
+    return cached
+
+
+def test_cached_run_matches_cold_after_add_change_remove(tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    problems, contests, topics = _corpus()
+
+    def validator():
+        # A new instance per run, so every run starts from the saved state
+        return IncrementalValidator('v1.0.0', state_path=state_path)
+
+    first = _assert_matches_cold(validator(), problems, contests, topics, tmp_path)
+    assert first.count('schema') and first.count('reference') and first.count('orphan')
+    assert first.near_duplicates
+
+    unchanged = validator()
+    _assert_matches_cold(unchanged, problems, contests, topics, tmp_path)
+    assert unchanged.delta['problem'] == {'added': 0, 'removed': 0, 'evaluated': 0, 'reused': len(problems)}
+
+    # Added: a new problem, a repeated copy of an existing one and a contest
+    added = problems + [make_problem('codeforces', '2-B', 'Fibonacci Sums', topics=['math']), dict(problems[0])]
+    more_contests = contests + [_contest('3', ['1-A', '9-Z'])]
+    run = validator()
+    result = _assert_matches_cold(run, added, more_contests, topics, tmp_path)
+    assert run.delta['problem']['added'] == 2 and run.delta['problem']['evaluated'] == 1
+    assert result.count('duplicate')
+
+    # Changed: fix one schema error, break another document, rename a near duplicate
+    changed = [dict(p) for p in added]
+    changed[2]['difficulty'] = 'easy'
+    changed[0]['problem_id'] = 'not-a-uuid'
+    changed[4]['title'] = 'Sum Of Two Queries'
+    changed[4]['slug'] = 'sum-of-two-queries'
+    run = validator()
+    result = _assert_matches_cold(run, changed, more_contests, topics, tmp_path)
+    assert run.delta['problem']['removed'] == 3 and run.delta['problem']['added'] == 3
+    assert result.near_duplicates == []
+
+    # Removed: a problem still referenced by a contest, and the repeated copy
+    removed = changed[:1] + changed[2:-1]
+    run = validator()
+    result = _assert_matches_cold(run, removed, more_contests[:2], topics, tmp_path)
+    assert ('problem', 'codeforces:1-B') in [(e.orphan_type, e.value) for e in result.orphan_errors]
+
+    # Back to the first corpus: everything reused from the cache, same result as before
+    run = validator()
+    again = _assert_matches_cold(run, problems, contests, topics, tmp_path)
+    assert _outcome(again) == _outcome(first)
+
+
+def test_schema_change_invalidates_cache(tmp_path, monkeypatch):
+    schemas_dir = tmp_path / 'schemas'
+    shutil.copytree(os.path.join(SCHEMAS_DIR, 'v1.0.0'), schemas_dir / 'v-test')
+    monkeypatch.setattr(validator_module, 'SCHEMAS_DIR', str(schemas_dir))
+    monkeypatch.setattr(incremental_module, 'SCHEMAS_DIR', str(schemas_dir))
+
+    state_path = str(tmp_path / 'state.json')
+    problems, contests, topics = _corpus()
+    problems[0]['rating'] = 3500
+
+    def validator():
+        return IncrementalValidator(
+            'v-test', state_path=state_path, validator=SchemaValidator('v-test', compiled=False))
+
+    before = _assert_matches_cold(validator(), problems, contests, topics, tmp_path, 'v-test')
+    assert not [e for e in before.schema_errors if e['path'] == 'rating']
+
+    schema_path = schemas_dir / 'v-test' / 'problem.schema.json'
+    schema = json.loads(schema_path.read_text(encoding='utf-8'))
+    schema['properties']['rating']['maximum'] = 3000
+    schema_path.write_text(json.dumps(schema, indent=4), encoding='utf-8')
+
+    run = validator()
+    after = _assert_matches_cold(run, problems, contests, topics, tmp_path, 'v-test')
+    assert run.delta['problem']['evaluated'] == len(problems)
+    assert [e['path'] for e in after.schema_errors if e['path'] == 'rating'] == ['rating']
@@ -0,0 +1,90 @@
+"""
+JSON array reader tests: streamed elements must match json.load.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from modify_data.utils.json_array_reader import JsonArrayReader, iter_json_array
+from modify_data.transformers.leetcode_transformer import LeetCodeTransformer
+
+
+def _question(number: int) -> dict:
+    return {
+        'title': f"Question {number}",
+        'problem_id': str(number),
+        'frontend_id': str(number),
+        'difficulty': 'Easy',
+        'problem_slug': f"question-{number}",
+        'topics': ['Array'],
+        'description': f"<p>Return the answer to question {number}.</p>",
+    }
+
+
+def _write(tmp_path, data, name='data.json', **dump) -> str:
+    path = str(tmp_path / name)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump)
+    return path
+
+
+@pytest.mark.parametrize('data, expected', [
+    ([1, 2], [1, 2]),
+    ({'questions': [1, 2], 'problems': [3]}, [1, 2]),
+    ({'problems': [3], 'questions': [1, 2]}, [1, 2]),
+    # An empty (or missing) preferred array falls back to the next key
+    ({'questions': [], 'problems': [3, 4]}, [3, 4]),
+    ({'problems': [3, 4], 'questions': []}, [3, 4]),
+    ({'meta': {'n': [1]}, 'problems': [3, 4], 'extra': [9]}, [3, 4]),
+    ({'questions': None, 'problems': [3]}, [3]),
+    ({'questions': [], 'problems': []}, []),
+    ({'other': [1]}, []),
+    ({}, []),
+    ([], []),
+])
+def test_keys_are_tried_in_order(tmp_path, data, expected):
+    legacy = data if isinstance(data, list) else data.get('questions') or data.get('problems') or []
+    assert legacy == expected
+    for dump in ({}, {'indent': 2}):
+        path = _write(tmp_path, data, **dump)
+        assert list(iter_json_array(path)) == expected
+        # Refilling after every few characters crosses every token boundary
+        with JsonArrayReader(path, chunk_size=3) as reader:
+            assert list(reader) == expected
+            assert reader.count == len(expected)
+
+
+def test_fallback_after_later_member_skipped(tmp_path):
+    data = {'version': 2, 'problems': [{'a': [1, 2]}, {'b': -4.5e3}], 'notes': 'x' * 50, 'questions': []}
+    path = _write(tmp_path, data)
+    with JsonArrayReader(path, chunk_size=4) as reader:
+        assert reader.kind == 'dict'
+        assert list(reader) == data['problems']
+
+
+def test_invalid_top_level_value(tmp_path):
+    with JsonArrayReader(_write(tmp_path, 'text'), keys=('questions',)) as reader:
+        assert reader.kind is None
+        assert list(reader) == []
+
+
+def test_leetcode_transformer_falls_back_to_problems(tmp_path):
+    questions = [_question(1), _question(2)]
+    for data in ({'questions': [], 'problems': questions}, {'problems': questions, 'questions': []}):
+        path = _write(tmp_path, data)
+        result = LeetCodeTransformer().transform_from_file(path)
+        assert [p['external_id'] for p in result['problems']] == ['1', '2']
+        assert result['errors'] == []
+        assert [doc['external_id'] for _, doc in LeetCodeTransformer().iter_from_file(path)] == ['1', '2']
+
+    result = LeetCodeTransformer().transform_from_file(_write(tmp_path, 42))
+    assert result['errors'] == ['Invalid JSON format - expected list or dict']
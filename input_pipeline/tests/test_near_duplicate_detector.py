@@ -0,0 +1,82 @@
+"""
+Near-duplicate detector regression tests.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from normalize_schema.rules.near_duplicate_detector import detect_near_duplicates
+
+from conftest import DESCRIPTIONS, make_problem
+
+
+def _keys(duplicates) -> list:
+    return [d.keys for d in duplicates]
+
+
+def test_cross_source_pair_found_with_descriptions():
+    problems = [
+        make_problem('leetcode', '1', 'Two Sum Queries', 'two-sum-queries'),
+        make_problem('codeforces', '100-A', 'Two Sum Queries'),
+    ]
+    assert _keys(detect_near_duplicates(problems, DESCRIPTIONS)) == [('leetcode:1', 'codeforces:100-A')]
+
+
+def test_cross_source_pair_found_without_descriptions():
+    problems = [
+        make_problem('leetcode', '1', 'Two Sum Queries', 'two-sum-queries'),
+        make_problem('codeforces', '100-A', 'Two Sum Queries'),
+    ]
+    duplicates = detect_near_duplicates(problems)
+    assert _keys(duplicates) == [('leetcode:1', 'codeforces:100-A')]
+    assert duplicates[0].similarity == 1.0
+
+
+def test_same_source_reupload_found_without_descriptions():
+    problems = [
+        make_problem('leetcode', '1', 'Two Sum Queries', 'two-sum-queries'),
+        make_problem('leetcode', '2', 'Two Sum Queries', 'two-sum-queries-2'),
+    ]
+    assert _keys(detect_near_duplicates(problems)) == [('leetcode:1', 'leetcode:2')]
+
+
+def test_same_source_pair_compared_on_descriptions():
+    problems = [
+        make_problem('leetcode', '1', 'Two Sum Queries', 'two-sum-queries'),
+        make_problem('leetcode', '2', 'Two Sum Queries', 'tree-paths'),
+    ]
+    assert detect_near_duplicates(problems, DESCRIPTIONS) == []
+
+
+def test_same_source_short_or_numbered_titles_not_reported():
+    problems = [
+        make_problem('codeforces', '1-A', 'Game'),
+        make_problem('codeforces', '2-A', 'Game'),
+        make_problem('leetcode', '121', 'Best Time to Buy and Sell Stock II'),
+        make_problem('leetcode', '122', 'Best Time to Buy and Sell Stock III'),
+    ]
+    assert detect_near_duplicates(problems) == []
+
+
+def test_codeforces_same_title_problems_not_reported():
+    # Different problems sharing a title on Codeforces (from the corpus),
+    # including same-rating, same-topic pairs
+    problems = [
+        make_problem('codeforces', '1033-C', 'Permutation Game', rating=1600, topics=['brute-force', 'dynamic-programming', 'game-theory']),
+        make_problem('codeforces', '1772-E', 'Permutation Game', rating=1700, topics=['game-theory']),
+        make_problem('codeforces', '1968-D', 'Permutation Game', rating=1300, topics=['game-theory', 'graph', 'greedy']),
+        make_problem('codeforces', '818-B', 'Permutation Game', rating=1600, topics=['implementation']),
+        make_problem('codeforces', '102-B', 'Sum of Digits', rating=1000, topics=['implementation']),
+        make_problem('codeforces', '1373-E', 'Sum of Digits', rating=2200, topics=['brute-force', 'greedy']),
+        make_problem('codeforces', '48-D', 'Permutations', rating=1500, topics=['greedy']),
+        make_problem('codeforces', '187-A', 'Permutations', rating=1500, topics=['greedy']),
+        make_problem('codeforces', '1639-A', 'Treasure Hunt', topics=['graph', 'interactive']),
+        make_problem('codeforces', '1639-B', 'Treasure Hunt', topics=['graph', 'interactive']),
+    ]
+    assert detect_near_duplicates(problems) == []
@@ -0,0 +1,216 @@
+"""
+Query index and snapshot reader tests: indexed lookups must match a plain
+scan of the records.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import json
+import random
+import itertools
+
+import pytest
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from normalize_schema.entity_graph import EntityGraph, load_snapshot_graph
+from normalize_schema.topic_hierarchy import TopicClosure
+from validate_schema.query_index import QueryIndex, intersect_postings, parse_time
+from validate_schema.compression import write_json_compressed
+from validate_schema.snapshot_reader import SnapshotReader, write_offset_indexes
+
+
+# name -> parent
+TOPICS = {
+    'dsa': None,
+    'graph': 'dsa',
+    'trees': 'graph',
+    'dp': 'dsa',
+    'math': None,
+    'geometry': 'math',
+    'strings': None,
+}
+
+SOURCES = ['codeforces', 'leetcode']
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+
+def _corpus(seed: int = 7):
+    rng = random.Random(seed)
+    topics = [
+        {'topic_id': f"t-{name}", 'name': name, 'parent': parent, 'category': 'dsa'}
+        for name, parent in TOPICS.items()
+    ]
+    problems = []
+    for i in range(60):
+        source = rng.choice(SOURCES)
+        tags = rng.sample(list(TOPICS) + ['undefined-topic'], rng.randint(0, 3))
+        if tags and rng.random() < 0.1:
+            tags.append(tags[0])
+        problems.append({
+            'problem_id': f"p-{i}",
+            'source': source,
+            'external_id': str(i),
+            'slug': f"problem-{i}",
+            'title': f"Problem {i}",
+            'difficulty': rng.choice(DIFFICULTIES),
+            'rating': rng.choice([None, 800, 1200, 1200, 1600, 2000, 2400]),
+            'topics': tags,
+        })
+    contests = []
+    for i in range(15):
+        source = rng.choice(SOURCES)
+        members = [p for p in problems if p['source'] == source]
+        picked = rng.sample(members, min(len(members), rng.randint(1, 5)))
+        contests.append({
+            'contest_id': f"c-{i}",
+            'source': source,
+            'external_id': str(1000 + i),
+            'name': f"Round {i}",
+            # Some contests have no start time; a few reference unknown problems
+            'start_time': None if i % 7 == 3 else parse_time(f"20{10 + i:02d}-06-01"),
+            'problems': [{'problem_external_id': p['external_id'], 'index': 'A'} for p in picked]
+            + ([{'problem_external_id': 'missing', 'index': 'Z'}] if i % 5 == 0 else []),
+        })
+    return problems, contests, topics
+
+
+def _scan(problems, contests, closure, source=None, topics=None, under=None, difficulty=None,
+          rating_min=None, rating_max=None, contest_after=None, not_in_contests_before=None):
+    """Plain filter over the records (the reference for QueryIndex.select)."""
+    starts = {}
+    for contest in contests:
+        for ref in contest['problems']:
+            key = (contest['source'], ref['problem_external_id'])
+            starts.setdefault(key, []).append(contest['start_time'])
+
+    matched = []
+    for position, problem in enumerate(problems):
+        tags = problem['topics']
+        expanded = closure.expand(tags)
+        rating = problem['rating']
+        times = starts.get((problem['source'], problem['external_id']), [])
+        if source is not None and problem['source'] != source:
+            continue
+        if any(topic not in tags for topic in topics or []):
+            continue
+        if any(topic not in expanded for topic in under or []):
+            continue
+        if difficulty is not None and problem['difficulty'] != difficulty:
+            continue
+        if rating_min is not None and (rating is None or rating < rating_min):
+            continue
+        if rating_max is not None and (rating is None or rating > rating_max):
+            continue
+        if contest_after is not None and not any(t is not None and t >= contest_after for t in times):
+            continue
+        if not_in_contests_before is not None and any(t is not None and t < not_in_contests_before for t in times):
+            continue
+        matched.append(position)
+    return matched
+
+
+def test_intersect_postings_matches_set_intersection():
+    rng = random.Random(3)
+    for _ in range(200):
+        lists = [sorted(rng.sample(range(50), rng.randint(0, 30))) for _ in range(rng.randint(1, 4))]
+        expected = sorted(set(lists[0]).intersection(*lists[1:]))
+        assert intersect_postings(lists) == expected
+    assert intersect_postings([]) == []
+
+
+def test_select_matches_plain_filter():
+    problems, contests, topics = _corpus()
+    graph = EntityGraph.build(problems, contests, topics)
+    closure = TopicClosure.from_graph(graph)
+    index = QueryIndex.build(problems, contests, closure)
+
+    filters = {
+        'source': [None, 'codeforces', 'leetcode', 'atcoder'],
+        'topics': [None, ['graph'], ['dp', 'math'], ['undefined-topic']],
+        'under': [None, ['dsa'], ['graph'], ['math', 'dsa'], ['strings']],
+        'difficulty': [None, 'medium'],
+        'rating': [(None, None), (1200, None), (None, 1600), (1200, 1200)],
+        'contest_after': [None, parse_time('2015'), parse_time('2019-06-01')],
+        'not_in_contests_before': [None, parse_time('2016-01')],
+    }
+    checked = 0
+    for values in itertools.product(*filters.values()):
+        source, tags, under, difficulty, (rating_min, rating_max), after, before = values
+        kwargs = dict(
+            source=source, topics=tags, under=under, difficulty=difficulty,
+            rating_min=rating_min, rating_max=rating_max,
+            contest_after=after, not_in_contests_before=before,
+        )
+        assert index.select(graph=graph, **kwargs) == _scan(problems, contests, closure, **kwargs), kwargs
+        checked += 1
+    assert checked == 4 * 4 * 5 * 2 * 4 * 3 * 2
+
+
+def test_select_survives_save_and_load(tmp_path):
+    problems, contests, topics = _corpus(seed=11)
+    graph = EntityGraph.build(problems, contests, topics)
+    index = QueryIndex.build(problems, contests, TopicClosure.from_graph(graph))
+    path = str(tmp_path / 'query_index.json')
+    index.save(path)
+    loaded = QueryIndex.load(path)
+    assert loaded.select(under=['dsa'], rating_min=1200, graph=graph) == \
+        index.select(under=['dsa'], rating_min=1200, graph=graph)
+    with pytest.raises(ValueError):
+        loaded.select(contest_after=0)
+
+
+@pytest.mark.parametrize('codec', [None, 'gzip'])
+def test_snapshot_reader_round_trip(tmp_path, codec):
+    problems, contests, topics = _corpus(seed=5)
+    # Non-ASCII text and a pretty-printed file exercise the byte offsets
+    problems[0]['title'] = 'Пермутация — “quotes” ✓'
+    for name, records in (('problems', problems), ('contests', contests), ('topics', topics)):
+        path = str(tmp_path / f"{name}.json")
+        if codec:
+            write_json_compressed(records, path, codec)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False, indent=2)
+    written = write_offset_indexes(str(tmp_path))
+    assert sorted(written) == ['contests.index.json', 'problems.index.json', 'topics.index.json']
+
+    with SnapshotReader(str(tmp_path)) as reader:
+        assert reader.count('problems') == len(problems)
+        assert list(reader.records('problems')) == problems
+        for position, problem in enumerate(problems):
+            assert reader.at('problems', position) == problem
+            assert json.loads(reader.raw('problems', position)) == problem
+            assert reader.get('problems', problem['problem_id']) == problem
+            assert reader.get('problems', (problem['source'], problem['external_id']),
+                              key='source:external_id') == problem
+            assert reader.get('problems', problem['slug'], key='slug') == problem
+        assert reader.get('problems', 'p-missing') is None
+
+        wanted = [contests[3]['contest_id'], 'c-missing', contests[0]['contest_id']]
+        assert reader.get_many('contests', wanted) == [contests[3], None, contests[0]]
+        assert reader.keys('topics', key='name') == list(TOPICS)
+        with pytest.raises(ValueError):
+            reader.get('topics', 'dsa', key='category')
+
+
+@pytest.mark.parametrize('codec', [None, 'gzip'])
+def test_snapshot_graph_rebuilt_from_data_files(tmp_path, codec):
+    # Snapshots without entity_graph.json are indexed from their (possibly
+    # compressed) collections
+    problems, contests, topics = _corpus(seed=9)
+    for name, records in (('problems', problems), ('contests', contests), ('topics', topics)):
+        path = str(tmp_path / f"{name}.json")
+        if codec:
+            write_json_compressed(records, path, codec)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(records, f)
+
+    graph = load_snapshot_graph(str(tmp_path))
+    assert graph.problem_count == len(problems) > 0
+    assert graph.to_dict() == EntityGraph.build(problems, contests, topics).to_dict()
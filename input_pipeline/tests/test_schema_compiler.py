@@ -0,0 +1,184 @@
+"""
+Compiled schema validator tests: fuzzed documents must get the same
+errors as Draft7Validator.iter_errors (path, message, schema path, order).
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import copy
+import json
+import random
+from typing import Any
+
+import pytest
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from normalize_schema import validator as validator_module
+from normalize_schema import schema_compiler
+from normalize_schema.validator import SchemaValidator, SCHEMAS_DIR
+from normalize_schema.schema_compiler import load_compiled_validator, SchemaCompileError
+
+
+# Valid canonical documents the fuzzer starts from
+SEEDS = {
+    'problem': {
+        'problem_id': '484fb0d4-06a5-5c7e-a8a9-1beb43753926',
+        'source': 'codeforces',
+        'external_id': '1-C',
+        'slug': '1-c-ancient-berland-circus',
+        'title': 'Ancient Berland Circus',
+        'difficulty': 'hard',
+        'rating': 2100,
+        'metadata': {
+            'frontend_id': None,
+            'contest_index': 'C',
+            'source_url': 'https://codeforces.com/problemset/problem/1/C',
+        },
+        'topics': ['geometry', 'math'],
+        'content_refs': {
+            'description_path': None,
+            'examples_path': None,
+            'constraints_path': None,
+        },
+    },
+    'contest': {
+        'contest_id': '24ff332c-86d3-59ec-9d0d-a24ef4877e25',
+        'source': 'codeforces',
+        'external_id': '1',
+        'name': 'Codeforces Beta Round 1',
+        'type': 'ICPC',
+        'duration_seconds': 7200,
+        'start_time': 1266580800,
+        'phase': 'FINISHED',
+        'problems': [
+            {'problem_external_id': '1-C', 'index': 'C'},
+            {'problem_external_id': '1-B', 'index': 'B'},
+        ],
+    },
+    'topic': {
+        'topic_id': '2f542f61-79f5-5b20-aebf-218c31e2eb4c',
+        'name': 'binary-search',
+        'parent': None,
+        'category': 'dsa',
+    },
+}
+
+# Values swapped into fields by the fuzzer
+FUZZ_VALUES = [None, True, 0, -1, 1.5, 2.0, '', 'x', 'not-a-uuid', [], ['a', 'a'], [1], {}, {'k': 1}]
+
+FUZZ_COUNT = 2000
+
+
+def _mutate(doc: Any, rng: random.Random) -> Any:
+    """Apply one random mutation somewhere in a document (in place where possible)."""
+    if isinstance(doc, dict) and doc:
+        key = rng.choice(list(doc))
+        action = rng.random()
+        if action < 0.2:
+            del doc[key]
+        elif action < 0.3:
+            doc[f"extra_{rng.randint(0, 3)}"] = rng.choice(FUZZ_VALUES)
+        elif action < 0.7:
+            doc[key] = copy.deepcopy(rng.choice(FUZZ_VALUES))
+        else:
+            doc[key] = _mutate(doc[key], rng)
+        return doc
+    if isinstance(doc, list) and doc:
+        index = rng.randrange(len(doc))
+        if rng.random() < 0.2:
+            doc.append(copy.deepcopy(doc[index]))
+        else:
+            doc[index] = _mutate(doc[index], rng)
+        return doc
+    return copy.deepcopy(rng.choice(FUZZ_VALUES))
+
+
+def _fuzzed(entity_type: str, count: int, seed: int):
+    rng = random.Random(seed)
+    for _ in range(count):
+        doc = copy.deepcopy(SEEDS[entity_type])
+        for _ in range(rng.randint(1, 3)):
+            doc = _mutate(doc, rng)
+        yield doc
+
+
+def _draft7_errors(validator, doc) -> list:
+    return [(tuple(e.absolute_path), e.message, tuple(e.schema_path)) for e in validator.iter_errors(doc)]
+
+
+@pytest.mark.parametrize('entity_type', sorted(SEEDS))
+def test_compiled_errors_match_draft7(entity_type):
+    validator = SchemaValidator('v1.0.0')
+    assert entity_type in validator.compiled
+    compiled = validator.compiled[entity_type]
+    generic = validator.validators[entity_type]
+
+    assert compiled(SEEDS[entity_type]) == [] == _draft7_errors(generic, SEEDS[entity_type])
+    errors_seen = 0
+    for doc in _fuzzed(entity_type, FUZZ_COUNT, seed=42):
+        expected = _draft7_errors(generic, doc)
+        assert compiled(doc) == expected, doc
+        errors_seen += len(expected)
+    assert errors_seen > FUZZ_COUNT
+
+
+def test_validate_entity_same_with_and_without_compiled():
+    compiled = SchemaValidator('v1.0.0', compiled=True)
+    generic = SchemaValidator('v1.0.0', compiled=False)
+    assert not generic.compiled
+    for entity_type in SEEDS:
+        for doc in _fuzzed(entity_type, 200, seed=7):
+            assert compiled.validate_entity(doc, entity_type) == generic.validate_entity(doc, entity_type)
+
+
+@pytest.mark.parametrize('topics', [
+    [1, True], [1, 1.0], [0, False], [[1], [True]], [{'k': 1}, {'k': 1.0}], [{'k': [1]}, {'k': [True]}],
+    [None, None], ['a', 'b'],
+])
+def test_unique_items_uses_json_equality(topics):
+    validator = SchemaValidator('v1.0.0')
+    problem = dict(SEEDS['problem'], topics=topics)
+    expected = _draft7_errors(validator.validators['problem'], problem)
+    assert validator.compiled['problem'](problem) == expected
+
+
+def test_cache_keyed_by_jsonschema_version(monkeypatch):
+    with open(os.path.join(SCHEMAS_DIR, 'v1.0.0', 'topic.schema.json'), 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    current = schema_compiler._schema_hash(schema)
+    monkeypatch.setattr(schema_compiler, 'JSONSCHEMA_VERSION', '0.0.0')
+    assert schema_compiler._schema_hash(schema) != current
+
+
+def test_unsupported_keyword_falls_back_to_draft7(tmp_path, monkeypatch):
+    with open(os.path.join(SCHEMAS_DIR, 'v1.0.0', 'problem.schema.json'), 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    schema['properties']['rating']['multipleOf'] = 100
+    os.makedirs(tmp_path / 'v-test')
+    with open(tmp_path / 'v-test' / 'problem.schema.json', 'w', encoding='utf-8') as f:
+        json.dump(schema, f)
+
+    with pytest.raises(SchemaCompileError, match='multipleOf'):
+        load_compiled_validator(schema, 'problem', 'v-test', cache_dir=str(tmp_path / 'compiled'))
+
+    monkeypatch.setattr(validator_module, 'SCHEMAS_DIR', str(tmp_path))
+    validator = SchemaValidator('v-test')
+    assert 'problem' not in validator.compiled
+    generic = validator.validators['problem']
+
+    problem = dict(SEEDS['problem'], rating=2150)
+    errors = validator.validate_entity(problem, 'problem')
+    assert [(e['path'], e['schema_path']) for e in errors] == [('rating', 'properties.rating.multipleOf')]
+    for doc in _fuzzed('problem', 200, seed=3):
+        expected = [
+            {'path': '.'.join(str(p) for p in path), 'message': message,
+             'schema_path': '.'.join(str(p) for p in schema_path)}
+            for path, message, schema_path in _draft7_errors(generic, doc)
+        ]
+        actual = [{k: e[k] for k in ('path', 'message', 'schema_path')} for e in validator.validate_entity(doc, 'problem')]
+        assert actual == expected
@@ -0,0 +1,98 @@
+"""
+Similarity index tests: the vectorized top-K must match a brute-force
+ranking computed with exact fractions.
+
+Skipped when NumPy is not installed.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import random
+from fractions import Fraction
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from validate_schema.similarity_index import (
+    RATING_WEIGHT,
+    UNRATED_DISTANCE,
+    nearest_problems,
+    problem_profiles,
+)
+
+
+def _corpus(rng: random.Random, count: int, topic_count: int):
+    """Few distinct topic sets and ratings, so profiles and ties repeat."""
+    topic_sets = [
+        frozenset(t for t in range(topic_count) if rng.random() < 0.4)
+        for _ in range(rng.randint(1, 6))
+    ]
+    rating_values = [None] + rng.sample(range(800, 3600, 100), rng.randint(1, 4))
+    rows = [(rng.choice(topic_sets), rng.choice(rating_values)) for _ in range(count)]
+
+    matrix = np.zeros((count, topic_count), dtype=np.float32)
+    for position, (topics, _) in enumerate(rows):
+        matrix[position, sorted(topics)] = 1.0
+    ratings = np.array([np.nan if r is None else r for _, r in rows], dtype=np.float64)
+    return rows, matrix, ratings
+
+
+def _brute_force(rows, k: int):
+    """Exact scores of every pair, ranked by (score desc, position asc)."""
+    rated = [r for _, r in rows if r is not None]
+    span = max(rated) - min(rated) if rated else 0
+    weight = Fraction(RATING_WEIGHT)
+
+    expected = []
+    for i, (topics_i, rating_i) in enumerate(rows):
+        ranked = []
+        for j, (topics_j, rating_j) in enumerate(rows):
+            shared = len(topics_i & topics_j)
+            if j == i or shared == 0:
+                continue
+            if rating_i is None or rating_j is None:
+                penalty = weight * Fraction(UNRATED_DISTANCE)
+            elif span > 0:
+                penalty = weight * Fraction(abs(rating_i - rating_j), span)
+            else:
+                penalty = Fraction(0)
+            ranked.append((-(Fraction(shared, len(topics_i | topics_j)) - penalty), j))
+        ranked.sort()
+        expected.append([(j, -score) for score, j in ranked])
+    return expected
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_nearest_problems_match_brute_force(seed):
+    rng = random.Random(seed)
+    count = rng.randint(1, 60)
+    k = rng.randint(1, 12)
+    rows, matrix, ratings = _corpus(rng, count, topic_count=rng.randint(1, 8))
+
+    positions, scores = nearest_problems(matrix, ratings, k=k, block_size=rng.choice([1, 3, 256]))
+
+    k = min(k, count - 1)
+    assert positions.shape == scores.shape == (count, k)
+    for problem, ranked in enumerate(_brute_force(rows, k)):
+        best = ranked[:k]
+        padding = k - len(best)
+        assert positions[problem].tolist() == [j for j, _ in best] + [-1] * padding
+        assert scores[problem].tolist() == pytest.approx(
+            [float(score) for _, score in best] + [0.0] * padding, abs=1e-6
+        )
+
+
+def test_profiles_group_identical_topics_and_rating():
+    matrix = np.array([[1, 0], [0, 1], [1, 0], [1, 0], [0, 0]], dtype=np.float32)
+    ratings = np.array([1200, np.nan, 1200, 1300, np.nan])
+
+    first, members = problem_profiles(matrix, ratings)
+    assert first.tolist() == [0, 1, 3, 4]
+    assert [group.tolist() for group in members] == [[0, 2], [1], [3], [4]]
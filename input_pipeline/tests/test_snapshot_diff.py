@@ -0,0 +1,72 @@
+"""
+Snapshot diff tests: the change feed must report added, removed and
+changed records, and nothing for records that are equal JSON.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import io
+import os
+import sys
+import json
+
+import pytest
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from validate_schema.compression import write_json_compressed
+from validate_schema.snapshot_diff import diff_snapshots, write_change_feed
+from validate_schema.snapshot_reader import write_offset_indexes
+
+from conftest import make_problem, make_topic
+
+
+def _write_snapshot(directory, problems, topics, codec=None):
+    directory.mkdir()
+    for name, records in (('problems', problems), ('contests', []), ('topics', topics)):
+        path = str(directory / f"{name}.json")
+        if codec:
+            write_json_compressed(records, path, codec)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False, separators=(',', ':'))
+    write_offset_indexes(str(directory))
+    return str(directory)
+
+
+@pytest.mark.parametrize('codec', [None, 'gzip'])
+def test_change_feed(tmp_path, codec):
+    kept, edited, dropped = (make_problem('codeforces', f"1-{i}") for i in 'ABC')
+    added = make_problem('codeforces', '2-A', 'Fresh Problem')
+
+    # Same record with its keys in another order: different bytes, equal JSON
+    reordered = dict(reversed(list(kept.items())))
+    assert json.dumps(reordered) != json.dumps(kept)
+    renamed = dict(edited, title='Renamed', metadata=dict(edited['metadata'], contest_index='B'))
+
+    old_dir = _write_snapshot(tmp_path / 'old', [kept, edited, dropped], [make_topic('math')], codec)
+    new_dir = _write_snapshot(tmp_path / 'new', [added, reordered, renamed], [make_topic('math')], codec)
+
+    changes = list(diff_snapshots(old_dir, new_dir))
+    assert changes == [
+        {'op': 'added', 'collection': 'problems', 'key': added['problem_id'], 'record': added},
+        {'op': 'changed', 'collection': 'problems', 'key': edited['problem_id'], 'changes': [
+            {'field': 'title', 'old': 'Problem 1-B', 'new': 'Renamed'},
+            {'field': 'metadata.contest_index', 'old': None, 'new': 'B'},
+        ]},
+        {'op': 'removed', 'collection': 'problems', 'key': dropped['problem_id'], 'record': dropped},
+    ]
+
+    stream = io.StringIO()
+    summary = write_change_feed(iter(changes), stream)
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == changes
+    assert summary == {'problems': {
+        'added': 1, 'removed': 1, 'changed': 1,
+        'fields': {'title': 1, 'metadata.contest_index': 1},
+    }}
+
+    assert list(diff_snapshots(old_dir, old_dir)) == []
+    with pytest.raises(ValueError):
+        list(diff_snapshots(old_dir, new_dir, ['submissions']))
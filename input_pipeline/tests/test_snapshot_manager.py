@@ -0,0 +1,375 @@
+"""
+Snapshot lifecycle tests: version ordering, atomic publishing, staging
+cleanup and schema migration, in a temporary validated/ directory.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import json
+import uuid
+import shutil
+import multiprocessing
+
+import pytest
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from normalize_schema import migrations
+from normalize_schema import validator as validator_module
+from normalize_schema.migrations import Migration
+from normalize_schema.validator import SCHEMAS_DIR
+from validate_schema import snapshot_manager
+from validate_schema.snapshot_catalog import (
+    CATALOG_FILE,
+    CATALOG_LOCK_FILE,
+    add_to_catalog,
+    load_catalog,
+    rebuild_catalog,
+    sort_versions,
+)
+from validate_schema.snapshot_manager import (
+    STAGING_PREFIX,
+    create_snapshot,
+    get_existing_versions,
+    get_next_version,
+    migrate_snapshot,
+    publish_snapshot,
+    verify_snapshot,
+)
+
+from conftest import make_problem, make_topic
+
+
+DATA_FILES = ['problems.json', 'contests.json', 'topics.json']
+
+
+@pytest.fixture
+def validated_dir(tmp_path, monkeypatch):
+    """Point the snapshot manager at an empty validated/ directory."""
+    directory = tmp_path / 'validated'
+    directory.mkdir()
+    monkeypatch.setattr(snapshot_manager, 'VALIDATED_DIR', str(directory))
+    return directory
+
+
+def _data(titles=('Theatre Square', 'Spreadsheet', 'Winner')) -> dict:
+    problems = [
+        make_problem(
+            'codeforces', f"{i}-A", title,
+            slug=f"{i}-a-{title.lower().replace(' ', '-')}",
+            rating=800 + 100 * i,
+            metadata={
+                'frontend_id': None,
+                'contest_index': 'A',
+                'source_url': f"https://codeforces.com/problemset/problem/{i}/A",
+            },
+        )
+        for i, title in enumerate(titles, start=1)
+    ]
+    contests = [{
+        'contest_id': str(uuid.uuid5(uuid.NAMESPACE_URL, 'contest:codeforces:1')),
+        'source': 'codeforces',
+        'external_id': '1',
+        'name': 'Codeforces Beta Round 1',
+        'type': 'ICPC',
+        'duration_seconds': 7200,
+        'start_time': 1266580800,
+        'phase': 'FINISHED',
+        'problems': [{'problem_external_id': p['external_id'], 'index': 'A'} for p in problems],
+    }]
+    return {'problems': problems, 'contests': contests, 'topics': [make_topic('math')]}
+
+
+def _create(version: str, tmp_path, **kwargs) -> dict:
+    kwargs.setdefault('data', _data())
+    result = create_snapshot(version, leetcode_file=str(tmp_path / 'no-leetcode.json'), **kwargs)
+    assert result['success'], result['error']
+    return result
+
+
+def _hidden(validated_dir) -> list:
+    """Leftover staging/work directories and unlinked releases (the catalog
+    lock file and the releases versions point at stay by design)."""
+    linked = {
+        os.readlink(os.path.join(validated_dir, name))
+        for name in os.listdir(validated_dir)
+        if os.path.islink(os.path.join(validated_dir, name))
+    }
+    return sorted(
+        name for name in os.listdir(validated_dir)
+        if name.startswith('.') and name != CATALOG_LOCK_FILE and name not in linked
+    )
+
+
+def _visible(validated_dir) -> list:
+    return sorted(name for name in os.listdir(validated_dir) if not name.startswith('.'))
+
+
+def test_versions_sort_semantically(validated_dir, tmp_path):
+    assert sort_versions(['v1.10.0', 'v1.9.0', 'v1.9.10', 'v1.9.2', 'v2.0.0', 'latest']) == \
+        ['latest', 'v1.9.0', 'v1.9.2', 'v1.9.10', 'v1.10.0', 'v2.0.0']
+
+    # Created newest first, so directory and creation order both disagree with semver
+    _create('v1.10.0', tmp_path)
+    _create('v1.9.0', tmp_path)
+    assert get_existing_versions() == ['v1.9.0', 'v1.10.0']
+    assert get_next_version('patch') == 'v1.10.1'
+    assert get_next_version('minor') == 'v1.11.0'
+
+    catalog = load_catalog(str(validated_dir))
+    assert [entry['version'] for entry in catalog['snapshots']] == ['v1.9.0', 'v1.10.0']
+    assert catalog['latest'] == 'v1.10.0'
+
+    os.remove(validated_dir / CATALOG_FILE)
+    rebuilt = rebuild_catalog(str(validated_dir))
+    assert [entry['version'] for entry in rebuilt['snapshots']] == ['v1.9.0', 'v1.10.0']
+    assert rebuilt['latest'] == 'v1.10.0'
+
+
+def _add_versions(validated_dir: str, manifest_path: str, versions):
+    for version in versions:
+        add_to_catalog(validated_dir, {'version': version, 'counts': {}, 'checksums': {}}, manifest_path)
+
+
+def test_concurrent_catalog_writers_keep_every_entry(validated_dir, tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    manifest_path.write_text('{}')
+    ctx = multiprocessing.get_context('fork')
+    writers = [
+        ctx.Process(target=_add_versions, args=(
+            str(validated_dir), str(manifest_path), [f"v1.{worker}.{i}" for i in range(15)]))
+        for worker in range(4)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+
+    catalog = load_catalog(str(validated_dir))
+    assert len(catalog['snapshots']) == 60
+    assert catalog['latest'] == 'v1.3.14'
+
+
+def test_reading_a_missing_catalog_does_not_write(validated_dir, tmp_path):
+    _create('v1.0.0', tmp_path)
+    os.remove(validated_dir / CATALOG_FILE)
+    before = sorted(os.listdir(validated_dir))
+
+    assert snapshot_manager.get_latest_version() == 'v1.0.0'
+    assert [entry['version'] for entry in snapshot_manager.list_snapshots()] == ['v1.0.0']
+    assert verify_snapshot('v1.0.0')['valid']
+    assert sorted(os.listdir(validated_dir)) == before
+
+
+def test_publish_replace_leaves_no_partial_directory(validated_dir):
+    snapshot_dir = validated_dir / 'v1.0.0'
+    snapshot_dir.mkdir()
+    (snapshot_dir / 'problems.json').write_text('old')
+    (snapshot_dir / 'stale.json').write_text('old only')
+
+    staging_dir = validated_dir / f"{STAGING_PREFIX}v1.0.0-1"
+    staging_dir.mkdir()
+    (staging_dir / 'problems.json').write_text('new')
+
+    with pytest.raises(FileExistsError):
+        publish_snapshot(str(staging_dir), str(snapshot_dir))
+    assert (snapshot_dir / 'problems.json').read_text() == 'old'
+
+    publish_snapshot(str(staging_dir), str(snapshot_dir), replace=True)
+    assert sorted(os.listdir(snapshot_dir)) == ['problems.json']
+    assert (snapshot_dir / 'problems.json').read_text() == 'new'
+    assert os.path.islink(snapshot_dir)
+    assert _hidden(validated_dir) == []
+    assert _visible(validated_dir) == ['v1.0.0']
+
+
+def test_replacing_a_release_never_leaves_the_version_missing(validated_dir, monkeypatch):
+    snapshot_dir = str(validated_dir / 'v1.0.0')
+    for content in ('first', 'second'):
+        staging_dir = validated_dir / f"{STAGING_PREFIX}v1.0.0-1"
+        staging_dir.mkdir()
+        (staging_dir / 'problems.json').write_text(content)
+        if content == 'first':
+            publish_snapshot(str(staging_dir), snapshot_dir)
+            first_release = os.readlink(snapshot_dir)
+            continue
+
+        # Every filesystem step of the swap runs with the version resolvable
+        seen = []
+        real_replace, real_symlink, real_rmtree = os.replace, os.symlink, shutil.rmtree
+
+        def observe(real):
+            def step(*args, **kwargs):
+                seen.append(open(os.path.join(snapshot_dir, 'problems.json')).read())
+                result = real(*args, **kwargs)
+                seen.append(open(os.path.join(snapshot_dir, 'problems.json')).read())
+                return result
+            return step
+
+        monkeypatch.setattr(os, 'replace', observe(real_replace))
+        monkeypatch.setattr(os, 'symlink', observe(real_symlink))
+        monkeypatch.setattr(shutil, 'rmtree', observe(real_rmtree))
+        publish_snapshot(str(staging_dir), snapshot_dir, replace=True)
+        monkeypatch.undo()
+
+    assert seen[0] == 'first' and seen[-1] == 'second'
+    assert set(seen) == {'first', 'second'}
+    assert not os.path.exists(validated_dir / first_release)
+    assert open(os.path.join(snapshot_dir, 'problems.json')).read() == 'second'
+    assert _hidden(validated_dir) == []
+
+
+def test_force_overwrite_replaces_snapshot_atomically(validated_dir, tmp_path):
+    _create('v1.0.0', tmp_path)
+    replaced = _create('v1.0.0', tmp_path, data=_data(titles=('Other Title',)), force=True)
+
+    assert replaced['manifest']['counts']['problems'] == 1
+    assert verify_snapshot('v1.0.0')['valid']
+    assert _hidden(validated_dir) == []
+    catalog = load_catalog(str(validated_dir))
+    assert [(e['version'], e['counts']['problems']) for e in catalog['snapshots']] == [('v1.0.0', 1)]
+
+    refused = create_snapshot('v1.0.0', data=_data(), leetcode_file=str(tmp_path / 'none.json'))
+    assert not refused['success'] and 'already exists' in refused['error']
+
+
+def test_failed_build_removes_staging_directory(validated_dir, tmp_path, monkeypatch):
+    _create('v1.0.0', tmp_path)
+    catalog = (validated_dir / CATALOG_FILE).read_bytes()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(snapshot_manager, 'write_offset_indexes', fail)
+    with pytest.raises(RuntimeError, match="disk full"):
+        create_snapshot('v1.0.1', data=_data(), leetcode_file=str(tmp_path / 'none.json'))
+    # Rebuilding the same version over an existing one fails the same way
+    with pytest.raises(RuntimeError):
+        create_snapshot('v1.0.0', data=_data(), force=True, leetcode_file=str(tmp_path / 'none.json'))
+    monkeypatch.undo()
+
+    def refuse(*args, **kwargs):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(snapshot_manager, 'VALIDATED_DIR', str(validated_dir))
+    monkeypatch.setattr(snapshot_manager, 'publish_snapshot', refuse)
+    failed = create_snapshot('v1.0.2', data=_data(), leetcode_file=str(tmp_path / 'none.json'))
+    assert not failed['success'] and 'read-only' in failed['error']
+
+    assert _hidden(validated_dir) == []
+    assert _visible(validated_dir) == [CATALOG_FILE, 'v1.0.0']
+    assert (validated_dir / CATALOG_FILE).read_bytes() == catalog
+    assert verify_snapshot('v1.0.0')['valid']
+
+
+@pytest.mark.parametrize('options', [{}, {'compression': 'gzip', 'shard_count': 2}])
+def test_same_version_migration_is_byte_identical(validated_dir, tmp_path, options):
+    source = _create('v1.0.0', tmp_path, **options)
+    migrated = migrate_snapshot('v1.0.0', source['manifest']['schema_version'], new_version='v1.1.0')
+
+    assert migrated['success'], migrated['error']
+    assert migrated['steps'] == []
+    source_dir, target_dir = validated_dir / 'v1.0.0', validated_dir / 'v1.1.0'
+    stored = sorted(
+        name for name in os.listdir(source_dir)
+        if name not in ('manifest.json', 'checksum.txt')
+    )
+    assert stored == sorted(
+        name for name in os.listdir(target_dir)
+        if name not in ('manifest.json', 'checksum.txt')
+    )
+    assert any(name.startswith(tuple(DATA_FILES)) for name in stored)
+    for name in stored:
+        files = sorted(os.listdir(source_dir / name)) if os.path.isdir(source_dir / name) else ['']
+        for filename in files:
+            path = os.path.join(name, filename) if filename else name
+            assert (source_dir / path).read_bytes() == (target_dir / path).read_bytes(), path
+
+    source_manifest = json.loads((source_dir / 'manifest.json').read_text(encoding='utf-8'))
+    target_manifest = json.loads((target_dir / 'manifest.json').read_text(encoding='utf-8'))
+    assert target_manifest['checksums'] == source_manifest['checksums']
+    assert target_manifest.get('shards') == source_manifest.get('shards')
+    assert _hidden(validated_dir) == []
+
+
+@pytest.fixture
+def schema_v110(tmp_path, monkeypatch):
+    """A v1.1.0 schema whose problems require 'tags', next to a copy of v1.0.0
+    (compiled into a temporary cache, not the source tree)."""
+    schemas_dir = tmp_path / 'schemas'
+    shutil.copytree(os.path.join(SCHEMAS_DIR, 'v1.0.0'), schemas_dir / 'v1.0.0')
+    shutil.copytree(os.path.join(SCHEMAS_DIR, 'v1.0.0'), schemas_dir / 'v1.1.0')
+    problem_schema = schemas_dir / 'v1.1.0' / 'problem.schema.json'
+    schema = json.loads(problem_schema.read_text(encoding='utf-8'))
+    schema['properties']['tags'] = {'type': 'array', 'items': {'type': 'string'}}
+    schema['required'].append('tags')
+    problem_schema.write_text(json.dumps(schema), encoding='utf-8')
+
+    monkeypatch.setattr(validator_module, 'SCHEMAS_DIR', str(schemas_dir))
+    monkeypatch.setattr(snapshot_manager, 'SCHEMAS_DIR', str(schemas_dir))
+    monkeypatch.setattr(validator_module, 'COMPILED_DIR', str(tmp_path / 'compiled'))
+    return 'v1.1.0'
+
+
+def _use_migration(monkeypatch, problem=None, contest=None):
+    step = Migration('v1.0.0', 'v1.1.0', problem=problem, contest=contest)
+    monkeypatch.setattr(migrations, 'load_migrations', lambda: {'v1.0.0': step})
+
+
+def _add_tags(problem):
+    if problem['external_id'] == '2-A':
+        return None
+    return dict(problem, tags=list(problem['topics']))
+
+
+def _drop_contest_ref(contest):
+    refs = [ref for ref in contest['problems'] if ref['problem_external_id'] != '2-A']
+    return dict(contest, problems=refs)
+
+
+@pytest.mark.parametrize('options', [{}, {'compression': 'gzip'}])
+def test_migration_transforms_and_drops_records(validated_dir, tmp_path, monkeypatch, schema_v110, options):
+    _create('v1.0.0', tmp_path, **options)
+    _use_migration(monkeypatch, problem=_add_tags, contest=_drop_contest_ref)
+
+    migrated = migrate_snapshot('v1.0.0', schema_v110)
+
+    assert migrated['success'], migrated['error']
+    assert migrated['version'] == 'v1.1.0'
+    assert migrated['steps'] == ['v1.0.0 → v1.1.0']
+    assert migrated['counts']['problems'] == {'read': 3, 'written': 2, 'dropped': 1}
+    assert migrated['counts']['contests'] == {'read': 1, 'written': 1, 'dropped': 0}
+    assert migrated['validation'].is_valid
+    assert migrated['snapshot']['manifest']['schema_version'] == schema_v110
+    assert migrated['snapshot']['manifest'].get('compression') == options.get('compression')
+    assert verify_snapshot('v1.1.0')['valid']
+
+    with snapshot_manager.open_snapshot('v1.1.0') as reader:
+        problems = list(reader.records('problems'))
+    assert [p['external_id'] for p in problems] == ['1-A', '3-A']
+    assert all(p['tags'] == ['math'] for p in problems)
+    assert _hidden(validated_dir) == []
+
+
+def test_migration_failing_target_validation_publishes_nothing(validated_dir, tmp_path, monkeypatch, schema_v110):
+    _create('v1.0.0', tmp_path)
+    catalog = (validated_dir / CATALOG_FILE).read_bytes()
+    # Drops a problem the contest still references and never adds 'tags'
+    _use_migration(monkeypatch, problem=lambda p: None if p['external_id'] == '2-A' else p)
+
+    migrated = migrate_snapshot('v1.0.0', schema_v110, new_version='v1.1.0')
+
+    assert not migrated['success']
+    assert 'fails v1.1.0 validation' in migrated['error']
+    validation = migrated['validation']
+    assert validation.count('schema') == 2
+    assert validation.count('orphan') == 1
+    assert migrated['snapshot'] is None
+    assert _hidden(validated_dir) == []
+    assert _visible(validated_dir) == [CATALOG_FILE, 'v1.0.0']
+    assert (validated_dir / CATALOG_FILE).read_bytes() == catalog
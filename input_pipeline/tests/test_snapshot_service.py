@@ -0,0 +1,145 @@
+"""
+Snapshot service tests: responses, revalidation and swapping to a new
+version without dropping the requests still reading the old one.
+
+Run from input_pipeline/:
+    python3 -m pytest tests
+"""
+
+import os
+import sys
+import json
+import threading
+import http.client
+
+import pytest
+
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_DIR)
+
+from validate_schema import snapshot_manager
+from validate_schema import snapshot_service
+from validate_schema.snapshot_manager import create_snapshot
+from validate_schema.snapshot_service import SnapshotService, SnapshotView, start_service
+
+from conftest import make_contest, make_problem, make_topic
+
+
+def _publish(version: str, tmp_path, titles=('Theatre Square', 'Spreadsheet')):
+    problems = [
+        make_problem('codeforces', f"1-{index}", title, rating=800 + 100 * i)
+        for i, (index, title) in enumerate(zip('AB', titles))
+    ]
+    data = {
+        'problems': problems,
+        'contests': [make_contest('codeforces', '1', [p['external_id'] for p in problems])],
+        'topics': [make_topic('math')],
+    }
+    result = create_snapshot(version, data=data, leetcode_file=str(tmp_path / 'no-leetcode.json'))
+    assert result['success'], result['error']
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Service over a tmp validated/ holding v1.0.0, listening on a free port."""
+    validated_dir = tmp_path / 'validated'
+    validated_dir.mkdir()
+    monkeypatch.setattr(snapshot_manager, 'VALIDATED_DIR', str(validated_dir))
+    monkeypatch.setattr(snapshot_service, 'VALIDATED_DIR', str(validated_dir))
+    _publish('v1.0.0', tmp_path)
+
+    service = SnapshotService()
+    server = start_service(service, port=0)
+    service.port = server.server_address[1]
+    yield service
+    server.shutdown()
+    server.server_close()
+    service.view.close()
+
+
+def _get(service, path: str, etag: str = None):
+    connection = http.client.HTTPConnection('127.0.0.1', service.port, timeout=10)
+    try:
+        connection.request('GET', path, headers={'If-None-Match': etag} if etag else {})
+        response = connection.getresponse()
+        body = response.read()
+        return response.status, dict(response.getheaders()), json.loads(body) if body else None
+    finally:
+        connection.close()
+
+
+def test_responses_and_revalidation(service):
+    status, headers, body = _get(service, '/problems/theatre-square')
+    assert status == 200
+    assert body['problem']['external_id'] == '1-A'
+    assert headers['X-Snapshot-Version'] == 'v1.0.0'
+    etag = headers['ETag']
+
+    status, headers, body = _get(service, '/problems/theatre-square', etag=etag)
+    assert (status, body) == (304, None)
+    assert headers['ETag'] == etag
+    assert _get(service, '/problems/theatre-square', etag='"other"')[0] == 200
+
+    status, _, body = _get(service, '/contests/codeforces:1')
+    assert [p['title'] for p in body['problems']] == ['Theatre Square', 'Spreadsheet']
+    assert _get(service, '/problems?rating_min=850')[2]['count'] == 1
+
+    assert _get(service, '/problems?rating_min=high')[0] == 400
+    assert _get(service, '/problems/missing')[0] == 404
+    assert _get(service, '/contests/codeforces:9')[0] == 404
+    assert _get(service, '/nowhere')[0] == 404
+
+
+def test_swap_keeps_in_flight_request_on_old_version(service, tmp_path, monkeypatch):
+    old = service.view
+    old_etag = old.etag
+    closed = []
+    close = old.close
+
+    def recording_close():
+        closed.append(old.version)
+        close()
+
+    monkeypatch.setattr(old, 'close', recording_close)
+
+    # The next request holds the old view until released
+    entered, proceed = threading.Event(), threading.Event()
+    route = SnapshotView.route
+
+    def blocking_route(url):
+        entered.set()
+        assert proceed.wait(10)
+        return route(old, url)
+
+    monkeypatch.setattr(old, 'route', blocking_route)
+    in_flight = {}
+    request = threading.Thread(
+        target=lambda: in_flight.update(response=_get(service, '/problems/theatre-square'))
+    )
+    request.start()
+    assert entered.wait(10)
+
+    _publish('v1.0.1', tmp_path, titles=('Theatre Square', 'Winner'))
+    assert service.refresh()
+    assert service.view.version == 'v1.0.1'
+    assert old.retired and old.active == 1
+    assert closed == []
+
+    # New requests see the new version; the old ETag no longer matches
+    status, headers, body = _get(service, '/problems/theatre-square', etag=old_etag)
+    assert status == 200
+    assert headers['X-Snapshot-Version'] == 'v1.0.1'
+    assert headers['ETag'] != old_etag
+    assert _get(service, '/problems/winner')[0] == 200
+
+    proceed.set()
+    request.join(10)
+    status, headers, body = in_flight['response']
+    assert status == 200
+    assert headers['X-Snapshot-Version'] == 'v1.0.0'
+    assert body['problem']['title'] == 'Theatre Square'
+    # Closed by the last request holding it, exactly once
+    assert closed == ['v1.0.0']
+    assert old.active == 0
+
+    assert not service.refresh()
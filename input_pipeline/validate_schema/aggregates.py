@@ -0,0 +1,142 @@
+"""
+Snapshot Aggregates
+
+Dashboard tables precomputed at snapshot time and stored in
+aggregates.json (referenced from manifest.json):
+- Difficulty distribution per source
+- Rating histogram per source (RATING_BUCKET-wide buckets)
+- Problem count per topic and source
+- Problem count per contest
+
+Everything is derived from indexes the snapshot already builds (the query
+index postings and the entity graph), so no pass over problems.json is
+needed, neither here nor by the consumers (upload, cache warmup).
+"""
+
+import os
+import json
+from typing import Dict, List, Any, Optional
+
+from normalize_schema.entity_graph import EntityGraph, load_snapshot_graph
+from validate_schema.query_index import QueryIndex, load_query_index
+
+
+# Bump when the table layout changes
+AGGREGATES_FORMAT = 1
+
+AGGREGATES_FILE = "aggregates.json"
+
+# Rating histogram bucket width
+RATING_BUCKET = 100
+
+
+def _source_of(index: QueryIndex) -> List[str]:
+    """Source name per problem position."""
+    sources = [''] * index.problem_count
+    for source, positions in index.source.items():
+        for position in positions:
+            sources[position] = source
+    return sources
+
+
+def _count_by_source(positions: List[int], sources: List[str]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for position in positions:
+        counts[sources[position]] = counts.get(sources[position], 0) + 1
+    return counts
+
+
+def build_aggregates(index: QueryIndex, graph: EntityGraph) -> Dict[str, Any]:
+    """
+    Build the aggregate tables of a snapshot.
+
+    Args:
+        index: Query index of the snapshot's problems
+        graph: Entity graph of the snapshot
+
+    Returns:
+        Aggregates dict (as stored in aggregates.json)
+    """
+    sources = _source_of(index)
+
+    difficulty: Dict[str, Dict[str, int]] = {}
+    for level, positions in index.difficulty.items():
+        for source, count in _count_by_source(positions, sources).items():
+            difficulty.setdefault(source, {})[level] = count
+
+    histogram: Dict[str, Dict[str, int]] = {}
+    rated: Dict[str, int] = {}
+    for value, position in zip(index.rating['values'], index.rating['positions']):
+        source = sources[position]
+        bucket = str(int(value // RATING_BUCKET * RATING_BUCKET))
+        counts = histogram.setdefault(source, {})
+        counts[bucket] = counts.get(bucket, 0) + 1
+        rated[source] = rated.get(source, 0) + 1
+
+    problems_per_source = {source: len(positions) for source, positions in index.source.items()}
+
+    return {
+        'format': AGGREGATES_FORMAT,
+        'problems': index.problem_count,
+        'problems_per_source': problems_per_source,
+        'difficulty': difficulty,
+        'rating_histogram': {
+            'bucket': RATING_BUCKET,
+            'counts': histogram,
+            'unrated': {
+                source: total - rated.get(source, 0)
+                for source, total in problems_per_source.items()
+            },
+        },
+        'topics': {
+            topic: _count_by_source(positions, sources)
+            for topic, positions in sorted(index.topics.items())
+        },
+        'contest_problems': {
+            graph.contest_ids[contest]: graph.contest_problems.degree(contest)
+            for contest in range(len(graph.contest_ids))
+        },
+    }
+
+
+def save_aggregates(aggregates: Dict[str, Any], filepath: str):
+    """Write aggregates as JSON."""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(aggregates, f, indent=2, ensure_ascii=False)
+
+
+def load_aggregates(snapshot_dir: str) -> Dict[str, Any]:
+    """
+    Aggregates of a snapshot directory.
+
+    Snapshots created before aggregates were stored are aggregated from
+    their indexes (or data files).
+
+    Args:
+        snapshot_dir: Snapshot directory
+
+    Returns:
+        Aggregates dict
+    """
+    filepath = os.path.join(snapshot_dir, AGGREGATES_FILE)
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            aggregates = json.load(f)
+        if aggregates.get('format') == AGGREGATES_FORMAT:
+            return aggregates
+    return build_aggregates(load_query_index(snapshot_dir), load_snapshot_graph(snapshot_dir))
+
+
+def topic_totals(aggregates: Dict[str, Any]) -> Dict[str, int]:
+    """Problem count per topic over all sources."""
+    return {topic: sum(counts.values()) for topic, counts in aggregates['topics'].items()}
+
+
+def difficulty_totals(aggregates: Dict[str, Any], source: Optional[str] = None) -> Dict[str, int]:
+    """Difficulty distribution of one source, or over all sources."""
+    totals: Dict[str, int] = {}
+    for name, counts in aggregates['difficulty'].items():
+        if source is None or name == source:
+            for level, count in counts.items():
+                totals[level] = totals.get(level, 0) + count
+    return totals
@@ -0,0 +1,253 @@
+"""
+Snapshot Compression
+
+Optional compressed storage for snapshot data files:
+- gzip and lzma from the standard library, zstd when the zstandard
+  package is installed
+- a compressed file keeps its logical name plus the codec suffix
+  (problems.json.gz, problems.json.xz, problems.json.zst)
+- writes are streamed through the compressor while both the compressed
+  bytes and the logical content are hashed, so the manifest can record
+  both checksums without a second pass
+- readers locate a data file in either form and decompress it in chunks
+
+Compressed output is deterministic (no timestamps in gzip headers), so an
+unchanged file compresses to the same bytes and the same checksum.
+"""
+
+import os
+import gzip
+import lzma
+import json
+import hashlib
+from typing import Dict, Any, Iterable, Optional
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+# Codec → file suffix
+CODECS = {
+    'gzip': '.gz',
+    'lzma': '.xz',
+    'zstd': '.zst',
+}
+
+COMPRESSION_LEVELS = {
+    'gzip': 6,
+    'lzma': 6,
+    'zstd': 10,
+}
+
+# Bytes read or buffered per step when streaming
+CHUNK_SIZE = 1 << 20
+
+
+def available_codecs() -> list:
+    """Codecs usable in this environment."""
+    return [codec for codec in CODECS if codec != 'zstd' or HAS_ZSTD]
+
+
+def check_codec(codec: str):
+    """Raise ValueError if a codec is unknown or its library is missing."""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression: {codec} (expected one of {', '.join(CODECS)})")
+    if codec == 'zstd' and not HAS_ZSTD:
+        raise ValueError("zstd compression needs the zstandard package (pip install zstandard)")
+
+
+def codec_of(path: str) -> Optional[str]:
+    """Codec of a file by its suffix (None if stored uncompressed)."""
+    for codec, suffix in CODECS.items():
+        if path.endswith(suffix):
+            return codec
+    return None
+
+
+def find_data_file(directory: str, filename: str) -> Optional[str]:
+    """
+    Path of a data file stored plain or compressed.
+
+    Args:
+        directory: Snapshot directory
+        filename: Logical file name (e.g., 'problems.json')
+
+    Returns:
+        Existing path, or None
+    """
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        return path
+    for suffix in CODECS.values():
+        if os.path.exists(path + suffix):
+            return path + suffix
+    return None
+
+
+class _HashingFile:
+    """Write-through wrapper that hashes what reaches the file."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.raw.write(data)
+        self.hash.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        self.raw.flush()
+
+
+def _compressor(codec: str, fileobj):
+    level = COMPRESSION_LEVELS[codec]
+    if codec == 'gzip':
+        return gzip.GzipFile(filename='', mode='wb', compresslevel=level, fileobj=fileobj, mtime=0)
+    if codec == 'lzma':
+        return lzma.LZMAFile(fileobj, 'wb', preset=level)
+    return zstandard.ZstdCompressor(level=level).stream_writer(fileobj, closefd=False)
+
+
+def _decompressor(codec: Optional[str], path: str):
+    if codec == 'gzip':
+        return gzip.open(path, 'rb')
+    if codec == 'lzma':
+        return lzma.open(path, 'rb')
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+class CompressedWriter:
+    """
+    Streams bytes into a compressed file, hashing both sides.
+
+    Example:
+        with CompressedWriter(path, 'gzip') as writer:
+            writer.write(data)
+        writer.info['content_checksum']
+    """
+
+    def __init__(self, path: str, codec: str):
+        """
+        Open path + the codec's suffix for writing.
+
+        Args:
+            path: Logical file path (e.g., <snapshot>/problems.json)
+            codec: Codec name (see CODECS)
+        """
+        check_codec(codec)
+        self.path = path + CODECS[codec]
+        self.info: Dict[str, Any] = {}
+        self._file = open(self.path, 'wb')
+        self._stored = _HashingFile(self._file)
+        self._stream = _compressor(codec, self._stored)
+        self._content = hashlib.sha256()
+        self._content_size = 0
+        self._buffer = bytearray()
+
+    def write(self, data: bytes):
+        self._content.update(data)
+        self._content_size += len(data)
+        self._buffer += data
+        if len(self._buffer) >= CHUNK_SIZE:
+            self._stream.write(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish the compressed stream.
+
+        Returns:
+            Dict with 'path', 'checksum' / 'size' (compressed bytes) and
+            'content_checksum' / 'content_size' (logical content)
+        """
+        if not self.info:
+            if self._buffer:
+                self._stream.write(bytes(self._buffer))
+                self._buffer.clear()
+            self._stream.close()
+            self._file.close()
+            self.info = {
+                'path': self.path,
+                'checksum': f"sha256:{self._stored.hash.hexdigest()}",
+                'size': self._stored.size,
+                'content_checksum': f"sha256:{self._content.hexdigest()}",
+                'content_size': self._content_size,
+            }
+        return self.info
+
+    def __enter__(self) -> 'CompressedWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compress_file(src: str, path: str, codec: str) -> Dict[str, Any]:
+    """Stream an uncompressed file into path + suffix (see CompressedWriter.close())."""
+    with open(src, 'rb') as f, CompressedWriter(path, codec) as writer:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            writer.write(chunk)
+    return writer.info
+
+
+def write_json_compressed(data: Any, path: str, codec: str) -> Dict[str, Any]:
+    """
+    Write data in the canonical file format (2-space indent), compressed.
+
+    The logical content is byte-identical to write_json() output, so its
+    checksum matches the uncompressed file's.
+    """
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    with CompressedWriter(path, codec) as writer:
+        for chunk in encoder.iterencode(data):
+            writer.write(chunk.encode('utf-8'))
+    return writer.info
+
+
+def compress_bytes(content: bytes, codec: str) -> bytes:
+    """Compress an in-memory buffer (deterministic, like CompressedWriter)."""
+    level = COMPRESSION_LEVELS[codec]
+    if codec == 'gzip':
+        return gzip.compress(content, compresslevel=level, mtime=0)
+    if codec == 'lzma':
+        return lzma.compress(content, preset=level)
+    return zstandard.ZstdCompressor(level=level).compress(content)
+
+
+def iter_chunks(path: str) -> Iterable[bytes]:
+    """Logical content of a plain or compressed file, chunk by chunk."""
+    with _decompressor(codec_of(path), path) as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            yield chunk
+
+
+def read_data(path: str) -> bytes:
+    """Logical content of a plain or compressed file."""
+    if codec_of(path) is None:
+        with open(path, 'rb') as f:
+            return f.read()
+    buffer = bytearray()
+    for chunk in iter_chunks(path):
+        buffer += chunk
+    return bytes(buffer)
+
+
+def load_json_data(path: str) -> Any:
+    """Parse a plain or compressed JSON file."""
+    return json.loads(read_data(path))
+
+
+def content_sha256(path: str) -> str:
+    """SHA256 of a file's logical content, decompressed as a stream."""
+    sha256_hash = hashlib.sha256()
+    for chunk in iter_chunks(path):
+        sha256_hash.update(chunk)
+    return f"sha256:{sha256_hash.hexdigest()}"
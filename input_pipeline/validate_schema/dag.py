@@ -0,0 +1,349 @@
+"""
+Stage DAG Executor
+
+Runs pipeline stages as a dependency graph instead of a fixed sequence:
+- Stages declare the named inputs they consume and the outputs they produce
+- A stage starts as soon as every input is available
+- A failing stage cancels all stages downstream of it; independent
+  branches keep running
+- The recorded schedule yields a critical-path report
+
+Stages run on a thread pool, so they overlap I/O and hand their
+outputs to each other in memory.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Callable, Optional
+
+
+# Stage states
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class DAGError(Exception):
+    """Exception raised for an invalid stage graph."""
+    pass
+
+
+class StageFailed(Exception):
+    """
+    Raised by a stage to fail cleanly.
+
+    Used for expected outcomes (e.g., validation did not pass) as opposed
+    to unexpected exceptions, which are reported as errors.
+    """
+    pass
+
+
+@dataclass
+class Stage:
+    """
+    A unit of work in the graph.
+
+    func is called with one keyword argument per input and returns a
+    dict holding every declared output (or None if it has no outputs).
+    """
+    name: str
+    func: Callable[..., Optional[Dict[str, Any]]]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StageRun:
+    """Execution record of one stage (times relative to the run start)."""
+    name: str
+    depends_on: List[str]
+    status: str = PENDING
+    start: Optional[float] = None
+    end: Optional[float] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+
+    def duration(self) -> float:
+        """Seconds the stage ran (0 if it never started)."""
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'status': self.status,
+            'depends_on': self.depends_on,
+            'start': round(self.start, 4) if self.start is not None else None,
+            'end': round(self.end, 4) if self.end is not None else None,
+            'duration': round(self.duration(), 4),
+            'error': self.error,
+        }
+
+
+@dataclass
+class DAGResult:
+    """Outcome of a DAG run."""
+    runs: Dict[str, StageRun]
+    outputs: Dict[str, Any]
+    wall_seconds: float
+
+    @property
+    def success(self) -> bool:
+        return all(run.status == SUCCEEDED for run in self.runs.values())
+
+    def with_status(self, status: str) -> List[str]:
+        """Names of stages in a given state."""
+        return [name for name, run in self.runs.items() if run.status == status]
+
+    def critical_path(self) -> Dict[str, Any]:
+        """
+        Longest dependency chain by measured stage duration.
+
+        Stages on the critical path bound the wall time; speeding up any
+        other stage cannot shorten the run. Slack is how much longer a
+        stage could have taken without extending the critical path.
+
+        Returns:
+            Dict with the path, its length, per-stage slack and the
+            achieved parallelism (total stage time / wall time)
+        """
+        ran = [name for name, run in self.runs.items() if run.start is not None]
+
+        # Forward pass: longest chain ending at each stage (runs are in
+        # topological order, so dependencies are visited first)
+        finish: Dict[str, float] = {}
+        via: Dict[str, Optional[str]] = {}
+        for name in ran:
+            best, best_dep = 0.0, None
+            for dep in self.runs[name].depends_on:
+                if dep in finish and finish[dep] > best:
+                    best, best_dep = finish[dep], dep
+            finish[name] = best + self.runs[name].duration()
+            via[name] = best_dep
+
+        if not finish:
+            return {'stages': [], 'length_seconds': 0.0, 'wall_seconds': round(self.wall_seconds, 4),
+                    'parallelism': 0.0, 'slack': {}}
+
+        # Backward pass: longest chain starting after each stage
+        tail: Dict[str, float] = {name: 0.0 for name in ran}
+        for name in reversed(ran):
+            for dep in self.runs[name].depends_on:
+                if dep in tail:
+                    tail[dep] = max(tail[dep], tail[name] + self.runs[name].duration())
+
+        end = max(finish, key=finish.get)
+        length = finish[end]
+        path = []
+        while end is not None:
+            path.append(end)
+            end = via[end]
+        path.reverse()
+
+        busy = sum(self.runs[name].duration() for name in ran)
+        return {
+            'stages': path,
+            'length_seconds': round(length, 4),
+            'wall_seconds': round(self.wall_seconds, 4),
+            'parallelism': round(busy / self.wall_seconds, 2) if self.wall_seconds > 0 else 0.0,
+            'slack': {name: round(length - finish[name] - tail[name], 4) for name in ran},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'success': self.success,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'stages': {name: run.to_dict() for name, run in self.runs.items()},
+            'critical_path': self.critical_path(),
+        }
+
+    def format_report(self) -> List[str]:
+        """Format the schedule and critical path as lines for console output."""
+        critical = self.critical_path()
+        on_path = set(critical['stages'])
+
+        lines = []
+        for name, run in self.runs.items():
+            marker = '*' if name in on_path else ' '
+            if run.start is None:
+                lines.append(f"{marker} {name:<24} {run.status}")
+            else:
+                lines.append(
+                    f"{marker} {name:<24} {run.status:<10} "
+                    f"{run.start:7.3f}s → {run.end:7.3f}s  ({run.duration():.3f}s, "
+                    f"slack {critical['slack'][name]:.3f}s)"
+                )
+        lines.append(
+            f"Critical path: {' → '.join(critical['stages']) or '-'} "
+            f"({critical['length_seconds']:.3f}s of {critical['wall_seconds']:.3f}s wall, "
+            f"parallelism {critical['parallelism']}x)"
+        )
+        return lines
+
+
+class DAGExecutor:
+    """
+    Runs stages concurrently in dependency order.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4, profiler=None):
+        """
+        Initialize executor and check the graph.
+
+        Args:
+            stages: Stages to run (declaration order breaks scheduling ties)
+            max_workers: Maximum number of stages running at once
+            profiler: Optional StageProfiler; each stage is timed as a top-level stage
+
+        Raises:
+            DAGError: On duplicate stage names or outputs, or a dependency cycle
+        """
+        self.max_workers = max(1, max_workers)
+        self.profiler = profiler
+
+        self.producers: Dict[str, str] = {}
+        by_name: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in by_name:
+                raise DAGError(f"Duplicate stage name: {stage.name}")
+            by_name[stage.name] = stage
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise DAGError(
+                        f"Output '{output}' produced by both {self.producers[output]} and {stage.name}"
+                    )
+                self.producers[output] = stage.name
+
+        self.deps: Dict[str, List[str]] = {}
+        self.children: Dict[str, List[str]] = {name: [] for name in by_name}
+        for stage in stages:
+            deps = []
+            for item in stage.inputs:
+                producer = self.producers.get(item)
+                if producer is not None and producer not in deps:
+                    deps.append(producer)
+            self.deps[stage.name] = deps
+            for dep in deps:
+                self.children[dep].append(stage.name)
+
+        self.stages = self._topological_order(by_name)
+
+    def _topological_order(self, by_name: Dict[str, Stage]) -> List[Stage]:
+        """Order stages so every stage follows its dependencies (Kahn's algorithm)."""
+        remaining = {name: len(deps) for name, deps in self.deps.items()}
+        ready = [name for name in by_name if remaining[name] == 0]
+        order = []
+
+        while ready:
+            name = ready.pop(0)
+            order.append(by_name[name])
+            for child in self.children[name]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+
+        if len(order) != len(by_name):
+            cyclic = sorted(name for name, count in remaining.items() if count > 0)
+            raise DAGError(f"Dependency cycle between stages: {cyclic}")
+
+        return order
+
+    def _execute(self, stage: Stage, kwargs: Dict[str, Any], run: StageRun, t0: float) -> Dict[str, Any]:
+        """Run one stage on a worker thread."""
+        timer = self.profiler.stage(stage.name) if self.profiler is not None else nullcontext()
+        run.start = time.perf_counter() - t0
+        try:
+            with timer:
+                produced = stage.func(**kwargs) or {}
+        finally:
+            run.end = time.perf_counter() - t0
+
+        missing = [output for output in stage.outputs if output not in produced]
+        if missing:
+            raise DAGError(f"Stage {stage.name} did not produce outputs: {missing}")
+        return {output: produced[output] for output in stage.outputs}
+
+    def _cancel_downstream(self, name: str, runs: Dict[str, StageRun]):
+        """Cancel every pending stage that depends (transitively) on a failed one."""
+        queue = list(self.children[name])
+        while queue:
+            child = queue.pop(0)
+            run = runs[child]
+            if run.status != PENDING:
+                continue
+            run.status = CANCELLED
+            run.error = f"Cancelled: upstream stage {name} failed"
+            queue.extend(self.children[child])
+
+    def run(self, initial: Dict[str, Any] = None) -> DAGResult:
+        """
+        Run all stages.
+
+        Args:
+            initial: Externally provided inputs (not produced by any stage)
+
+        Returns:
+            DAGResult with per-stage runs and all produced outputs
+
+        Raises:
+            DAGError: If a stage needs an input nobody provides
+        """
+        outputs: Dict[str, Any] = dict(initial or {})
+        for stage in self.stages:
+            unresolved = [i for i in stage.inputs if i not in self.producers and i not in outputs]
+            if unresolved:
+                raise DAGError(f"Stage {stage.name} has unresolved inputs: {unresolved}")
+
+        runs = {
+            stage.name: StageRun(name=stage.name, depends_on=list(self.deps[stage.name]))
+            for stage in self.stages
+        }
+        t0 = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage') as pool:
+            running = {}
+
+            def submit_ready():
+                for stage in self.stages:
+                    run = runs[stage.name]
+                    if run.status != PENDING:
+                        continue
+                    if all(runs[dep].status == SUCCEEDED for dep in run.depends_on):
+                        run.status = RUNNING
+                        kwargs = {item: outputs[item] for item in stage.inputs}
+                        future = pool.submit(self._execute, stage, kwargs, run, t0)
+                        running[future] = stage.name
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    run = runs[name]
+                    try:
+                        outputs.update(future.result())
+                        run.status = SUCCEEDED
+                    except StageFailed as e:
+                        run.status = FAILED
+                        run.error = str(e)
+                        run.error_type = 'StageFailed'
+                    except Exception as e:
+                        run.status = FAILED
+                        run.error = f"{type(e).__name__}: {e}"
+                        run.error_type = type(e).__name__
+
+                    if run.status == FAILED:
+                        self._cancel_downstream(name, runs)
+                submit_ready()
+
+        return DAGResult(
+            runs=runs,
+            outputs=outputs,
+            wall_seconds=time.perf_counter() - t0
+        )
@@ -6,6 +6,10 @@ Generates manifest files with:
 - Entity counts
 - SHA256 checksums
 - Creation timestamps
+- A reference to the snapshot's aggregate tables
+- Per-shard counts and checksums (sharded snapshots)
+- Checksums of both the stored bytes and the logical content of
+  compressed data files
 """
 
 import os
@@ -14,6 +18,23 @@ import hashlib
 from datetime import datetime
 from typing import Dict, Any, List
 
+try:
+    from .compression import codec_of, content_sha256, find_data_file
+except ImportError:
+    # When run as standalone script
+    from compression import codec_of, content_sha256, find_data_file
+
+
+# Files covered by '<name>_file' checksums when present in a snapshot
+# (plain or compressed; compressed files also get '<name>_content')
+SNAPSHOT_FILES = [
+    'problems.json', 'topics.json', 'contests.json',
+    'entity_graph.json', 'topic_closure.json', 'expanded_topics.json', 'query_index.json', 'search_index.json', 'search_index.bin',
+    'near_duplicates.json', 'aggregates.json',
+    'topic_cooccurrence.npy', 'similar_problems.npy', 'similar_scores.npy',
+    'problems.index.json', 'topics.index.json', 'contests.index.json',
+]
+
 
 def compute_sha256(filepath: str) -> str:
     """
@@ -56,7 +77,9 @@ def generate_manifest(
     topics: List[Dict],
     contests: List[Dict] = None,
     data_dir: str = None,
-    notes: str = None
+    notes: str = None,
+    shards: Dict[str, Any] = None,
+    content_checksums: Dict[str, str] = None
 ) -> Dict[str, Any]:
     """
     Generate a manifest for a data snapshot.
@@ -69,6 +92,10 @@ def generate_manifest(
         contests: List of contest documents (optional)
         data_dir: Directory containing data files (for file checksums)
         notes: Optional notes about the snapshot
+        shards: Shard section (see shards.write_shards())
+        content_checksums: Logical-content checksums of compressed files
+            by logical name, as returned while writing them (computed by
+            decompressing the file when absent)
         
     Returns:
         Manifest dict
@@ -95,11 +122,28 @@ def generate_manifest(
         manifest['checksums']['contests.json'] = compute_json_checksum(contests)
     
     # If data_dir is provided, also compute file checksums
+    # (data files and the indexes written next to them)
     if data_dir and os.path.exists(data_dir):
-        for filename in ['problems.json', 'topics.json', 'contests.json']:
-            filepath = os.path.join(data_dir, filename)
-            if os.path.exists(filepath):
-                manifest['checksums'][f"{filename}_file"] = compute_sha256(filepath)
+        for filename in SNAPSHOT_FILES:
+            filepath = find_data_file(data_dir, filename)
+            if filepath is None:
+                continue
+            stored_name = os.path.basename(filepath)
+            manifest['checksums'][f"{stored_name}_file"] = compute_sha256(filepath)
+            
+            codec = codec_of(filepath)
+            if codec:
+                manifest['checksums'][f"{stored_name}_content"] = (
+                    (content_checksums or {}).get(filename) or content_sha256(filepath)
+                )
+                manifest['compression'] = codec
+        
+        # Dashboard tables (difficulty, ratings, topics, contests)
+        if os.path.exists(os.path.join(data_dir, 'aggregates.json')):
+            manifest['aggregates'] = 'aggregates.json'
+    
+    if shards:
+        manifest['shards'] = shards
     
     if notes:
         manifest['notes'] = notes
@@ -107,13 +151,17 @@ def generate_manifest(
     return manifest
 
 
-def verify_manifest(manifest: Dict, data_dir: str) -> Dict[str, Any]:
+def verify_manifest(manifest: Dict, data_dir: str, deep: bool = False) -> Dict[str, Any]:
     """
     Verify manifest checksums against actual files.
     
+    Compressed files are checked by their stored bytes; with deep=True
+    they are also decompressed and checked against the content checksum.
+    
     Args:
         manifest: Manifest to verify
         data_dir: Directory containing data files
+        deep: Also verify the logical content of compressed files
         
     Returns:
         Verification result dict
@@ -125,23 +173,35 @@ def verify_manifest(manifest: Dict, data_dir: str) -> Dict[str, Any]:
     }
     
     for filename, expected_checksum in manifest.get('checksums', {}).items():
+        # Content checksums of compressed files need a decompress
+        if filename.endswith('_content'):
+            if not deep:
+                continue
+            actual_filename = filename[:-len('_content')]
+            label = f"{actual_filename} (content)"
         # Skip in-memory checksums (without _file suffix)
-        if not filename.endswith('_file'):
+        elif filename.endswith('_file'):
+            actual_filename = filename[:-len('_file')]
+            label = actual_filename
+        else:
             continue
         
-        actual_filename = filename.replace('_file', '')
         filepath = os.path.join(data_dir, actual_filename)
         
         if not os.path.exists(filepath):
-            result['missing'].append(actual_filename)
+            if label == actual_filename:
+                result['missing'].append(actual_filename)
             result['valid'] = False
             continue
         
-        actual_checksum = compute_sha256(filepath)
+        if filename.endswith('_content'):
+            actual_checksum = content_sha256(filepath)
+        else:
+            actual_checksum = compute_sha256(filepath)
         
         if actual_checksum != expected_checksum:
             result['mismatches'].append({
-                'file': actual_filename,
+                'file': label,
                 'expected': expected_checksum,
                 'actual': actual_checksum,
             })
@@ -178,7 +238,8 @@ def load_manifest(filepath: str) -> Dict:
 
 def generate_checksum_file(data_dir: str, output_path: str):
     """
-    Generate a checksum.txt file for all JSON files in directory.
+    Generate a checksum.txt file for all JSON files in directory
+    (compressed ones by their stored bytes).
     
     Format matches sha256sum output for easy verification.
     
@@ -189,7 +250,7 @@ def generate_checksum_file(data_dir: str, output_path: str):
     lines = []
     
     for filename in sorted(os.listdir(data_dir)):
-        if filename.endswith('.json'):
+        if filename.endswith('.json') or codec_of(filename):
             filepath = os.path.join(data_dir, filename)
             checksum = compute_sha256(filepath)
             # Format: checksum  filename (sha256sum compatible)
@@ -0,0 +1,254 @@
+"""
+Stage Profiler
+
+Instrumentation for pipeline stages:
+- Wall-clock timers for stages and nested sub-steps
+- Optional cProfile dump + collapsed-stack samples per stage
+- Optional tracemalloc snapshot + top allocation sites per stage
+
+Collapsed-stack files use the "frame;frame;frame count" format accepted
+by flamegraph.pl and speedscope.
+"""
+
+import os
+import sys
+import time
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Any
+
+
+class _StackSampler(threading.Thread):
+    """
+    Samples the call stack of one thread at a fixed interval.
+
+    cProfile only records caller/callee pairs, so full stacks for the
+    collapsed output come from sampling sys._current_frames().
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                stack.append(f"{module}:{code.co_name}")
+                frame = frame.f_back
+
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class StageProfiler:
+    """
+    Records timings for pipeline stages and sub-steps.
+
+    Stages nest: a stage opened inside another is recorded as
+    "outer.inner". cProfile and tracemalloc only attach to top-level
+    stages, since profilers cannot nest.
+    """
+
+    def __init__(
+        self,
+        profile: bool = False,
+        trace_memory: bool = False,
+        output_dir: str = None,
+        top_allocations: int = 15
+    ):
+        """
+        Initialize profiler.
+
+        Args:
+            profile: Write a cProfile dump and collapsed stacks per stage
+            trace_memory: Record tracemalloc snapshots per stage
+            output_dir: Directory for profile artifacts
+            top_allocations: Number of allocation sites to keep per stage
+        """
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.output_dir = output_dir
+        self.top_allocations = top_allocations
+
+        self.timings: Dict[str, float] = {}
+        self.memory: Dict[str, Dict[str, Any]] = {}
+        self.artifacts: Dict[str, List[str]] = {}
+
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+    def _stack(self) -> List[str]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _artifact_path(self, stage: str, suffix: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{stage}{suffix}")
+        self.artifacts.setdefault(stage, []).append(path)
+        return path
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a stage or sub-step.
+
+        Args:
+            name: Stage name (nested names are prefixed with the parent)
+        """
+        stack = self._stack()
+        full_name = '.'.join(stack + [name])
+        top_level = not stack
+        stack.append(name)
+        # Reserve the slot so parents are listed before their sub-steps
+        self.timings.setdefault(full_name, 0.0)
+
+        profiler = None
+        sampler = None
+        if top_level and self.profile and self.output_dir:
+            sampler = _StackSampler(threading.get_ident())
+            sampler.start()
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        tracing = top_level and self.trace_memory
+        if tracing:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            traced_start, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            self.timings[full_name] += elapsed
+
+            if profiler is not None:
+                profiler.disable()
+                sampler.stop()
+                profiler.dump_stats(self._artifact_path(full_name, '.prof'))
+                self._write_collapsed(full_name, sampler.samples)
+
+            if tracing:
+                self._record_memory(full_name, traced_start)
+
+    def scope(self) -> str:
+        """Full name of the innermost open stage on this thread ('' if none)."""
+        return '.'.join(self._stack())
+
+    def record(self, name: str, seconds: float):
+        """
+        Record an externally measured timing under the current stage.
+
+        Args:
+            name: Sub-step name relative to the open stage (e.g., "rules.problems")
+            seconds: Duration in seconds
+        """
+        full_name = '.'.join(self._stack() + [name])
+        self.timings[full_name] = self.timings.get(full_name, 0.0) + seconds
+
+    def timings_under(self, scope: str) -> Dict[str, float]:
+        """
+        Timings recorded beneath a stage.
+
+        Args:
+            scope: Stage name ('' for all)
+
+        Returns:
+            Dict of sub-step name (relative to scope) to seconds
+        """
+        if not scope:
+            return dict(self.timings)
+        prefix = scope + '.'
+        return {
+            name[len(prefix):]: seconds
+            for name, seconds in self.timings.items()
+            if name.startswith(prefix)
+        }
+
+    def _write_collapsed(self, stage: str, samples: Counter):
+        """Write sampled stacks in collapsed format."""
+        with open(self._artifact_path(stage, '.collapsed'), 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _record_memory(self, stage: str, traced_start: int):
+        """Take a tracemalloc snapshot and keep the top allocation sites."""
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+        top = []
+        for stat in snapshot.statistics('lineno')[:self.top_allocations]:
+            frame = stat.traceback[0]
+            top.append({
+                'site': f"{frame.filename}:{frame.lineno}",
+                'size_kb': round(stat.size / 1024, 1),
+                'count': stat.count,
+            })
+
+        self.memory[stage] = {
+            'peak_mb': round(peak / (1024 * 1024), 2),
+            'retained_mb': round((current - traced_start) / (1024 * 1024), 2),
+            'top_allocations': top,
+        }
+
+        if self.output_dir:
+            snapshot.dump(self._artifact_path(stage, '.tracemalloc'))
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'timings': {k: round(v, 4) for k, v in self.timings.items()},
+            'memory': self.memory,
+            'artifacts': self.artifacts,
+        }
+
+    def format_timings(self) -> List[str]:
+        """Format timings as indented lines for console output."""
+        # Keep sub-steps under their parent even when concurrent stages
+        # recorded them out of order
+        order = {name: i for i, name in enumerate(self.timings)}
+
+        def tree_key(name: str):
+            parts = name.split('.')
+            return tuple(
+                order.get('.'.join(parts[:i + 1]), order[name])
+                for i in range(len(parts))
+            )
+
+        lines = []
+        for name in sorted(self.timings, key=tree_key):
+            seconds = self.timings[name]
+            depth = name.count('.')
+            label = name.rsplit('.', 1)[-1]
+            lines.append(f"{'  ' * depth}{label}: {seconds:.3f}s")
+        return lines
@@ -0,0 +1,303 @@
+"""
+Query Index
+
+Secondary indexes over a snapshot's problems, built at snapshot time:
+- Postings lists (sorted problem positions) per topic, difficulty and source
+- Subtree postings per parent topic: problems tagged with the topic or any
+  of its descendants (from the topic closure), so "all problems under
+  graph" is one lookup
+- Rating and contest start_time as sorted arrays for range queries (bisect)
+
+Filters are conjunctive: each produces a postings list and the result is
+their intersection, smallest list first. Contest filters go through the
+entity graph (contest → problems). Positions are record positions in
+problems.json, as used by SnapshotReader.at().
+"""
+
+import os
+import json
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+from normalize_schema.entity_graph import EntityGraph
+from normalize_schema.topic_hierarchy import TopicClosure, load_snapshot_closure
+from validate_schema.compression import find_data_file, load_json_data
+
+
+# Bump when the index layout changes
+QUERY_INDEX_FORMAT = 2
+
+QUERY_INDEX_FILE = "query_index.json"
+
+
+def _sorted_pairs(pairs: List[tuple]) -> Dict[str, List]:
+    """(value, position) pairs → parallel arrays sorted by value."""
+    pairs.sort()
+    return {'values': [value for value, _ in pairs], 'positions': [position for _, position in pairs]}
+
+
+def parse_time(value: Union[str, int]) -> int:
+    """
+    Unix timestamp of a date given as YYYY, YYYY-MM, YYYY-MM-DD or a timestamp.
+
+    Args:
+        value: Date string or Unix timestamp
+
+    Returns:
+        Unix timestamp (UTC)
+
+    Raises:
+        ValueError: If the value is not a recognised date
+    """
+    if isinstance(value, int) or str(value).isdigit() and len(str(value)) > 4:
+        return int(value)
+    for fmt in ('%Y-%m-%d', '%Y-%m', '%Y'):
+        try:
+            parsed = datetime.strptime(str(value), fmt)
+        except ValueError:
+            continue
+        return int(parsed.replace(tzinfo=timezone.utc).timestamp())
+    raise ValueError(f"Unrecognised date: {value} (expected YYYY, YYYY-MM, YYYY-MM-DD or a timestamp)")
+
+
+def intersect_postings(postings: Sequence[List[int]]) -> List[int]:
+    """
+    Intersect sorted postings lists.
+
+    Starts from the shortest list and probes the others with bisect,
+    advancing the lower bound, so a small list against a large one costs
+    O(small * log large).
+
+    Args:
+        postings: Sorted lists of positions
+
+    Returns:
+        Sorted positions present in every list
+    """
+    if not postings:
+        return []
+    ordered = sorted(postings, key=len)
+    result = list(ordered[0])
+    for other in ordered[1:]:
+        if not result:
+            break
+        kept = []
+        lo = 0
+        for position in result:
+            lo = bisect_left(other, position, lo)
+            if lo == len(other):
+                break
+            if other[lo] == position:
+                kept.append(position)
+        result = kept
+    return result
+
+
+class QueryIndex:
+    """
+    Secondary indexes over one snapshot.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Initialize from index data (see build()).
+
+        Args:
+            data: Index dict as produced by build() / stored in query_index.json
+        """
+        self.data = data
+        self.problem_count = data['problem_count']
+        self.topics: Dict[str, List[int]] = data['topics']
+        # Parent topics only; a leaf's subtree is its own topic postings
+        self.subtree: Dict[str, List[int]] = data['subtree']
+        self.difficulty: Dict[str, List[int]] = data['difficulty']
+        self.source: Dict[str, List[int]] = data['source']
+        self.rating: Dict[str, List] = data['rating']
+        self.contest_start: Dict[str, List] = data['contest_start']
+
+    @classmethod
+    def build(
+        cls,
+        problems: List[Dict],
+        contests: List[Dict],
+        closure: Optional[TopicClosure] = None
+    ) -> 'QueryIndex':
+        """
+        Build the indexes.
+
+        Args:
+            problems: Snapshot problems (in file order)
+            contests: Snapshot contests (in file order)
+            closure: Topic hierarchy closure (subtrees are single topics if None)
+
+        Returns:
+            QueryIndex
+        """
+        topics: Dict[str, List[int]] = {}
+        subtree: Dict[str, List[int]] = {}
+        parents = set()
+        if closure is not None:
+            parents = {name for i, name in enumerate(closure.names) if closure.descendant_ids[i]}
+        difficulty: Dict[str, List[int]] = {}
+        source: Dict[str, List[int]] = {}
+        ratings = []
+
+        for position, problem in enumerate(problems):
+            # A topic listed twice still gets one posting
+            tags = dict.fromkeys(problem.get('topics') or [])
+            for topic in tags:
+                topics.setdefault(topic, []).append(position)
+            if parents:
+                for topic in closure.expand(tags):
+                    if topic in parents:
+                        subtree.setdefault(topic, []).append(position)
+            difficulty.setdefault(problem.get('difficulty'), []).append(position)
+            source.setdefault(problem.get('source'), []).append(position)
+            rating = problem.get('rating')
+            if isinstance(rating, (int, float)):
+                ratings.append((rating, position))
+
+        starts = [
+            (contest['start_time'], position)
+            for position, contest in enumerate(contests)
+            if isinstance(contest.get('start_time'), int)
+        ]
+
+        return cls({
+            'format': QUERY_INDEX_FORMAT,
+            'problem_count': len(problems),
+            'topics': topics,
+            'subtree': subtree,
+            'difficulty': {str(k): v for k, v in difficulty.items()},
+            'source': {str(k): v for k, v in source.items()},
+            'rating': _sorted_pairs(ratings),
+            'contest_start': _sorted_pairs(starts),
+        })
+
+    def save(self, filepath: str):
+        """Write the index as compact JSON."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.data, ensure_ascii=False, separators=(',', ':')))
+
+    @classmethod
+    def load(cls, filepath: str) -> 'QueryIndex':
+        """Load an index written by save()."""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != QUERY_INDEX_FORMAT:
+            raise ValueError(f"Unsupported query index format: {data.get('format')}")
+        return cls(data)
+
+    def rating_range(self, low: Optional[float] = None, high: Optional[float] = None) -> List[int]:
+        """Problems with low <= rating <= high (unrated problems never match), sorted."""
+        values = self.rating['values']
+        start = bisect_left(values, low) if low is not None else 0
+        end = bisect_right(values, high) if high is not None else len(values)
+        return sorted(self.rating['positions'][start:end])
+
+    def contests_between(self, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        """Contests with start <= start_time < end (contests without a start time never match)."""
+        values = self.contest_start['values']
+        lo = bisect_left(values, start) if start is not None else 0
+        hi = bisect_left(values, end) if end is not None else len(values)
+        return self.contest_start['positions'][lo:hi]
+
+    def under(self, topic: str) -> List[int]:
+        """Problems tagged with a topic or any of its descendants, sorted."""
+        if topic in self.subtree:
+            return self.subtree[topic]
+        return self.topics.get(topic, [])
+
+    def select(
+        self,
+        source: Optional[str] = None,
+        topics: Optional[List[str]] = None,
+        under: Optional[List[str]] = None,
+        difficulty: Optional[str] = None,
+        rating_min: Optional[float] = None,
+        rating_max: Optional[float] = None,
+        contest_after: Optional[int] = None,
+        not_in_contests_before: Optional[int] = None,
+        graph: Optional[EntityGraph] = None
+    ) -> List[int]:
+        """
+        Problems matching every given filter.
+
+        Args:
+            source: Problem source (e.g., 'codeforces')
+            topics: Topics the problem must all have
+            under: Topics the problem must all fall under (tagged with the
+                topic or one of its descendants)
+            difficulty: Difficulty bucket ('easy', 'medium', 'hard')
+            rating_min: Minimum rating (inclusive)
+            rating_max: Maximum rating (inclusive)
+            contest_after: Problem appears in a contest starting at or after this timestamp
+            not_in_contests_before: Problem appears in no contest starting before this timestamp
+            graph: Snapshot entity graph (required for the contest filters)
+
+        Returns:
+            Sorted problem positions
+        """
+        postings: List[List[int]] = []
+        if source is not None:
+            postings.append(self.source.get(source, []))
+        for topic in topics or []:
+            postings.append(self.topics.get(topic, []))
+        for topic in under or []:
+            postings.append(self.under(topic))
+        if difficulty is not None:
+            postings.append(self.difficulty.get(difficulty, []))
+        if rating_min is not None or rating_max is not None:
+            postings.append(self.rating_range(rating_min, rating_max))
+
+        if contest_after is not None or not_in_contests_before is not None:
+            if graph is None:
+                raise ValueError("Contest filters need the snapshot's entity graph")
+        if contest_after is not None:
+            postings.append(self._contest_problems(graph, self.contests_between(start=contest_after)))
+
+        if postings:
+            result = intersect_postings(postings)
+        else:
+            result = list(range(self.problem_count))
+
+        if not_in_contests_before is not None and result:
+            excluded = set(self._contest_problems(graph, self.contests_between(end=not_in_contests_before)))
+            result = [position for position in result if position not in excluded]
+
+        return result
+
+    def _contest_problems(self, graph: EntityGraph, contests: List[int]) -> List[int]:
+        """Sorted, distinct (defined) problems of a set of contests."""
+        problems = set()
+        for contest in contests:
+            problems.update(graph.contest_problems.neighbors(contest))
+        return sorted(p for p in problems if p < graph.problem_count)
+
+
+def load_query_index(snapshot_dir: str) -> QueryIndex:
+    """
+    Query index of a snapshot directory.
+
+    Snapshots created before the index was persisted (or with an older
+    index format) are indexed from their data files.
+
+    Args:
+        snapshot_dir: Snapshot directory
+
+    Returns:
+        QueryIndex
+    """
+    index_path = os.path.join(snapshot_dir, QUERY_INDEX_FILE)
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') == QUERY_INDEX_FORMAT:
+            return QueryIndex(data)
+
+    collections = {}
+    for name in ('problems', 'contests'):
+        path = find_data_file(snapshot_dir, f"{name}.json")
+        collections[name] = load_json_data(path) if path else []
+    return QueryIndex.build(collections['problems'], collections['contests'], load_snapshot_closure(snapshot_dir))
@@ -14,14 +14,23 @@ Usage:
     python3 run_pipeline.py --step validate    # Only validation
     python3 run_pipeline.py --step snapshot    # Only snapshot creation
     python3 run_pipeline.py --dry-run          # Don't save any files
+    python3 run_pipeline.py --no-write-output  # Keep normalized data in memory only
+    python3 run_pipeline.py --workers 1        # Run stages one at a time
+    python3 run_pipeline.py --stream --max-errors 50  # Validate while transforming, fail fast
+    python3 run_pipeline.py --incremental      # Revalidate only documents changed since last run
+    python3 run_pipeline.py --profile          # cProfile + collapsed stacks per stage
+    python3 run_pipeline.py --trace-memory     # tracemalloc top allocations per stage
+    python3 run_pipeline.py --metrics-port 9108  # Serve OpenMetrics while running
 """
 
 import os
 import sys
 import json
+import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, List, Any, Optional
 
 # Add parent directories to path
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -30,8 +39,24 @@ sys.path.insert(0, PIPELINE_DIR)
 
 # Import pipeline components
 from modify_data.transformers import LeetCodeTransformer, CodeforcesTransformer
+from modify_data.run_normalization import build_normalization_report
+from modify_data.utils.json_array_writer import JsonArrayWriter
+from modify_data.utils.topic_normalizer import build_topic_document
+from normalize_schema.error_sink import ErrorSink
 from normalize_schema.validator import SchemaValidator
+from normalize_schema.streaming_validator import StreamingValidator, ErrorBudgetExceeded
+from normalize_schema.incremental_validator import IncrementalValidator
 from validate_schema.snapshot_manager import create_snapshot, get_next_version
+from validate_schema.search_index import load_leetcode_descriptions
+from validate_schema.profiling import StageProfiler
+from validate_schema.dag import Stage, DAGExecutor, StageFailed, SUCCEEDED, FAILED
+from validate_schema.compression import CODECS
+from metrics import add_metrics_arguments, MetricsRun
+from metrics.pipeline_metrics import (
+    record_stage_timings,
+    record_normalization_stats,
+    record_validation_result
+)
 
 
 # Paths
@@ -40,6 +65,7 @@ LEETCODE_DATA = os.path.join(FETCH_DATA_DIR, "leetcode", "data", "merged_problem
 CODEFORCES_DATA = os.path.join(FETCH_DATA_DIR, "codeforces", "data")
 OUTPUT_DIR = os.path.join(PIPELINE_DIR, "modify_data", "output")
 VALIDATED_DIR = os.path.join(PIPELINE_DIR, "validate_schema", "validated")
+PROFILES_DIR = os.path.join(PIPELINE_DIR, "validate_schema", "profiles")
 
 
 class PipelineResult:
@@ -54,6 +80,9 @@ class PipelineResult:
         self.snapshot = None
         self.errors = []
         self.warnings = []
+        self.timings = {}
+        self.schedule = None
+        self.profiling = None
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -62,9 +91,12 @@ class PipelineResult:
             'steps_failed': self.steps_failed,
             'errors': self.errors,
             'warnings': self.warnings,
+            'timings': self.timings,
+            'schedule': self.schedule,
             'normalization': self.normalization,
             'validation': self.validation.to_dict() if self.validation else None,
             'snapshot': self.snapshot,
+            'profiling': self.profiling,
         }
 
 
@@ -74,23 +106,139 @@ def ensure_dirs():
 
 
 def save_json(data: Any, filename: str, directory: str = OUTPUT_DIR):
-    """Save data to JSON file."""
+    """
+    Save data to JSON file.
+    
+    The file is replaced rather than rewritten in place: snapshots may
+    hard-link the previous output, and must not change with it.
+    """
     filepath = os.path.join(directory, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, filepath)
     return filepath
 
 
-def step_normalize(dry_run: bool = False) -> Dict[str, Any]:
+class OutputWriter:
+    """
+    Writes normalized output files, optionally on a background thread.
+    
+    In a full run the later stages get the collections in memory, so the
+    files in OUTPUT_DIR are only needed by standalone steps and for
+    inspection. Writing them in the background lets validation start
+    right away; the snapshot step waits for them before copying.
+    """
+    
+    def __init__(self, background: bool = False):
+        self._executor = None
+        if background:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='output-writer')
+        self._futures = []
+        self.seconds = 0.0
+        # Profiler timing the write time is added to (set by write_normalized)
+        self.timing_name = None
+    
+    def _write(self, data: Any, filename: str, directory: str) -> str:
+        start = time.perf_counter()
+        filepath = save_json(data, filename, directory)
+        self.seconds += time.perf_counter() - start
+        return filepath
+    
+    def submit(self, data: Any, filename: str, directory: str = OUTPUT_DIR):
+        """Queue a file write (runs inline without a background thread)."""
+        if self._executor is None:
+            self._write(data, filename, directory)
+        else:
+            self._futures.append(self._executor.submit(self._write, data, filename, directory))
+    
+    def wait(self) -> List[str]:
+        """
+        Block until queued writes have finished.
+        
+        Returns:
+            Error messages for failed writes
+        """
+        errors = []
+        for future in self._futures:
+            try:
+                future.result()
+            except (OSError, TypeError, ValueError) as e:
+                errors.append(f"Failed to write output: {e}")
+        self._futures = []
+        return errors
+    
+    def close(self) -> List[str]:
+        """Wait for queued writes and stop the worker thread."""
+        errors = self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return errors
+
+
+def normalize_leetcode() -> Optional[Dict[str, Any]]:
+    """
+    Transform LeetCode raw data.
+    
+    Returns:
+        Transformer result, or None if the raw data is missing
+    """
+    lines = ["\n[LeetCode]"]
+    lc_result = None
+    if os.path.exists(LEETCODE_DATA):
+        lc_result = LeetCodeTransformer().transform_from_file(LEETCODE_DATA)
+        lines.append(f"  ✓ Transformed {lc_result['stats']['success']} problems")
+        if lc_result['stats']['failed'] > 0:
+            lines.append(f"  ⚠ Failed: {lc_result['stats']['failed']}")
+    else:
+        lines.append(f"  ⚠ Skipped: Data not found at {LEETCODE_DATA}")
+    
+    # One print call so concurrent stages don't interleave lines
+    print('\n'.join(lines))
+    return lc_result
+
+
+def normalize_codeforces() -> Optional[Dict[str, Any]]:
+    """
+    Transform Codeforces raw data.
+    
+    Returns:
+        Transformer result, or None if the raw data is missing
+    """
+    lines = ["\n[Codeforces]"]
+    cf_result = None
+    if os.path.exists(CODEFORCES_DATA):
+        cf_result = CodeforcesTransformer().transform_all(CODEFORCES_DATA)
+        lines.append(f"  ✓ Transformed {cf_result['stats']['problems']['success']} problems")
+        lines.append(f"  ✓ Transformed {cf_result['stats']['contests']['success']} contests")
+        if cf_result['stats']['problems']['failed'] > 0:
+            lines.append(f"  ⚠ Failed problems: {cf_result['stats']['problems']['failed']}")
+    else:
+        lines.append(f"  ⚠ Skipped: Data not found at {CODEFORCES_DATA}")
+    
+    print('\n'.join(lines))
+    return cf_result
+
+
+def merge_normalized(
+    lc_result: Optional[Dict[str, Any]],
+    cf_result: Optional[Dict[str, Any]],
+    profiler: StageProfiler = None
+) -> Dict[str, Any]:
     """
-    Step 1: Normalize raw data to canonical format.
+    Combine per-source results and extract the topic collection.
+    
+    Args:
+        lc_result: LeetCode transformer result (None if skipped)
+        cf_result: Codeforces transformer result (None if skipped)
+        profiler: Profiler to record sub-step timings into
     
     Returns:
         Normalization result with stats
     """
-    print("\n" + "=" * 60)
-    print("STEP 1: NORMALIZATION")
-    print("=" * 60)
+    if profiler is None:
+        profiler = StageProfiler()
     
     result = {
         'success': False,
@@ -99,63 +247,36 @@ def step_normalize(dry_run: bool = False) -> Dict[str, Any]:
         'topics': [],
         'stats': {},
         'errors': [],
+        # Per source, for the normalization report
+        'source_errors': {},
+        'source_warnings': {},
     }
     
-    # LeetCode normalization
-    print("\n[LeetCode]")
-    if os.path.exists(LEETCODE_DATA):
-        lc_transformer = LeetCodeTransformer()
-        lc_result = lc_transformer.transform_from_file(LEETCODE_DATA)
-        
+    if lc_result is not None:
         result['problems'].extend(lc_result['problems'])
         result['stats']['leetcode'] = lc_result['stats']
         result['errors'].extend(lc_result['errors'])
-        
-        print(f"  ✓ Transformed {lc_result['stats']['success']} problems")
-        if lc_result['stats']['failed'] > 0:
-            print(f"  ⚠ Failed: {lc_result['stats']['failed']}")
-    else:
-        print(f"  ⚠ Skipped: Data not found at {LEETCODE_DATA}")
+        result['source_errors']['leetcode'] = lc_result['errors']
+        result['source_warnings']['leetcode'] = lc_result.get('warnings', [])
     
-    # Codeforces normalization
-    print("\n[Codeforces]")
-    if os.path.exists(CODEFORCES_DATA):
-        cf_transformer = CodeforcesTransformer()
-        cf_result = cf_transformer.transform_all(CODEFORCES_DATA)
-        
+    if cf_result is not None:
         result['problems'].extend(cf_result['problems'])
         result['contests'].extend(cf_result['contests'])
         result['stats']['codeforces'] = cf_result['stats']
         result['errors'].extend(cf_result['errors'])
-        
-        print(f"  ✓ Transformed {cf_result['stats']['problems']['success']} problems")
-        print(f"  ✓ Transformed {cf_result['stats']['contests']['success']} contests")
-        if cf_result['stats']['problems']['failed'] > 0:
-            print(f"  ⚠ Failed problems: {cf_result['stats']['problems']['failed']}")
-    else:
-        print(f"  ⚠ Skipped: Data not found at {CODEFORCES_DATA}")
+        result['source_errors']['codeforces'] = cf_result['errors']
+        result['source_warnings']['codeforces'] = cf_result.get('warnings', [])
     
     # Merge and deduplicate topics
-    print("\n[Topics]")
-    all_topics = {}
-    for problem in result['problems']:
-        for topic in problem.get('topics', []):
-            if topic not in all_topics:
-                from modify_data.utils.topic_normalizer import build_topic_document
-                all_topics[topic] = build_topic_document(topic)
-    
-    result['topics'] = sorted(all_topics.values(), key=lambda t: t['name'])
-    print(f"  ✓ Extracted {len(result['topics'])} unique topics")
-    
-    # Save output
-    if not dry_run:
-        ensure_dirs()
-        save_json(result['problems'], 'problems.json')
-        save_json(result['contests'], 'contests.json')
-        save_json(result['topics'], 'topics.json')
-        print(f"\n  ✓ Saved to: {OUTPUT_DIR}")
-    else:
-        print("\n  [DRY RUN] Files not saved")
+    with profiler.stage('topics'):
+        all_topics = {}
+        for problem in result['problems']:
+            for topic in problem.get('topics', []):
+                if topic not in all_topics:
+                    all_topics[topic] = build_topic_document(topic)
+        
+        result['topics'] = sorted(all_topics.values(), key=lambda t: t['name'])
+    print(f"\n[Topics]\n  ✓ Extracted {len(result['topics'])} unique topics")
     
     result['success'] = len(result['problems']) > 0 or len(result['contests']) > 0
     result['stats']['total_problems'] = len(result['problems'])
@@ -165,41 +286,278 @@ def step_normalize(dry_run: bool = False) -> Dict[str, Any]:
     return result
 
 
-def step_validate(schema_version: str = "v1.0.0") -> Any:
+def write_normalized(
+    result: Dict[str, Any],
+    writer: OutputWriter,
+    profiler: StageProfiler,
+    timings: Dict[str, float]
+):
+    """
+    Queue the normalized collections and report for writing to OUTPUT_DIR.
+    
+    Args:
+        result: Normalization result from merge_normalized()
+        writer: Output writer
+        profiler: Profiler the write time is recorded into
+        timings: Normalization timings for the report
+    """
+    ensure_dirs()
+    report = build_normalization_report(
+        result['stats'], timings, result['source_errors'], result['source_warnings']
+    )
+    # Reserve the slot; the writer's time is recorded once it finishes
+    scope = profiler.scope()
+    writer.timing_name = f"{scope}.write" if scope else 'write'
+    profiler.timings.setdefault(writer.timing_name, 0.0)
+    
+    writer.submit(result['problems'], 'problems.json')
+    writer.submit(result['contests'], 'contests.json')
+    writer.submit(result['topics'], 'topics.json')
+    writer.submit(report, 'normalization_report.json')
+    print(f"\n  ✓ Saving to: {OUTPUT_DIR}")
+
+
+def step_stream(
+    schema_version: str = "v1.0.0",
+    max_errors: Optional[int] = None,
+    dry_run: bool = False,
+    write_output: bool = True,
+    profiler: StageProfiler = None,
+    sink: Optional[ErrorSink] = None
+) -> Dict[str, Any]:
+    """
+    Steps 1+2 in streaming mode: transform, validate and write each
+    document as it is produced.
+    
+    Per-record schema and reference checks run on every document;
+    cross-entity checks run once the sources are exhausted. Documents
+    are not retained, so memory is bounded by the key indexes rather
+    than the corpus; validation errors are kept too unless a sink is
+    given (or the error budget caps them). If the error budget is exceeded the run stops
+    immediately and previous output files are left untouched.
+    
+    Args:
+        schema_version: Schema version to use
+        max_errors: Error budget (transform + validation errors); None = unlimited
+        dry_run: Don't save any files
+        write_output: Write the normalized collections to OUTPUT_DIR
+        profiler: Profiler to record sub-step timings into
+        sink: Stream validation errors here instead of keeping them
+    
+    Returns:
+        Dict with 'success', 'aborted', 'stats', 'errors' and 'validation'
+    """
+    if profiler is None:
+        profiler = StageProfiler()
+    
+    print("\n" + "=" * 60)
+    print("STEP 1+2: STREAMING NORMALIZATION + VALIDATION")
+    print("=" * 60)
+    if max_errors is not None:
+        print(f"  Error budget: {max_errors}")
+    
+    result = {
+        'success': False,
+        'aborted': False,
+        'stats': {},
+        'errors': [],
+        'validation': None,
+    }
+    
+    streaming = StreamingValidator(schema_version, max_errors=max_errors, sink=sink)
+    writers = {}
+    if not dry_run and write_output:
+        ensure_dirs()
+        writers = {
+            'problem': JsonArrayWriter(os.path.join(OUTPUT_DIR, 'problems.json')),
+            'contest': JsonArrayWriter(os.path.join(OUTPUT_DIR, 'contests.json')),
+        }
+    
+    lc_transformer = LeetCodeTransformer()
+    cf_transformer = CodeforcesTransformer()
+    sources = []
+    if os.path.exists(LEETCODE_DATA):
+        sources.append(('leetcode', lc_transformer, lc_transformer.iter_from_file(LEETCODE_DATA)))
+    else:
+        print(f"\n[LeetCode]\n  ⚠ Skipped: Data not found at {LEETCODE_DATA}")
+    if os.path.exists(CODEFORCES_DATA):
+        sources.append(('codeforces', cf_transformer, cf_transformer.iter_documents(CODEFORCES_DATA)))
+    else:
+        print(f"\n[Codeforces]\n  ⚠ Skipped: Data not found at {CODEFORCES_DATA}")
+    
+    topic_names = set()
+    
+    def charge_transform_errors(transformer):
+        streaming.set_external_errors(
+            len(lc_transformer.errors) + len(cf_transformer.errors),
+            transformer.errors[-1] if transformer.errors else ''
+        )
+    
+    try:
+        for name, transformer, documents in sources:
+            with profiler.stage(name):
+                for entity_type, doc in documents:
+                    charge_transform_errors(transformer)
+                    streaming.add(entity_type, doc)
+                    if entity_type == 'problem':
+                        topic_names.update(doc.get('topics', []))
+                    if writers:
+                        writers[entity_type].write(doc)
+                charge_transform_errors(transformer)
+            
+            result['stats'][name] = transformer.stats
+            print(f"\n[{name.capitalize()}]\n  ✓ Streamed {streaming.counts['problem']} problems, "
+                  f"{streaming.counts['contest']} contests so far ({streaming.error_count} errors)")
+        
+        with profiler.stage('cross_entity'):
+            topics = sorted(
+                (build_topic_document(topic) for topic in topic_names),
+                key=lambda t: t['name']
+            )
+            validation = streaming.finish(topics)
+    except ErrorBudgetExceeded as e:
+        for writer in writers.values():
+            writer.abort()
+        streaming.result.is_valid = False
+        result['aborted'] = True
+        result['validation'] = streaming.result
+        result['errors'] = lc_transformer.errors + cf_transformer.errors + [str(e)]
+        print(f"\n  ✗ Aborted after {streaming.counts['problem']} problems, "
+              f"{streaming.counts['contest']} contests: {e}")
+        return result
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+    
+    result['validation'] = validation
+    result['errors'] = lc_transformer.errors + cf_transformer.errors
+    result['success'] = streaming.counts['problem'] > 0 or streaming.counts['contest'] > 0
+    result['stats']['total_problems'] = streaming.counts['problem']
+    result['stats']['total_contests'] = streaming.counts['contest']
+    result['stats']['total_topics'] = len(topics)
+    print(f"\n[Topics]\n  ✓ Extracted {len(topics)} unique topics")
+    
+    if writers:
+        for writer in writers.values():
+            writer.commit()
+        save_json(topics, 'topics.json')
+        report = build_normalization_report(
+            result['stats'],
+            profiler.timings_under(profiler.scope()),
+            errors={'leetcode': lc_transformer.errors, 'codeforces': cf_transformer.errors},
+            warnings={'leetcode': lc_transformer.warnings, 'codeforces': cf_transformer.warnings}
+        )
+        save_json(report, 'normalization_report.json')
+        print(f"\n  ✓ Saved to: {OUTPUT_DIR}")
+    elif dry_run:
+        print("\n  [DRY RUN] Files not saved")
+    
+    print(f"\n  Schema Errors: {validation.count('schema')}")
+    print(f"  Duplicate Errors: {validation.count('duplicate')}")
+    print(f"  Orphan Errors: {validation.count('orphan')}")
+    print(f"  Reference Errors: {validation.count('reference')}")
+    print(f"\n  VALID: {'✓ YES' if validation.is_valid else '✗ NO'}")
+    
+    return result
+
+
+def load_normalized() -> Dict[str, List[Dict]]:
+    """
+    Load normalized collections from OUTPUT_DIR.
+    
+    Raises:
+        FileNotFoundError: If normalization has not been run
+    """
+    data = {}
+    for name in ('problems', 'contests', 'topics'):
+        with open(os.path.join(OUTPUT_DIR, f"{name}.json"), 'r') as f:
+            data[name] = json.load(f)
+    return data
+
+
+def step_validate(
+    schema_version: str = "v1.0.0",
+    profiler: StageProfiler = None,
+    data: Dict[str, List[Dict]] = None,
+    validator: SchemaValidator = None,
+    schema_errors: Dict[str, List[Dict]] = None,
+    incremental: bool = False
+) -> Any:
     """
     Step 2: Validate normalized data against schemas.
     
+    Args:
+        schema_version: Schema version to use
+        profiler: Profiler to record sub-step timings into
+        data: Normalized collections from step 1 (loaded from OUTPUT_DIR if None)
+        validator: Validator to reuse (created for schema_version if None)
+        schema_errors: Per-entity schema errors already computed per type
+        incremental: Reuse cached results for documents unchanged since the
+            last incremental run (schema_errors is ignored)
+    
     Returns:
         ValidationResult
     """
+    if profiler is None:
+        profiler = StageProfiler()
+    
     print("\n" + "=" * 60)
     print("STEP 2: VALIDATION")
     print("=" * 60)
     
     # Load normalized data
-    try:
-        with open(os.path.join(OUTPUT_DIR, 'problems.json'), 'r') as f:
-            problems = json.load(f)
-        with open(os.path.join(OUTPUT_DIR, 'contests.json'), 'r') as f:
-            contests = json.load(f)
-        with open(os.path.join(OUTPUT_DIR, 'topics.json'), 'r') as f:
-            topics = json.load(f)
-    except FileNotFoundError as e:
-        print(f"  ✗ Error: Normalized data not found. Run normalization first.")
-        print(f"    {e}")
-        return None
+    if data is None:
+        try:
+            with profiler.stage('load'):
+                data = load_normalized()
+        except FileNotFoundError as e:
+            print(f"  ✗ Error: Normalized data not found. Run normalization first.")
+            print(f"    {e}")
+            return None
+    problems = data['problems']
+    contests = data['contests']
+    topics = data['topics']
     
     print(f"\n  Loaded: {len(problems)} problems, {len(contests)} contests, {len(topics)} topics")
     
+    # Near duplicates are reported here and handed to the snapshot step;
+    # descriptions make LeetCode near-duplicate detection content-based
+    with profiler.stage('descriptions'):
+        descriptions = load_leetcode_descriptions(LEETCODE_DATA)
+    
     # Run validation
-    validator = SchemaValidator(schema_version)
-    result = validator.validate_all(problems, contests, topics)
+    with profiler.stage('rules'):
+        if validator is None:
+            validator = SchemaValidator(schema_version)
+        if incremental:
+            incremental_validator = IncrementalValidator(schema_version, validator=validator)
+            result = incremental_validator.validate_all(
+                problems, contests, topics, descriptions=descriptions, near_duplicates=True
+            )
+        else:
+            result = validator.validate_all(
+                problems, contests, topics, schema_errors=schema_errors, descriptions=descriptions,
+                near_duplicates=True
+            )
+    
+    for name, seconds in result.timings.items():
+        profiler.record(f"rules.{name}", seconds)
+    
+    if incremental:
+        print()
+        for entity_type, delta in incremental_validator.delta.items():
+            print(f"  Incremental [{entity_type}]: {delta['evaluated']} evaluated, {delta['reused']} reused "
+                  f"(+{delta['added']} / -{delta['removed']} since last run)")
     
     # Print summary
-    print(f"\n  Schema Errors: {len(result.schema_errors)}")
-    print(f"  Duplicate Errors: {len(result.duplicate_errors)}")
-    print(f"  Orphan Errors: {len(result.orphan_errors)}")
-    print(f"  Reference Errors: {len(result.reference_errors)}")
+    print(f"\n  Schema Errors: {result.count('schema')}")
+    print(f"  Duplicate Errors: {result.count('duplicate')}")
+    print(f"  Orphan Errors: {result.count('orphan')}")
+    print(f"  Reference Errors: {result.count('reference')}")
+    print(f"  Near-duplicate Warnings: {len(result.near_duplicates)}")
+    for duplicate in result.near_duplicates[:5]:
+        print(f"    ⚠ {duplicate.message}")
     print(f"\n  VALID: {'✓ YES' if result.is_valid else '✗ NO'}")
     
     return result
@@ -208,14 +566,34 @@ def step_validate(schema_version: str = "v1.0.0") -> Any:
 def step_snapshot(
     version: str = None,
     schema_version: str = "v1.0.0",
-    notes: str = None
+    notes: str = None,
+    profiler: StageProfiler = None,
+    data: Dict[str, List[Dict]] = None,
+    source_dir: str = OUTPUT_DIR,
+    graph: Any = None,
+    near_duplicates: List[Any] = None,
+    compression: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Step 3: Create immutable versioned snapshot.
     
+    Args:
+        version: Specific version for snapshot (auto-increments if None)
+        schema_version: Schema version used for validation
+        notes: Notes for snapshot
+        profiler: Profiler to record sub-step timings into
+        data: Normalized collections already in memory (skips re-parsing)
+        source_dir: Directory to copy files from (None writes them from data)
+        graph: Entity graph built during validation (persisted with the snapshot)
+        near_duplicates: Near-duplicate pairs found during validation
+        compression: Codec for the snapshot's data files and shards (None: plain)
+    
     Returns:
         Snapshot creation result
     """
+    if profiler is None:
+        profiler = StageProfiler()
+    
     print("\n" + "=" * 60)
     print("STEP 3: SNAPSHOT CREATION")
     print("=" * 60)
@@ -225,49 +603,348 @@ def step_snapshot(
     
     print(f"\n  Version: {version}")
     print(f"  Schema Version: {schema_version}")
+    if compression:
+        print(f"  Compression: {compression}")
     
-    result = create_snapshot(
-        version=version,
-        source_dir=OUTPUT_DIR,
-        schema_version=schema_version,
-        notes=notes
-    )
+    with profiler.stage('create'):
+        result = create_snapshot(
+            version=version,
+            source_dir=source_dir,
+            schema_version=schema_version,
+            notes=notes,
+            data=data,
+            graph=graph,
+            near_duplicates=near_duplicates,
+            compression=compression
+        )
     
     if result['success']:
         print(f"\n  ✓ Snapshot created: {result['path']}")
         print(f"    Problems: {result['manifest']['counts']['problems']}")
         print(f"    Topics: {result['manifest']['counts']['topics']}")
         print(f"    Contests: {result['manifest']['counts'].get('contests', 0)}")
+        search = result['search']
+        print(f"    Search index: {search['terms']} terms "
+              f"({search['reused']} of {search['documents']} documents reused)")
+        print(f"    Near-duplicate pairs: {result['near_duplicates']}")
+        if result['shards']:
+            print(f"    Shards: {result['shards']['files']} "
+                  f"({result['shards']['reused']} unchanged since the previous snapshot)")
+        similarity = result['similarity']
+        if similarity:
+            print(f"    Similarity: {similarity['topics']} topics, "
+                  f"{similarity['links']} similar-problem links over {similarity['problems']} problems")
+        else:
+            print("    ⚠ Similarity artifacts skipped (NumPy not installed)")
     else:
         print(f"\n  ✗ Failed: {result['error']}")
     
     return result
 
 
+# Pipeline step each DAG stage belongs to (for steps_completed / steps_failed)
+STAGE_STEPS = {
+    'normalize_leetcode': 'normalize',
+    'normalize_codeforces': 'normalize',
+    'merge': 'normalize',
+    'load': 'validate',
+    'schema_leetcode': 'validate',
+    'schema_codeforces': 'validate',
+    'validate': 'validate',
+    'snapshot': 'snapshot',
+}
+
+
+def build_stages(
+    steps: list,
+    result: PipelineResult,
+    dry_run: bool,
+    schema_version: str,
+    snapshot_version: str,
+    notes: str,
+    profiler: StageProfiler,
+    writer: OutputWriter,
+    write_output: bool,
+    incremental: bool = False,
+    compression: Optional[str] = None
+) -> List[Stage]:
+    """
+    Build the stage graph for the requested steps.
+    
+    LeetCode and Codeforces normalize independently, and each source's
+    per-entity schema validation starts as soon as that source is
+    transformed. Collection-level rules (duplicates, references,
+    cross-entity) wait for the merged collections. Stages record their
+    results into the PipelineResult as they finish. Incremental
+    validation has no per-source schema stages: unchanged documents are
+    not schema-validated at all.
+    
+    Returns:
+        List of stages
+    """
+    stages = []
+    normalizing = 'normalize' in steps
+    validator = SchemaValidator(schema_version) if 'validate' in steps else None
+    
+    if normalizing:
+        def merge(leetcode, codeforces):
+            norm = merge_normalized(leetcode, codeforces, profiler)
+            result.normalization = norm['stats']
+            result.errors.extend(norm['errors'])
+            
+            if not dry_run and write_output:
+                timings = {
+                    name: profiler.timings[name]
+                    for name in ('normalize_leetcode', 'normalize_codeforces', 'merge')
+                    if name in profiler.timings
+                }
+                write_normalized(norm, writer, profiler, timings)
+            elif dry_run:
+                print("\n  [DRY RUN] Files not saved")
+            else:
+                print("\n  Output files not written (kept in memory)")
+            
+            if not norm['success']:
+                raise StageFailed("No problems or contests were normalized")
+            return {'canonical': {
+                'problems': norm['problems'],
+                'contests': norm['contests'],
+                'topics': norm['topics'],
+            }}
+        
+        stages.extend([
+            Stage('normalize_leetcode', lambda: {'leetcode': normalize_leetcode()},
+                  outputs=['leetcode']),
+            Stage('normalize_codeforces', lambda: {'codeforces': normalize_codeforces()},
+                  outputs=['codeforces']),
+            Stage('merge', merge, inputs=['leetcode', 'codeforces'], outputs=['canonical']),
+        ])
+    
+    if 'validate' in steps:
+        schema_inputs = []
+        if normalizing and not incremental:
+            def schema_leetcode(leetcode):
+                problems = leetcode['problems'] if leetcode else []
+                return {'schema.leetcode': {'problem': validator.validate_batch(problems, 'problem')}}
+            
+            def schema_codeforces(codeforces):
+                problems = codeforces['problems'] if codeforces else []
+                contests = codeforces['contests'] if codeforces else []
+                return {'schema.codeforces': {
+                    'problem': validator.validate_batch(problems, 'problem'),
+                    'contest': validator.validate_batch(contests, 'contest'),
+                }}
+            
+            schema_inputs = ['schema.leetcode', 'schema.codeforces']
+            stages.extend([
+                Stage('schema_leetcode', schema_leetcode,
+                      inputs=['leetcode'], outputs=['schema.leetcode']),
+                Stage('schema_codeforces', schema_codeforces,
+                      inputs=['codeforces'], outputs=['schema.codeforces']),
+            ])
+        elif not normalizing:
+            def load():
+                try:
+                    return {'canonical': load_normalized()}
+                except FileNotFoundError as e:
+                    print(f"  ✗ Error: Normalized data not found. Run normalization first.")
+                    print(f"    {e}")
+                    raise StageFailed(f"Normalized data not found: {e}")
+            
+            stages.append(Stage('load', load, outputs=['canonical']))
+        
+        def validate(canonical, **schema):
+            schema_errors = None
+            if schema:
+                # Same order as sequential validation: LeetCode problems first
+                schema_errors = {
+                    'problem': schema['schema.leetcode']['problem'] + schema['schema.codeforces']['problem'],
+                    'contest': schema['schema.codeforces']['contest'],
+                }
+            val_result = step_validate(
+                schema_version,
+                profiler=profiler,
+                data=canonical,
+                validator=validator,
+                schema_errors=schema_errors,
+                incremental=incremental
+            )
+            result.validation = val_result
+            if not val_result.is_valid:
+                raise StageFailed(f"Validation failed with {val_result.total_errors()} errors")
+            return {'validation': val_result}
+        
+        stages.append(Stage('validate', validate,
+                            inputs=['canonical'] + schema_inputs, outputs=['validation']))
+    
+    if 'snapshot' in steps and not dry_run and 'validate' in steps:
+        def snapshot(canonical, validation):
+            source_dir = OUTPUT_DIR
+            if normalizing:
+                # Copy the files if they were written, else write from memory
+                write_errors = writer.wait()
+                if write_errors:
+                    result.errors.extend(write_errors)
+                    result.success = False
+                if write_errors or not write_output:
+                    source_dir = None
+            
+            snap_result = step_snapshot(
+                version=snapshot_version,
+                schema_version=schema_version,
+                notes=notes,
+                profiler=profiler,
+                data=canonical,
+                source_dir=source_dir,
+                graph=validation.graph,
+                near_duplicates=validation.near_duplicates,
+                compression=compression
+            )
+            result.snapshot = snap_result
+            if not snap_result['success']:
+                raise StageFailed(snap_result['error'])
+        
+        stages.append(Stage('snapshot', snapshot, inputs=['canonical', 'validation']))
+    
+    return stages
+
+
+def run_streaming(
+    steps: list,
+    result: PipelineResult,
+    dry_run: bool,
+    schema_version: str,
+    snapshot_version: str,
+    notes: str,
+    profiler: StageProfiler,
+    write_output: bool,
+    max_errors: Optional[int],
+    compression: Optional[str] = None
+):
+    """
+    Run the pipeline in streaming mode, recording into result.
+    
+    Normalization and validation run as one streamed pass. A snapshot
+    (if requested) is then created from the written output files, since
+    the documents are not kept in memory.
+    """
+    try:
+        with profiler.stage('stream'):
+            stream_result = step_stream(
+                schema_version,
+                max_errors=max_errors,
+                dry_run=dry_run,
+                write_output=write_output,
+                profiler=profiler
+            )
+    except Exception as e:
+        result.steps_failed.extend(['normalize', 'validate'])
+        result.errors.append(f"Streaming failed: {str(e)}")
+        result.success = False
+        return
+    
+    result.normalization = stream_result['stats']
+    result.validation = stream_result['validation']
+    result.errors.extend(stream_result['errors'])
+    
+    if stream_result['aborted'] or not stream_result['success']:
+        result.steps_failed.append('normalize')
+        # The error budget is a validation limit: the run stopped because
+        # validation failed, not only because normalization was cut short
+        if stream_result['aborted']:
+            result.steps_failed.append('validate')
+        result.success = False
+        return
+    result.steps_completed.append('normalize')
+    
+    if result.validation.is_valid:
+        result.steps_completed.append('validate')
+    else:
+        result.steps_failed.append('validate')
+        result.success = False
+        return
+    
+    if 'snapshot' in steps and not dry_run:
+        if not write_output:
+            print("\n  ⚠ Skipping snapshot: streaming mode needs the output files")
+            result.warnings.append("Snapshot skipped: --stream with --no-write-output")
+            return
+        try:
+            with profiler.stage('snapshot'):
+                snap_result = step_snapshot(
+                    version=snapshot_version,
+                    schema_version=schema_version,
+                    notes=notes,
+                    profiler=profiler,
+                    compression=compression
+                )
+            result.snapshot = snap_result
+            if snap_result['success']:
+                result.steps_completed.append('snapshot')
+            else:
+                result.steps_failed.append('snapshot')
+        except Exception as e:
+            result.steps_failed.append('snapshot')
+            result.errors.append(f"Snapshot creation failed: {str(e)}")
+
+
 def run_pipeline(
     steps: list = None,
     dry_run: bool = False,
     schema_version: str = "v1.0.0",
     snapshot_version: str = None,
-    notes: str = None
+    notes: str = None,
+    profiler: StageProfiler = None,
+    write_output: bool = True,
+    max_workers: int = 4,
+    stream: bool = False,
+    max_errors: Optional[int] = None,
+    incremental: bool = False,
+    compression: Optional[str] = None
 ) -> PipelineResult:
     """
     Run the complete data ingestion pipeline.
     
+    Steps are expanded into a stage graph and run concurrently as soon as
+    their inputs are ready (see build_stages). Collections are handed
+    between stages in memory; the output files are written in the
+    background (or skipped with write_output=False). A failed stage
+    cancels everything downstream of it.
+    
     Args:
         steps: List of steps to run (normalize, validate, snapshot)
         dry_run: Don't save any files
         schema_version: Schema version to use
         snapshot_version: Specific version for snapshot
         notes: Notes for snapshot
+        profiler: Profiler for stage timings (and optional cProfile/tracemalloc)
+        write_output: Write normalized collections to OUTPUT_DIR
+        max_workers: Maximum number of stages running at once
+        stream: Normalize and validate one document at a time (see step_stream);
+            requires the normalize and validate steps
+        max_errors: Error budget for streaming mode
+        incremental: Revalidate only documents changed since the last
+            incremental run (see IncrementalValidator)
+        compression: Store the snapshot compressed with this codec
+            ('gzip', 'lzma' or 'zstd')
         
     Returns:
         PipelineResult with aggregated results
     """
     if steps is None:
         steps = ['normalize', 'validate', 'snapshot']
+    if profiler is None:
+        profiler = StageProfiler()
+    if stream and not {'normalize', 'validate'} <= set(steps):
+        raise ValueError("Streaming mode requires the normalize and validate steps")
+    if stream and incremental:
+        raise ValueError("Streaming and incremental validation cannot be combined")
+    if profiler.profile or profiler.trace_memory:
+        # Profilers and tracemalloc peaks are process-wide; keep stages apart
+        max_workers = 1
     
     result = PipelineResult()
+    writer = OutputWriter(background=len(steps) > 1)
     
     print("\n" + "=" * 60)
     print("DATA INGESTION PIPELINE")
@@ -276,65 +953,66 @@ def run_pipeline(
     print(f"Steps: {steps}")
     print(f"Dry Run: {dry_run}")
     print(f"Schema Version: {schema_version}")
+    if incremental:
+        print("Validation: incremental")
+    if stream:
+        print(f"Mode: streaming (error budget: {max_errors if max_errors is not None else 'none'})")
+    else:
+        print(f"Workers: {max_workers}")
     
-    # Step 1: Normalization
-    if 'normalize' in steps:
-        try:
-            norm_result = step_normalize(dry_run=dry_run)
-            result.normalization = norm_result['stats']
-            result.errors.extend(norm_result.get('errors', []))
-            
-            if norm_result['success']:
-                result.steps_completed.append('normalize')
-            else:
-                result.steps_failed.append('normalize')
+    dag_result = None
+    if stream:
+        run_streaming(
+            steps, result, dry_run, schema_version, snapshot_version, notes,
+            profiler, write_output, max_errors, compression
+        )
+    else:
+        stages = build_stages(
+            steps, result, dry_run, schema_version, snapshot_version, notes,
+            profiler, writer, write_output, incremental, compression
+        )
+        dag_result = DAGExecutor(stages, max_workers=max_workers, profiler=profiler).run()
+        result.schedule = dag_result.to_dict()
+    
+    # Map stage outcomes back onto pipeline steps
+    for step in (steps if dag_result else []):
+        runs = [run for name, run in dag_result.runs.items() if STAGE_STEPS.get(name) == step]
+        if not runs:
+            continue
+        if any(run.status == FAILED for run in runs):
+            result.steps_failed.append(step)
+            # Snapshot failures are reported but don't fail the run
+            if step != 'snapshot':
                 result.success = False
-        except Exception as e:
-            result.steps_failed.append('normalize')
-            result.errors.append(f"Normalization failed: {str(e)}")
-            result.success = False
+        elif all(run.status == SUCCEEDED for run in runs):
+            result.steps_completed.append(step)
     
-    # Step 2: Validation
-    if 'validate' in steps and result.success:
-        try:
-            val_result = step_validate(schema_version)
-            result.validation = val_result
-            
-            if val_result and val_result.is_valid:
-                result.steps_completed.append('validate')
-            else:
-                result.steps_failed.append('validate')
-                # Don't fail the whole pipeline for validation warnings
-                # but don't proceed to snapshot
-                if val_result and val_result.total_errors() > 0:
-                    result.success = False
-        except Exception as e:
-            result.steps_failed.append('validate')
-            result.errors.append(f"Validation failed: {str(e)}")
-            result.success = False
+    for name, run in (dag_result.runs.items() if dag_result else []):
+        if run.status == FAILED and run.error_type != 'StageFailed':
+            result.errors.append(f"Stage {name} failed: {run.error}")
     
-    # Step 3: Snapshot
-    if 'snapshot' in steps and result.success and not dry_run:
-        # Only create snapshot if validation passed
-        if result.validation and result.validation.is_valid:
-            try:
-                snap_result = step_snapshot(
-                    version=snapshot_version,
-                    schema_version=schema_version,
-                    notes=notes
-                )
-                result.snapshot = snap_result
-                
-                if snap_result['success']:
-                    result.steps_completed.append('snapshot')
-                else:
-                    result.steps_failed.append('snapshot')
-            except Exception as e:
-                result.steps_failed.append('snapshot')
-                result.errors.append(f"Snapshot creation failed: {str(e)}")
-        else:
-            print("\n  ⚠ Skipping snapshot: Validation did not pass")
-            result.warnings.append("Snapshot skipped due to validation errors")
+    if 'snapshot' in steps and not dry_run and 'validate' not in steps and result.success:
+        print("\n  ⚠ Skipping snapshot: Validation did not pass")
+        result.warnings.append("Snapshot skipped due to validation errors")
+    
+    write_errors = writer.close()
+    if write_errors:
+        result.errors.extend(write_errors)
+        result.success = False
+    if writer.timing_name in profiler.timings:
+        profiler.timings[writer.timing_name] += writer.seconds
+    
+    profiler.close()
+    result.timings = {k: round(v, 4) for k, v in profiler.timings.items()}
+    if profiler.profile or profiler.trace_memory:
+        result.profiling = profiler.to_dict()
+    
+    # Publish metrics for the textfile / HTTP exporter
+    record_stage_timings('run_pipeline', profiler.timings)
+    if result.normalization:
+        record_normalization_stats(result.normalization)
+    if result.validation:
+        record_validation_result(result.validation)
     
     # Final summary
     print("\n" + "=" * 60)
@@ -349,6 +1027,23 @@ def run_pipeline(
     if result.warnings:
         print(f"  Warnings: {len(result.warnings)}")
     
+    if dag_result:
+        print("\n  Schedule (* = critical path):")
+        for line in dag_result.format_report():
+            print(f"    {line}")
+    
+    print("\n  Timings:")
+    for line in profiler.format_timings():
+        print(f"    {line}")
+    
+    for stage, memory in profiler.memory.items():
+        print(f"\n  Memory [{stage}]: peak {memory['peak_mb']}MB, retained {memory['retained_mb']}MB")
+        for site in memory['top_allocations'][:5]:
+            print(f"    {site['size_kb']:>10.1f} KB  {site['site']}")
+    
+    if profiler.artifacts:
+        print(f"\n  Profile artifacts: {profiler.output_dir}")
+    
     return result
 
 
@@ -367,6 +1062,32 @@ def main():
         action='store_true',
         help="Don't save any files"
     )
+    parser.add_argument(
+        '--no-write-output',
+        action='store_true',
+        help="Keep normalized data in memory only (standalone validate/snapshot steps need the files)"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help="Maximum number of stages running concurrently (default: 4)"
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help="Validate each document as it is transformed instead of in batch (full runs only)"
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="Reuse cached validation results for documents unchanged since the last incremental run"
+    )
+    parser.add_argument(
+        '--max-errors',
+        type=int,
+        help="Abort as soon as more than N transform/validation errors are seen (implies --stream)"
+    )
     parser.add_argument(
         '--schema-version',
         default="v1.0.0",
@@ -380,6 +1101,26 @@ def main():
         '--notes',
         help="Notes for the snapshot"
     )
+    parser.add_argument(
+        '--compression',
+        choices=list(CODECS),
+        help="Store the snapshot's data files and shards compressed (zstd needs the zstandard package)"
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="Write a cProfile dump and collapsed-stack samples per stage"
+    )
+    parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help="Record tracemalloc snapshots and top allocation sites per stage"
+    )
+    parser.add_argument(
+        '--profile-dir',
+        help=f"Directory for profile artifacts (default: {PROFILES_DIR}/<timestamp>)"
+    )
+    add_metrics_arguments(parser, 'run_pipeline')
     args = parser.parse_args()
     
     if args.step == 'all':
@@ -387,14 +1128,39 @@ def main():
     else:
         steps = [args.step]
     
-    result = run_pipeline(
-        steps=steps,
-        dry_run=args.dry_run,
-        schema_version=args.schema_version,
-        snapshot_version=args.snapshot_version,
-        notes=args.notes
+    stream = args.stream or args.max_errors is not None
+    if stream and args.step != 'all':
+        parser.error("--stream/--max-errors require --step all")
+    if stream and args.incremental:
+        parser.error("--incremental cannot be combined with --stream/--max-errors")
+    
+    profile_dir = args.profile_dir
+    if profile_dir is None and (args.profile or args.trace_memory):
+        profile_dir = os.path.join(PROFILES_DIR, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    
+    profiler = StageProfiler(
+        profile=args.profile,
+        trace_memory=args.trace_memory,
+        output_dir=profile_dir
     )
     
+    with MetricsRun('run_pipeline', args.metrics_file, args.metrics_port) as metrics_run:
+        result = run_pipeline(
+            steps=steps,
+            dry_run=args.dry_run,
+            schema_version=args.schema_version,
+            snapshot_version=args.snapshot_version,
+            notes=args.notes,
+            profiler=profiler,
+            write_output=not args.no_write_output,
+            max_workers=args.workers,
+            stream=stream,
+            max_errors=args.max_errors,
+            incremental=args.incremental,
+            compression=args.compression
+        )
+        metrics_run.success = result.success
+    
     # Exit with appropriate code
     sys.exit(0 if result.success else 1)
 
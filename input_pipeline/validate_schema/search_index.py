@@ -0,0 +1,299 @@
+"""
+Search Index
+
+BM25 full-text search over snapshot problems:
+- Documents are problem titles plus, for LeetCode, the description
+  Markdown produced by html_to_markdown from the raw LeetCode data
+- Postings (doc gap, term frequency) are varint-encoded into
+  search_index.bin; the term dictionary, document lengths and content
+  hashes go to search_index.json
+- search() scores only the query terms' postings and keeps the top K
+  with a heap
+
+Builds are incremental across snapshot versions: documents whose title
+and description are unchanged since the previous snapshot reuse the term
+frequencies decoded from its index instead of being converted and
+tokenized again.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import hashlib
+from array import array
+from typing import Dict, List, Any, Optional, Tuple
+
+from modify_data.utils.html_stripper import html_to_markdown
+from modify_data.utils.json_array_reader import iter_json_array
+
+
+# Bump when the index layout or tokenization changes
+SEARCH_INDEX_FORMAT = 1
+
+SEARCH_INDEX_FILE = "search_index.json"
+SEARCH_POSTINGS_FILE = "search_index.bin"
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Title tokens are counted this many times (titles are short but precise)
+TITLE_WEIGHT = 3
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or "
+    "such that the their then there these this to was were which will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens, without stopwords."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def content_hash(title: str, description_html: str) -> str:
+    """Hash of the text a document is built from."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(title.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(description_html.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def term_frequencies(title: str, description_html: str) -> Dict[str, int]:
+    """Weighted term frequencies of one document."""
+    counts: Dict[str, int] = {}
+    for token in tokenize(title):
+        counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+    if description_html:
+        for token in tokenize(html_to_markdown(description_html)):
+            counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def load_leetcode_descriptions(filepath: str) -> Dict[str, str]:
+    """
+    Raw description HTML per slug from a LeetCode data file.
+
+    Args:
+        filepath: merged_problems.json (a list or {questions|problems: [...]})
+
+    Returns:
+        Dict of slug to description HTML ({} if the file does not exist)
+    """
+    if not filepath or not os.path.exists(filepath):
+        return {}
+    descriptions = {}
+    # Read one problem at a time; only the description HTML is kept
+    for raw in iter_json_array(filepath, keys=('questions', 'problems')):
+        slug = raw.get('problem_slug') or raw.get('titleSlug')
+        html = raw.get('description') or raw.get('question') or raw.get('content')
+        if slug and html:
+            descriptions[slug] = html
+    return descriptions
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_postings(postings: List[Tuple[int, int]]) -> bytes:
+    """Varint-encode (doc, tf) pairs sorted by doc as (doc gap, tf)."""
+    out = bytearray()
+    previous = 0
+    for doc, tf in postings:
+        _encode_varint(doc - previous, out)
+        _encode_varint(tf, out)
+        previous = doc
+    return bytes(out)
+
+
+def decode_postings(data: bytes) -> List[Tuple[int, int]]:
+    """Inverse of encode_postings()."""
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+
+    postings = []
+    doc = 0
+    for i in range(0, len(values), 2):
+        doc += values[i]
+        postings.append((doc, values[i + 1]))
+    return postings
+
+
+class SearchIndex:
+    """
+    Compressed inverted index with BM25 scoring.
+    """
+
+    def __init__(self, meta: Dict[str, Any], postings: bytes):
+        """
+        Initialize from index metadata and the postings blob.
+
+        Args:
+            meta: Contents of search_index.json
+            postings: Contents of search_index.bin
+        """
+        self.meta = meta
+        self.postings = postings
+        self.terms: Dict[str, List[int]] = meta['terms']
+        self.doc_ids: List[str] = meta['docs']['ids']
+        self.doc_lengths = array('i', meta['docs']['lengths'])
+        self.doc_count = len(self.doc_ids)
+        self.avg_length = meta['avg_length'] or 1.0
+        # Filled in by build(): documents reused from the previous index
+        self.reused = 0
+
+    @classmethod
+    def build(
+        cls,
+        problems: List[Dict],
+        descriptions: Optional[Dict[str, str]] = None,
+        previous: Optional['SearchIndex'] = None
+    ) -> 'SearchIndex':
+        """
+        Build the index.
+
+        Args:
+            problems: Snapshot problems (in file order; doc id = position)
+            descriptions: LeetCode description HTML per slug
+            previous: Index of the previous snapshot (unchanged documents
+                reuse its term frequencies)
+
+        Returns:
+            SearchIndex
+        """
+        descriptions = descriptions or {}
+        previous_docs = previous.document_terms() if previous is not None else {}
+
+        inverted: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        hashes = []
+        reused = 0
+
+        for doc, problem in enumerate(problems):
+            title = problem.get('title') or ''
+            html = descriptions.get(problem.get('slug'), '') if problem.get('source') == 'leetcode' else ''
+            digest = content_hash(title, html)
+
+            cached = previous_docs.get(problem.get('problem_id'))
+            if cached is not None and cached[0] == digest:
+                counts = cached[1]
+                reused += 1
+            else:
+                counts = term_frequencies(title, html)
+
+            for term, tf in counts.items():
+                inverted.setdefault(term, []).append((doc, tf))
+            lengths.append(sum(counts.values()))
+            hashes.append(digest)
+
+        blob = bytearray()
+        terms = {}
+        for term in sorted(inverted):
+            encoded = encode_postings(inverted[term])
+            terms[term] = [len(blob), len(encoded), len(inverted[term])]
+            blob.extend(encoded)
+
+        meta = {
+            'format': SEARCH_INDEX_FORMAT,
+            'k1': K1,
+            'b': B,
+            'title_weight': TITLE_WEIGHT,
+            'avg_length': sum(lengths) / len(lengths) if lengths else 0.0,
+            'docs': {
+                'ids': [problem.get('problem_id', '') for problem in problems],
+                'lengths': lengths,
+                'hashes': hashes,
+            },
+            'terms': terms,
+        }
+        index = cls(meta, bytes(blob))
+        index.reused = reused
+        return index
+
+    def document_terms(self) -> Dict[str, Tuple[str, Dict[str, int]]]:
+        """
+        Forward view of the index: problem id → (content hash, term frequencies).
+
+        Decodes every postings list once; used to carry unchanged documents
+        over to the next snapshot's index.
+        """
+        forward: List[Dict[str, int]] = [{} for _ in self.doc_ids]
+        for term, (offset, length, _) in self.terms.items():
+            for doc, tf in decode_postings(self.postings[offset:offset + length]):
+                forward[doc][term] = tf
+        hashes = self.meta['docs']['hashes']
+        return {doc_id: (hashes[doc], forward[doc]) for doc, doc_id in enumerate(self.doc_ids)}
+
+    def save(self, directory: str):
+        """Write search_index.json and search_index.bin into a directory."""
+        with open(os.path.join(directory, SEARCH_POSTINGS_FILE), 'wb') as f:
+            f.write(self.postings)
+        with open(os.path.join(directory, SEARCH_INDEX_FILE), 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.meta, ensure_ascii=False, separators=(',', ':')))
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['SearchIndex']:
+        """
+        Load the index of a snapshot directory.
+
+        Returns:
+            SearchIndex, or None if the directory has no (current-format) index
+        """
+        meta_path = os.path.join(directory, SEARCH_INDEX_FILE)
+        postings_path = os.path.join(directory, SEARCH_POSTINGS_FILE)
+        if not os.path.exists(meta_path) or not os.path.exists(postings_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format') != SEARCH_INDEX_FORMAT:
+            return None
+        with open(postings_path, 'rb') as f:
+            postings = f.read()
+        return cls(meta, postings)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Top-K documents for a query by BM25 score.
+
+        Args:
+            query: Free-text query
+            k: Number of results
+
+        Returns:
+            (doc position, score) pairs, best first
+        """
+        scores: Dict[int, float] = {}
+        k1 = self.meta['k1']
+        b = self.meta['b']
+        lengths = self.doc_lengths
+        norm = k1 / self.avg_length
+
+        for term in dict.fromkeys(tokenize(query)):
+            entry = self.terms.get(term)
+            if entry is None:
+                continue
+            offset, length, df = entry
+            idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+            for doc, tf in decode_postings(self.postings[offset:offset + length]):
+                denominator = tf + k1 * (1 - b) + norm * b * lengths[doc]
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / denominator
+
+        # Ties go to the earlier document
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(doc, round(score, 4)) for doc, score in best]
@@ -0,0 +1,247 @@
+"""
+Snapshot Shards
+
+Optional sharded copies of the large collections, so loaders, hashers and
+uploaders can work on independent pieces in parallel:
+- problems and contests are partitioned by source, then by a hash range of
+  their primary key (problem_id / contest_id) into SHARD_COUNT shards per
+  source: shards/<collection>-<source>-<NN>.json
+- every shard is a JSON array in file order of the collection, listed in
+  manifest.json with its source, hash range, record count and checksum
+- a shard whose content is unchanged since the previous snapshot is linked
+  from it instead of being compressed and written again, so an update only
+  regenerates the shards its records fall into
+- in compressed snapshots every shard is compressed on its own, so shards
+  still load independently
+
+The unsharded collection files stay the reference for record positions
+(offset, query and similarity indexes), so shards are a second copy of
+problems and contests: snapshots only get them when asked for
+(create_snapshot(shard_count=N), off by default).
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from validate_schema.manifest_generator import compute_sha256
+from validate_schema.compression import CODECS, compress_bytes, load_json_data
+
+
+SHARD_DIR = "shards"
+
+# Shards per source when sharding is enabled
+SHARD_COUNT = 4
+
+# Sharded collections and the key their records are hashed by
+SHARD_KEYS = {
+    'problems': 'problem_id',
+    'contests': 'contest_id',
+}
+
+# Threads used to hash, load or upload shards
+SHARD_WORKERS = 4
+
+_HASH_SPACE = 1 << 32
+
+
+def shard_of(key: str, count: int) -> int:
+    """
+    Hash range a key falls into.
+
+    Args:
+        key: Primary key value
+        count: Shards per source
+
+    Returns:
+        Shard number in [0, count)
+    """
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return (int.from_bytes(digest[:4], 'big') * count) >> 32
+
+
+def hash_range(shard: int, count: int) -> List[int]:
+    """[low, high) of the 32-bit key hashes that map to a shard."""
+    return [-(-shard * _HASH_SPACE // count), -(-(shard + 1) * _HASH_SPACE // count)]
+
+
+def shard_filename(collection: str, source: str, shard: int, codec: Optional[str] = None) -> str:
+    """Path of a shard relative to the snapshot directory."""
+    return f"{SHARD_DIR}/{collection}-{source}-{shard:02d}.json{CODECS[codec] if codec else ''}"
+
+
+def partition(records: List[Dict], collection: str, count: int = SHARD_COUNT) -> Dict[Tuple[str, int], List[Dict]]:
+    """
+    Split a collection into shards.
+
+    Args:
+        records: Collection records (in file order)
+        collection: 'problems' or 'contests'
+        count: Shards per source
+
+    Returns:
+        (source, shard) → records (in file order), sorted by source and shard
+    """
+    key = SHARD_KEYS[collection]
+    shards: Dict[tuple, List[Dict]] = {}
+    for record in records:
+        source = str(record.get('source') or 'unknown')
+        shards.setdefault((source, shard_of(str(record.get(key, '')), count)), []).append(record)
+    return {source_shard: shards[source_shard] for source_shard in sorted(shards)}
+
+
+def link_or_copy(src: str, dst: str):
+    """Hard-link a file into place (copy across filesystems)."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def write_shards(
+    snapshot_dir: str,
+    collections: Dict[str, List[Dict]],
+    count: int = SHARD_COUNT,
+    previous_dir: Optional[str] = None,
+    previous: Optional[Dict[str, Any]] = None,
+    codec: Optional[str] = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Write the shards of a snapshot.
+
+    Args:
+        snapshot_dir: Snapshot directory
+        collections: Collection name → records, for the collections in SHARD_KEYS
+        count: Shards per source
+        previous_dir: Directory of the previous snapshot
+        previous: The previous snapshot's manifest 'shards' section; shards
+            with the same file name and content are linked from it
+        codec: Compress each shard with this codec (see compression.CODECS)
+
+    Returns:
+        (manifest 'shards' section: count and per-collection shard entries
+        with file, source, hash_range, count and checksum of the stored
+        bytes, plus content_checksum when compressed;
+        files linked from the previous snapshot)
+    """
+    os.makedirs(os.path.join(snapshot_dir, SHARD_DIR), exist_ok=True)
+
+    # File name -> previous entry (the name carries source, shard and codec)
+    previous_entries = {}
+    if previous and previous_dir and previous.get('count') == count:
+        for entries in previous.get('collections', {}).values():
+            for entry in entries:
+                previous_entries[entry['file']] = entry
+
+    section: Dict[str, Any] = {'count': count, 'collections': {}}
+    reused = []
+    for collection, records in collections.items():
+        entries = []
+        for (source, shard), shard_records in partition(records, collection, count).items():
+            filename = shard_filename(collection, source, shard, codec)
+            content = json.dumps(shard_records, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            content_checksum = f"sha256:{hashlib.sha256(content).hexdigest()}"
+            path = os.path.join(snapshot_dir, filename)
+
+            # Unchanged partition: link the previous file, skipping compression
+            previous_entry = previous_entries.get(filename)
+            previous_path = os.path.join(previous_dir, filename) if previous_dir else None
+            if (previous_entry is not None and
+                    previous_entry.get('content_checksum', previous_entry['checksum']) == content_checksum and
+                    os.path.exists(previous_path)):
+                link_or_copy(previous_path, path)
+                reused.append(filename)
+                checksum = previous_entry['checksum']
+            else:
+                stored = compress_bytes(content, codec) if codec else content
+                checksum = f"sha256:{hashlib.sha256(stored).hexdigest()}" if codec else content_checksum
+                with open(path, 'wb') as f:
+                    f.write(stored)
+
+            entry = {
+                'file': filename,
+                'source': source,
+                'hash_range': hash_range(shard, count),
+                'count': len(shard_records),
+                'checksum': checksum,
+            }
+            if codec:
+                entry['content_checksum'] = content_checksum
+            entries.append(entry)
+        section['collections'][collection] = entries
+    return section, reused
+
+
+def shard_entries(manifest: Dict[str, Any], collection: str, source: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Shard entries of a collection in a manifest (empty if unsharded)."""
+    entries = manifest.get('shards', {}).get('collections', {}).get(collection, [])
+    return [entry for entry in entries if source is None or entry['source'] == source]
+
+
+def load_shard(snapshot_dir: str, entry: Dict[str, Any]) -> List[Dict]:
+    """Records of one shard (decompressed if needed)."""
+    return load_json_data(os.path.join(snapshot_dir, entry['file']))
+
+
+def map_shards(
+    snapshot_dir: str,
+    entries: List[Dict[str, Any]],
+    fn: Callable[[Dict[str, Any], List[Dict]], Any],
+    workers: int = SHARD_WORKERS
+) -> List[Any]:
+    """
+    Load shards and process each with fn(entry, records) on a thread pool.
+
+    Suited to I/O-bound work (uploads, hashing); results come back in
+    entry order.
+
+    Args:
+        snapshot_dir: Snapshot directory
+        entries: Shard entries (see shard_entries())
+        fn: Called once per shard
+        workers: Threads
+
+    Returns:
+        fn results per shard
+    """
+    def run(entry):
+        return fn(entry, load_shard(snapshot_dir, entry))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(run, entries))
+
+
+def verify_shards(snapshot_dir: str, manifest: Dict[str, Any], workers: int = SHARD_WORKERS) -> Dict[str, List]:
+    """
+    Check every shard's checksum against the manifest, in parallel.
+
+    Args:
+        snapshot_dir: Snapshot directory
+        manifest: Snapshot manifest
+        workers: Threads (hashing releases the GIL)
+
+    Returns:
+        Dict with 'missing' (file names) and 'mismatches'
+        ({'file', 'expected', 'actual'} dicts)
+    """
+    entries = [
+        entry
+        for collection in manifest.get('shards', {}).get('collections', {})
+        for entry in shard_entries(manifest, collection)
+    ]
+
+    def check(entry):
+        path = os.path.join(snapshot_dir, entry['file'])
+        return entry, compute_sha256(path) if os.path.exists(path) else None
+
+    result = {'missing': [], 'mismatches': []}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for entry, actual in pool.map(check, entries):
+            if actual is None:
+                result['missing'].append(entry['file'])
+            elif actual != entry['checksum']:
+                result['mismatches'].append({'file': entry['file'], 'expected': entry['checksum'], 'actual': actual})
+    return result
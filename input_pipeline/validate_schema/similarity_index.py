@@ -0,0 +1,327 @@
+"""
+Similarity Index
+
+Precomputed "related topics" and "similar problems" for a snapshot:
+- Each problem is a 0/1 row over the snapshot's topics (entity graph
+  topic ids, expanded from the problem → topics adjacency) plus its
+  rating (distances normalized by the rating span)
+- topic_cooccurrence.npy: topics x topics, problems tagged with both
+  (the diagonal is the problem count per topic)
+- similar_problems.npy / similar_scores.npy: the TOP_K problems closest
+  to each problem by topic Jaccard, penalized by rating distance
+
+Both are built with vectorized NumPy: co-occurrence is one matrix product,
+similarities are computed a block of rows at a time (block x problems)
+and reduced to the top K with argpartition. NumPy is optional; without it
+the artifacts are not written.
+"""
+
+import os
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from normalize_schema.entity_graph import EntityGraph
+
+
+COOCCURRENCE_FILE = "topic_cooccurrence.npy"
+SIMILAR_PROBLEMS_FILE = "similar_problems.npy"
+SIMILAR_SCORES_FILE = "similar_scores.npy"
+
+# Neighbours kept per problem
+TOP_K = 10
+
+# score = topic Jaccard - RATING_WEIGHT * |rating difference| / rating span
+RATING_WEIGHT = 0.5
+
+# Rating distance assumed when either problem is unrated
+UNRATED_DISTANCE = 0.5
+
+# Problems per similarity block (block x problems float64 temporaries)
+BLOCK_SIZE = 256
+
+# Scores are compared at this precision, far below the smallest gap
+# between two distinct scores
+_SCORE_DECIMALS = 9
+
+# Ranks ties by position (earlier problem first)
+_TIE_BREAK = 1e-13
+
+
+def topic_matrix(graph: EntityGraph) -> 'np.ndarray':
+    """
+    Problems x topics 0/1 matrix of the defined problems.
+
+    Args:
+        graph: Snapshot entity graph
+
+    Returns:
+        float32 array (problem_count, topic nodes)
+    """
+    count = graph.problem_count
+    offsets = np.frombuffer(graph.problem_topics.offsets, dtype=np.int32)[:count + 1]
+    targets = np.frombuffer(graph.problem_topics.targets, dtype=np.int32)[:offsets[-1]]
+    rows = np.repeat(np.arange(count), np.diff(offsets))
+
+    matrix = np.zeros((count, len(graph.topic_names)), dtype=np.float32)
+    matrix[rows, targets] = 1.0
+    return matrix
+
+
+def problem_ratings(problems: List[Dict]) -> 'np.ndarray':
+    """
+    Ratings of the problems (NaN if unrated).
+
+    Args:
+        problems: Snapshot problems (in file order)
+
+    Returns:
+        float64 array (problems,)
+    """
+    return np.array(
+        [p['rating'] if isinstance(p.get('rating'), (int, float)) else np.nan for p in problems],
+        dtype=np.float64
+    )
+
+
+def topic_cooccurrence(matrix: 'np.ndarray') -> 'np.ndarray':
+    """Topics x topics count of problems tagged with both topics."""
+    return (matrix.T @ matrix).astype(np.int32)
+
+
+def rating_penalties(ratings: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Rating penalty of every problem pair, factored by distinct rating.
+
+    Distances are normalized by the rating span (so they fall in [0, 1]).
+    Ratings take few distinct values, so the penalty is tabulated once per
+    value: row level[i] of the table holds problem i's penalty against
+    every problem. Raw ratings are subtracted before scaling, so equal
+    rating gaps give bit-identical penalties and ties stay ties.
+
+    Args:
+        ratings: Ratings (NaN if unrated)
+
+    Returns:
+        (table float64 (distinct ratings, problems), level int (problems,))
+    """
+    values, level = np.unique(ratings, return_inverse=True)
+    rated = values[~np.isnan(values)]
+    span = float(rated.max() - rated.min()) if rated.size else 0.0
+
+    distance = np.abs(values[:, None] - ratings[None, :])
+    if span > 0:
+        distance *= RATING_WEIGHT / span
+    distance[np.isnan(distance)] = RATING_WEIGHT * UNRATED_DISTANCE
+    return distance, level.reshape(-1)
+
+
+def problem_profiles(matrix: 'np.ndarray', ratings: 'np.ndarray') -> Tuple['np.ndarray', List['np.ndarray']]:
+    """
+    Group problems with the same topics and rating.
+
+    Args:
+        matrix: Problems x topics 0/1 matrix
+        ratings: Ratings (NaN if unrated)
+
+    Returns:
+        (first problem of each profile, sorted member positions per profile),
+        profiles in order of first appearance
+    """
+    keys = np.concatenate([matrix, np.nan_to_num(ratings, nan=-1.0)[:, None]], axis=1)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    # Renumber profiles by first appearance
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    profile = rank[inverse]
+
+    by_profile = np.argsort(profile, kind='stable')
+    bounds = np.cumsum(np.bincount(profile, minlength=len(order)))[:-1]
+    return first[order], np.split(by_profile, bounds)
+
+
+def nearest_problems(
+    matrix: 'np.ndarray',
+    ratings: 'np.ndarray',
+    k: int = TOP_K,
+    block_size: int = BLOCK_SIZE
+) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Top-K most similar problems of every problem.
+
+    Problems with the same topics and rating score alike against everyone,
+    so scores are computed between distinct profiles: the best k + 1
+    profiles (ties to the earlier first member) always contain a problem's
+    k best neighbours, which are then ranked by (score, position).
+
+    Only problems sharing at least one topic qualify; rows with fewer
+    candidates are padded with position -1 and score 0.
+
+    Args:
+        matrix: Problems x topics 0/1 matrix (see topic_matrix())
+        ratings: Ratings (see problem_ratings())
+        k: Neighbours per problem
+        block_size: Profiles compared per step
+
+    Returns:
+        (positions int32 (problems, k), scores float32 (problems, k)), best first
+    """
+    count = matrix.shape[0]
+    k = min(k, max(count - 1, 0))
+    positions = np.full((count, k), -1, dtype=np.int32)
+    scores = np.zeros((count, k), dtype=np.float32)
+    if k == 0:
+        return positions, scores
+
+    first, members = problem_profiles(matrix, ratings)
+    profiles = matrix[first]
+    profile_count = len(first)
+    picked = min(k + 1, profile_count)
+
+    # Topic counts are small integers: float32 sums and products are exact
+    sizes = profiles.sum(axis=1)
+    transposed = np.ascontiguousarray(profiles.T)
+    penalties, level = rating_penalties(ratings[first])
+    tie_break = first.astype(np.float64) * _TIE_BREAK
+    heads = [group[:k + 1] for group in members]
+
+    for start in range(0, profile_count, block_size):
+        end = min(start + block_size, profile_count)
+
+        shared = profiles[start:end] @ transposed
+        union = sizes[start:end, None] + sizes[None, :]
+        union -= shared
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # 0/0 only where neither profile has topics (excluded below)
+            score = np.divide(shared, union, dtype=np.float64)
+        score -= penalties[level[start:end]]
+        # Scores equal in exact arithmetic can differ in the last bits
+        np.round(score, _SCORE_DECIMALS, out=score)
+        np.copyto(score, -np.inf, where=shared == 0)
+
+        rank_key = tie_break - score
+        top = np.argpartition(rank_key, picked - 1, axis=1)[:, :picked]
+        top_scores = np.take_along_axis(score, top, axis=1)
+
+        for row in range(end - start):
+            found = np.isfinite(top_scores[row])
+            if not found.any():
+                continue
+            candidates = [heads[q] for q in top[row][found]]
+            sizes_found = [len(c) for c in candidates]
+            candidate_ids = np.concatenate(candidates)
+            candidate_scores = np.repeat(top_scores[row][found], sizes_found)
+            order = np.lexsort((candidate_ids, -candidate_scores))
+            candidate_ids = candidate_ids[order]
+            candidate_scores = candidate_scores[order]
+
+            for problem in members[start + row]:
+                keep = candidate_ids != problem
+                best = candidate_ids[keep][:k]
+                positions[problem, :len(best)] = best
+                scores[problem, :len(best)] = candidate_scores[keep][:k]
+
+    return positions, scores
+
+
+def build_similarity(graph: EntityGraph, problems: List[Dict], k: int = TOP_K) -> Dict[str, 'np.ndarray']:
+    """
+    Build the similarity artifacts of a snapshot.
+
+    Args:
+        graph: Entity graph of the snapshot
+        problems: Snapshot problems (in file order, same as the graph)
+        k: Neighbours per problem
+
+    Returns:
+        Dict of file name to array
+    """
+    matrix = topic_matrix(graph)
+    positions, scores = nearest_problems(matrix, problem_ratings(problems), k)
+    return {
+        COOCCURRENCE_FILE: topic_cooccurrence(matrix),
+        SIMILAR_PROBLEMS_FILE: positions,
+        SIMILAR_SCORES_FILE: scores,
+    }
+
+
+def save_similarity(artifacts: Dict[str, 'np.ndarray'], snapshot_dir: str) -> List[str]:
+    """Write the artifacts as .npy files; returns the file names."""
+    for filename, values in artifacts.items():
+        np.save(os.path.join(snapshot_dir, filename), values, allow_pickle=False)
+    return list(artifacts)
+
+
+class SimilarityIndex:
+    """
+    Read access to a snapshot's similarity artifacts.
+    """
+
+    def __init__(self, cooccurrence: 'np.ndarray', positions: 'np.ndarray', scores: 'np.ndarray'):
+        self.cooccurrence = cooccurrence
+        self.positions = positions
+        self.scores = scores
+
+    @classmethod
+    def load(cls, snapshot_dir: str) -> Optional['SimilarityIndex']:
+        """
+        Load the artifacts of a snapshot directory (memory-mapped).
+
+        Returns:
+            SimilarityIndex, or None if NumPy or the artifacts are missing
+        """
+        paths = [os.path.join(snapshot_dir, name)
+                 for name in (COOCCURRENCE_FILE, SIMILAR_PROBLEMS_FILE, SIMILAR_SCORES_FILE)]
+        if not HAS_NUMPY or not all(os.path.exists(path) for path in paths):
+            return None
+        return cls(*(np.load(path, mmap_mode='r', allow_pickle=False) for path in paths))
+
+    def related_topics(self, topic: int, k: int = TOP_K) -> List[Tuple[int, int]]:
+        """
+        Topics most often tagged together with a topic.
+
+        Args:
+            topic: Topic node id
+            k: Number of topics
+
+        Returns:
+            (topic node id, shared problem count) pairs, most shared first
+        """
+        counts = np.array(self.cooccurrence[topic], dtype=np.int64)
+        counts[topic] = 0
+        order = np.lexsort((np.arange(len(counts)), -counts))[:k]
+        return [(int(t), int(counts[t])) for t in order if counts[t] > 0]
+
+    def similar(self, problem: int, k: int = TOP_K) -> List[Tuple[int, float]]:
+        """
+        Precomputed nearest problems of a problem.
+
+        Args:
+            problem: Problem position
+            k: Number of problems (at most the stored TOP_K)
+
+        Returns:
+            (problem position, score) pairs, best first
+        """
+        return [
+            (int(position), round(float(score), 4))
+            for position, score in zip(self.positions[problem][:k], self.scores[problem][:k])
+            if position >= 0
+        ]
+
+
+def similarity_summary(artifacts: Dict[str, Any]) -> Dict[str, int]:
+    """Counts reported after a build (topics, problems, neighbour links)."""
+    positions = artifacts[SIMILAR_PROBLEMS_FILE]
+    return {
+        'topics': int(artifacts[COOCCURRENCE_FILE].shape[0]),
+        'problems': int(positions.shape[0]),
+        'links': int((positions >= 0).sum()),
+    }
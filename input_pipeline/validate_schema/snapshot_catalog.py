@@ -0,0 +1,224 @@
+"""
+Snapshot Catalog
+
+One file (validated/catalog.json) describing every complete snapshot, so
+version lookups and listings do not open each snapshot's manifest:
+- entries hold version, created_at, counts and checksums (the manifest's
+  data checksums plus the checksum of manifest.json itself)
+- entries are kept in semantic-version order (v1.9.0 before v1.10.0) and
+  the newest version is stored as 'latest'
+- a snapshot is added once its manifest and checksum file are written, so
+  a half-written snapshot never appears in the catalog
+- the file is replaced atomically (write to a temporary file, then rename),
+  so readers always see either the old or the new catalog
+- writers hold an exclusive lock on validated/.catalog.lock across their
+  read-modify-write, so concurrent snapshot builds never drop each
+  other's entries
+
+A missing or unreadable catalog is derived from the manifests when read;
+only rebuild_catalog() and the writers save it, so read-only commands
+never write into validated/.
+"""
+
+import os
+import re
+import json
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows: writers are not serialized there
+    fcntl = None
+
+from validate_schema.manifest_generator import compute_sha256, load_manifest
+
+
+CATALOG_FILE = "catalog.json"
+
+# Lock file serializing catalog writers (never removed)
+CATALOG_LOCK_FILE = ".catalog.lock"
+
+# Bump when the catalog layout changes (older catalogs are rebuilt)
+CATALOG_FORMAT = 1
+
+_VERSION = re.compile(r'^v(\d+)\.(\d+)\.(\d+)$')
+
+
+def version_key(version: str) -> Tuple:
+    """
+    Sort key ordering versions by number rather than as text.
+
+    Names that are not vX.Y.Z sort before all proper versions.
+    """
+    match = _VERSION.match(version)
+    if match is None:
+        return (0, (), version)
+    return (1, tuple(int(part) for part in match.groups()), version)
+
+
+def sort_versions(versions: List[str]) -> List[str]:
+    """Versions in semantic order (oldest first)."""
+    return sorted(versions, key=version_key)
+
+
+def catalog_entry(manifest: Dict[str, Any], manifest_path: str) -> Dict[str, Any]:
+    """
+    Catalog entry of a snapshot.
+
+    Args:
+        manifest: Snapshot manifest
+        manifest_path: Path of its manifest.json
+
+    Returns:
+        Dict with 'version', 'created_at', 'counts' and 'checksums'
+        (per-collection data checksums and 'manifest.json')
+    """
+    checksums = {
+        name: checksum
+        for name, checksum in manifest.get('checksums', {}).items()
+        if not name.endswith(('_file', '_content'))
+    }
+    checksums['manifest.json'] = compute_sha256(manifest_path)
+    return {
+        'version': manifest['version'],
+        'created_at': manifest.get('created_at'),
+        'counts': manifest.get('counts', {}),
+        'checksums': checksums,
+    }
+
+
+def _catalog(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    entries = sorted(entries, key=lambda entry: version_key(entry['version']))
+    return {
+        'format': CATALOG_FORMAT,
+        'updated_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        'latest': entries[-1]['version'] if entries else None,
+        'snapshots': entries,
+    }
+
+
+def save_catalog(catalog: Dict[str, Any], validated_dir: str):
+    """Write the catalog atomically (temporary file + rename)."""
+    path = os.path.join(validated_dir, CATALOG_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def catalog_lock(validated_dir: str) -> Iterator[None]:
+    """
+    Hold the exclusive catalog writer lock.
+
+    Args:
+        validated_dir: Directory holding the catalog (created if missing)
+    """
+    os.makedirs(validated_dir, exist_ok=True)
+    with open(os.path.join(validated_dir, CATALOG_LOCK_FILE), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def scan_catalog(validated_dir: str) -> Dict[str, Any]:
+    """
+    Build the catalog from the snapshot manifests (nothing is saved).
+
+    Only snapshots with a checksum file (i.e., completely written) are
+    listed.
+
+    Args:
+        validated_dir: Directory holding the version directories
+
+    Returns:
+        Catalog dict
+    """
+    entries = []
+    if os.path.exists(validated_dir):
+        for name in os.listdir(validated_dir):
+            snapshot_dir = os.path.join(validated_dir, name)
+            manifest_path = os.path.join(snapshot_dir, "manifest.json")
+            if not name.startswith('v') or not os.path.exists(os.path.join(snapshot_dir, "checksum.txt")):
+                continue
+            try:
+                entries.append(catalog_entry(load_manifest(manifest_path), manifest_path))
+            except (OSError, ValueError, KeyError):
+                continue
+    return _catalog(entries)
+
+
+def rebuild_catalog(validated_dir: str) -> Dict[str, Any]:
+    """
+    Rebuild the catalog from the snapshot manifests and save it.
+
+    Args:
+        validated_dir: Directory holding the version directories
+
+    Returns:
+        Catalog dict
+    """
+    if not os.path.exists(validated_dir):
+        return _catalog([])
+    with catalog_lock(validated_dir):
+        catalog = scan_catalog(validated_dir)
+        save_catalog(catalog, validated_dir)
+    return catalog
+
+
+def load_catalog(validated_dir: str) -> Dict[str, Any]:
+    """
+    Load the catalog, deriving it from the manifests if it is missing or
+    unreadable (without saving it; see rebuild_catalog()).
+
+    Args:
+        validated_dir: Directory holding the version directories
+
+    Returns:
+        Catalog dict with 'latest' and 'snapshots' (semantic order)
+    """
+    try:
+        with open(os.path.join(validated_dir, CATALOG_FILE), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        if catalog.get('format') == CATALOG_FORMAT:
+            return catalog
+    except (OSError, ValueError):
+        pass
+    return scan_catalog(validated_dir)
+
+
+def add_to_catalog(validated_dir: str, manifest: Dict[str, Any], manifest_path: str) -> Dict[str, Any]:
+    """
+    Add (or replace) a snapshot's entry and save the catalog.
+
+    Args:
+        validated_dir: Directory holding the version directories
+        manifest: The snapshot's manifest
+        manifest_path: Path of its manifest.json
+
+    Returns:
+        Updated catalog dict
+    """
+    entry = catalog_entry(manifest, manifest_path)
+    with catalog_lock(validated_dir):
+        entries = [e for e in load_catalog(validated_dir)['snapshots'] if e['version'] != entry['version']]
+        catalog = _catalog(entries + [entry])
+        save_catalog(catalog, validated_dir)
+    return catalog
+
+
+def find_entry(catalog: Dict[str, Any], version: str) -> Optional[Dict[str, Any]]:
+    """Catalog entry of a version (None if not listed)."""
+    for entry in catalog['snapshots']:
+        if entry['version'] == version:
+            return entry
+    return None
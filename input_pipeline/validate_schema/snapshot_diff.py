@@ -0,0 +1,148 @@
+"""
+Snapshot Diff
+
+Keyed change feed between two snapshots:
+- Records are matched by primary key (problem_id, contest_id, topic_id)
+  through the snapshots' offset indexes
+- Records whose bytes are identical in both versions are skipped without
+  being decoded; only candidates for a change are parsed and compared
+  field by field
+- Changes are emitted as one JSON object per line (NDJSON): added and
+  changed records in new-snapshot order, then removed records in
+  old-snapshot order
+
+Uncompressed data files stay memory-mapped, so memory is bounded by the
+offset indexes (one entry per key) rather than by the size of the data
+files. Compressed snapshots are the exception: SnapshotReader decompresses
+each of their collection files into memory, so diffing them holds both
+decompressed versions of a collection.
+"""
+
+import json
+from typing import Dict, List, Any, Iterable, Iterator, Optional, TextIO
+
+from validate_schema.snapshot_reader import KEY_FIELDS, SnapshotReader
+
+
+# Collections compared by default, in feed order
+DIFF_COLLECTIONS = ['topics', 'contests', 'problems']
+
+_MISSING = object()
+
+
+def field_changes(old: Dict[str, Any], new: Dict[str, Any], prefix: str = '') -> List[Dict[str, Any]]:
+    """
+    Field-level differences between two records.
+
+    Nested objects are compared field by field (dotted paths); any other
+    value, lists included, is compared as a whole.
+
+    Args:
+        old: Record in the old snapshot
+        new: Record in the new snapshot
+        prefix: Path prefix of nested fields
+
+    Returns:
+        {'field', 'old', 'new'} dicts (None stands for an absent field)
+    """
+    changes = []
+    for field in list(old) + [f for f in new if f not in old]:
+        before = old.get(field, _MISSING)
+        after = new.get(field, _MISSING)
+        if isinstance(before, dict) and isinstance(after, dict):
+            changes.extend(field_changes(before, after, f"{prefix}{field}."))
+        elif before != after:
+            changes.append({
+                'field': f"{prefix}{field}",
+                'old': None if before is _MISSING else before,
+                'new': None if after is _MISSING else after,
+            })
+    return changes
+
+
+def diff_collection(old: SnapshotReader, new: SnapshotReader, collection: str) -> Iterator[Dict[str, Any]]:
+    """
+    Changes of one collection between two snapshots.
+
+    Args:
+        old: Reader of the old snapshot
+        new: Reader of the new snapshot
+        collection: 'problems', 'contests' or 'topics'
+
+    Yields:
+        Change dicts: {'op': 'added', 'collection', 'key', 'record'},
+        {'op': 'changed', 'collection', 'key', 'changes'} or
+        {'op': 'removed', 'collection', 'key', 'record'}
+    """
+    old_positions = old.positions(collection)
+    new_positions = new.positions(collection)
+
+    for key, position in new_positions.items():
+        old_position = old_positions.get(key)
+        if old_position is None:
+            yield {'op': 'added', 'collection': collection, 'key': key, 'record': new.at(collection, position)}
+            continue
+        if old.raw(collection, old_position) == new.raw(collection, position):
+            continue
+        # Same bytes means same record; different bytes may still be equal JSON
+        changes = field_changes(old.at(collection, old_position), new.at(collection, position))
+        if changes:
+            yield {'op': 'changed', 'collection': collection, 'key': key, 'changes': changes}
+
+    for key, position in old_positions.items():
+        if key not in new_positions:
+            yield {'op': 'removed', 'collection': collection, 'key': key, 'record': old.at(collection, position)}
+
+
+def diff_snapshots(
+    old_dir: str,
+    new_dir: str,
+    collections: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Change feed between two snapshot directories.
+
+    Args:
+        old_dir: Old snapshot directory
+        new_dir: New snapshot directory
+        collections: Collections to compare (default: DIFF_COLLECTIONS)
+
+    Yields:
+        Change dicts (see diff_collection())
+    """
+    for collection in collections or DIFF_COLLECTIONS:
+        if collection not in KEY_FIELDS:
+            raise ValueError(f"Unknown collection: {collection}")
+
+    with SnapshotReader(old_dir) as old, SnapshotReader(new_dir) as new:
+        for collection in collections or DIFF_COLLECTIONS:
+            yield from diff_collection(old, new, collection)
+
+
+def write_change_feed(
+    changes: Iterable[Dict[str, Any]],
+    stream: Optional[TextIO] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Write changes as NDJSON while counting them.
+
+    Args:
+        changes: Change dicts (see diff_snapshots())
+        stream: Output stream (None to only count)
+
+    Returns:
+        Summary per collection with changes: 'added', 'removed', 'changed'
+        and 'fields' (changed field → number of records)
+    """
+    summary: Dict[str, Dict[str, Any]] = {}
+    for change in changes:
+        counts = summary.setdefault(
+            change['collection'], {'added': 0, 'removed': 0, 'changed': 0, 'fields': {}}
+        )
+        counts[change['op']] += 1
+        for field in change.get('changes', ()):
+            counts['fields'][field['field']] = counts['fields'].get(field['field'], 0) + 1
+        if stream is not None:
+            stream.write(json.dumps(change, ensure_ascii=False, separators=(',', ':')))
+            stream.write('\n')
+    return summary
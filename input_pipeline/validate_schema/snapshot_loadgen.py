@@ -0,0 +1,221 @@
+"""
+Snapshot Service Load Generator
+
+Sends a mix of requests to a running snapshot service from several client
+threads (one keep-alive connection each) and reports throughput and
+latency percentiles, overall and per endpoint.
+
+The mix is drawn from a local snapshot so lookups hit real records:
+- problem lookups by problem_id, source:external_id and slug
+- filtered listings (topic / difficulty / rating range)
+- contest detail
+- the topic tree
+
+Usage:
+    python3 validate_schema/snapshot_service.py &
+    python3 validate_schema/snapshot_loadgen.py --requests 5000 --concurrency 8
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import threading
+import http.client
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit, quote
+
+# Add pipeline directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validate_schema.snapshot_reader import SnapshotReader
+from validate_schema.snapshot_service import DEFAULT_PORT, SnapshotService
+from validate_schema.snapshot_manager import VALIDATED_DIR
+
+
+# Share of requests per endpoint
+MIX = [
+    ('problem', 0.5),
+    ('list', 0.25),
+    ('contest', 0.2),
+    ('topics', 0.05),
+]
+
+
+def build_requests(snapshot_dir: str, count: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """
+    Draw a request mix from a snapshot.
+
+    Args:
+        snapshot_dir: Snapshot the keys are taken from
+        count: Number of requests
+        seed: Random seed (the same seed gives the same mix)
+
+    Returns:
+        (endpoint, path) pairs
+    """
+    rng = random.Random(seed)
+    with SnapshotReader(snapshot_dir) as reader:
+        problem_keys = (reader.keys('problems')
+                        + reader.keys('problems', key='source:external_id')
+                        + reader.keys('problems', key='slug'))
+        topics = reader.keys('topics', key='name')
+        contests = reader.keys('contests')
+
+    def path(endpoint: str) -> str:
+        if endpoint == 'problem' and problem_keys:
+            return f"/problems/{quote(rng.choice(problem_keys), safe=':')}"
+        if endpoint == 'contest' and contests:
+            return f"/contests/{quote(rng.choice(contests))}"
+        if endpoint == 'list':
+            low = rng.randrange(800, 3000, 100)
+            filters = [f"rating_min={low}", f"rating_max={low + 400}"]
+            if topics:
+                filters.append(f"{rng.choice(['topic', 'under'])}={quote(rng.choice(topics))}")
+            if rng.random() < 0.3:
+                filters.append(f"difficulty={rng.choice(['easy', 'medium', 'hard'])}")
+            return f"/problems?{'&'.join(filters)}"
+        return "/topics"
+
+    endpoints = [name for name, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    return [(endpoint, path(endpoint)) for endpoint in rng.choices(endpoints, weights, k=count)]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+def run_load(
+    base_url: str,
+    requests: List[Tuple[str, str]],
+    concurrency: int = 8,
+    revalidate: bool = False
+) -> Dict[str, object]:
+    """
+    Send the requests from `concurrency` threads.
+
+    Args:
+        base_url: Service URL (http://host:port)
+        requests: (endpoint, path) pairs, split round-robin over the threads
+        concurrency: Client threads
+        revalidate: Send If-None-Match with the ETag last seen for a path
+
+    Returns:
+        Dict with 'elapsed', 'latencies' (endpoint → seconds), 'statuses'
+        (status → count) and 'errors'
+    """
+    parts = urlsplit(base_url)
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[int, int] = {}
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def client(share: List[Tuple[str, str]]):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        etags: Dict[str, str] = {}
+        local: List[Tuple[str, float, int]] = []
+        for endpoint, path in share:
+            headers = {}
+            if revalidate and path in etags:
+                headers['If-None-Match'] = etags[path]
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                with lock:
+                    errors.append(f"{path}: {e}")
+                continue
+            local.append((endpoint, time.perf_counter() - start, response.status))
+            if response.getheader('ETag'):
+                etags[path] = response.getheader('ETag')
+        connection.close()
+
+        with lock:
+            for endpoint, seconds, status in local:
+                latencies.setdefault(endpoint, []).append(seconds)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    threads = [
+        threading.Thread(target=client, args=(requests[i::concurrency],))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'elapsed': time.perf_counter() - start,
+        'latencies': latencies,
+        'statuses': statuses,
+        'errors': errors,
+    }
+
+
+def print_report(result: Dict[str, object]):
+    """Print throughput, status counts and latency percentiles (ms)."""
+    latencies = result['latencies']
+    done = sum(len(values) for values in latencies.values())
+    elapsed = result['elapsed']
+
+    print(f"  Requests: {done:,} in {elapsed:.2f}s ({done / elapsed if elapsed else 0:,.0f} req/s)")
+    print(f"  Status: {', '.join(f'{status} x{count:,}' for status, count in sorted(result['statuses'].items()))}")
+    if result['errors']:
+        print(f"  ✗ Errors: {len(result['errors'])} (first: {result['errors'][0]})")
+
+    print(f"\n  {'endpoint':<10} {'count':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    rows = sorted(latencies.items())
+    rows.append(('all', [seconds for values in latencies.values() for seconds in values]))
+    for endpoint, values in rows:
+        values = sorted(values)
+        cells = [percentile(values, 50), percentile(values, 90), percentile(values, 99), values[-1] if values else 0.0]
+        print(f"  {endpoint:<10} {len(values):>7,} " + ' '.join(f"{v * 1000:>8.2f}" for v in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the snapshot service")
+    parser.add_argument('--url', default=f"http://127.0.0.1:{DEFAULT_PORT}",
+                        help=f"Service URL (default: http://127.0.0.1:{DEFAULT_PORT})")
+    parser.add_argument('--version', help="Snapshot the request mix is drawn from (default: latest)")
+    parser.add_argument('--requests', type=int, default=5000, help="Number of requests (default: 5000)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Client threads (default: 8)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed of the request mix")
+    parser.add_argument('--revalidate', action='store_true',
+                        help="Send If-None-Match for repeated paths (measures 304s)")
+    args = parser.parse_args()
+
+    version = args.version or SnapshotService.latest_version()
+    if version is None or not os.path.isdir(os.path.join(VALIDATED_DIR, version)):
+        print(f"✗ No snapshot to draw requests from in {VALIDATED_DIR}")
+        sys.exit(1)
+
+    requests = build_requests(os.path.join(VALIDATED_DIR, version), args.requests, args.seed)
+
+    print("=" * 60)
+    print("SNAPSHOT SERVICE LOAD TEST")
+    print("=" * 60)
+    print(f"  Target: {args.url}")
+    print(f"  Mix from: {version} ({', '.join(f'{name} {weight:.0%}' for name, weight in MIX)})")
+    print(f"  Clients: {args.concurrency}")
+    print("-" * 60)
+
+    result = run_load(args.url, requests, args.concurrency, args.revalidate)
+    print_report(result)
+
+    if result['errors']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
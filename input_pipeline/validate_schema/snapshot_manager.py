@@ -2,18 +2,33 @@
 Snapshot Manager
 
 Manages immutable versioned snapshots of validated data:
-- Creates new version directories
-- Copies validated data
+- Builds new versions in a hidden staging directory and publishes them
+  with an atomic rename
+- Hard-links validated data into the snapshot (copies across filesystems;
+  optionally compressed: gzip, lzma or zstd)
 - Generates manifests and checksums
+- Persists the entity graph (relationship index) with each snapshot
+- Persists the topic hierarchy closure and ancestor-expanded problem topics
+- Writes per-collection offset indexes for lazy record lookups
+- Optionally shards problems and contests by source and key hash (per-shard checksums)
+- Writes secondary query indexes (topics, difficulty, source, rating, dates)
+- Writes a BM25 full-text search index (incremental from the previous snapshot)
+- Records near-duplicate problems as a cross-reference table
+- Precomputes topic co-occurrence and similar problems (NumPy, optional)
+- Precomputes dashboard aggregates (difficulty, ratings, topics, contests)
+- Diffs two snapshots as a keyed NDJSON change feed
+- Keeps a catalog of complete snapshots in semantic-version order
+- Migrates snapshots to a newer schema version (streaming, validated)
 - Prevents modification of existing snapshots
 """
 
 import os
 import sys
 import json
+import uuid
 import shutil
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, List, Any, Optional
 
 try:
     from .manifest_generator import (
@@ -21,8 +36,10 @@ try:
         save_manifest,
         generate_checksum_file,
         verify_manifest,
-        load_manifest
+        load_manifest,
+        compute_sha256
     )
+    from .snapshot_reader import SnapshotReader, write_offset_indexes
 except ImportError:
     # When run as standalone script
     from manifest_generator import (
@@ -30,14 +47,69 @@ except ImportError:
         save_manifest,
         generate_checksum_file,
         verify_manifest,
-        load_manifest
+        load_manifest,
+        compute_sha256
     )
+    from snapshot_reader import SnapshotReader, write_offset_indexes
+
+# Add pipeline directory to path for the shared entity graph
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalize_schema.entity_graph import EntityGraph, GRAPH_FILE, load_snapshot_graph
+from normalize_schema.topic_hierarchy import (
+    CLOSURE_FILE,
+    EXPANDED_TOPICS_FILE,
+    TopicClosure,
+    load_snapshot_closure,
+    save_expanded_topics
+)
+from validate_schema.query_index import QUERY_INDEX_FILE, QueryIndex, load_query_index, parse_time
+from validate_schema.search_index import SearchIndex, load_leetcode_descriptions
+from normalize_schema.rules.near_duplicate_detector import (
+    NEAR_DUPLICATES_FILE,
+    detect_near_duplicates,
+    save_near_duplicates
+)
+from validate_schema.aggregates import (
+    AGGREGATES_FILE,
+    build_aggregates,
+    load_aggregates,
+    save_aggregates,
+    topic_totals
+)
+from validate_schema.shards import SHARD_COUNT, link_or_copy, verify_shards, write_shards
+from validate_schema.compression import CODECS, check_codec, compress_file, write_json_compressed
+from validate_schema.snapshot_catalog import (
+    add_to_catalog,
+    find_entry,
+    load_catalog,
+    rebuild_catalog,
+    sort_versions
+)
+from validate_schema.snapshot_diff import DIFF_COLLECTIONS, diff_snapshots, write_change_feed
+from validate_schema.snapshot_migration import migrate_collections
+from normalize_schema.migrations import MigrationError, migration_path
+from normalize_schema.validator import SCHEMAS_DIR
+from validate_schema.similarity_index import (
+    HAS_NUMPY,
+    SimilarityIndex,
+    build_similarity,
+    save_similarity,
+    similarity_summary
+)
 
 
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 VALIDATED_DIR = os.path.join(SCRIPT_DIR, "validated")
 CANONICAL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "modify_data", "output")
+# Raw LeetCode data (descriptions for the search index)
+LEETCODE_DATA = os.path.join(os.path.dirname(SCRIPT_DIR), "fetch_data", "leetcode", "data", "merged_problems.json")
+# Snapshots are built in VALIDATED_DIR/.staging-<version>-<pid> (hidden from listings)
+STAGING_PREFIX = ".staging-"
+# Published builds live in VALIDATED_DIR/.release-<version>-<id>; the version
+# name is a symlink to one of them, switched atomically on replacement
+RELEASE_PREFIX = ".release-"
 
 
 class SnapshotError(Exception):
@@ -47,10 +119,11 @@ class SnapshotError(Exception):
 
 def get_existing_versions() -> list:
     """
-    Get list of existing snapshot versions.
+    Get list of existing snapshot versions (including any still being
+    written; see list_snapshots() for complete ones).
     
     Returns:
-        Sorted list of version strings
+        Version strings in semantic order (v1.9.0 before v1.10.0)
     """
     if not os.path.exists(VALIDATED_DIR):
         return []
@@ -60,7 +133,7 @@ def get_existing_versions() -> list:
         if name.startswith('v') and os.path.isdir(os.path.join(VALIDATED_DIR, name)):
             versions.append(name)
     
-    return sorted(versions)
+    return sort_versions(versions)
 
 
 def version_exists(version: str) -> bool:
@@ -104,12 +177,83 @@ def get_next_version(bump: str = "patch") -> str:
         return f"v{major}.{minor}.{patch + 1}"
 
 
+def publish_snapshot(staging_dir: str, snapshot_dir: str, replace: bool = False):
+    """
+    Publish a finished staging directory as a version.
+    
+    The build is renamed to an immutable, uniquely named release
+    directory and the version name is pointed at it with a symlink.
+    Replacing a version swaps that symlink with os.replace(), so readers
+    always find either the old or the new complete version, never
+    neither. The previous release is deleted after the swap.
+    
+    Versions published as plain directories (before releases were
+    linked) cannot be swapped atomically: they are renamed aside just
+    before the link takes their place.
+    
+    Args:
+        staging_dir: Complete snapshot in the staging area
+        snapshot_dir: Version path to publish it as
+        replace: Replace an existing version
+        
+    Raises:
+        OSError: If the version exists and replace is False
+    """
+    parent, version = os.path.split(snapshot_dir)
+    if os.path.lexists(snapshot_dir) and not replace:
+        raise FileExistsError(f"{snapshot_dir} already exists")
+    
+    release_name = f"{RELEASE_PREFIX}{version}-{uuid.uuid4().hex[:12]}"
+    release_dir = os.path.join(parent, release_name)
+    os.rename(staging_dir, release_dir)
+    
+    try:
+        if not replace:
+            # Fails if another build published the version meanwhile
+            os.symlink(release_name, snapshot_dir)
+            return
+        
+        previous = None
+        if os.path.islink(snapshot_dir):
+            previous = os.path.join(parent, os.readlink(snapshot_dir))
+        elif os.path.exists(snapshot_dir):
+            previous = f"{release_dir}.old"
+            os.rename(snapshot_dir, previous)
+        
+        link_tmp = os.path.join(parent, f".link-{version}-{os.getpid()}")
+        os.symlink(release_name, link_tmp)
+        os.replace(link_tmp, snapshot_dir)
+    except BaseException:
+        shutil.rmtree(release_dir, ignore_errors=True)
+        raise
+    
+    if previous is not None and os.path.realpath(previous) != os.path.realpath(release_dir):
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def write_json(data: Any, filepath: str):
+    """
+    Write a collection in the canonical file format.
+    
+    Matches the normalization output byte for byte, so a snapshot
+    written from memory has the same checksums as one copied from disk.
+    """
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
 def create_snapshot(
     version: str,
     source_dir: str = None,
     schema_version: str = "v1.0.0",
     notes: str = None,
-    force: bool = False
+    force: bool = False,
+    data: Dict[str, List[Dict]] = None,
+    graph: Optional[EntityGraph] = None,
+    leetcode_file: str = LEETCODE_DATA,
+    near_duplicates: Optional[List] = None,
+    shard_count: int = 0,
+    compression: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Create an immutable snapshot of validated data.
@@ -120,6 +264,21 @@ def create_snapshot(
         schema_version: Schema version used for validation
         notes: Optional notes about this snapshot
         force: If True, overwrite existing version (dangerous!)
+        data: Collections already in memory ('problems', 'topics', 'contests').
+            Skips parsing the source files; with no source_dir the snapshot
+            files are written from data, otherwise linked from source_dir
+            (which must hold the same content)
+        graph: Entity graph of the same collections (e.g., from validation);
+            built here if not given
+        leetcode_file: Raw LeetCode data with problem descriptions for the
+            search index and near-duplicate detection (skipped if missing)
+        near_duplicates: Near-duplicate pairs of the same problems (e.g.,
+            from validation); detected here if not given
+        shard_count: Shards per source for problems and contests (0 for
+            none; shards are a second copy of both, see shards.py)
+        compression: Store the data files and shards compressed with this
+            codec ('gzip', 'lzma' or 'zstd'); indexes stay uncompressed so
+            they can still be memory-mapped
         
     Returns:
         Snapshot creation result dict
@@ -127,7 +286,7 @@ def create_snapshot(
     Raises:
         SnapshotError: If version exists and force is False
     """
-    if source_dir is None:
+    if source_dir is None and data is None:
         source_dir = CANONICAL_DIR
     
     result = {
@@ -135,6 +294,10 @@ def create_snapshot(
         'version': version,
         'path': None,
         'manifest': None,
+        'search': None,
+        'near_duplicates': 0,
+        'similarity': None,
+        'shards': None,
         'error': None,
     }
     
@@ -143,30 +306,43 @@ def create_snapshot(
         result['error'] = f"Invalid version format: {version} (expected vX.Y.Z)"
         return result
     
-    # Check if version exists
-    snapshot_dir = os.path.join(VALIDATED_DIR, version)
+    if compression:
+        try:
+            check_codec(compression)
+        except ValueError as e:
+            result['error'] = str(e)
+            return result
     
+    # Check if version exists (an overwritten version stays readable until
+    # the new one is published)
     if version_exists(version):
         if not force:
             result['error'] = f"Version {version} already exists. Use force=True to overwrite."
             return result
         print(f"  ⚠ Warning: Overwriting existing version {version}")
-        shutil.rmtree(snapshot_dir)
     
     # Load source data
+    if data is not None:
+        problems = data['problems']
+        topics = data['topics']
+        contests = data.get('contests') or []
+    else:
+        problems, topics, contests = None, None, None
+    
     try:
-        with open(os.path.join(source_dir, "problems.json"), 'r') as f:
-            problems = json.load(f)
-        
-        with open(os.path.join(source_dir, "topics.json"), 'r') as f:
-            topics = json.load(f)
-        
-        contests_path = os.path.join(source_dir, "contests.json")
-        if os.path.exists(contests_path):
-            with open(contests_path, 'r') as f:
-                contests = json.load(f)
-        else:
-            contests = []
+        if problems is None:
+            with open(os.path.join(source_dir, "problems.json"), 'r') as f:
+                problems = json.load(f)
+            
+            with open(os.path.join(source_dir, "topics.json"), 'r') as f:
+                topics = json.load(f)
+            
+            contests_path = os.path.join(source_dir, "contests.json")
+            if os.path.exists(contests_path):
+                with open(contests_path, 'r') as f:
+                    contests = json.load(f)
+            else:
+                contests = []
             
     except FileNotFoundError as e:
         result['error'] = f"Source data not found: {e}"
@@ -175,32 +351,132 @@ def create_snapshot(
         result['error'] = f"Invalid JSON in source data: {e}"
         return result
     
-    # Create snapshot directory
-    os.makedirs(snapshot_dir, exist_ok=True)
-    
-    # Copy data files
-    for filename in ['problems.json', 'topics.json', 'contests.json']:
-        src = os.path.join(source_dir, filename)
-        dst = os.path.join(snapshot_dir, filename)
-        if os.path.exists(src):
-            shutil.copy2(src, dst)
-    
-    # Generate manifest
-    manifest = generate_manifest(
-        version=version,
-        schema_version=schema_version,
-        problems=problems,
-        topics=topics,
-        contests=contests if contests else None,
-        data_dir=snapshot_dir,
-        notes=notes
-    )
+    # Build in a hidden staging directory; readers only ever see the
+    # published version directory (see publish_snapshot())
+    staging_dir = os.path.join(VALIDATED_DIR, f"{STAGING_PREFIX}{version}-{os.getpid()}")
+    os.makedirs(staging_dir)
+    
+    try:
+        # Link data files (or write them straight from memory), compressing
+        # as they stream through when asked to
+        content_checksums = {}
+        if source_dir is not None:
+            for filename in ['problems.json', 'topics.json', 'contests.json']:
+                src = os.path.join(source_dir, filename)
+                dst = os.path.join(staging_dir, filename)
+                if not os.path.exists(src):
+                    continue
+                if compression:
+                    content_checksums[filename] = compress_file(src, dst, compression)['content_checksum']
+                else:
+                    # Same filesystem: a hard link, no data copied
+                    link_or_copy(src, dst)
+        else:
+            for filename, records in (('problems.json', problems), ('topics.json', topics), ('contests.json', contests)):
+                dst = os.path.join(staging_dir, filename)
+                if compression:
+                    content_checksums[filename] = write_json_compressed(records, dst, compression)['content_checksum']
+                else:
+                    write_json(records, dst)
+        
+        # Previous snapshot: unchanged shards and search documents are reused from it
+        previous_versions = [
+            entry['version'] for entry in load_catalog(VALIDATED_DIR)['snapshots'] if entry['version'] != version
+        ]
+        previous_dir = os.path.join(VALIDATED_DIR, previous_versions[-1]) if previous_versions else None
+        
+        # Sharded copies of the large collections (see shards.py)
+        shards = None
+        if shard_count > 0:
+            previous_shards = None
+            if previous_dir and os.path.exists(os.path.join(previous_dir, "manifest.json")):
+                previous_shards = load_manifest(os.path.join(previous_dir, "manifest.json")).get('shards')
+            shards, reused = write_shards(
+                staging_dir,
+                {'problems': problems, 'contests': contests},
+                shard_count,
+                previous_dir,
+                previous_shards,
+                compression
+            )
+            result['shards'] = {
+                'files': sum(len(entries) for entries in shards['collections'].values()),
+                'reused': len(reused),
+            }
+        
+        # Persist the relationship index next to the data
+        if graph is None:
+            graph = EntityGraph.build(problems, contests, topics)
+        graph.save(os.path.join(staging_dir, GRAPH_FILE))
+        
+        # Topic hierarchy closure and each problem's ancestor-expanded topics
+        closure = TopicClosure.from_graph(graph)
+        closure.save(os.path.join(staging_dir, CLOSURE_FILE))
+        save_expanded_topics(problems, closure, os.path.join(staging_dir, EXPANDED_TOPICS_FILE))
+        
+        # Byte-range indexes for point lookups (see SnapshotReader)
+        write_offset_indexes(staging_dir)
+        
+        # Secondary indexes for filtered views (see query_snapshot)
+        query_index = QueryIndex.build(problems, contests, closure)
+        query_index.save(os.path.join(staging_dir, QUERY_INDEX_FILE))
+        
+        # Dashboard tables, derived from the query index and graph (no rescan)
+        save_aggregates(build_aggregates(query_index, graph), os.path.join(staging_dir, AGGREGATES_FILE))
+        
+        # Full-text index, reusing unchanged documents of the previous snapshot
+        previous = SearchIndex.load(previous_dir) if previous_dir else None
+        descriptions = load_leetcode_descriptions(leetcode_file)
+        search = SearchIndex.build(problems, descriptions, previous)
+        search.save(staging_dir)
+        result['search'] = {'documents': search.doc_count, 'terms': len(search.terms), 'reused': search.reused}
+        
+        # Cross-reference of problems that look like the same problem
+        if near_duplicates is None:
+            near_duplicates = detect_near_duplicates(problems, descriptions)
+        save_near_duplicates(near_duplicates, os.path.join(staging_dir, NEAR_DUPLICATES_FILE))
+        result['near_duplicates'] = len(near_duplicates)
+        
+        # Related topics / similar problems, served without per-request work
+        if HAS_NUMPY:
+            artifacts = build_similarity(graph, problems)
+            save_similarity(artifacts, staging_dir)
+            result['similarity'] = similarity_summary(artifacts)
+        
+        # Generate manifest
+        manifest = generate_manifest(
+            version=version,
+            schema_version=schema_version,
+            problems=problems,
+            topics=topics,
+            contests=contests if contests else None,
+            data_dir=staging_dir,
+            notes=notes,
+            shards=shards,
+            content_checksums=content_checksums
+        )
+        
+        # Save manifest
+        save_manifest(manifest, os.path.join(staging_dir, "manifest.json"))
+        
+        # Generate checksum file
+        generate_checksum_file(staging_dir, os.path.join(staging_dir, "checksum.txt"))
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
     
-    # Save manifest
-    save_manifest(manifest, os.path.join(snapshot_dir, "manifest.json"))
+    # Publish with an atomic rename
+    snapshot_dir = os.path.join(VALIDATED_DIR, version)
+    try:
+        publish_snapshot(staging_dir, snapshot_dir, replace=force)
+    except OSError as e:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        result['error'] = f"Failed to publish {version}: {e}"
+        return result
+    manifest_path = os.path.join(snapshot_dir, "manifest.json")
     
-    # Generate checksum file
-    generate_checksum_file(snapshot_dir, os.path.join(snapshot_dir, "checksum.txt"))
+    # List the (now complete) snapshot in the catalog
+    add_to_catalog(VALIDATED_DIR, manifest, manifest_path)
     
     result['success'] = True
     result['path'] = snapshot_dir
@@ -209,12 +485,14 @@ def create_snapshot(
     return result
 
 
-def verify_snapshot(version: str) -> Dict[str, Any]:
+def verify_snapshot(version: str, deep: bool = False) -> Dict[str, Any]:
     """
     Verify integrity of an existing snapshot.
     
     Args:
         version: Version to verify
+        deep: Also decompress compressed data files and check their
+            logical content (stored bytes are always checked)
         
     Returns:
         Verification result dict
@@ -245,8 +523,11 @@ def verify_snapshot(version: str) -> Dict[str, Any]:
         result['errors'].append(f"Failed to load manifest: {e}")
         return result
     
-    # Verify checksums
-    verification = verify_manifest(manifest, snapshot_dir)
+    # Verify checksums (shards are hashed in parallel)
+    verification = verify_manifest(manifest, snapshot_dir, deep)
+    shard_verification = verify_shards(snapshot_dir, manifest)
+    verification['missing'] += shard_verification['missing']
+    verification['mismatches'] += shard_verification['mismatches']
     
     if verification['missing']:
         result['errors'].append(f"Missing files: {verification['missing']}")
@@ -258,39 +539,280 @@ def verify_snapshot(version: str) -> Dict[str, Any]:
                 f"expected {mismatch['expected']}, got {mismatch['actual']}"
             )
     
+    # The catalog entry must describe this manifest
+    entry = find_entry(load_catalog(VALIDATED_DIR), version)
+    if entry is None:
+        result['errors'].append("Not listed in the snapshot catalog")
+    elif entry['checksums'].get('manifest.json') != compute_sha256(manifest_path):
+        result['errors'].append("Catalog entry does not match manifest.json")
+    
     result['valid'] = len(result['errors']) == 0
     
     return result
 
 
-def list_snapshots() -> list:
+def open_snapshot(version: str) -> SnapshotReader:
     """
-    List all snapshots with their manifest info.
+    Open a snapshot for lazy record lookups.
     
+    Args:
+        version: Snapshot version
+        
     Returns:
-        List of snapshot info dicts
+        SnapshotReader (close it, or use it as a context manager)
+        
+    Raises:
+        SnapshotError: If the version does not exist
+    """
+    if not version_exists(version):
+        raise SnapshotError(f"Version {version} does not exist")
+    return SnapshotReader(os.path.join(VALIDATED_DIR, version))
+
+
+def query_snapshot(version: str, limit: int = None, **filters) -> Dict[str, Any]:
     """
-    snapshots = []
+    Problems of a snapshot matching conjunctive filters.
     
-    for version in get_existing_versions():
-        snapshot_dir = os.path.join(VALIDATED_DIR, version)
-        manifest_path = os.path.join(snapshot_dir, "manifest.json")
+    Args:
+        version: Snapshot version
+        limit: Decode at most this many matching records (None for all)
+        **filters: QueryIndex.select() filters (source, topics, under, difficulty,
+            rating_min, rating_max, contest_after, not_in_contests_before)
         
-        info = {
-            'version': version,
-            'path': snapshot_dir,
-            'manifest': None,
-        }
+    Returns:
+        Dict with 'count' (all matches) and 'problems' (decoded records)
         
-        if os.path.exists(manifest_path):
-            try:
-                info['manifest'] = load_manifest(manifest_path)
-            except Exception:
-                pass
+    Raises:
+        SnapshotError: If the version does not exist
+    """
+    reader = open_snapshot(version)
+    snapshot_dir = reader.snapshot_dir
+    
+    graph = None
+    if filters.get('contest_after') is not None or filters.get('not_in_contests_before') is not None:
+        graph = load_snapshot_graph(snapshot_dir)
+    
+    positions = load_query_index(snapshot_dir).select(graph=graph, **filters)
+    
+    with reader:
+        selected = positions if limit is None else positions[:limit]
+        problems = [reader.at('problems', position) for position in selected]
+    
+    return {'count': len(positions), 'problems': problems}
+
+
+def search_snapshot(version: str, query: str, k: int = 10) -> List[Dict[str, Any]]:
+    """
+    Full-text search over a snapshot's problems.
+    
+    Args:
+        version: Snapshot version
+        query: Free-text query
+        k: Number of results
+        
+    Returns:
+        Problems (best first), each with a '_score' field
+        
+    Raises:
+        SnapshotError: If the version does not exist or has no search index
+    """
+    reader = open_snapshot(version)
+    index = SearchIndex.load(reader.snapshot_dir)
+    if index is None:
+        raise SnapshotError(f"Snapshot {version} has no search index")
+    
+    with reader:
+        results = []
+        for position, score in index.search(query, k):
+            problem = reader.at('problems', position)
+            problem['_score'] = score
+            results.append(problem)
+    return results
+
+
+def related_snapshot(
+    version: str,
+    problem: str = None,
+    topic: str = None,
+    k: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Precomputed similar problems of a problem, or related topics of a topic.
+    
+    Args:
+        version: Snapshot version
+        problem: Problem key (source:external_id)
+        topic: Topic name
+        k: Number of results
+        
+    Returns:
+        Problems (each with a '_score' field) or {'topic', 'shared'} dicts, best first
         
-        snapshots.append(info)
+    Raises:
+        SnapshotError: If the version, entity or similarity artifacts do not exist
+    """
+    reader = open_snapshot(version)
+    index = SimilarityIndex.load(reader.snapshot_dir)
+    if index is None:
+        reader.close()
+        raise SnapshotError(f"Snapshot {version} has no similarity artifacts (NumPy needed)")
+    graph = load_snapshot_graph(reader.snapshot_dir)
     
-    return snapshots
+    with reader:
+        if topic is not None:
+            node = graph.topic_node(topic)
+            if node is None:
+                raise SnapshotError(f"Unknown topic: {topic}")
+            return [
+                {'topic': graph.topic_names[t], 'shared': shared}
+                for t, shared in index.related_topics(node, k)
+            ]
+        
+        node = graph.problem_node(problem or '')
+        if node is None or graph.is_phantom_problem(node):
+            raise SnapshotError(f"Unknown problem: {problem}")
+        results = []
+        for position, score in index.similar(node, k):
+            similar = reader.at('problems', position)
+            similar['_score'] = score
+            results.append(similar)
+        return results
+
+
+def diff_snapshot(old_version: str, new_version: str, collections: List[str] = None):
+    """
+    Keyed change feed between two snapshots.
+    
+    Args:
+        old_version: Old snapshot version
+        new_version: New snapshot version
+        collections: Collections to compare (default: topics, contests, problems)
+        
+    Returns:
+        Iterator of change dicts (see snapshot_diff.diff_collection())
+        
+    Raises:
+        SnapshotError: If either version does not exist
+    """
+    for version in (old_version, new_version):
+        if not version_exists(version):
+            raise SnapshotError(f"Version {version} does not exist")
+    return diff_snapshots(
+        os.path.join(VALIDATED_DIR, old_version),
+        os.path.join(VALIDATED_DIR, new_version),
+        collections
+    )
+
+
+def migrate_snapshot(
+    version: str,
+    schema_version: str,
+    new_version: str = None,
+    max_errors: Optional[int] = None,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Migrate a snapshot to another schema version as a new snapshot.
+    
+    The source snapshot's records are streamed through the migration
+    steps and validated against the target schema (see
+    snapshot_migration.py); the migrated files are then published with
+    create_snapshot(), keeping the source's shard count and compression.
+    
+    Args:
+        version: Source snapshot version
+        schema_version: Target schema version (e.g., "v1.1.0")
+        new_version: Version of the migrated snapshot (default: next minor)
+        max_errors: Stop migrating once more validation errors are seen
+        force: Overwrite new_version if it exists
+        
+    Returns:
+        Dict with 'success', 'version', 'from_schema', 'to_schema',
+        'steps', 'counts', 'validation', 'snapshot' (create_snapshot()
+        result) and 'error'
+    """
+    result = {
+        'success': False,
+        'version': new_version,
+        'from_schema': None,
+        'to_schema': schema_version,
+        'steps': [],
+        'counts': {},
+        'validation': None,
+        'snapshot': None,
+        'error': None,
+    }
+    
+    snapshot_dir = os.path.join(VALIDATED_DIR, version)
+    manifest_path = os.path.join(snapshot_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        result['error'] = f"Version {version} does not exist"
+        return result
+    if not os.path.isdir(os.path.join(SCHEMAS_DIR, schema_version)):
+        result['error'] = f"Unknown schema version: {schema_version}"
+        return result
+    
+    manifest = load_manifest(manifest_path)
+    result['from_schema'] = manifest.get('schema_version', 'v1.0.0')
+    try:
+        steps = migration_path(result['from_schema'], schema_version)
+    except MigrationError as e:
+        result['error'] = str(e)
+        return result
+    result['steps'] = [f"{step.from_version} → {step.to_version}" for step in steps]
+    
+    # Migrated files go to a hidden directory next to the snapshots, so
+    # create_snapshot can hard-link them
+    work_dir = os.path.join(VALIDATED_DIR, f"{STAGING_PREFIX}migrate-{version}-{os.getpid()}")
+    try:
+        migration = migrate_collections(snapshot_dir, steps, work_dir, schema_version, max_errors)
+        result['counts'] = migration['counts']
+        result['validation'] = migration['validation']
+        if not migration['success']:
+            result['error'] = migration['error']
+            return result
+        
+        result['version'] = new_version or get_next_version("minor")
+        created = create_snapshot(
+            version=result['version'],
+            source_dir=work_dir,
+            schema_version=schema_version,
+            notes=f"Migrated from {version} (schema {result['from_schema']} → {schema_version})",
+            force=force,
+            shard_count=(manifest.get('shards') or {}).get('count', 0),
+            compression=manifest.get('compression')
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    result['snapshot'] = created
+    result['success'] = created['success']
+    result['error'] = created['error']
+    return result
+
+
+def list_snapshots() -> list:
+    """
+    List all complete snapshots from the catalog (no manifest is read).
+    
+    Returns:
+        Snapshot info dicts in semantic-version order, with 'version',
+        'path', 'created_at', 'counts' and 'checksums'
+    """
+    return [
+        dict(entry, path=os.path.join(VALIDATED_DIR, entry['version']))
+        for entry in load_catalog(VALIDATED_DIR)['snapshots']
+    ]
+
+
+def get_latest_version() -> Optional[str]:
+    """
+    Get the newest complete snapshot version (from the catalog).
+    
+    Returns:
+        Version string or None
+    """
+    return load_catalog(VALIDATED_DIR)['latest']
 
 
 def get_latest_snapshot() -> Optional[Dict]:
@@ -298,10 +820,13 @@ def get_latest_snapshot() -> Optional[Dict]:
     Get the latest snapshot info.
     
     Returns:
-        Snapshot info dict or None
+        Snapshot info dict (see list_snapshots()) or None
     """
-    snapshots = list_snapshots()
-    return snapshots[-1] if snapshots else None
+    catalog = load_catalog(VALIDATED_DIR)
+    if catalog['latest'] is None:
+        return None
+    entry = find_entry(catalog, catalog['latest'])
+    return dict(entry, path=os.path.join(VALIDATED_DIR, entry['version']))
 
 
 if __name__ == "__main__":
@@ -318,13 +843,80 @@ if __name__ == "__main__":
     create_parser.add_argument("--source", help="Source data directory")
     create_parser.add_argument("--notes", help="Notes for this snapshot")
     create_parser.add_argument("--force", action="store_true", help="Overwrite existing")
+    create_parser.add_argument("--shards", type=int, nargs='?', default=0, const=SHARD_COUNT,
+                               help=f"Also write problems and contests as N shards per source "
+                                    f"(default: none; --shards alone: {SHARD_COUNT})")
+    create_parser.add_argument("--compression", choices=list(CODECS),
+                               help="Compress data files and shards (zstd needs the zstandard package)")
     
     # List command
-    subparsers.add_parser("list", help="List all snapshots")
+    list_parser = subparsers.add_parser("list", help="List all snapshots")
+    list_parser.add_argument("--rebuild", action="store_true",
+                             help="Rebuild the catalog from the snapshot manifests first")
     
     # Verify command
     verify_parser = subparsers.add_parser("verify", help="Verify a snapshot")
     verify_parser.add_argument("version", help="Version to verify")
+    verify_parser.add_argument("--deep", action="store_true",
+                               help="Also decompress compressed files and check their content checksums")
+    
+    # Graph command
+    graph_parser = subparsers.add_parser("graph", help="Query a snapshot's entity graph")
+    graph_parser.add_argument("version", help="Version to query")
+    graph_parser.add_argument("--contest", help="Problems of a contest (contest_id)")
+    graph_parser.add_argument("--problem", help="Topics and contests of a problem (source:external_id)")
+    graph_parser.add_argument("--topic", help="Parent, children and problems of a topic")
+    
+    # Query command
+    query_parser = subparsers.add_parser("query", help="Filter a snapshot's problems")
+    query_parser.add_argument("version", help="Version to query")
+    query_parser.add_argument("--source", help="Problem source (e.g., codeforces)")
+    query_parser.add_argument("--topic", action="append", dest="topics", help="Required topic (repeat for several)")
+    query_parser.add_argument("--under", action="append",
+                              help="Required topic or any of its descendants (repeat for several)")
+    query_parser.add_argument("--difficulty", choices=["easy", "medium", "hard"])
+    query_parser.add_argument("--rating-min", type=float, help="Minimum rating (inclusive)")
+    query_parser.add_argument("--rating-max", type=float, help="Maximum rating (inclusive)")
+    query_parser.add_argument("--contest-after", help="Used in a contest starting on/after this date (YYYY[-MM[-DD]])")
+    query_parser.add_argument("--not-in-contests-before", help="Not used in any contest starting before this date")
+    query_parser.add_argument("--limit", type=int, default=20, help="Problems to print (default: 20)")
+    query_parser.add_argument("--json", action="store_true", help="Print matching problems as JSON")
+    
+    # Search command
+    search_parser = subparsers.add_parser("search", help="Full-text search over a snapshot's problems")
+    search_parser.add_argument("version", help="Version to search")
+    search_parser.add_argument("query", help="Search terms")
+    search_parser.add_argument("--top", type=int, default=10, help="Number of results (default: 10)")
+    
+    # Aggregates command
+    aggregates_parser = subparsers.add_parser("aggregates", help="Show a snapshot's aggregate tables")
+    aggregates_parser.add_argument("version", help="Version to show")
+    aggregates_parser.add_argument("--json", action="store_true", help="Print the tables as JSON")
+    
+    # Diff command
+    diff_parser = subparsers.add_parser("diff", help="Keyed change feed between two snapshots (NDJSON)")
+    diff_parser.add_argument("old", help="Old version")
+    diff_parser.add_argument("new", help="New version")
+    diff_parser.add_argument("--collection", action="append", dest="collections", choices=DIFF_COLLECTIONS,
+                             help="Collection to compare (repeat for several; default: all)")
+    diff_parser.add_argument("--summary", action="store_true", help="Print change counts instead of the feed")
+    diff_parser.add_argument("--output", help="Write the feed to this file (and print the summary)")
+    
+    # Migrate command
+    migrate_parser = subparsers.add_parser("migrate", help="Migrate a snapshot to another schema version")
+    migrate_parser.add_argument("version", help="Snapshot to migrate")
+    migrate_parser.add_argument("--to", required=True, dest="schema_version", help="Target schema version")
+    migrate_parser.add_argument("--new-version", help="Version of the migrated snapshot (default: next minor)")
+    migrate_parser.add_argument("--max-errors", type=int, help="Stop once more validation errors are seen")
+    migrate_parser.add_argument("--force", action="store_true", help="Overwrite the new version if it exists")
+    
+    # Related command
+    related_parser = subparsers.add_parser("related", help="Similar problems or related topics")
+    related_parser.add_argument("version", help="Version to query")
+    related_group = related_parser.add_mutually_exclusive_group(required=True)
+    related_group.add_argument("--problem", help="Similar problems of a problem (source:external_id)")
+    related_group.add_argument("--topic", help="Topics most often tagged together with a topic")
+    related_parser.add_argument("--top", type=int, default=10, help="Number of results (default: 10)")
     
     args = parser.parse_args()
     
@@ -336,7 +928,9 @@ if __name__ == "__main__":
             version=version,
             source_dir=args.source,
             notes=args.notes,
-            force=args.force
+            force=args.force,
+            shard_count=args.shards,
+            compression=args.compression
         )
         
         if result['success']:
@@ -344,18 +938,24 @@ if __name__ == "__main__":
             print(f"  Problems: {result['manifest']['counts']['problems']}")
             print(f"  Topics: {result['manifest']['counts']['topics']}")
             print(f"  Contests: {result['manifest']['counts'].get('contests', 0)}")
+            if result['shards']:
+                print(f"  Shards: {result['shards']['files']} ({result['shards']['reused']} unchanged, linked)")
+            if result['manifest'].get('compression'):
+                print(f"  Compression: {result['manifest']['compression']}")
         else:
             print(f"✗ Failed: {result['error']}")
             sys.exit(1)
     
     elif args.command == "list":
+        if args.rebuild:
+            rebuild_catalog(VALIDATED_DIR)
+        
         print("\nExisting Snapshots:")
         print("-" * 60)
         
         for snap in list_snapshots():
-            manifest = snap.get('manifest', {})
-            counts = manifest.get('counts', {})
-            created = manifest.get('created_at', 'unknown')
+            counts = snap.get('counts', {})
+            created = snap.get('created_at') or 'unknown'
             
             print(f"  {snap['version']}")
             print(f"    Created: {created}")
@@ -367,15 +967,211 @@ if __name__ == "__main__":
     elif args.command == "verify":
         print(f"\nVerifying snapshot {args.version}...")
         
-        result = verify_snapshot(args.version)
+        result = verify_snapshot(args.version, deep=args.deep)
         
         if result['valid']:
             print(f"✓ Snapshot {args.version} is valid")
+            shards = result['manifest'].get('shards')
+            if shards:
+                files = sum(len(entries) for entries in shards['collections'].values())
+                print(f"  Shards: {files} verified ({shards['count']} per source)")
+            if result['manifest'].get('compression'):
+                content = "stored bytes and content" if args.deep else "stored bytes"
+                print(f"  Compression: {result['manifest']['compression']} ({content} verified)")
         else:
             print(f"✗ Snapshot {args.version} is INVALID")
             for err in result['errors']:
                 print(f"  - {err}")
             sys.exit(1)
     
+    elif args.command == "graph":
+        snapshot_dir = os.path.join(VALIDATED_DIR, args.version)
+        if not os.path.exists(snapshot_dir):
+            print(f"✗ Version {args.version} does not exist")
+            sys.exit(1)
+        graph = load_snapshot_graph(snapshot_dir)
+        
+        if args.contest:
+            node = graph.contest_node(args.contest)
+            if node is None:
+                print(f"✗ Unknown contest: {args.contest}")
+                sys.exit(1)
+            print(f"\nContest {args.contest}:")
+            for p in graph.contest_problems.neighbors(node):
+                print(f"  {graph.problem_keys[p]}  {graph.problem_ids[p]}")
+        elif args.problem:
+            node = graph.problem_node(args.problem)
+            if node is None:
+                print(f"✗ Unknown problem: {args.problem}")
+                sys.exit(1)
+            print(f"\nProblem {args.problem} ({graph.problem_ids[node]}):")
+            print(f"  Topics: {', '.join(graph.topic_names[t] for t in graph.problem_topics.neighbors(node)) or '-'}")
+            print(f"  Contests: {', '.join(graph.contest_ids[c] for c in graph.problem_contests.neighbors(node)) or '-'}")
+        elif args.topic:
+            node = graph.topic_node(args.topic)
+            if node is None:
+                print(f"✗ Unknown topic: {args.topic}")
+                sys.exit(1)
+            parent = graph.topic_parent[node]
+            closure = load_snapshot_closure(snapshot_dir, graph)
+            print(f"\nTopic {args.topic}:")
+            print(f"  Parent: {graph.topic_names[parent] if parent >= 0 else '-'}")
+            print(f"  Children: {', '.join(graph.topic_names[c] for c in graph.topic_children.neighbors(node)) or '-'}")
+            print(f"  Depth: {closure.depth(args.topic)}")
+            print(f"  Ancestors: {', '.join(closure.ancestors(args.topic)) or '-'}")
+            print(f"  Descendants: {', '.join(closure.descendants(args.topic)) or '-'}")
+            print(f"  Problems: {graph.topic_problems.degree(node)}")
+            for p in graph.topic_problems.neighbors(node):
+                print(f"    {graph.problem_keys[p]}")
+        else:
+            print(f"\nEntity graph of {args.version}:")
+            print("-" * 60)
+            for key, value in graph.stats().items():
+                print(f"  {key}: {value}")
+    
+    elif args.command == "query":
+        try:
+            result = query_snapshot(
+                args.version,
+                limit=args.limit,
+                source=args.source,
+                topics=args.topics,
+                under=args.under,
+                difficulty=args.difficulty,
+                rating_min=args.rating_min,
+                rating_max=args.rating_max,
+                contest_after=parse_time(args.contest_after) if args.contest_after else None,
+                not_in_contests_before=(
+                    parse_time(args.not_in_contests_before) if args.not_in_contests_before else None
+                )
+            )
+        except (SnapshotError, ValueError) as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        
+        if args.json:
+            print(json.dumps(result['problems'], indent=2, ensure_ascii=False))
+        else:
+            print(f"\n{result['count']} matching problems")
+            print("-" * 60)
+            for problem in result['problems']:
+                rating = problem.get('rating')
+                print(f"  {problem['source']}:{problem['external_id']:<10} "
+                      f"{rating if rating is not None else '-':>6}  {problem.get('difficulty', ''):<6}  {problem.get('title', '')}")
+            if result['count'] > len(result['problems']):
+                print(f"  ... {result['count'] - len(result['problems'])} more")
+    
+    elif args.command == "search":
+        try:
+            results = search_snapshot(args.version, args.query, args.top)
+        except SnapshotError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        
+        print(f"\nTop {len(results)} results for '{args.query}'")
+        print("-" * 60)
+        for problem in results:
+            print(f"  {problem['_score']:>7.3f}  {problem['source']}:{problem['external_id']:<10} {problem.get('title', '')}")
+    
+    elif args.command == "aggregates":
+        snapshot_dir = os.path.join(VALIDATED_DIR, args.version)
+        if not os.path.exists(snapshot_dir):
+            print(f"✗ Version {args.version} does not exist")
+            sys.exit(1)
+        aggregates = load_aggregates(snapshot_dir)
+        
+        if args.json:
+            print(json.dumps(aggregates, indent=2, ensure_ascii=False))
+        else:
+            print(f"\nAggregates of {args.version} ({aggregates['problems']} problems)")
+            print("-" * 60)
+            for source, total in aggregates['problems_per_source'].items():
+                levels = ', '.join(f"{level}: {count}" for level, count in aggregates['difficulty'].get(source, {}).items())
+                print(f"  {source}: {total} ({levels})")
+                buckets = aggregates['rating_histogram']['counts'].get(source, {})
+                if buckets:
+                    print(f"    Ratings: " + ', '.join(f"{bucket}: {count}" for bucket, count in buckets.items()))
+            totals = sorted(((count, topic) for topic, count in topic_totals(aggregates).items()), reverse=True)
+            print(f"  Topics: {len(totals)} (largest: {', '.join(f'{t} ({n})' for n, t in totals[:5])})")
+            print(f"  Contests: {len(aggregates['contest_problems'])}")
+    
+    elif args.command == "diff":
+        try:
+            changes = diff_snapshot(args.old, args.new, args.collections)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    summary = write_change_feed(changes, f)
+            else:
+                summary = write_change_feed(changes, None if args.summary else sys.stdout)
+        except SnapshotError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        
+        if args.summary or args.output:
+            print(f"\nChanges {args.old} → {args.new}")
+            print("-" * 60)
+            for collection in args.collections or DIFF_COLLECTIONS:
+                counts = summary.get(collection)
+                if counts is None:
+                    print(f"  {collection}: unchanged")
+                    continue
+                print(f"  {collection}: +{counts['added']} added, -{counts['removed']} removed, "
+                      f"~{counts['changed']} changed")
+                fields = sorted(counts['fields'].items(), key=lambda item: (-item[1], item[0]))
+                if fields:
+                    print(f"    Fields: " + ', '.join(f"{field} ({count})" for field, count in fields[:10]))
+            if args.output:
+                print(f"  Feed: {args.output}")
+    
+    elif args.command == "migrate":
+        print(f"\nMigrating snapshot {args.version} to schema {args.schema_version}...")
+        
+        result = migrate_snapshot(
+            args.version,
+            args.schema_version,
+            new_version=args.new_version,
+            max_errors=args.max_errors,
+            force=args.force
+        )
+        
+        if result['steps']:
+            print(f"  Steps: {', '.join(result['steps'])}")
+        for collection, counts in result['counts'].items():
+            dropped = f", {counts['dropped']} dropped" if counts['dropped'] else ""
+            print(f"  {collection.capitalize()}: {counts['written']} migrated{dropped}")
+        validation = result['validation']
+        if validation is not None and not validation.is_valid:
+            for category in ('schema', 'duplicate', 'orphan', 'reference'):
+                if validation.count(category):
+                    print(f"  {category.capitalize()} errors: {validation.count(category)}")
+            for error in validation.schema_errors[:5]:
+                print(f"    - {error.get('entity_id', '?')}: {error.get('path')}: {error['message']}")
+        
+        if result['success']:
+            print(f"✓ Snapshot created: {result['snapshot']['path']}")
+        else:
+            print(f"✗ Failed: {result['error']}")
+            sys.exit(1)
+    
+    elif args.command == "related":
+        try:
+            results = related_snapshot(args.version, problem=args.problem, topic=args.topic, k=args.top)
+        except SnapshotError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        
+        if args.topic:
+            print(f"\nTopics related to '{args.topic}'")
+            print("-" * 60)
+            for related in results:
+                print(f"  {related['shared']:>6}  {related['topic']}")
+        else:
+            print(f"\nProblems similar to {args.problem}")
+            print("-" * 60)
+            for problem in results:
+                rating = problem.get('rating')
+                print(f"  {problem['_score']:>7.3f}  {problem['source']}:{problem['external_id']:<10} "
+                      f"{rating if rating is not None else '-':>6}  {', '.join(problem.get('topics') or [])}")
+    
     else:
         parser.print_help()
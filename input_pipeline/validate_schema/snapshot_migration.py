@@ -0,0 +1,153 @@
+"""
+Snapshot Migration
+
+Carries an existing snapshot's collections to a newer schema version in
+one streaming pass:
+- records are parsed one at a time with JsonArrayReader (a compressed
+  data file is first decompressed, as a stream, to a scratch file) and
+  run through the migration steps registered in normalize_schema.migrations
+- every migrated document is validated against the target schema as it
+  goes, with StreamingValidator (compiled validators; duplicate and
+  reference checks on key indexes rather than documents)
+- migrated problems and contests are streamed to disk with JsonArrayWriter,
+  in the canonical file format; only topics are kept for the cross-entity
+  checks at the end
+
+The pass itself holds the key indexes and the topics, not the problems
+or contests. Publishing the result through create_snapshot (see
+snapshot_manager.migrate_snapshot()) then loads the migrated collections
+to build the snapshot's indexes, like any other snapshot creation.
+"""
+
+import os
+from typing import Dict, List, Any, Iterator, Optional
+
+from modify_data.utils.json_array_reader import JsonArrayReader
+from modify_data.utils.json_array_writer import JsonArrayWriter
+from normalize_schema.migrations import Migration, migrate_record
+from normalize_schema.streaming_validator import ErrorBudgetExceeded, StreamingValidator
+from validate_schema.compression import codec_of, find_data_file, iter_chunks
+
+
+# Collection file → entity type, in migration order (topics first: they
+# are needed in full for the final checks)
+MIGRATED_COLLECTIONS = [
+    ('topics', 'topic'),
+    ('problems', 'problem'),
+    ('contests', 'contest'),
+]
+
+
+def iter_collection(snapshot_dir: str, collection: str, scratch_dir: str) -> Iterator[Dict]:
+    """
+    Records of a snapshot collection, parsed one at a time.
+
+    Args:
+        snapshot_dir: Snapshot directory
+        collection: 'problems', 'contests' or 'topics'
+        scratch_dir: Where a compressed data file is decompressed to
+            (removed again once the records are read)
+
+    Yields:
+        Record dicts in file order (nothing if the collection is missing)
+    """
+    filepath = find_data_file(snapshot_dir, f"{collection}.json")
+    if filepath is None:
+        return
+    scratch = None
+    if codec_of(filepath) is not None:
+        scratch = os.path.join(scratch_dir, f".{collection}.source.json")
+        with open(scratch, 'wb') as f:
+            for chunk in iter_chunks(filepath):
+                f.write(chunk)
+        filepath = scratch
+    try:
+        with JsonArrayReader(filepath) as reader:
+            yield from reader
+    finally:
+        if scratch is not None and os.path.exists(scratch):
+            os.remove(scratch)
+
+
+def migrate_collections(
+    snapshot_dir: str,
+    steps: List[Migration],
+    output_dir: str,
+    schema_version: str,
+    max_errors: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Migrate and validate a snapshot's collections into output_dir.
+
+    Output files are only moved into place when the whole pass succeeded;
+    on a validation failure output_dir is left without them.
+
+    Args:
+        snapshot_dir: Source snapshot directory
+        steps: Migration steps (see migration_path())
+        output_dir: Directory for the migrated problems/topics/contests.json
+        schema_version: Target schema version (validation)
+        max_errors: Stop as soon as more validation errors are seen (None = unlimited)
+
+    Returns:
+        Dict with 'success', 'aborted', 'counts' (collection → read,
+        written, dropped), 'validation' (ValidationResult) and 'error'
+    """
+    result = {
+        'success': False,
+        'aborted': False,
+        'counts': {},
+        'validation': None,
+        'error': None,
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    streaming = StreamingValidator(schema_version, max_errors=max_errors)
+    writers = {
+        collection: JsonArrayWriter(os.path.join(output_dir, f"{collection}.json"))
+        for collection, _ in MIGRATED_COLLECTIONS
+    }
+    topics = []
+
+    try:
+        for collection, entity_type in MIGRATED_COLLECTIONS:
+            counts = {'read': 0, 'written': 0, 'dropped': 0}
+            for record in iter_collection(snapshot_dir, collection, output_dir):
+                counts['read'] += 1
+                migrated = migrate_record(entity_type, record, steps)
+                if migrated is None:
+                    counts['dropped'] += 1
+                    continue
+                if entity_type == 'topic':
+                    topics.append(migrated)
+                else:
+                    streaming.add(entity_type, migrated)
+                writers[collection].write(migrated)
+                counts['written'] += 1
+            result['counts'][collection] = counts
+
+        validation = streaming.finish(topics)
+    except ErrorBudgetExceeded as e:
+        for writer in writers.values():
+            writer.abort()
+        streaming.result.is_valid = False
+        result['aborted'] = True
+        result['validation'] = streaming.result
+        result['error'] = str(e)
+        return result
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+
+    result['validation'] = validation
+    if not validation.is_valid:
+        for writer in writers.values():
+            writer.abort()
+        result['error'] = f"Migrated data fails {schema_version} validation ({validation.total_errors()} errors)"
+        return result
+
+    for writer in writers.values():
+        writer.commit()
+    result['success'] = True
+    return result
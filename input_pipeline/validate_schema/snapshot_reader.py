@@ -0,0 +1,342 @@
+"""
+Snapshot Reader
+
+Point lookups into snapshot data files without parsing them:
+- create_snapshot writes a sidecar offset index per collection
+  (problems.index.json, ...) mapping each primary key to the byte range
+  of its record in the data file
+- SnapshotReader memory-maps the data file and decodes only the records
+  it is asked for (compressed data files are decompressed into memory
+  once, as a stream, and then read the same way)
+
+Keys per collection:
+- problems: problem_id, source:external_id, slug
+- contests: contest_id, source:external_id
+- topics: topic_id, name
+"""
+
+import os
+import re
+import json
+import mmap
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple, Union
+
+try:
+    from .compression import codec_of, find_data_file, read_data
+except ImportError:
+    # When run as standalone script
+    from compression import codec_of, find_data_file, read_data
+
+
+# Bump when the index layout changes
+INDEX_FORMAT = 2
+
+INDEX_SUFFIX = ".index.json"
+
+# Indexed key names per collection (the first is the primary key);
+# compound keys join their fields with ':'
+KEY_FIELDS = {
+    'problems': ['problem_id', 'source:external_id', 'slug'],
+    'contests': ['contest_id', 'source:external_id'],
+    'topics': ['topic_id', 'name'],
+}
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def index_filename(collection: str) -> str:
+    """Sidecar index file name of a collection (e.g., problems.index.json)."""
+    return f"{collection}{INDEX_SUFFIX}"
+
+
+def key_value(record: Dict, key: str) -> str:
+    """Value of a (possibly compound) key in a record."""
+    if ':' in key:
+        return ':'.join(str(record.get(field, '')) for field in key.split(':'))
+    return str(record.get(key, ''))
+
+
+def scan_records(data: bytes) -> Iterator[Tuple[int, int, Any]]:
+    """
+    Walk the top-level array of a JSON file.
+
+    Args:
+        data: File content (UTF-8)
+
+    Yields:
+        (byte offset, byte length, decoded record) per array element
+    """
+    text = data.decode('utf-8')
+    # Character offsets equal byte offsets unless the file has non-ASCII text
+    ascii_only = len(text) == len(data)
+    decoder = json.JSONDecoder()
+
+    pos = _WHITESPACE.match(text, 0).end()
+    if pos >= len(text) or text[pos] != '[':
+        raise ValueError("Expected a JSON array")
+    pos = _WHITESPACE.match(text, pos + 1).end()
+    if pos < len(text) and text[pos] == ']':
+        return
+
+    char_pos = byte_pos = 0
+    while True:
+        record, end = decoder.raw_decode(text, pos)
+        if ascii_only:
+            yield pos, end - pos, record
+        else:
+            byte_pos += len(text[char_pos:pos].encode('utf-8'))
+            length = len(text[pos:end].encode('utf-8'))
+            yield byte_pos, length, record
+            byte_pos += length
+            char_pos = end
+
+        pos = _WHITESPACE.match(text, end).end()
+        if pos < len(text) and text[pos] == ',':
+            pos = _WHITESPACE.match(text, pos + 1).end()
+        elif pos < len(text) and text[pos] == ']':
+            return
+        else:
+            raise ValueError(f"Malformed JSON array at character {pos}")
+
+
+def build_offset_index(filepath: str, collection: str) -> Dict[str, Any]:
+    """
+    Build the offset index of a collection file.
+
+    Args:
+        filepath: Path to the collection's JSON array file (plain or compressed)
+        collection: Collection name ('problems', 'contests', 'topics')
+
+    Returns:
+        Index dict: per-record [offset, length] into the logical content
+        and key → record position
+    """
+    data = read_data(filepath)
+
+    key_names = KEY_FIELDS.get(collection, [])
+    records = []
+    keys: Dict[str, Dict[str, int]] = {name: {} for name in key_names}
+
+    for position, (offset, length, record) in enumerate(scan_records(data)):
+        records.append([offset, length])
+        if isinstance(record, dict):
+            for name in key_names:
+                # Duplicate keys resolve to the first record
+                keys[name].setdefault(key_value(record, name), position)
+
+    return {
+        'format': INDEX_FORMAT,
+        'file': os.path.basename(filepath),
+        'size': len(data),
+        'records': records,
+        'keys': keys,
+    }
+
+
+def write_offset_indexes(snapshot_dir: str) -> List[str]:
+    """
+    Write sidecar offset indexes for every collection file in a snapshot.
+
+    Args:
+        snapshot_dir: Snapshot directory
+
+    Returns:
+        Index file names written
+    """
+    written = []
+    for collection in KEY_FIELDS:
+        filepath = find_data_file(snapshot_dir, f"{collection}.json")
+        if filepath is None:
+            continue
+        index = build_offset_index(filepath, collection)
+        with open(os.path.join(snapshot_dir, index_filename(collection)), 'w', encoding='utf-8') as f:
+            f.write(json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+        written.append(index_filename(collection))
+    return written
+
+
+class _Collection:
+    """One memory-mapped collection file and its offset index."""
+
+    def __init__(self, filepath: str, index: Dict[str, Any]):
+        self.index = index
+        self.records = index['records']
+        self.keys = index['keys']
+        if codec_of(filepath) is not None:
+            self._file = None
+            self._data = read_data(filepath)
+            size = len(self._data)
+        else:
+            self._file = open(filepath, 'rb')
+            size = os.fstat(self._file.fileno()).st_size
+            # mmap cannot map empty files
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        if size != index['size']:
+            self.close()
+            raise ValueError(f"{os.path.basename(filepath)} changed since it was indexed")
+
+    def raw(self, position: int) -> bytes:
+        offset, length = self.records[position]
+        return self._data[offset:offset + length]
+
+    def decode(self, position: int) -> Dict:
+        return json.loads(self.raw(position))
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class SnapshotReader:
+    """
+    Lazy, memory-mapped access to the records of a snapshot.
+
+    Example:
+        with SnapshotReader(snapshot_dir) as reader:
+            problem = reader.get('problems', ('codeforces', '1-A'), key='source:external_id')
+    """
+
+    def __init__(self, snapshot_dir: str):
+        """
+        Open a snapshot directory.
+
+        Collections are mapped on first access. Snapshots without sidecar
+        indexes are indexed in memory when opened.
+
+        Args:
+            snapshot_dir: Snapshot directory
+        """
+        self.snapshot_dir = snapshot_dir
+        self._collections: Dict[str, Optional[_Collection]] = {}
+
+    def __enter__(self) -> 'SnapshotReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmap every open collection."""
+        for collection in self._collections.values():
+            if collection is not None:
+                collection.close()
+        self._collections.clear()
+
+    def _open(self, collection: str) -> Optional[_Collection]:
+        if collection in self._collections:
+            return self._collections[collection]
+        if collection not in KEY_FIELDS:
+            raise ValueError(f"Unknown collection: {collection}")
+
+        filepath = find_data_file(self.snapshot_dir, f"{collection}.json")
+        if filepath is None:
+            self._collections[collection] = None
+            return None
+
+        index_path = os.path.join(self.snapshot_dir, index_filename(collection))
+        index = None
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('format') != INDEX_FORMAT:
+                index = None
+        if index is None:
+            index = build_offset_index(filepath, collection)
+
+        self._collections[collection] = _Collection(filepath, index)
+        return self._collections[collection]
+
+    def _position(self, data: _Collection, collection: str, value: Union[str, Sequence], key: Optional[str]) -> Optional[int]:
+        if key is None:
+            key = KEY_FIELDS[collection][0]
+        if key not in data.keys:
+            raise ValueError(f"'{key}' is not an indexed key of {collection} (indexed: {list(data.keys)})")
+        if not isinstance(value, str):
+            value = ':'.join(str(part) for part in value)
+        return data.keys[key].get(value)
+
+    def count(self, collection: str) -> int:
+        """Number of records in a collection (0 if the file is absent)."""
+        data = self._open(collection)
+        return len(data.records) if data is not None else 0
+
+    def get(self, collection: str, value: Union[str, Sequence], key: str = None) -> Optional[Dict]:
+        """
+        Look up one record.
+
+        Args:
+            collection: 'problems', 'contests' or 'topics'
+            value: Key value; compound keys may be given as a tuple
+                (e.g., ('codeforces', '1-A'))
+            key: Indexed key name (default: the collection's primary key)
+
+        Returns:
+            Decoded record, or None if not found
+        """
+        data = self._open(collection)
+        if data is None:
+            return None
+        position = self._position(data, collection, value, key)
+        return data.decode(position) if position is not None else None
+
+    def get_many(self, collection: str, values: Sequence, key: str = None) -> List[Optional[Dict]]:
+        """
+        Look up several records (read in file order, returned in request order).
+
+        Args:
+            collection: 'problems', 'contests' or 'topics'
+            values: Key values
+            key: Indexed key name (default: the collection's primary key)
+
+        Returns:
+            Decoded records (None where not found)
+        """
+        data = self._open(collection)
+        if data is None:
+            return [None] * len(values)
+
+        positions = [self._position(data, collection, value, key) for value in values]
+        decoded = {
+            position: data.decode(position)
+            for position in sorted({p for p in positions if p is not None})
+        }
+        return [decoded.get(position) if position is not None else None for position in positions]
+
+    def at(self, collection: str, position: int) -> Dict:
+        """Record at a position in the collection file."""
+        data = self._open(collection)
+        if data is None:
+            raise IndexError(f"{collection} is not part of this snapshot")
+        return data.decode(position)
+
+    def records(self, collection: str) -> Iterator[Dict]:
+        """Records of a collection in file order, decoded one at a time."""
+        data = self._open(collection)
+        if data is None:
+            return
+        for position in range(len(data.records)):
+            yield data.decode(position)
+
+    def raw(self, collection: str, position: int) -> bytes:
+        """Undecoded bytes of the record at a position (for comparisons)."""
+        data = self._open(collection)
+        if data is None:
+            raise IndexError(f"{collection} is not part of this snapshot")
+        return data.raw(position)
+
+    def positions(self, collection: str, key: str = None) -> Dict[str, int]:
+        """Key value → record position, in file order (the index itself; do not modify)."""
+        data = self._open(collection)
+        if data is None:
+            return {}
+        if key is None:
+            key = KEY_FIELDS[collection][0]
+        if key not in data.keys:
+            raise ValueError(f"'{key}' is not an indexed key of {collection} (indexed: {list(data.keys)})")
+        return data.keys[key]
+
+    def keys(self, collection: str, key: str = None) -> List[str]:
+        """Key values of a collection, in file order of first occurrence."""
+        return list(self.positions(collection, key))
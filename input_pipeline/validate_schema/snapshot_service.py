@@ -0,0 +1,513 @@
+"""
+Snapshot Service
+
+Local read-only HTTP service over the latest validated snapshot:
+- GET /problems/<key>   problem by problem_id, source:external_id or slug
+- GET /problems         filtered listing (topic, under, source, difficulty,
+                        rating_min, rating_max, limit, offset)
+- GET /topics           topic tree with problem counts
+- GET /contests/<key>   contest by contest_id or source:external_id, with its problems
+- GET /health           served version and cache statistics
+
+Requests are answered from in-memory indexes of the snapshot (offset
+indexes, query index, entity graph, topic closure); rendered responses are
+kept in a bounded LRU cache keyed by version and URL. Responses carry an
+ETag derived from the manifest checksum, so clients can revalidate with
+If-None-Match and get 304 until a new snapshot is published.
+
+A watcher thread polls for new snapshots, loads the new version off the
+request path and swaps it in under a lock. Requests already running keep
+the version they started with; it is closed when the last of them ends.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+# Add pipeline directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalize_schema.entity_graph import load_snapshot_graph
+from normalize_schema.topic_hierarchy import load_snapshot_closure
+from validate_schema.query_index import load_query_index
+from validate_schema.snapshot_reader import SnapshotReader
+from validate_schema.snapshot_manager import VALIDATED_DIR, get_latest_version
+
+
+DEFAULT_PORT = 8765
+
+# Rendered responses kept in memory
+CACHE_SIZE = 1024
+
+# Seconds between checks for a newer snapshot
+POLL_INTERVAL = 5.0
+
+# Page size of /problems (default and maximum)
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
+class ServiceError(Exception):
+    """Request error answered with an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """
+    Thread-safe mapping bounded to `capacity` entries, evicting the least
+    recently used one.
+    """
+
+    def __init__(self, capacity: int = CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Any, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        """Cached value (None on a miss); marks the entry as recently used."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Any, value: Any):
+        """Store a value, evicting the least recently used entries over capacity."""
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def _one(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    """Last value of a query parameter (None if absent)."""
+    values = params.get(name)
+    return values[-1] if values else None
+
+
+def _number(params: Dict[str, List[str]], name: str, cast=float) -> Optional[Any]:
+    value = _one(params, name)
+    if value is None:
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        raise ServiceError(400, f"Invalid {name}: {value}")
+
+
+class SnapshotView:
+    """
+    One loaded snapshot version and its in-memory indexes.
+    """
+
+    def __init__(self, version: str, snapshot_dir: str):
+        """
+        Load a snapshot (indexes are read now, records stay memory-mapped).
+
+        Args:
+            version: Snapshot version
+            snapshot_dir: Snapshot directory
+        """
+        self.version = version
+        self.snapshot_dir = snapshot_dir
+
+        with open(os.path.join(snapshot_dir, "manifest.json"), 'rb') as f:
+            self.etag = f'"{version}-{hashlib.sha256(f.read()).hexdigest()[:16]}"'
+
+        self.reader = SnapshotReader(snapshot_dir)
+        self.index = load_query_index(snapshot_dir)
+        self.graph = load_snapshot_graph(snapshot_dir)
+        self.closure = load_snapshot_closure(snapshot_dir, self.graph)
+        # Map every collection now, not on the first request
+        for collection in ('problems', 'contests', 'topics'):
+            self.reader.count(collection)
+        self.topic_tree = self._build_topic_tree()
+
+        # Requests in flight; guarded by the owning service's lock
+        self.active = 0
+        self.retired = False
+
+    def close(self):
+        self.reader.close()
+
+    def _build_topic_tree(self) -> List[Dict[str, Any]]:
+        graph = self.graph
+        records = {
+            name: self.reader.get('topics', name, key='name')
+            for name in self.reader.keys('topics', key='name')
+        }
+
+        def node(topic: int) -> Dict[str, Any]:
+            name = graph.topic_names[topic]
+            record = records.get(name) or {}
+            return {
+                'name': name,
+                'topic_id': record.get('topic_id'),
+                'category': record.get('category'),
+                'depth': self.closure.depth(name),
+                'problems': len(self.index.topics.get(name, [])),
+                'subtree_problems': len(self.index.under(name)),
+                'children': [node(child) for child in graph.topic_children.neighbors(topic)],
+            }
+
+        # Topics under an undefined parent are listed as roots
+        return [
+            node(topic) for topic in range(graph.topic_count)
+            if graph.topic_parent[topic] < 0 or graph.is_phantom_topic(graph.topic_parent[topic])
+        ]
+
+    def route(self, url: str) -> Dict[str, Any]:
+        """
+        Answer a GET request.
+
+        Args:
+            url: Request path and query string
+
+        Returns:
+            Response payload
+
+        Raises:
+            ServiceError: Unknown path, unknown record or invalid parameter
+        """
+        parts = urlsplit(url)
+        segments = [unquote(segment) for segment in parts.path.strip('/').split('/')]
+        params = parse_qs(parts.query)
+
+        if segments == ['problems']:
+            return self.list_problems(params)
+        if len(segments) == 2 and segments[0] == 'problems':
+            return self.problem(segments[1])
+        if segments == ['topics']:
+            return {'version': self.version, 'topics': self.topic_tree}
+        if len(segments) == 2 and segments[0] == 'contests':
+            return self.contest(segments[1])
+        raise ServiceError(404, f"Unknown path: {parts.path}")
+
+    def problem(self, value: str) -> Dict[str, Any]:
+        """Problem by problem_id, source:external_id or slug."""
+        for key in ('problem_id', 'source:external_id', 'slug'):
+            problem = self.reader.get('problems', value, key=key)
+            if problem is not None:
+                return {'version': self.version, 'problem': problem}
+        raise ServiceError(404, f"Unknown problem: {value}")
+
+    def list_problems(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        """One page of the problems matching every filter parameter."""
+        limit = _number(params, 'limit', int)
+        limit = DEFAULT_LIMIT if limit is None else max(0, min(limit, MAX_LIMIT))
+        offset = max(0, _number(params, 'offset', int) or 0)
+
+        positions = self.index.select(
+            source=_one(params, 'source'),
+            topics=params.get('topic'),
+            under=params.get('under'),
+            difficulty=_one(params, 'difficulty'),
+            rating_min=_number(params, 'rating_min'),
+            rating_max=_number(params, 'rating_max')
+        )
+        return {
+            'version': self.version,
+            'count': len(positions),
+            'offset': offset,
+            'limit': limit,
+            'problems': [self.reader.at('problems', p) for p in positions[offset:offset + limit]],
+        }
+
+    def contest(self, value: str) -> Dict[str, Any]:
+        """Contest by contest_id or source:external_id, with its problems."""
+        contest = (self.reader.get('contests', value)
+                   or self.reader.get('contests', value, key='source:external_id'))
+        if contest is None:
+            raise ServiceError(404, f"Unknown contest: {value}")
+
+        problems = []
+        node = self.graph.contest_node(contest.get('contest_id'))
+        if node is not None:
+            positions = dict.fromkeys(
+                p for p in self.graph.contest_problems.neighbors(node)
+                if not self.graph.is_phantom_problem(p)
+            )
+            problems = [self.reader.at('problems', p) for p in positions]
+        return {'version': self.version, 'contest': contest, 'problems': problems}
+
+
+class SnapshotService:
+    """
+    Serves the latest published snapshot and swaps in newer ones.
+    """
+
+    def __init__(self, version: Optional[str] = None, cache_size: int = CACHE_SIZE):
+        """
+        Load the snapshot to serve.
+
+        Args:
+            version: Serve this version and never swap (default: latest, followed)
+            cache_size: Response cache capacity
+
+        Raises:
+            ServiceError: If there is no snapshot to serve
+        """
+        self.pinned = version is not None
+        self.cache = LRUCache(cache_size)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._failed = None
+
+        version = version or self.latest_version()
+        if version is None or not os.path.isdir(os.path.join(VALIDATED_DIR, version)):
+            raise ServiceError(503, f"No snapshot to serve in {VALIDATED_DIR}")
+        self.view = SnapshotView(version, os.path.join(VALIDATED_DIR, version))
+
+    @staticmethod
+    def latest_version() -> Optional[str]:
+        """Newest snapshot that has been completely written (from the catalog)."""
+        return get_latest_version()
+
+    def acquire(self) -> SnapshotView:
+        """Current view, held open until release()."""
+        with self._lock:
+            view = self.view
+            view.active += 1
+            return view
+
+    def release(self, view: SnapshotView):
+        with self._lock:
+            view.active -= 1
+            close = view.retired and view.active == 0
+        if close:
+            view.close()
+
+    def swap(self, version: str):
+        """
+        Load a version and make it the served one.
+
+        Loading happens before the lock is taken, so requests keep being
+        answered from the old view meanwhile; the old view is closed once
+        no request holds it.
+        """
+        view = SnapshotView(version, os.path.join(VALIDATED_DIR, version))
+        with self._lock:
+            old, self.view = self.view, view
+            old.retired = True
+            close = old.active == 0
+        # Entries are keyed by version, so this only frees the old ones
+        self.cache.clear()
+        if close:
+            old.close()
+
+    def refresh(self) -> bool:
+        """Swap to the latest snapshot if it is newer; returns True if swapped."""
+        latest = self.latest_version()
+        if self.pinned or latest is None or latest in (self.view.version, self._failed):
+            return False
+        try:
+            self.swap(latest)
+        except Exception:
+            # Not retried until an even newer snapshot shows up
+            self._failed = latest
+            raise
+        return True
+
+    def watch(self, interval: float = POLL_INTERVAL) -> threading.Thread:
+        """Poll for new snapshots from a daemon thread."""
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    if self.refresh():
+                        print(f"  ✓ Now serving {self.view.version}")
+                except Exception as e:
+                    print(f"  ⚠ Failed to load snapshot {self._failed}: {e}")
+
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def health(self) -> Dict[str, Any]:
+        view = self.view
+        return {
+            'status': 'ok',
+            'version': view.version,
+            'etag': view.etag,
+            'pinned': self.pinned,
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'cache': self.cache.stats(),
+        }
+
+    def respond(self, url: str, if_none_match: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answer a GET request.
+
+        Args:
+            url: Request path and query string
+            if_none_match: If-None-Match request header
+
+        Returns:
+            (status, headers, body)
+        """
+        if urlsplit(url).path.rstrip('/') == '/health':
+            body = json.dumps(self.health()).encode('utf-8')
+            return 200, {'Cache-Control': 'no-store'}, body
+
+        view = self.acquire()
+        try:
+            headers = {'ETag': view.etag, 'X-Snapshot-Version': view.version}
+            key = (view.version, url)
+            cached = self.cache.get(key)
+            if cached is None:
+                try:
+                    cached = (200, view.route(url))
+                except ServiceError as e:
+                    cached = (e.status, {'error': str(e)})
+                except Exception as e:
+                    return 500, {}, json.dumps({'error': f"Internal error: {e}"}).encode('utf-8')
+                cached = (cached[0], json.dumps(cached[1], ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+                self.cache.put(key, cached)
+            status, body = cached
+        finally:
+            self.release(view)
+
+        if status != 200:
+            return status, {}, body
+        if if_none_match and (if_none_match.strip() == '*' or view.etag in
+                              [tag.strip() for tag in if_none_match.split(',')]):
+            return 304, headers, b''
+        return status, headers, body
+
+
+class SnapshotHTTPServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server for the snapshot service.
+
+    The listen backlog is a class attribute because TCPServer.__init__
+    calls listen() with it before an instance could change it.
+    """
+    daemon_threads = True
+    # Room for load-test bursts
+    request_queue_size = 128
+
+
+def start_service(
+    service: SnapshotService,
+    port: int = DEFAULT_PORT,
+    addr: str = '127.0.0.1'
+) -> SnapshotHTTPServer:
+    """
+    Serve a SnapshotService from a daemon thread.
+
+    Args:
+        service: Service answering the requests
+        port: Port to listen on (0 picks a free port)
+        addr: Bind address (local only by default)
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    class SnapshotHandler(BaseHTTPRequestHandler):
+        # Keep-alive, so clients reuse their connection; headers and body
+        # go out as separate writes, so Nagle would hold the body back
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            status, headers, body = service.respond(self.path, self.headers.get('If-None-Match'))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if status != 304:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = SnapshotHTTPServer((addr, port), SnapshotHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP read service over the latest snapshot")
+    parser.add_argument('--host', default='127.0.0.1', help="Bind address (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument('--version', help="Serve this version only (default: latest, swapped when a new one is published)")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE,
+                        help=f"Cached responses (default: {CACHE_SIZE})")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between checks for a new snapshot (default: {POLL_INTERVAL})")
+    args = parser.parse_args()
+
+    try:
+        service = SnapshotService(args.version, args.cache_size)
+    except (ServiceError, OSError, ValueError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    server = start_service(service, args.port, args.host)
+    host, port = server.server_address[:2]
+
+    print("=" * 60)
+    print("SNAPSHOT SERVICE")
+    print("=" * 60)
+    print(f"  Version: {service.view.version}{' (pinned)' if service.pinned else ''}")
+    print(f"  ETag: {service.view.etag}")
+    print(f"  Listening: http://{host}:{port}/")
+    print("-" * 60)
+
+    if not service.pinned and args.poll_interval > 0:
+        service.watch(args.poll_interval)
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n  Shutting down")
+    finally:
+        service.stop()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()